@@ -0,0 +1,38 @@
+"""add_content_hash_to_content_chunks
+
+Add text_hash and embedding_model to content_chunks so chunk embeddings can
+be reused across jobs with identical chunk text (content-addressed cache).
+
+Revision ID: a3f1c9d2e7b4
+Revises: 65f2c3eb4088
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3f1c9d2e7b4"
+down_revision = "65f2c3eb4088"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content_chunks", sa.Column("embedding_model", sa.String(100), nullable=True)
+    )
+    op.add_column(
+        "content_chunks", sa.Column("text_hash", sa.String(64), nullable=True)
+    )
+    op.create_index(
+        "ix_content_chunks_text_hash", "content_chunks", ["text_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_chunks_text_hash", table_name="content_chunks")
+    op.drop_column("content_chunks", "text_hash")
+    op.drop_column("content_chunks", "embedding_model")
@@ -0,0 +1,94 @@
+"""add_job_facet_counts
+
+Add job_facet_counts, the precomputed search facet and filter statistics
+read by /search/facets, /search/filters/stats and /search/popular-filters,
+and fill it from the existing jobs. The application keeps it current from
+then on.
+
+Revision ID: a7c3e9f1d2b8
+Revises: e3f9a2c7d4b1
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e9f1d2b8"
+down_revision = "e3f9a2c7d4b1"
+branch_labels = None
+depends_on = None
+
+COUNTED = [
+    ("classification", "job_descriptions", "classification"),
+    ("language", "job_descriptions", "language"),
+    ("department", "job_metadata", "department"),
+    ("location", "job_metadata", "location"),
+]
+
+# Dates are stored as proleptic Gregorian ordinals, as date.toordinal() does
+NUMERIC = [
+    ("salary_budget", "salary_budget"),
+    ("fte_count", "fte_count"),
+    ("effective_date", "(effective_date - DATE '0001-01-01' + 1)"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_facet_counts",
+        sa.Column("facet", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.String(length=500), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("value_sum", sa.Float(), nullable=True),
+        sa.Column("value_min", sa.Float(), nullable=True),
+        sa.Column("value_max", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("facet", "value"),
+    )
+
+    for facet, table, column in COUNTED:
+        op.execute(
+            f"""
+            INSERT INTO job_facet_counts (facet, value, row_count, updated_at)
+            SELECT '{facet}', {column}, count(*), now()
+            FROM {table}
+            WHERE {column} IS NOT NULL AND {column} <> ''
+            GROUP BY {column}
+            """
+        )
+    op.execute(
+        """
+        INSERT INTO job_facet_counts (facet, value, row_count, updated_at)
+        SELECT 'section_type', section_type, count(*), now()
+        FROM job_sections
+        WHERE section_type IS NOT NULL
+        GROUP BY section_type
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO job_facet_counts (facet, value, row_count, updated_at)
+        SELECT 'embedded_chunks', '', count(*), now()
+        FROM content_chunks
+        WHERE embedding IS NOT NULL
+        HAVING count(*) > 0
+        """
+    )
+    for facet, expression in NUMERIC:
+        op.execute(
+            f"""
+            INSERT INTO job_facet_counts
+                (facet, value, row_count, value_sum, value_min, value_max, updated_at)
+            SELECT '{facet}', '', count({expression}), sum({expression}),
+                   min({expression}), max({expression}), now()
+            FROM job_metadata
+            HAVING count({expression}) > 0
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("job_facet_counts")
@@ -0,0 +1,74 @@
+"""add_job_embeddings_table
+
+Add job_embeddings, holding one mean-pooled chunk embedding per job with an
+HNSW index, and backfill it from existing chunk embeddings.
+
+Revision ID: b7e4d2a9c1f3
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e4d2a9c1f3"
+down_revision = "a3f1c9d2e7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_embeddings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "embedding", pgvector.sqlalchemy.vector.VECTOR(dim=1536), nullable=False
+        ),
+        sa.Column("embedding_model", sa.String(length=100), nullable=True),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["job_id"], ["job_descriptions.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_job_embeddings_id"), "job_embeddings", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_job_embeddings_job_id"), "job_embeddings", ["job_id"], unique=True
+    )
+
+    # Backfill centroids for jobs that already have chunk embeddings
+    op.execute(
+        """
+        INSERT INTO job_embeddings
+            (job_id, embedding, embedding_model, chunk_count, created_at, updated_at)
+        SELECT job_id, AVG(embedding), MAX(embedding_model), COUNT(*), NOW(), NOW()
+        FROM content_chunks
+        WHERE embedding IS NOT NULL
+        GROUP BY job_id;
+    """
+    )
+
+    # HNSW index for job-level similarity searches
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_job_embeddings_embedding_hnsw
+        ON job_embeddings USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64);
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_job_embeddings_embedding_hnsw;")
+    op.drop_index(op.f("ix_job_embeddings_job_id"), table_name="job_embeddings")
+    op.drop_index(op.f("ix_job_embeddings_id"), table_name="job_embeddings")
+    op.drop_table("job_embeddings")
@@ -0,0 +1,59 @@
+"""add_file_manifest_table
+
+Add file_manifest, recording the stat signature (size, mtime, inode) and
+content hash of each ingested file so directory rescans can skip unchanged
+files and update edited ones in place.
+
+Revision ID: c5a8e1f4b2d6
+Revises: b7e4d2a9c1f3
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5a8e1f4b2d6"
+down_revision = "b7e4d2a9c1f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "file_manifest",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("file_path", sa.String(length=1000), nullable=False),
+        sa.Column("file_size", sa.BigInteger(), nullable=False),
+        sa.Column("mtime_ns", sa.BigInteger(), nullable=False),
+        sa.Column("inode", sa.BigInteger(), nullable=False),
+        sa.Column("file_hash", sa.String(length=64), nullable=False),
+        sa.Column("encoding", sa.String(length=50), nullable=True),
+        sa.Column("job_id", sa.Integer(), nullable=True),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["job_id"], ["job_descriptions.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_file_manifest_id"), "file_manifest", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_file_manifest_file_path"), "file_manifest", ["file_path"], unique=True
+    )
+    op.create_index(
+        op.f("ix_file_manifest_file_hash"), "file_manifest", ["file_hash"], unique=False
+    )
+    op.create_index(
+        op.f("ix_file_manifest_job_id"), "file_manifest", ["job_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_file_manifest_job_id"), table_name="file_manifest")
+    op.drop_index(op.f("ix_file_manifest_file_hash"), table_name="file_manifest")
+    op.drop_index(op.f("ix_file_manifest_file_path"), table_name="file_manifest")
+    op.drop_index(op.f("ix_file_manifest_id"), table_name="file_manifest")
+    op.drop_table("file_manifest")
@@ -0,0 +1,154 @@
+"""add_job_search_vectors
+
+Store the full-text search documents of job descriptions instead of
+building them with to_tsvector() in every query:
+
+- job_descriptions.search_vector: title (weight A), section text (B) and
+  raw content (C)
+- job_descriptions.title_vector: the title alone, for title similarity
+
+Both are built with the text search configuration of the job's language
+(french for 'fr', english otherwise) and have GIN indexes. The section text
+lives in job_sections, so a generated column cannot include it; triggers
+keep the columns current instead. The triggers on job_sections are
+statement-level, so a multi-row section insert updates each job once.
+
+Revision ID: d4e8b2f6a1c9
+Revises: a7c3e9f1d2b8
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e8b2f6a1c9"
+down_revision = "a7c3e9f1d2b8"
+branch_labels = None
+depends_on = None
+
+SECTION_EVENTS = {"insert": "NEW TABLE", "update": "NEW TABLE", "delete": "OLD TABLE"}
+
+
+def upgrade() -> None:
+    op.add_column(
+        "job_descriptions",
+        sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True),
+    )
+    op.add_column(
+        "job_descriptions",
+        sa.Column("title_vector", postgresql.TSVECTOR(), nullable=True),
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION job_search_config(language text)
+        RETURNS regconfig AS $$
+            SELECT CASE WHEN lower(language) = 'fr'
+                THEN 'french'::regconfig ELSE 'english'::regconfig END
+        $$ LANGUAGE sql IMMUTABLE;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION job_search_vector(
+            job_id integer, title text, raw_content text, language text
+        ) RETURNS tsvector AS $$
+            SELECT
+                setweight(to_tsvector(job_search_config(language),
+                                      coalesce(title, '')), 'A')
+                || setweight(to_tsvector(job_search_config(language), coalesce(
+                    (SELECT string_agg(section_content, ' ' ORDER BY section_order)
+                     FROM job_sections WHERE job_sections.job_id = $1), '')), 'B')
+                || setweight(to_tsvector(job_search_config(language),
+                                         coalesce(raw_content, '')), 'C')
+        $$ LANGUAGE sql STABLE;
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION job_descriptions_search_vector_trigger()
+        RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := job_search_vector(
+                NEW.id, NEW.title, NEW.raw_content, NEW.language);
+            NEW.title_vector := to_tsvector(
+                job_search_config(NEW.language), coalesce(NEW.title, ''));
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER job_descriptions_search_vector
+        BEFORE INSERT OR UPDATE OF title, raw_content, language
+        ON job_descriptions
+        FOR EACH ROW EXECUTE FUNCTION job_descriptions_search_vector_trigger();
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION job_sections_search_vector_trigger()
+        RETURNS trigger AS $$
+        BEGIN
+            UPDATE job_descriptions AS job
+            SET search_vector = job_search_vector(
+                job.id, job.title, job.raw_content, job.language)
+            WHERE job.id IN (SELECT DISTINCT job_id FROM changed_sections);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # Transition tables allow only one event per trigger
+    for event, table in SECTION_EVENTS.items():
+        op.execute(
+            f"""
+            CREATE TRIGGER job_sections_search_vector_{event}
+            AFTER {event.upper()} ON job_sections
+            REFERENCING {table} AS changed_sections
+            FOR EACH STATEMENT EXECUTE FUNCTION job_sections_search_vector_trigger();
+            """
+        )
+
+    op.execute(
+        """
+        UPDATE job_descriptions
+        SET search_vector = job_search_vector(id, title, raw_content, language),
+            title_vector = to_tsvector(job_search_config(language), coalesce(title, ''))
+        """
+    )
+    op.create_index(
+        "idx_job_descriptions_search_vector",
+        "job_descriptions",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "idx_job_descriptions_title_vector",
+        "job_descriptions",
+        ["title_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_job_descriptions_title_vector", table_name="job_descriptions")
+    op.drop_index("idx_job_descriptions_search_vector", table_name="job_descriptions")
+    for event in SECTION_EVENTS:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS job_sections_search_vector_{event} ON job_sections;"
+        )
+    op.execute(
+        "DROP TRIGGER IF EXISTS job_descriptions_search_vector ON job_descriptions;"
+    )
+    op.execute("DROP FUNCTION IF EXISTS job_sections_search_vector_trigger();")
+    op.execute("DROP FUNCTION IF EXISTS job_descriptions_search_vector_trigger();")
+    op.execute("DROP FUNCTION IF EXISTS job_search_vector(integer, text, text, text);")
+    op.execute("DROP FUNCTION IF EXISTS job_search_config(text);")
+    op.drop_column("job_descriptions", "title_vector")
+    op.drop_column("job_descriptions", "search_vector")
@@ -0,0 +1,30 @@
+"""add_audit_log_previous_hash
+
+Add audit_log.previous_hash, linking each audit event to the hash of the
+event written before it so that removed or altered rows break the chain.
+
+Revision ID: e3f9a2c7d4b1
+Revises: c5a8e1f4b2d6
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e3f9a2c7d4b1"
+down_revision = "c5a8e1f4b2d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "audit_log", sa.Column("previous_hash", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("audit_log", "previous_hash")
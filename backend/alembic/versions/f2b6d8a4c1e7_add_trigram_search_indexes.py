@@ -0,0 +1,44 @@
+"""add_trigram_search_indexes
+
+Enable pg_trgm and add trigram GIN indexes for the substring (ILIKE
+'%...%') filters that a B-tree index cannot serve: job titles in the job
+list, department and location filters, and skill name search.
+
+Revision ID: f2b6d8a4c1e7
+Revises: d4e8b2f6a1c9
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "f2b6d8a4c1e7"
+down_revision = "d4e8b2f6a1c9"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = [
+    ("idx_job_descriptions_title_trgm", "job_descriptions", "title"),
+    ("idx_job_metadata_department_trgm", "job_metadata", "department"),
+    ("idx_job_metadata_location_trgm", "job_metadata", "location"),
+    ("idx_skills_name_trgm", "skills", "name"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name=table)
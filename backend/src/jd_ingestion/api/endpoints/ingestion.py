@@ -2,7 +2,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 # Third-party imports
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
@@ -16,6 +16,8 @@ from ...processors.content_processor import ProcessedContent
 from ...database.connection import get_async_session
 from ...database.models import ContentChunk, JobDescription, JobMetadata, JobSection
 from ...processors.content_processor import ContentProcessor
+from ...services.facet_store import facet_store
+from ...utils.cache import cache_service
 from ...utils.circuit_breaker import circuit_breaker_manager
 from ...utils.error_handler import handle_errors, retry_on_failure
 from ...utils.logging import get_logger
@@ -197,23 +199,9 @@ async def process_single_file(
             processed_content = ProcessedContent()
             processed_content.processing_errors = [str(e)]
 
-        # Generate chunks
+        # Generate section-aligned chunks
         try:
-            # Ensure cleaned_content is a string before passing to chunk_content
-            cleaned_content = processed_content.cleaned_content
-            logger.info(
-                "About to generate chunks",
-                cleaned_content_type=type(cleaned_content).__name__,
-            )
-            if not isinstance(cleaned_content, str):
-                logger.error(
-                    "cleaned_content is not a string",
-                    content_type=type(cleaned_content).__name__,
-                    content_preview=str(cleaned_content)[:200],
-                )
-                cleaned_content = str(cleaned_content)
-
-            chunks = content_processor.chunk_content(cleaned_content)
+            chunks = list(content_processor.iter_chunks(processed_content))
             logger.info(
                 "Chunk generation completed successfully", chunk_count=len(chunks)
             )
@@ -290,7 +278,7 @@ async def process_single_file(
 
                 db.add(job_description)
                 await db.commit()
-                job_id = job_description.id
+                job_id = int(job_description.id)
 
                 logger.info("Job saved to database", job_id=job_id, file_path=file_path)
 
@@ -322,6 +310,7 @@ async def process_single_file(
                 )
 
                 # Save job sections if processing succeeded
+                job_sections: Dict[Optional[str], JobSection] = {}
                 if (
                     processed_content
                     and hasattr(processed_content, "sections")
@@ -339,6 +328,7 @@ async def process_single_file(
                             section_order=section_order,
                         )
                         db.add(job_section)
+                        job_sections[section_type] = job_section
                         section_order += 1
 
                     logger.info(
@@ -366,9 +356,12 @@ async def process_single_file(
 
                 # Save content chunks if available
                 if chunks:
-                    for i, chunk_text in enumerate(chunks):
+                    for i, text_chunk in enumerate(chunks):
                         content_chunk = ContentChunk(
-                            job_id=job_id, chunk_text=chunk_text, chunk_index=i
+                            job_id=job_id,
+                            section=job_sections.get(text_chunk.section_type),
+                            chunk_text=text_chunk.text,
+                            chunk_index=i,
                         )
                         db.add(content_chunk)
 
@@ -377,7 +370,9 @@ async def process_single_file(
                     )
 
                 # Commit the basic data first
+                await facet_store.add_jobs(db, [job_id])
                 await db.commit()
+                await cache_service.invalidate_job_cache(job_id)
 
                 # Generate embeddings for the content chunks (done after commit to have chunk IDs)
                 if chunks:
@@ -397,25 +392,38 @@ async def process_single_file(
                         saved_chunks = saved_chunks_result.scalars().all()
 
                         # Generate embeddings in batches
-                        chunk_texts = [str(chunk.chunk_text) for chunk in saved_chunks]
+                        chunk_texts = [
+                            str(saved_chunk.chunk_text) for saved_chunk in saved_chunks
+                        ]
                         embeddings = await embedding_service.generate_embeddings_batch(
-                            chunk_texts, batch_size=50
+                            chunk_texts, batch_size=50, db=db
                         )
 
                         # Update chunks with embeddings
                         embedding_count = 0
-                        for chunk, embedding in zip(saved_chunks, embeddings):
+                        for saved_chunk, chunk_text, embedding in zip(
+                            saved_chunks, chunk_texts, embeddings
+                        ):
                             if (
                                 embedding
                             ):  # Only update if embedding generation succeeded
                                 await db.execute(
                                     update(ContentChunk)
-                                    .where(ContentChunk.id == chunk.id)
-                                    .values(embedding=embedding)
+                                    .where(ContentChunk.id == saved_chunk.id)
+                                    .values(
+                                        embedding=embedding,
+                                        embedding_model=settings.embedding_model,
+                                        text_hash=embedding_service.get_text_hash(
+                                            chunk_text
+                                        ),
+                                    )
                                 )
                                 embedding_count += 1
 
+                        await facet_store.record_embeddings(db, embedding_count)
                         await db.commit()
+                        if embedding_count:
+                            await embedding_service.update_job_embedding(job_id, db)
                         logger.info(
                             f"Generated and saved {embedding_count} embeddings out of {len(chunks)} chunks",
                             job_id=job_id,
@@ -988,6 +996,7 @@ async def _generate_embeddings_background_task(
         batch_size = 50  # Process in smaller batches for better error handling
         total_processed = 0
         total_successful = 0
+        embedded_job_ids: Set[int] = set()
 
         for i in range(0, len(chunks), batch_size):
             batch = chunks[i : i + batch_size]
@@ -1000,22 +1009,32 @@ async def _generate_embeddings_background_task(
             try:
                 # Generate embeddings for this batch
                 embeddings = await embedding_service.generate_embeddings_batch(
-                    batch_texts, batch_size=batch_size
+                    batch_texts, batch_size=batch_size, db=db
                 )
 
                 # Update chunks with embeddings
-                for chunk, embedding in zip(batch, embeddings):
+                newly_embedded = 0
+                batch_job_ids: Set[int] = set()
+                for chunk, chunk_text, embedding in zip(batch, batch_texts, embeddings):
                     if embedding:  # Only update if embedding generation succeeded
+                        newly_embedded += chunk.embedding is None
                         await db.execute(
                             update(ContentChunk)
                             .where(ContentChunk.id == chunk.id)
-                            .values(embedding=embedding)
+                            .values(
+                                embedding=embedding,
+                                embedding_model=settings.embedding_model,
+                                text_hash=embedding_service.get_text_hash(chunk_text),
+                            )
                         )
+                        batch_job_ids.add(int(chunk.job_id))
                         total_successful += 1
 
                     total_processed += 1
 
+                await facet_store.record_embeddings(db, newly_embedded)
                 await db.commit()
+                embedded_job_ids.update(batch_job_ids)
                 logger.info(
                     f"Batch {i // batch_size + 1} completed: {sum(1 for e in embeddings if e)} embeddings generated"
                 )
@@ -1027,6 +1046,9 @@ async def _generate_embeddings_background_task(
                 await db.rollback()
                 # Continue with next batch even if this one fails
 
+        # Refresh the job-level centroids used by similar-job search
+        await embedding_service.update_job_embeddings(embedded_job_ids, db)
+
         logger.info(
             f"Background embedding generation completed: {total_successful}/{total_processed} chunks processed successfully"
         )
@@ -26,9 +26,12 @@ from ...auth.api_key import get_api_key
 
 # Statistics functions now available via analytics_service
 from ...services.analytics_service import analytics_service
+from ...services.facet_store import facet_store
 from ...utils.error_handler import handle_errors, retry_on_failure
 from ...utils.logging import get_logger
 from ...utils.caching import cache_result
+from ...utils.cache import cache_service
+from ...utils.text_search import text_search_query
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -64,6 +67,62 @@ class JobUpdate(BaseModel):
         from_attributes = True
 
 
+def _job_list_filters(
+    search: Optional[str] = None,
+    classification: Optional[str] = None,
+    language: Optional[str] = None,
+    department: Optional[str] = None,
+    skill_ids: Optional[str] = None,
+    full_text: bool = True,
+) -> List[Any]:
+    """
+    Build the WHERE clauses of the job list.
+
+    Every clause can use an index: ``search`` matches the title by substring
+    (trigram index) or the title, sections and content by full-text search
+    (the stored search vector), and ``department`` matches by substring
+    (trigram index). Jobs must have ALL of ``skill_ids``, comma-separated.
+    Without ``full_text`` (databases other than PostgreSQL, e.g. SQLite),
+    the content is matched by substring instead.
+    """
+    filters: List[Any] = []
+    if search:
+        content_match = (
+            JobDescription.search_vector.op("@@")(text_search_query(search, language))
+            if full_text
+            else JobDescription.raw_content.ilike(f"%{search}%")
+        )
+        filters.append(JobDescription.title.ilike(f"%{search}%") | content_match)
+    if classification:
+        filters.append(JobDescription.classification == classification)
+    if language:
+        filters.append(JobDescription.language == language)
+    if department:
+        filters.append(
+            JobDescription.job_metadata.has(
+                JobMetadata.department.ilike(f"%{department}%")
+            )
+        )
+    if skill_ids:
+        skill_id_list = {
+            int(sid.strip()) for sid in skill_ids.split(",") if sid.strip()
+        }
+        if skill_id_list:
+            # Jobs linked to every requested skill, found in one subquery
+            filters.append(
+                JobDescription.id.in_(
+                    select(job_description_skills.c.job_id)
+                    .where(job_description_skills.c.skill_id.in_(skill_id_list))
+                    .group_by(job_description_skills.c.job_id)
+                    .having(
+                        func.count(job_description_skills.c.skill_id.distinct())
+                        == len(skill_id_list)
+                    )
+                )
+            )
+    return filters
+
+
 @router.get("/")
 @retry_on_failure()
 async def list_jobs(
@@ -96,82 +155,28 @@ async def list_jobs(
             detail="Both 'page' and 'size' parameters must be provided together",
         )
 
-    # Build base query - eagerly load related data to prevent N+1 queries
-    base_query = select(JobDescription).options(
-        selectinload(JobDescription.quality_metrics),
-        selectinload(JobDescription.skills),
-        selectinload(JobDescription.sections),  # Load job sections
-        selectinload(JobDescription.job_metadata),  # Load metadata
+    # One filter spec for both the count and the page query
+    filters = _job_list_filters(
+        search=search,
+        classification=classification,
+        language=language,
+        department=department,
+        skill_ids=skill_ids,
+        full_text=db.bind is not None and db.bind.dialect.name == "postgresql",
     )
+    count_query = select(func.count(JobDescription.id)).where(*filters)
 
-    # Apply filters
-    if search:
-        base_query = base_query.where(
-            JobDescription.title.ilike(f"%{search}%")
-            | JobDescription.raw_content.ilike(f"%{search}%")
-        )
-    if classification:
-        base_query = base_query.where(JobDescription.classification == classification)
-    if language:
-        base_query = base_query.where(JobDescription.language == language)
-    if department:
-        base_query = base_query.join(JobDescription.job_metadata).where(
-            JobMetadata.department.ilike(f"%{department}%")
-        )
-
-    # Skill filtering - jobs must have ALL specified skills (AND logic)
-    if skill_ids:
-        skill_id_list = [
-            int(sid.strip()) for sid in skill_ids.split(",") if sid.strip()
-        ]
-        if skill_id_list:
-            # For each skill ID, we need to ensure the job has it
-            # We use a subquery that counts how many of the required skills each job has
-            # and only keep jobs that have all required skills
-            for skill_id in skill_id_list:
-                base_query = base_query.where(
-                    JobDescription.id.in_(
-                        select(job_description_skills.c.job_id).where(
-                            job_description_skills.c.skill_id == skill_id
-                        )
-                    )
-                )
-
-    # Get total count and paginated results in a single query if possible, or two efficient queries
-    # For simplicity and broad compatibility, we'll stick to two queries, but ensure they are efficient.
-
-    # Count query - optimized to avoid subquery
-    count_query = select(func.count(JobDescription.id))
-
-    # Apply the same filters for count query
-    if search:
-        count_query = count_query.where(
-            JobDescription.title.ilike(f"%{search}%")
-            | JobDescription.raw_content.ilike(f"%{search}%")
-        )
-    if classification:
-        count_query = count_query.where(JobDescription.classification == classification)
-    if language:
-        count_query = count_query.where(JobDescription.language == language)
-    if department:
-        count_query = count_query.join(JobDescription.job_metadata).where(
-            JobMetadata.department.ilike(f"%{department}%")
+    # Build base query - eagerly load related data to prevent N+1 queries
+    base_query = (
+        select(JobDescription)
+        .options(
+            selectinload(JobDescription.quality_metrics),
+            selectinload(JobDescription.skills),
+            selectinload(JobDescription.sections),  # Load job sections
+            selectinload(JobDescription.job_metadata),  # Load metadata
         )
-
-    # Apply same skill filtering to count query
-    if skill_ids:
-        skill_id_list = [
-            int(sid.strip()) for sid in skill_ids.split(",") if sid.strip()
-        ]
-        if skill_id_list:
-            for skill_id in skill_id_list:
-                count_query = count_query.where(
-                    JobDescription.id.in_(
-                        select(job_description_skills.c.job_id).where(
-                            job_description_skills.c.skill_id == skill_id
-                        )
-                    )
-                )
+        .where(*filters)
+    )
 
     total_result = await db.execute(count_query)
     total_count = total_result.scalar_one()
@@ -620,6 +625,7 @@ async def create_job(
             raw_content=job_data.content or "",
         )
 
+        facet_change = await facet_store.track(db)
         db.add(new_job)
         await db.flush()  # Get the job ID
 
@@ -642,7 +648,9 @@ async def create_job(
                 )
                 db.add(section)
 
+        await facet_change.apply([int(new_job.id)])
         await db.commit()
+        await cache_service.invalidate_job_cache(int(new_job.id))
         await db.refresh(new_job)
 
         logger.info(
@@ -695,6 +703,7 @@ async def reprocess_job(
         # Update processed date to mark as reprocessed
         job.processed_date = datetime.utcnow()  # type: ignore[assignment]
         await db.commit()
+        await cache_service.invalidate_job_cache(job_id)
 
         logger.info(
             "Job description reprocessed", job_id=job_id, job_number=job.job_number
@@ -739,8 +748,11 @@ async def delete_job(
             raise HTTPException(status_code=404, detail="Job description not found")
 
         # Delete job (cascade will handle related records)
+        facet_change = await facet_store.track(db, [job_id])
         await db.delete(job)
+        await facet_change.apply()
         await db.commit()
+        await cache_service.invalidate_job_cache(job_id)
 
         logger.info("Job description deleted", job_id=job_id, job_number=job.job_number)
 
@@ -780,6 +792,8 @@ async def update_job(
         if not job:
             raise HTTPException(status_code=404, detail="Job description not found")
 
+        facet_change = await facet_store.track(db, [job_id])
+
         # Update only the fields that were provided
         update_data = job_update.model_dump(exclude_unset=True)
 
@@ -813,7 +827,9 @@ async def update_job(
         # Update timestamp
         job.updated_at = datetime.utcnow()  # type: ignore[assignment]
 
+        await facet_change.apply()
         await db.commit()
+        await cache_service.invalidate_job_cache(job_id)
         await db.refresh(job)
 
         logger.info(
@@ -890,6 +906,7 @@ async def update_job_section(
         job.updated_at = datetime.utcnow()  # type: ignore[assignment]
 
         await db.commit()
+        await cache_service.invalidate_job_cache(job_id)
         await db.refresh(section)
 
         logger.info(
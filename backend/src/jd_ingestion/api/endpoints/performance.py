@@ -8,7 +8,12 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 
 from ...database.connection import get_async_session
+from ...services.analytics_buffer import analytics_buffer
 from ...services.embedding_service import optimized_embedding_service
+from ...services.openai_dispatcher import RequestPriority, openai_dispatcher
+from ...services.search_recommendations_service import (
+    search_recommendations_service,
+)
 from ...utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -55,6 +60,42 @@ async def get_performance_statistics(db: AsyncSession = Depends(get_async_sessio
         )
 
 
+@router.get("/embedding-cache", response_model=Dict[str, Any])
+async def get_embedding_cache_statistics():
+    """Get hit/miss statistics for the content-addressed embedding cache."""
+    return {
+        "status": "success",
+        "embedding_cache": optimized_embedding_service.embedding_cache.get_stats(),
+    }
+
+
+@router.get("/analytics-buffer", response_model=Dict[str, Any])
+async def get_analytics_buffer_statistics():
+    """Get queue depth and throughput of the buffered usage analytics writer."""
+    return {
+        "status": "success",
+        "analytics_buffer": analytics_buffer.get_stats(),
+    }
+
+
+@router.get("/openai-dispatcher", response_model=Dict[str, Any])
+async def get_openai_dispatcher_statistics():
+    """Get queue depths and admission counters of the OpenAI request dispatcher."""
+    return {
+        "status": "success",
+        "openai_dispatcher": openai_dispatcher.get_stats(),
+    }
+
+
+@router.get("/search-suggestions", response_model=Dict[str, Any])
+async def get_search_suggestion_statistics():
+    """Get per-strategy latency of query suggestions and the autocomplete index."""
+    return {
+        "status": "success",
+        "search_suggestions": search_recommendations_service.get_stats(),
+    }
+
+
 @router.post("/benchmark/vector-search")
 async def benchmark_vector_search(
     benchmark: VectorSearchBenchmark, db: AsyncSession = Depends(get_async_session)
@@ -68,7 +109,7 @@ async def benchmark_vector_search(
         # Generate query embedding
         start_time = time.perf_counter()
         query_embedding = await optimized_embedding_service.generate_embedding(
-            benchmark.query_text
+            benchmark.query_text, RequestPriority.INTERACTIVE
         )
         embedding_time = time.perf_counter() - start_time
 
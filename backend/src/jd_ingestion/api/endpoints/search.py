@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 # Third-party imports
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import and_, desc, func, select, text
+from sqlalchemy import and_, desc, func, null, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Local imports
@@ -20,15 +20,27 @@ from ...database.models import (
     SearchAnalytics,
 )
 from ...services.embedding_service import embedding_service, optimized_embedding_service
+from ...services.facet_store import (
+    EMBEDDED_CHUNKS,
+    SECTION_TYPE,
+    facet_rows,
+    facet_store,
+)
 from ...services.search_analytics_service import search_analytics_service
 from ...services.search_recommendations_service import search_recommendations_service
 from ...utils.cache import cache_service
 from ...utils.error_handler import handle_errors, retry_on_failure
 from ...utils.logging import PerformanceTimer, get_logger, log_performance_metric
+from ...utils.text_search import any_term, text_search_query
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Aggregates requested on every UI page load; invalidated on any job change
+FACETS_CACHE_KEY = "facets:search"
+FILTER_STATS_CACHE_KEY = "facets:filter_stats"
+FACETS_CACHE_TTL = 300
+
 
 class SearchQuery(BaseModel):
     """Enhanced search query parameters with date range and salary filters."""
@@ -157,36 +169,22 @@ async def search_jobs(
         # If we got good semantic results, use them
         if semantic_results:
             logger.info("Using semantic search results", count=len(semantic_results))
-            detailed_results = []
-
-            for result in semantic_results:
-                # Get job details for snippet extraction
-                job_query = select(JobDescription).where(
-                    JobDescription.id == result["job_id"]
-                )
-                job_result = await db.execute(job_query)
-                job = job_result.scalar_one()
-
-                # Find matching sections
-                matching_sections = await _get_matching_sections(
-                    job_id=result["job_id"], search_query=search_query, db=db
-                )
-
-                detailed_results.append(
-                    {
-                        "job_id": result["job_id"],
-                        "job_number": result["job_number"],
-                        "title": result["title"],
-                        "classification": result["classification"],
-                        "language": result["language"],
-                        "relevance_score": result["relevance_score"],
-                        "matching_sections": matching_sections,
-                        "snippet": _extract_snippet(
-                            str(job.raw_content) if job.raw_content else "",
-                            search_query.query,
-                        ),
-                    }
-                )
+            hydrated = await _hydrate_search_results(
+                [result["job_id"] for result in semantic_results], search_query, db
+            )
+            detailed_results = [
+                {
+                    "job_id": result["job_id"],
+                    "job_number": result["job_number"],
+                    "title": result["title"],
+                    "classification": result["classification"],
+                    "language": result["language"],
+                    "relevance_score": result["relevance_score"],
+                    **hydrated[result["job_id"]],
+                }
+                for result in semantic_results
+                if result["job_id"] in hydrated
+            ]
 
             # Record analytics for successful semantic search
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -259,32 +257,24 @@ async def semantic_search(
             "message": "No semantic matches found - try full-text search",
         }
 
-    # Enhance results with detailed information
-    detailed_results = []
-    for result in semantic_results:
-        job_query = select(JobDescription).where(JobDescription.id == result["job_id"])
-        job_result = await db.execute(job_query)
-        job = job_result.scalar_one()
-
-        matching_sections = await _get_matching_sections(
-            job_id=result["job_id"], search_query=search_query, db=db
-        )
-
-        detailed_results.append(
-            {
-                "job_id": result["job_id"],
-                "job_number": result["job_number"],
-                "title": result["title"],
-                "classification": result["classification"],
-                "language": result["language"],
-                "relevance_score": result["relevance_score"],
-                "matching_sections": matching_sections,
-                "snippet": _extract_snippet(
-                    str(job.raw_content) if job.raw_content else "", search_query.query
-                ),
-                "matching_chunks": result.get("matching_chunks", 0),
-            }
-        )
+    # Enhance results with snippets and matching sections in one batch
+    hydrated = await _hydrate_search_results(
+        [result["job_id"] for result in semantic_results], search_query, db
+    )
+    detailed_results = [
+        {
+            "job_id": result["job_id"],
+            "job_number": result["job_number"],
+            "title": result["title"],
+            "classification": result["classification"],
+            "language": result["language"],
+            "relevance_score": result["relevance_score"],
+            **hydrated[result["job_id"]],
+            "matching_chunks": result.get("matching_chunks", 0),
+        }
+        for result in semantic_results
+        if result["job_id"] in hydrated
+    ]
 
     return {
         "query": search_query.query,
@@ -422,33 +412,20 @@ async def advanced_search_with_filters(
             if search_query.max_fte:
                 where_clauses.append(JobMetadata.fte_count <= search_query.max_fte)
 
-            # Text search filter
+            # Text search filter on the indexed title, section and body vector
+            tsquery = None
             if search_query.query.strip():
-                # Use full-text search on title and raw_content
-                text_search_clause = func.to_tsvector(
-                    "english",
-                    func.coalesce(JobDescription.title, "")
-                    + " "
-                    + func.coalesce(JobDescription.raw_content, ""),
-                ).match(func.plainto_tsquery("english", search_query.query))
-                where_clauses.append(text_search_clause)
+                tsquery = text_search_query(search_query.query, search_query.language)
+                where_clauses.append(JobDescription.search_vector.op("@@")(tsquery))
 
             # Apply all filters
             for clause in where_clauses:
                 base_query = base_query.where(clause)
 
             # Add ordering by relevance and date
-            if search_query.query.strip():
+            if tsquery is not None:
                 base_query = base_query.order_by(
-                    func.ts_rank(
-                        func.to_tsvector(
-                            "english",
-                            func.coalesce(JobDescription.title, "")
-                            + " "
-                            + func.coalesce(JobDescription.raw_content, ""),
-                        ),
-                        func.plainto_tsquery("english", search_query.query),
-                    ).desc(),
+                    func.ts_rank(JobDescription.search_vector, tsquery).desc(),
                     JobDescription.created_at.desc(),
                 )
             else:
@@ -531,7 +508,11 @@ async def advanced_search_with_filters(
 
             # Cache results for 30 minutes
             await cache_service.cache_search_results(
-                search_query.query, filters_dict, [response], 1800
+                search_query.query,
+                filters_dict,
+                [response],
+                1800,
+                job_ids=[item["job_id"] for item in search_results],
             )
 
             # Log analytics - method not available
@@ -556,149 +537,61 @@ async def advanced_search_with_filters(
 async def get_filter_statistics(db: AsyncSession = Depends(get_async_session)):
     """Get statistics for filter options to help users understand data ranges."""
     try:
-        with PerformanceTimer("filter_stats"):
-            # Get salary range statistics
-            salary_stats_query = select(
-                func.min(JobMetadata.salary_budget).label("min_salary"),
-                func.max(JobMetadata.salary_budget).label("max_salary"),
-                func.avg(JobMetadata.salary_budget).label("avg_salary"),
-                func.count(JobMetadata.salary_budget).label("salary_count"),
-            ).where(JobMetadata.salary_budget.isnot(None))
-
-            salary_result = await db.execute(salary_stats_query)
-            salary_stats = salary_result.fetchone()
-
-            # Get date range statistics
-            date_stats_query = select(
-                func.min(JobMetadata.effective_date).label("earliest_date"),
-                func.max(JobMetadata.effective_date).label("latest_date"),
-                func.count(JobMetadata.effective_date).label("date_count"),
-            ).where(JobMetadata.effective_date.isnot(None))
-
-            date_result = await db.execute(date_stats_query)
-            date_stats = date_result.fetchone()
-
-            # Get department and location counts
-            dept_stats_query = (
-                select(JobMetadata.department, func.count().label("count"))
-                .where(JobMetadata.department.isnot(None))
-                .group_by(JobMetadata.department)
-                .order_by(func.count().desc())
-                .limit(20)
-            )
-
-            dept_result = await db.execute(dept_stats_query)
-            dept_stats = dept_result.fetchall()
-
-            location_stats_query = (
-                select(JobMetadata.location, func.count().label("count"))
-                .where(JobMetadata.location.isnot(None))
-                .group_by(JobMetadata.location)
-                .order_by(func.count().desc())
-                .limit(20)
-            )
-
-            location_result = await db.execute(location_stats_query)
-            location_stats = location_result.fetchall()
-
-            # Get FTE statistics
-            fte_stats_query = select(
-                func.min(JobMetadata.fte_count).label("min_fte"),
-                func.max(JobMetadata.fte_count).label("max_fte"),
-                func.avg(JobMetadata.fte_count).label("avg_fte"),
-                func.count(JobMetadata.fte_count).label("fte_count"),
-            ).where(JobMetadata.fte_count.isnot(None))
-
-            fte_result = await db.execute(fte_stats_query)
-            fte_stats = fte_result.fetchone()
-
-            # Get classification and language counts
-            classification_stats_query = (
-                select(JobDescription.classification, func.count().label("count"))
-                .where(
-                    JobDescription.classification.isnot(None),
-                )
-                .group_by(JobDescription.classification)
-                .order_by(func.count().desc())
-            )
+        cached_stats = await cache_service.get(FILTER_STATS_CACHE_KEY)
+        if cached_stats:
+            return cached_stats
 
-            classification_result = await db.execute(classification_stats_query)
-            classification_stats = classification_result.fetchall()
-
-            language_stats_query = (
-                select(JobDescription.language, func.count().label("count"))
-                .where(
-                    JobDescription.language.isnot(None),
-                )
-                .group_by(JobDescription.language)
-                .order_by(func.count().desc())
-            )
-
-            language_result = await db.execute(language_stats_query)
-            language_stats = language_result.fetchall()
+        with PerformanceTimer("filter_stats"):
+            stored = await facet_store.load(db)
+            counts, numeric = stored["counts"], stored["numeric"]
+            salary = numeric.get("salary_budget", {})
+            dates = numeric.get("effective_date", {})
+            fte = numeric.get("fte_count", {})
+
+            def distribution(key: str, limit: Optional[int] = None):
+                return [
+                    {key: value, "count": count}
+                    for value, count in facet_rows(counts.get(key, {}), limit)
+                ]
 
             response = {
                 "salary_statistics": {
-                    "min_salary": (
-                        float(salary_stats.min_salary)
-                        if salary_stats and salary_stats.min_salary
-                        else None
-                    ),
-                    "max_salary": (
-                        float(salary_stats.max_salary)
-                        if salary_stats and salary_stats.max_salary
-                        else None
-                    ),
-                    "avg_salary": (
-                        float(salary_stats.avg_salary)
-                        if salary_stats and salary_stats.avg_salary
-                        else None
-                    ),
-                    "salary_count": salary_stats.salary_count if salary_stats else 0,
+                    "min_salary": salary.get("min"),
+                    "max_salary": salary.get("max"),
+                    "avg_salary": salary.get("avg"),
+                    "salary_count": salary.get("count", 0),
                 },
                 "date_statistics": {
                     "earliest_date": (
-                        date_stats.earliest_date.isoformat()
-                        if date_stats and date_stats.earliest_date
-                        else None
+                        dates["min"].isoformat() if dates.get("min") else None
                     ),
                     "latest_date": (
-                        date_stats.latest_date.isoformat()
-                        if date_stats and date_stats.latest_date
-                        else None
+                        dates["max"].isoformat() if dates.get("max") else None
                     ),
-                    "date_count": date_stats.date_count if date_stats else 0,
+                    "date_count": dates.get("count", 0),
                 },
                 "fte_statistics": {
-                    "min_fte": fte_stats.min_fte if fte_stats else None,
-                    "max_fte": fte_stats.max_fte if fte_stats else None,
-                    "avg_fte": float(fte_stats.avg_fte)
-                    if fte_stats and fte_stats.avg_fte
-                    else None,
-                    "fte_count": fte_stats.fte_count if fte_stats else 0,
+                    "min_fte": (
+                        int(fte["min"]) if fte.get("min") is not None else None
+                    ),
+                    "max_fte": (
+                        int(fte["max"]) if fte.get("max") is not None else None
+                    ),
+                    "avg_fte": fte.get("avg"),
+                    "fte_count": fte.get("count", 0),
                 },
-                "department_distribution": [
-                    {"department": row.department, "count": row.count}
-                    for row in dept_stats
-                    if row.department
-                ],
-                "location_distribution": [
-                    {"location": row.location, "count": row.count}
-                    for row in location_stats
-                    if row.location
-                ],
-                "classification_distribution": [
-                    {"classification": row.classification, "count": row.count}
-                    for row in classification_stats
-                    if row.classification
-                ],
-                "language_distribution": [
-                    {"language": row.language, "count": row.count}
-                    for row in language_stats
-                    if row.language
-                ],
+                "department_distribution": distribution("department", 20),
+                "location_distribution": distribution("location", 20),
+                "classification_distribution": distribution("classification"),
+                "language_distribution": distribution("language"),
             }
 
+            await cache_service.set(
+                FILTER_STATS_CACHE_KEY,
+                response,
+                FACETS_CACHE_TTL,
+                tags=[cache_service.JOBS_AGGREGATE_TAG],
+            )
             log_performance_metric("filter_stats_success", 1, "count")
             return response
 
@@ -719,6 +612,9 @@ async def find_similar_jobs_optimized(
     language_filter: Optional[str] = Query(
         None, description="Filter by language (EN/FR)"
     ),
+    use_centroid: bool = Query(
+        False, description="Compare using the job's mean embedding"
+    ),
     db: AsyncSession = Depends(get_async_session),
 ):
     """Find jobs similar to a given job description using optimized vector similarity."""
@@ -727,7 +623,13 @@ async def find_similar_jobs_optimized(
             "similar_jobs_search", tags={"job_id": job_id, "limit": limit}
         ):
             # Check cache first
-            cached_results = await cache_service.get_cached_similar_jobs(job_id, limit)
+            cached_results = await cache_service.get_cached_similar_jobs(
+                job_id,
+                limit,
+                use_centroid=use_centroid,
+                classification_filter=classification_filter,
+                language_filter=language_filter,
+            )
             if cached_results:
                 logger.debug("Cache hit for similar jobs", job_id=job_id)
                 log_performance_metric("similar_jobs_cache_hit", 1, "count")
@@ -743,141 +645,60 @@ async def find_similar_jobs_optimized(
             if not source_job:
                 raise HTTPException(status_code=404, detail="Job description not found")
 
-            # Use optimized embedding service for vector similarity
+            # Single-round-trip multi-vector kNN, aggregated per job in SQL
             try:
-                # Get representative chunks from the source job
-                chunk_query = (
-                    select(ContentChunk)
-                    .where(
-                        ContentChunk.job_id == job_id,
-                        ContentChunk.embedding.isnot(None),
-                    )
-                    .limit(3)
-                )  # Reduced for performance
-                chunk_result = await db.execute(chunk_query)
-                source_chunks = chunk_result.scalars().all()
-
-                if source_chunks:
-                    # Use batch similarity search for better performance
-                    # Cast embeddings to list[float] as they come from database
-                    source_embeddings: list[list[float]] = []
-                    for chunk in source_chunks:
-                        if chunk.embedding is not None:
-                            # pgvector returns embeddings as lists already
-                            if isinstance(chunk.embedding, list):
-                                source_embeddings.append(chunk.embedding)  # type: ignore[arg-type]
-                            else:
-                                # Convert to list if needed
-                                source_embeddings.append(list(chunk.embedding))  # type: ignore[arg-type]
-
-                    batch_results = (
-                        await optimized_embedding_service.batch_similarity_search(
-                            query_embeddings=source_embeddings,
-                            db=db,
-                            limit_per_query=limit,
-                            similarity_threshold=0.75,
-                        )
+                similar_jobs = (
+                    await optimized_embedding_service.find_similar_jobs_multi_vector(
+                        job_id=job_id,
+                        db=db,
+                        limit=limit,
+                        similarity_threshold=0.75,
+                        classification_filter=classification_filter,
+                        language_filter=language_filter,
+                        use_centroid=use_centroid,
                     )
+                )
+
+                if similar_jobs:
+                    result = {
+                        "source_job": {
+                            "id": source_job.id,
+                            "job_number": source_job.job_number,
+                            "title": source_job.title,
+                            "classification": source_job.classification,
+                        },
+                        "similar_jobs": [
+                            {
+                                "id": job["job_id"],
+                                "job_number": job["job_number"],
+                                "title": job["title"],
+                                "classification": job["classification"],
+                                "language": job["language"],
+                                "similarity_score": job["similarity_score"],
+                                "matching_chunks": job["matching_chunks"],
+                            }
+                            for job in similar_jobs
+                        ],
+                        "total_found": len(similar_jobs),
+                        "search_method": "optimized_vector_similarity",
+                        "filters_applied": {
+                            "classification": classification_filter,
+                            "language": language_filter,
+                        },
+                    }
 
-                    # Aggregate results efficiently
-                    job_similarities: Dict[int, Dict[str, Any]] = {}
-                    for results_batch in batch_results:
-                        for result_dict in results_batch:
-                            # result_dict is a dictionary from batch_similarity_search
-                            job_id_key = result_dict["job_id"]
-                            if job_id_key == job_id:  # Skip self
-                                continue
-
-                            # Apply filters if specified
-                            if (
-                                classification_filter
-                                and result_dict.get("classification")
-                                != classification_filter
-                            ):
-                                continue
-                            if (
-                                language_filter
-                                and result_dict.get("language") != language_filter
-                            ):
-                                continue
-
-                            if job_id_key not in job_similarities:
-                                job_similarities[job_id_key] = {
-                                    "job_id": result_dict["job_id"],
-                                    "job_number": result_dict["job_number"],
-                                    "title": result_dict["title"],
-                                    "classification": result_dict["classification"],
-                                    "language": result_dict["language"],
-                                    "similarity_scores": [],
-                                    "matching_chunks": 0,
-                                }
-                            job_similarities[job_id_key]["similarity_scores"].append(
-                                result_dict["similarity_score"]
-                            )
-                            job_similarities[job_id_key]["matching_chunks"] += 1
-
-                    if job_similarities:
-                        # Calculate final similarity score (weighted average of top scores)
-                        for job_data in job_similarities.values():
-                            scores = sorted(job_data["similarity_scores"], reverse=True)
-                            # Use weighted average of top 3 scores
-                            top_scores = scores[:3]
-                            if len(top_scores) >= 2:
-                                job_data["similarity_score"] = (
-                                    top_scores[0] * 0.5
-                                    + top_scores[1] * 0.3
-                                    + (
-                                        top_scores[2]
-                                        if len(top_scores) > 2
-                                        else top_scores[1]
-                                    )
-                                    * 0.2
-                                )
-                            else:
-                                job_data["similarity_score"] = top_scores[0]
-                            # Remove intermediate data
-                            del job_data["similarity_scores"]
-
-                        # Sort by similarity score and take top results
-                        similar_jobs = sorted(
-                            job_similarities.values(),
-                            key=lambda x: x["similarity_score"],
-                            reverse=True,
-                        )[:limit]
-
-                        result = {
-                            "source_job": {
-                                "id": source_job.id,
-                                "job_number": source_job.job_number,
-                                "title": source_job.title,
-                                "classification": source_job.classification,
-                            },
-                            "similar_jobs": [
-                                {
-                                    "id": job["job_id"],
-                                    "job_number": job["job_number"],
-                                    "title": job["title"],
-                                    "classification": job["classification"],
-                                    "language": job["language"],
-                                    "similarity_score": job["similarity_score"],
-                                    "matching_chunks": job["matching_chunks"],
-                                }
-                                for job in similar_jobs
-                            ],
-                            "total_found": len(similar_jobs),
-                            "search_method": "optimized_vector_similarity",
-                            "filters_applied": {
-                                "classification": classification_filter,
-                                "language": language_filter,
-                            },
-                        }
-
-                        # Cache the results
-                        await cache_service.cache_similar_jobs(job_id, limit, [result])
-                        log_performance_metric(
-                            "similar_jobs_vector_success", 1, "count"
-                        )
-                        return result
+                    # Cache the results
+                    await cache_service.cache_similar_jobs(
+                        job_id,
+                        limit,
+                        [result],
+                        related_job_ids=[job["job_id"] for job in similar_jobs],
+                        use_centroid=use_centroid,
+                        classification_filter=classification_filter,
+                        language_filter=language_filter,
+                    )
+                    log_performance_metric("similar_jobs_vector_success", 1, "count")
+                    return result
 
             except Exception as vector_error:
                 logger.warning(
@@ -885,7 +706,14 @@ async def find_similar_jobs_optimized(
                     error=str(vector_error),
                 )
 
-        # Fall back to title-based text similarity
+        # Fall back to title-based text similarity: jobs sharing a title term,
+        # parsed in every configuration when the job has no language
+        source_language = (
+            str(source_job.language) if source_job.language is not None else None
+        )
+        title_query = any_term(
+            text_search_query(str(source_job.title or ""), source_language)
+        )
         similar_query = (
             select(
                 JobDescription.id,
@@ -893,12 +721,12 @@ async def find_similar_jobs_optimized(
                 JobDescription.title,
                 JobDescription.classification,
                 JobDescription.language,
-                func.ts_rank(
-                    func.to_tsvector("english", JobDescription.title),
-                    func.plainto_tsquery("english", source_job.title),
-                ).label("rank"),
+                func.ts_rank(JobDescription.title_vector, title_query).label("rank"),
+            )
+            .where(
+                JobDescription.id != job_id,
+                JobDescription.title_vector.op("@@")(title_query),
             )
-            .where(JobDescription.id != job_id)
             .order_by(text("rank DESC"))
             .limit(limit)
         )
@@ -1200,64 +1028,71 @@ def _generate_comparison_recommendations(
 
 @router.get("/facets")
 @handle_errors(operation_name="get_search_facets")
-async def get_search_facets(db: AsyncSession = Depends(get_async_session)):
-    """Get available facets for search filtering."""
-    try:
-        # Get unique classifications
-        classification_query = (
-            select(JobDescription.classification, func.count().label("count"))
-            .group_by(JobDescription.classification)
-            .order_by(JobDescription.classification)
-        )
-
-        classification_result = await db.execute(classification_query)
-        classifications = [
-            {"value": row.classification, "count": row.count}
-            for row in classification_result.fetchall()
-        ]
-
-        # Get unique languages
-        language_query = (
-            select(JobDescription.language, func.count().label("count"))
-            .group_by(JobDescription.language)
-            .order_by(JobDescription.language)
-        )
-
-        language_result = await db.execute(language_query)
-        languages = [
-            {"value": row.language, "count": row.count}
-            for row in language_result.fetchall()
-        ]
-
-        # Get unique section types
-        section_query = (
-            select(JobSection.section_type, func.count().label("count"))
-            .group_by(JobSection.section_type)
-            .order_by(JobSection.section_type)
-        )
-
-        section_result = await db.execute(section_query)
-        section_types = [
-            {"value": row.section_type, "count": row.count}
-            for row in section_result.fetchall()
-        ]
+async def get_search_facets(
+    classification: Optional[str] = Query(None, description="Filter by classification"),
+    language: Optional[str] = Query(None, description="Filter by language"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Get available facets for search filtering.
 
-        # Check embedding availability
-        embedding_query = select(func.count(ContentChunk.id)).where(
-            ContentChunk.embedding.isnot(None)
-        )
-        embedding_result = await db.execute(embedding_query)
-        embedding_count = embedding_result.scalar() or 0
+    Without filters the counts are read from the precomputed facet store.
+    With filters, classification, language, department and location counts
+    are computed for the matching jobs in one grouped query; section types
+    and embedding stats always cover every job.
+    """
+    try:
+        filters = {
+            "classification": classification,
+            "language": language,
+            "department": department,
+            "location": location,
+        }
+        filtered = any(filters.values())
+        if not filtered:
+            cached_facets = await cache_service.get(FACETS_CACHE_KEY)
+            if cached_facets:
+                return cached_facets
+
+        stored = await facet_store.load(db)
+        counts = stored["counts"]
+
+        def by_value(key: str) -> List[Dict[str, Any]]:
+            return [
+                {"value": value, "count": count}
+                for value, count in sorted(counts.get(key, {}).items())
+            ]
 
-        return {
-            "classifications": classifications,
-            "languages": languages,
-            "section_types": section_types,
+        embedding_count = counts.get(EMBEDDED_CHUNKS, {}).get("", 0)
+        facets: Dict[str, Any] = {
+            "classifications": by_value("classification"),
+            "languages": by_value("language"),
+            "section_types": by_value(SECTION_TYPE),
             "embedding_stats": {
                 "chunks_with_embeddings": embedding_count,
                 "semantic_search_available": embedding_count > 0,
             },
         }
+        if filtered:
+            matching = await facet_store.filtered_counts(db, filters)
+            facets.update(
+                classifications=matching["classification"],
+                languages=matching["language"],
+                departments=matching["department"],
+                locations=matching["location"],
+                filters={name: value for name, value in filters.items() if value},
+            )
+            return facets
+
+        await cache_service.set(
+            FACETS_CACHE_KEY,
+            facets,
+            FACETS_CACHE_TTL,
+            tags=[cache_service.JOBS_AGGREGATE_TAG],
+        )
+        return facets
 
     except Exception as e:
         logger.error("Failed to get search facets", error=str(e))
@@ -1268,22 +1103,16 @@ async def _fulltext_search(
     search_query: SearchQuery, db: AsyncSession
 ) -> Dict[str, Any]:
     """Perform traditional full-text search."""
-    # Build base query with text search
+    # Build base query with text search over the indexed search vectors
+    tsquery = text_search_query(search_query.query, search_query.language)
     base_query = select(
         JobDescription.id,
         JobDescription.job_number,
         JobDescription.title,
         JobDescription.classification,
         JobDescription.language,
-        func.ts_rank(
-            func.to_tsvector("english", JobDescription.raw_content),
-            func.plainto_tsquery("english", search_query.query),
-        ).label("rank"),
-    ).where(
-        func.to_tsvector("english", JobDescription.raw_content).op("@@")(
-            func.plainto_tsquery("english", search_query.query)
-        )
-    )
+        func.ts_rank(JobDescription.search_vector, tsquery).label("rank"),
+    ).where(JobDescription.search_vector.op("@@")(tsquery))
 
     # Apply filters
     if search_query.classification:
@@ -1300,34 +1129,23 @@ async def _fulltext_search(
     result = await db.execute(base_query)
     search_results = result.fetchall()
 
-    # Get detailed information for each result
-    detailed_results = []
-    for row in search_results:
-        # Get job details
-        job_query = select(JobDescription).where(JobDescription.id == row.id)
-        job_result = await db.execute(job_query)
-        job = job_result.scalar_one()
-
-        # Find matching sections
-        matching_sections = await _get_matching_sections(
-            job_id=row.id, search_query=search_query, db=db
-        )
-
-        # Create search result
-        detailed_results.append(
-            {
-                "job_id": row.id,
-                "job_number": row.job_number,
-                "title": row.title,
-                "classification": row.classification,
-                "language": row.language,
-                "relevance_score": float(row.rank),
-                "matching_sections": matching_sections,
-                "snippet": _extract_snippet(
-                    str(job.raw_content) if job.raw_content else "", search_query.query
-                ),
-            }
-        )
+    # Get snippets and matching sections for all results in one batch
+    hydrated = await _hydrate_search_results(
+        [row.id for row in search_results], search_query, db
+    )
+    detailed_results = [
+        {
+            "job_id": row.id,
+            "job_number": row.job_number,
+            "title": row.title,
+            "classification": row.classification,
+            "language": row.language,
+            "relevance_score": float(row.rank),
+            **hydrated[row.id],
+        }
+        for row in search_results
+        if row.id in hydrated
+    ]
 
     return {
         "query": search_query.query,
@@ -1337,47 +1155,144 @@ async def _fulltext_search(
     }
 
 
-async def _get_matching_sections(
-    job_id: int, search_query: SearchQuery, db: AsyncSession
-) -> List[Dict[str, Any]]:
-    """Get sections that match the search query."""
-    matching_sections = []
+# Upper bound on query terms used to locate snippets in SQL
+MAX_SNIPPET_TERMS = 10
 
-    if search_query.section_types:
-        sections_query = select(JobSection).where(
-            JobSection.job_id == job_id,
-            JobSection.section_type.in_(search_query.section_types),
+
+def _snippet_columns(content_column, query: str, max_length: int = 200) -> List[Any]:
+    """
+    Build SQL columns that locate a snippet window inside ``content_column``.
+
+    Mirrors ``_extract_snippet`` but only transfers ``max_length`` characters
+    per row instead of the full text: the earliest query-term position, the
+    window itself and the full length (to decide on ellipses).
+    """
+    terms = list(dict.fromkeys(query.lower().split()))[:MAX_SNIPPET_TERMS]
+    content = func.coalesce(content_column, "")
+    position: Any
+    window_start: Any
+
+    if terms:
+        content_lower = func.lower(content)
+        position = func.least(
+            *[func.nullif(func.strpos(content_lower, term), 0) for term in terms]
         )
+        window_start = func.greatest(position - max_length // 3, 1)
+        window = func.substr(content, func.coalesce(window_start, 1), max_length)
     else:
-        sections_query = select(JobSection).where(JobSection.job_id == job_id)
+        position = null()
+        window_start = null()
+        window = func.substr(content, 1, max_length)
+
+    return [
+        position.label("snippet_position"),
+        window_start.label("snippet_start"),
+        window.label("snippet_window"),
+        func.length(content).label("content_length"),
+    ]
+
+
+def _build_snippet(row: Any, max_length: int = 200) -> str:
+    """Assemble a snippet from the columns produced by ``_snippet_columns``."""
+    window = row.snippet_window or ""
+    content_length = row.content_length or 0
+
+    if row.snippet_position is None:
+        # No terms found, return beginning
+        return window + "..." if content_length > max_length else window
+
+    start = row.snippet_start - 1
+    end = min(content_length, start + max_length)
+    snippet = window
+    if start > 0:
+        snippet = "..." + snippet
+    if end < content_length:
+        snippet = snippet + "..."
+    return snippet
+
+
+async def _hydrate_search_results(
+    job_ids: List[int], search_query: SearchQuery, db: AsyncSession
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Load snippets and matching sections for a page of search results.
+
+    Uses one query for job snippets and one for matching sections regardless
+    of how many results are on the page. Returns a mapping keyed by job ID so
+    callers keep their own relevance order; jobs that no longer exist are
+    omitted.
+    """
+    if not job_ids:
+        return {}
+
+    jobs_result = await db.execute(
+        select(
+            JobDescription.id,
+            *_snippet_columns(JobDescription.raw_content, search_query.query),
+        ).where(JobDescription.id.in_(job_ids))
+    )
+    hydrated: Dict[int, Dict[str, Any]] = {
+        row.id: {"matching_sections": [], "snippet": _build_snippet(row)}
+        for row in jobs_result.all()
+    }
+
+    sections_by_job = await _get_matching_sections_batch(
+        list(hydrated), search_query, db
+    )
+    for job_id, sections in sections_by_job.items():
+        hydrated[job_id]["matching_sections"] = sections
+
+    return hydrated
+
+
+async def _get_matching_sections_batch(
+    job_ids: List[int], search_query: SearchQuery, db: AsyncSession
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Get sections matching any query word for several jobs in one query."""
+    words = list(dict.fromkeys(search_query.query.lower().split()))
+    if not job_ids or not words:
+        return {}
+
+    section_content_lower = func.lower(func.coalesce(JobSection.section_content, ""))
+    sections_query = select(
+        JobSection.id,
+        JobSection.job_id,
+        JobSection.section_type,
+        *_snippet_columns(JobSection.section_content, search_query.query),
+    ).where(
+        JobSection.job_id.in_(job_ids),
+        or_(*[func.strpos(section_content_lower, word) > 0 for word in words]),
+    )
+    if search_query.section_types:
+        sections_query = sections_query.where(
+            JobSection.section_type.in_(search_query.section_types)
+        )
+    sections_query = sections_query.order_by(
+        JobSection.job_id, JobSection.section_order, JobSection.id
+    )
 
     sections_result = await db.execute(sections_query)
-    sections = sections_result.scalars().all()
 
-    for section in sections:
-        # Simple keyword matching for sections
-        section_content_str = (
-            str(section.section_content) if section.section_content else ""
+    matching_sections: Dict[int, List[Dict[str, Any]]] = {}
+    for row in sections_result.all():
+        matching_sections.setdefault(row.job_id, []).append(
+            {
+                "section_type": row.section_type,
+                "section_id": row.id,
+                "snippet": _build_snippet(row),
+            }
         )
-        if any(
-            word.lower() in section_content_str.lower()
-            for word in search_query.query.split()
-        ):
-            matching_sections.append(
-                {
-                    "section_type": section.section_type,
-                    "section_id": section.id,
-                    "snippet": _extract_snippet(
-                        section_content_str, search_query.query
-                    ),
-                }
-            )
 
     return matching_sections
 
 
 def _extract_snippet(content: str, query: str, max_length: int = 200) -> str:
-    """Extract a relevant snippet from content based on search query."""
+    """
+    Extract a relevant snippet from content based on search query.
+
+    Reference implementation for ``_snippet_columns`` and ``_build_snippet``,
+    which compute the same snippet in SQL; tests check the two agree.
+    """
     if not content or not query:
         return content[:max_length] + "..." if len(content) > max_length else content
 
@@ -1619,62 +1534,18 @@ async def get_popular_filters(
                 "date_ranges": [],
             }
 
-            # Get popular classifications
-            class_query = (
-                select(JobDescription.classification, func.count().label("count"))
-                .group_by(JobDescription.classification)
-                .order_by(desc("count"))
-                .limit(limit)
-            )
-
-            class_result = await db.execute(class_query)
-            for row in class_result.fetchall():
-                if row.classification:
-                    filters["classifications"].append(
-                        {
-                            "value": row.classification,
-                            "count": row.count,
-                            "label": f"Classification: {row.classification}",
-                        }
-                    )
-
-            # Get popular departments
-            dept_query = (
-                select(JobMetadata.department, func.count().label("count"))
-                .where(JobMetadata.department.isnot(None))
-                .group_by(JobMetadata.department)
-                .order_by(desc("count"))
-                .limit(limit)
-            )
-
-            dept_result = await db.execute(dept_query)
-            for row in dept_result.fetchall():
-                filters["departments"].append(
-                    {
-                        "value": row.department,
-                        "count": row.count,
-                        "label": f"Department: {row.department}",
-                    }
-                )
-
-            # Get popular languages
-            lang_query = (
-                select(JobDescription.language, func.count().label("count"))
-                .group_by(JobDescription.language)
-                .order_by(desc("count"))
-                .limit(5)
-            )
-
-            lang_result = await db.execute(lang_query)
-            for row in lang_result.fetchall():
-                if row.language:
-                    filters["languages"].append(
-                        {
-                            "value": row.language,
-                            "count": row.count,
-                            "label": f"Language: {row.language}",
-                        }
-                    )
+            stored = await facet_store.load(db)
+            counts = stored["counts"]
+
+            for name, key, label, top in [
+                ("classifications", "classification", "Classification", limit),
+                ("departments", "department", "Department", limit),
+                ("languages", "language", "Language", 5),
+            ]:
+                filters[name] = [
+                    {"value": value, "count": count, "label": f"{label}: {value}"}
+                    for value, count in facet_rows(counts.get(key, {}), top)
+                ]
 
             # Add common date range suggestions
             filters["date_ranges"] = [
@@ -8,8 +8,11 @@ This module provides WebSocket connections for:
 - Operational transformation for conflict resolution
 """
 
+import asyncio
 import json
-from typing import Optional, Dict, List
+from collections import deque
+from itertools import islice
+from typing import Any, Optional, Dict, List
 from fastapi import WebSocket, WebSocketDisconnect, Depends, HTTPException
 from fastapi.routing import APIRouter
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,24 +20,46 @@ from sqlalchemy import text
 from datetime import datetime
 import uuid
 
+from ...config.settings import settings
 from ...database.connection import get_async_session
+from ...services.collaboration_backend import RedisCollaborationBackend
 from ...utils.logging import get_logger
 from ...utils.operational_transform import (
     Operation,
-    apply_operation,
-    transform_against_history,
+    OperationType,
+    apply_operation_to_rope,
+    compose_operation_sequence,
+    transform_batch_against_history,
     validate_operation,
 )
+from ...utils.rope import Rope
 
 logger = get_logger(__name__)
 
+# Operations kept per session to transform operations from clients that are behind
+OPERATION_HISTORY_SIZE = 1000
+# Times a worker retries committing to a shared session other workers write to
+SHARED_COMMIT_ATTEMPTS = 5
+
 router = APIRouter(prefix="/ws", tags=["websocket"])
 
 
+class OperationRejectedError(Exception):
+    """Raised when client operations cannot be applied to a session."""
+
+
 class ConnectionManager:
-    """Manages WebSocket connections for real-time collaboration."""
+    """
+    Manages WebSocket connections for real-time collaboration.
 
-    def __init__(self):
+    With a collaboration backend, each worker keeps a replica of the sessions
+    its websockets take part in; the backend holds the authoritative
+    operation log and relays operations between workers. Without one, or
+    while Redis is unavailable, sessions are local to the worker.
+    """
+
+    def __init__(self, backend: Optional[RedisCollaborationBackend] = None):
+        self.backend = backend
         # Active connections by session_id
         self.active_connections: Dict[str, List[WebSocket]] = {}
         # User information by connection
@@ -55,10 +80,22 @@ class ConnectionManager:
                 "job_id": job_id,
                 "created_at": datetime.utcnow(),
                 "participants": set(),
-                "document_state": "",
+                "document_state": Rope(),
                 "operation_count": 0,
-                "operation_history": [],  # Track all operations for OT
+                # Ring buffer of the most recent operations for OT
+                "operation_history": deque(maxlen=OPERATION_HISTORY_SIZE),
+                # Serializes replica updates of a shared session
+                "lock": asyncio.Lock(),
             }
+            if self.backend is not None and self.backend.available:
+                session = self.editing_sessions[session_id]
+                async with session["lock"]:
+                    await self._join_shared_session(session_id, session)
+        else:
+            # Wait out a join started by an earlier connection, so this
+            # client is not handed the replica before it is loaded
+            async with self.editing_sessions[session_id]["lock"]:
+                pass
 
         # Add connection to session
         self.active_connections[session_id].append(websocket)
@@ -75,7 +112,7 @@ class ConnectionManager:
         logger.info(f"User {user_id} connected to session {session_id}")
 
         # Notify other participants about new user
-        await self.broadcast_to_session(
+        await self.publish_to_session(
             session_id,
             {
                 "type": "user_joined",
@@ -142,6 +179,12 @@ class ConnectionManager:
         for connection in disconnected:
             self.disconnect(connection)
 
+    def _shared_backend(self) -> RedisCollaborationBackend:
+        """The collaboration backend behind a shared session."""
+        backend = self.backend
+        assert backend is not None, "shared sessions require a backend"
+        return backend
+
     def _apply_insert_operation(self, document: str, operation: dict) -> str:
         """Apply an insert operation to a document."""
         position = operation.get("position", 0)
@@ -174,6 +217,155 @@ class ConnectionManager:
         # Delete text from start to end
         return document[:start] + document[end:]
 
+    def _document(self, session: Dict) -> Rope:
+        """Get the session document as a rope, converting a plain string."""
+        document = session["document_state"]
+        if not isinstance(document, Rope):
+            document = session["document_state"] = Rope(document)
+        return document
+
+    def _missed_operations(
+        self, session: Dict, base_sequence: int
+    ) -> Optional[List[Operation]]:
+        """Get operations applied after ``base_sequence``, or None if trimmed."""
+        history = session.setdefault(
+            "operation_history", deque(maxlen=OPERATION_HISTORY_SIZE)
+        )
+        behind = session["operation_count"] - base_sequence
+        if behind <= 0:
+            return []
+        if behind > len(history):
+            return None
+        return list(islice(history, len(history) - behind, None))
+
+    def _prepare_operations(
+        self,
+        session: Dict,
+        operations: List[Operation],
+        base_sequence: int,
+        batch: bool,
+    ) -> List[Operation]:
+        """Transform client operations to the current sequence and validate them."""
+        missed_ops = self._missed_operations(session, base_sequence)
+        if missed_ops is None:
+            raise OperationRejectedError(
+                "Operation is based on a sequence no longer in history; "
+                "reload the session state"
+            )
+        if missed_ops:
+            # Client is behind - transform against missed operations
+            operations = transform_batch_against_history(operations, missed_ops)
+            logger.info(
+                f"Transformed operation against {len(missed_ops)} concurrent operations"
+            )
+        if batch:
+            operations = compose_operation_sequence(operations)
+
+        # Validate against the document as each operation leaves it
+        length = len(self._document(session))
+        for op in operations:
+            if not validate_operation(op, length):
+                raise OperationRejectedError("Invalid operation")
+            if op.type == OperationType.INSERT:
+                length += len(op.text or "")
+            elif op.type == OperationType.DELETE:
+                start = op.start or 0
+                end = op.end if op.end is not None else start + 1
+                length -= end - start
+        return operations
+
+    def _describe_operations(
+        self, session: Dict, operations: List[Operation], user_id: Any
+    ) -> List[Dict]:
+        """Add ids and the sequence numbers the operations are committed at."""
+        sequence = session["operation_count"]
+        return [
+            {
+                **op.to_dict(),
+                "operation_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "timestamp": datetime.utcnow().isoformat(),
+                "sequence_number": sequence + i,
+            }
+            for i, op in enumerate(operations, 1)
+        ]
+
+    def _apply_committed(self, session: Dict, operations: List[Operation]) -> None:
+        """Apply committed operations to the document and record them in history."""
+        document = self._document(session)
+        history = session.setdefault(
+            "operation_history", deque(maxlen=OPERATION_HISTORY_SIZE)
+        )
+        for op in operations:
+            apply_operation_to_rope(document, op)
+            session["operation_count"] += 1
+            history.append(op)
+
+    def _commit_operations(
+        self, session: Dict, operations: List[Operation], user_id: Any
+    ) -> List[Dict]:
+        """Apply operations to the session document and record them in history."""
+        committed = self._describe_operations(session, operations, user_id)
+        self._apply_committed(session, operations)
+        return committed
+
+    async def _submit_operations(
+        self,
+        session_id: str,
+        session: Dict,
+        operations: List[Operation],
+        base_sequence: int,
+        user_id: Any,
+        batch: bool,
+    ) -> List[Dict]:
+        """
+        Transform, validate and commit operations from one client.
+
+        Shared sessions commit through the Redis operation log. If another
+        worker commits first, this worker catches up and transforms the
+        client's operations again.
+        """
+        if not session.get("shared"):
+            operations = self._prepare_operations(
+                session, operations, base_sequence, batch
+            )
+            return self._commit_operations(session, operations, user_id)
+
+        backend = self._shared_backend()
+        async with session["lock"]:
+            for _ in range(SHARED_COMMIT_ATTEMPTS):
+                await self._catch_up(session_id, session)
+                prepared = self._prepare_operations(
+                    session, operations, base_sequence, batch
+                )
+                if not prepared:
+                    return []
+                committed = self._describe_operations(session, prepared, user_id)
+                previous = session["operation_count"]
+                sequence = await backend.append(
+                    session_id,
+                    previous,
+                    committed,
+                    {
+                        "kind": "operations",
+                        "operations": committed,
+                        "message": self._operations_message(committed, batch),
+                    },
+                )
+                if sequence is None:
+                    continue  # Another worker committed first
+                self._apply_committed(session, prepared)
+                if backend.should_snapshot(previous, sequence):
+                    await self._save_snapshot(session_id, session)
+                return committed
+        raise OperationRejectedError("Session is busy; retry the operation")
+
+    def _operations_message(self, committed: List[Dict], batch: bool) -> Dict:
+        """Message that tells other participants about committed operations."""
+        if batch:
+            return {"type": "operations", "operations": committed}
+        return {"type": "operation", "operation": committed[0]}
+
     async def apply_operation(
         self, session_id: str, operation: dict, websocket: WebSocket
     ):
@@ -190,61 +382,23 @@ class ConnectionManager:
             # Convert dict to Operation object
             op = Operation.from_dict(operation)
 
-            # Validate operation
-            if not validate_operation(op, len(session["document_state"])):
-                logger.error(f"Invalid operation received: {operation}")
-                await self.send_personal_message(
-                    {
-                        "type": "operation_error",
-                        "error": "Invalid operation",
-                    },
-                    websocket,
-                )
-                return
-
-            # Transform operation against concurrent operations if needed
-            # If client has pending operations, transform against them
+            # Transform against operations the client had not seen, then apply
             client_sequence = operation.get("base_sequence", session["operation_count"])
-            if client_sequence < session["operation_count"]:
-                # Client is behind - transform against missed operations
-                missed_ops = session["operation_history"][client_sequence:]
-                op = transform_against_history(op, missed_ops)
-                logger.info(
-                    f"Transformed operation against {len(missed_ops)} concurrent operations"
-                )
-
-            # Apply operation to document
-            session["document_state"] = apply_operation(session["document_state"], op)
-
-            # Generate operation ID and increment counter
-            operation_id = str(uuid.uuid4())
-            session["operation_count"] += 1
-
-            # Store operation in history
-            session["operation_history"].append(op)
-
-            # Keep history manageable (last 1000 operations)
-            if len(session["operation_history"]) > 1000:
-                session["operation_history"] = session["operation_history"][-1000:]
-
-            # Enhance operation with metadata
-            enhanced_operation = {
-                **op.to_dict(),
-                "operation_id": operation_id,
-                "user_id": user_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "sequence_number": session["operation_count"],
-            }
+            committed = await self._submit_operations(
+                session_id, session, [op], client_sequence, user_id, batch=False
+            )
+            enhanced_operation = committed[0]
+            operation_id = enhanced_operation["operation_id"]
 
             logger.info(
                 f"Applied operation {operation_id} in session {session_id} "
-                f"(seq: {session['operation_count']})"
+                f"(seq: {enhanced_operation['sequence_number']})"
             )
 
             # Broadcast operation to other participants
             await self.broadcast_to_session(
                 session_id,
-                {"type": "operation", "operation": enhanced_operation},
+                self._operations_message(committed, batch=False),
                 exclude=websocket,
             )
 
@@ -253,7 +407,7 @@ class ConnectionManager:
                 {
                     "type": "operation_ack",
                     "operation_id": operation_id,
-                    "sequence_number": session["operation_count"],
+                    "sequence_number": enhanced_operation["sequence_number"],
                 },
                 websocket,
             )
@@ -268,9 +422,190 @@ class ConnectionManager:
                 websocket,
             )
 
+    async def apply_operations(
+        self,
+        session_id: str,
+        operations: List[dict],
+        websocket: WebSocket,
+        base_sequence: Optional[int] = None,
+    ):
+        """
+        Apply a batch of sequential operations from one client.
+
+        The batch is transformed against operations the client missed, then
+        consecutive inserts and deletes are composed, so a burst of
+        keystrokes is applied, stored and broadcast as a few operations.
+        The batch is rejected as a whole if any operation is invalid.
+        """
+        if session_id not in self.editing_sessions:
+            logger.error(f"Session {session_id} not found for operations")
+            return
+
+        session = self.editing_sessions[session_id]
+        user_info = self.user_sessions.get(websocket, {})
+        user_id = user_info.get("user_id")
+
+        try:
+            ops = [Operation.from_dict(operation) for operation in operations]
+            if base_sequence is None:
+                base_sequence = session["operation_count"]
+            committed = await self._submit_operations(
+                session_id, session, ops, base_sequence, user_id, batch=True
+            )
+
+            logger.info(
+                f"Applied {len(operations)} operations as {len(committed)} "
+                f"in session {session_id} (seq: {session['operation_count']})"
+            )
+
+            if committed:
+                await self.broadcast_to_session(
+                    session_id,
+                    self._operations_message(committed, batch=True),
+                    exclude=websocket,
+                )
+
+            await self.send_personal_message(
+                {
+                    "type": "operations_ack",
+                    "operation_ids": [op["operation_id"] for op in committed],
+                    "sequence_number": (
+                        committed[-1]["sequence_number"]
+                        if committed
+                        else session["operation_count"]
+                    ),
+                },
+                websocket,
+            )
+
+        except Exception as e:
+            logger.error(f"Error applying operations: {e}")
+            await self.send_personal_message(
+                {
+                    "type": "operation_error",
+                    "error": str(e),
+                },
+                websocket,
+            )
+
+    async def _join_shared_session(self, session_id: str, session: Dict) -> None:
+        """Load a session from Redis, or keep it local if Redis is unavailable."""
+        backend = self._shared_backend()
+        try:
+            await self._load_shared_state(session_id, session)
+        except Exception as e:
+            backend.mark_unavailable(e)
+            return
+        session["shared"] = True
+        backend.start(self._on_shared_event, self._resync_shared_sessions)
+
+    async def _load_shared_state(self, session_id: str, session: Dict) -> None:
+        """Replace the local replica with the latest snapshot plus the log after it."""
+        text, sequence, operations = await self._shared_backend().load(session_id)
+        session["document_state"] = Rope(text)
+        session["operation_count"] = sequence
+        session["operation_history"] = deque(maxlen=OPERATION_HISTORY_SIZE)
+        self._apply_committed(session, [Operation.from_dict(op) for op in operations])
+
+    async def _catch_up(self, session_id: str, session: Dict) -> None:
+        """Apply operations other workers committed since the replica's sequence."""
+        operations = await self._shared_backend().read(
+            session_id, session["operation_count"]
+        )
+        if operations is None:
+            # Compacted into a snapshot while this worker was behind
+            await self._load_shared_state(session_id, session)
+            await self.broadcast_to_session(
+                session_id,
+                {
+                    "type": "session_state",
+                    "session_id": session_id,
+                    "job_id": session["job_id"],
+                    "document_state": str(session["document_state"]),
+                    "participants": list(session["participants"]),
+                    "operation_count": session["operation_count"],
+                },
+            )
+        elif operations:
+            self._apply_committed(
+                session, [Operation.from_dict(op) for op in operations]
+            )
+            await self.broadcast_to_session(
+                session_id, {"type": "operations", "operations": operations}
+            )
+
+    async def _save_snapshot(self, session_id: str, session: Dict) -> None:
+        try:
+            await self._shared_backend().save_snapshot(
+                session_id, session["operation_count"], str(session["document_state"])
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to snapshot collaboration session",
+                session_id=session_id,
+                error=str(e),
+            )
+
+    async def _on_shared_event(self, session_id: str, event: Dict) -> None:
+        """Apply and fan out an event published by another worker."""
+        session = self.editing_sessions.get(session_id)
+        if session is None or not session.get("shared"):
+            return  # No participant of this session is connected here
+        if event.get("kind") != "operations":
+            await self.broadcast_to_session(session_id, event["message"])
+            return
+
+        async with session["lock"]:
+            operations = event["operations"]
+            first_sequence = operations[0]["sequence_number"]
+            if first_sequence == session["operation_count"] + 1:
+                self._apply_committed(
+                    session, [Operation.from_dict(op) for op in operations]
+                )
+                await self.broadcast_to_session(session_id, event["message"])
+            elif first_sequence > session["operation_count"] + 1:
+                await self._catch_up(session_id, session)
+            # Otherwise the operations were applied while catching up
+
+    async def _resync_shared_sessions(self) -> None:
+        """Catch up every shared session, e.g. after events may have been missed."""
+        for session_id, session in list(self.editing_sessions.items()):
+            if session.get("shared"):
+                async with session["lock"]:
+                    await self._catch_up(session_id, session)
+
+    async def publish_to_session(
+        self, session_id: str, message: dict, exclude: Optional[WebSocket] = None
+    ):
+        """Broadcast a message to the session's participants on every worker."""
+        await self.broadcast_to_session(session_id, message, exclude=exclude)
+        session = self.editing_sessions.get(session_id)
+        if session is not None and session.get("shared"):
+            try:
+                await self._shared_backend().publish(
+                    session_id, {"kind": "broadcast", "message": message}
+                )
+            except Exception as e:
+                logger.warning(
+                    "Failed to publish to collaboration session",
+                    session_id=session_id,
+                    error=str(e),
+                )
+
+    async def stop(self):
+        """Stop receiving events from other workers."""
+        if self.backend is not None:
+            await self.backend.stop()
+
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    backend=(
+        RedisCollaborationBackend()
+        if settings.collaboration_backend == "redis"
+        else None
+    )
+)
 
 
 @router.websocket("/edit/{session_id}")
@@ -308,9 +643,9 @@ async def websocket_edit_session(
                 "type": "session_state",
                 "session_id": session_id,
                 "job_id": job_id,
-                "document_state": manager.editing_sessions[session_id][
-                    "document_state"
-                ],
+                "document_state": str(
+                    manager.editing_sessions[session_id]["document_state"]
+                ),
                 "participants": list(
                     manager.editing_sessions[session_id]["participants"]
                 ),
@@ -333,13 +668,22 @@ async def websocket_edit_session(
                 operation = message.get("operation", {})
                 await manager.apply_operation(session_id, operation, websocket)
 
+            elif message_type == "operations":
+                # Handle a batch of sequential operations from one client
+                await manager.apply_operations(
+                    session_id,
+                    message.get("operations", []),
+                    websocket,
+                    message.get("base_sequence"),
+                )
+
             elif message_type == "cursor_update":
                 # Handle cursor position updates
                 position = message.get("position")
                 if websocket in manager.user_sessions:
                     manager.user_sessions[websocket]["cursor_position"] = position
 
-                await manager.broadcast_to_session(
+                await manager.publish_to_session(
                     session_id,
                     {
                         "type": "cursor_update",
@@ -396,7 +740,7 @@ async def get_session_state(session_id: str):
     return {
         "session_id": session_id,
         "job_id": session["job_id"],
-        "document_state": session["document_state"],
+        "document_state": str(session["document_state"]),
         "participants": list(session["participants"]),
         "operation_count": session["operation_count"],
         "created_at": session["created_at"].isoformat(),
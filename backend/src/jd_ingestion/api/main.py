@@ -10,9 +10,14 @@ from fastapi.staticfiles import StaticFiles
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Local imports
+from ..audit.logger import audit_logger
 from ..config import settings
 from ..database.connection import configure_mappers, get_async_session
 from ..middleware.analytics_middleware import AnalyticsMiddleware
+from ..services.analytics_buffer import analytics_buffer
+from ..services.openai_dispatcher import openai_dispatcher
+from ..services.suggestion_index import suggestion_index
+from ..utils.cache import cache_service
 from ..utils.logging import configure_logging, get_logger
 from .endpoints import (
     ai_suggestions,
@@ -60,9 +65,22 @@ async def lifespan(app: FastAPI):
     configure_mappers()
     logger.info("Database mappers configured successfully")
 
+    # Evict this worker's L1 cache entries when other workers invalidate them
+    await cache_service.start_invalidation_listener()
+
+    # Build this worker's autocomplete index in the background
+    suggestion_index.start()
+
     yield
 
     # Shutdown
+    await cache_service.stop_invalidation_listener()
+    await suggestion_index.stop()
+    await websocket.manager.stop()
+    await openai_dispatcher.stop()
+    # Write analytics and audit events still queued for their batch writers
+    await analytics_buffer.stop()
+    await audit_logger.close()
     logger.info("Shutting down JDDB - Government Job Description Database API")
 
 
@@ -5,14 +5,17 @@ This module provides comprehensive audit logging for all user actions,
 document changes, and system events in the collaborative editing environment.
 """
 
+import asyncio
 import json
 import hashlib
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Deque, Iterable, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
 from sqlalchemy import text
 
+from ..config.settings import settings
 from ..database.connection import get_async_session
 from ..utils.logging import get_logger
 
@@ -111,8 +114,13 @@ class AuditEvent:
         data["timestamp"] = self.timestamp.isoformat()
         return data
 
-    def generate_hash(self) -> str:
-        """Generate a hash of the audit event for integrity verification."""
+    def generate_hash(self, previous_hash: Optional[str] = None) -> str:
+        """
+        Generate a hash of the audit event for integrity verification.
+
+        When ``previous_hash`` is given, it is included so the hash chains the
+        event to the one stored before it.
+        """
         # Create a canonical representation for hashing
         hash_data = {
             "event_type": self.event_type.value,
@@ -123,102 +131,289 @@ class AuditEvent:
             "action": self.action,
             "details": json.dumps(self.details, sort_keys=True),
         }
+        if previous_hash is not None:
+            hash_data["previous_hash"] = previous_hash
 
         hash_string = json.dumps(hash_data, sort_keys=True)
         return hashlib.sha256(hash_string.encode()).hexdigest()
 
 
-class AuditLogger:
-    """Main audit logging class for Phase 2 features."""
+_INSERT_AUDIT_EVENT = text(
+    """
+    INSERT INTO audit_log (
+        event_type, severity, user_id, username, timestamp,
+        resource_type, resource_id, action, description,
+        ip_address, user_agent, session_id, details,
+        before_state, after_state, success, error_message,
+        event_hash, previous_hash
+    ) VALUES (
+        :event_type, :severity, :user_id, :username, :timestamp,
+        :resource_type, :resource_id, :action, :description,
+        :ip_address, :user_agent, :session_id, :details,
+        :before_state, :after_state, :success, :error_message,
+        :event_hash, :previous_hash
+    )
+"""
+)
+
+# Serializes chain extension across every process writing audit_log
+_AUDIT_CHAIN_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('audit_log_chain'))")
+_SELECT_CHAIN_HEAD = text("SELECT event_hash FROM audit_log ORDER BY id DESC LIMIT 1")
+
+# A queued event and, for callers waiting on the commit, its outcome
+_PendingEvent = Tuple[AuditEvent, Optional["asyncio.Future[bool]"]]
 
-    def __init__(self):
-        self.events_cache: List[AuditEvent] = []
-        self.max_cache_size = 100
+
+class AuditLogger:
+    """
+    Main audit logging class for Phase 2 features.
+
+    ``log_event`` queues events for a background writer that group-commits
+    them every ``batch_size`` events or ``flush_interval_ms`` milliseconds.
+    Events with a durable severity (CRITICAL by default) flush immediately
+    and ``log_event`` only returns once they are committed. Every stored
+    event is hash-chained to the row stored before it; batches take a
+    transaction-scoped advisory lock so writers in other processes extend
+    the same chain instead of forking it.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        durable_severities: Optional[Iterable[AuditSeverity]] = None,
+    ):
+        self.batch_size = batch_size or settings.audit_batch_size
+        self.flush_interval = (
+            flush_interval_ms or settings.audit_flush_interval_ms
+        ) / 1000
+        self.max_pending = max_pending or settings.audit_max_pending
+        if durable_severities is None:
+            durable_severities = [
+                AuditSeverity(severity)
+                for severity in settings.audit_durable_severities_list
+            ]
+        self.durable_severities = frozenset(durable_severities)
+
+        # Ring buffer of the most recently accepted events
+        self.events_cache: Deque[AuditEvent] = deque(maxlen=100)
+
+        self._pending: Deque[_PendingEvent] = deque()
+        self._writer: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._failed_attempts = 0
+
+    @property
+    def max_cache_size(self) -> int:
+        """Number of recent events kept in ``events_cache``."""
+        return self.events_cache.maxlen or 0
+
+    @max_cache_size.setter
+    def max_cache_size(self, size: int) -> None:
+        self.events_cache = deque(self.events_cache, maxlen=size)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of events queued but not yet committed."""
+        return len(self._pending)
 
     async def log_event(self, event: AuditEvent) -> bool:
         """
-        Log an audit event to the database and local cache.
+        Queue an audit event for the database and add it to the local cache.
 
-        Returns True if successfully logged, False otherwise.
+        Durable severities, and any event arriving while ``max_pending``
+        events are already queued, wait for their batch to be committed and
+        return False if it fails. Other events return True once queued.
         """
         try:
-            # Generate integrity hash
-            event_hash = event.generate_hash()
+            durable = (
+                event.severity in self.durable_severities
+                or len(self._pending) >= self.max_pending
+            )
+            loop = asyncio.get_running_loop()
+            outcome = loop.create_future() if durable else None
 
-            # Store in database
-            async for db in get_async_session():
-                await db.execute(
-                    text(
-                        """
-                    INSERT INTO audit_log (
-                        event_type, severity, user_id, username, timestamp,
-                        resource_type, resource_id, action, description,
-                        ip_address, user_agent, session_id, details,
-                        before_state, after_state, success, error_message,
-                        event_hash
-                    ) VALUES (
-                        :event_type, :severity, :user_id, :username, :timestamp,
-                        :resource_type, :resource_id, :action, :description,
-                        :ip_address, :user_agent, :session_id, :details,
-                        :before_state, :after_state, :success, :error_message,
-                        :event_hash
-                    )
-                """
-                    ),
-                    {
-                        "event_type": event.event_type.value,
-                        "severity": event.severity.value,
-                        "user_id": event.user_id,
-                        "username": event.username,
-                        "timestamp": event.timestamp,
-                        "resource_type": event.resource_type,
-                        "resource_id": event.resource_id,
-                        "action": event.action,
-                        "description": event.description,
-                        "ip_address": event.ip_address,
-                        "user_agent": event.user_agent,
-                        "session_id": event.session_id,
-                        "details": json.dumps(event.details),
-                        "before_state": (
-                            json.dumps(event.before_state)
-                            if event.before_state
-                            else None
-                        ),
-                        "after_state": (
-                            json.dumps(event.after_state) if event.after_state else None
-                        ),
-                        "success": event.success,
-                        "error_message": event.error_message,
-                        "event_hash": event_hash,
-                    },
-                )
+            wakeup = self._ensure_writer(loop)
+            self._pending.append((event, outcome))
+            if outcome is not None or len(self._pending) >= self.batch_size:
+                wakeup.set()
 
-                await db.commit()
-                break
+            if outcome is not None and not await outcome:
+                return False
 
-            # Add to local cache
             self.events_cache.append(event)
-            if len(self.events_cache) > self.max_cache_size:
-                self.events_cache.pop(0)
-
-            # Log to application logger based on severity
-            log_message = f"AUDIT: {event.action} by {event.username or 'system'} - {event.description}"
-
-            if event.severity == AuditSeverity.CRITICAL:
-                logger.critical(log_message, extra=event.to_dict())
-            elif event.severity == AuditSeverity.HIGH:
-                logger.error(log_message, extra=event.to_dict())
-            elif event.severity == AuditSeverity.MEDIUM:
-                logger.warning(log_message, extra=event.to_dict())
-            else:
-                logger.info(log_message, extra=event.to_dict())
-
+            self._log_to_application(event)
             return True
 
         except Exception as e:
             logger.error(f"Failed to log audit event: {e}")
             return False
 
+    def _log_to_application(self, event: AuditEvent) -> None:
+        """Log to application logger based on severity."""
+        log_message = f"AUDIT: {event.action} by {event.username or 'system'} - {event.description}"
+
+        if event.severity == AuditSeverity.CRITICAL:
+            logger.critical(log_message, extra=event.to_dict())
+        elif event.severity == AuditSeverity.HIGH:
+            logger.error(log_message, extra=event.to_dict())
+        elif event.severity == AuditSeverity.MEDIUM:
+            logger.warning(log_message, extra=event.to_dict())
+        else:
+            logger.info(log_message, extra=event.to_dict())
+
+    def _ensure_writer(self, loop: asyncio.AbstractEventLoop) -> asyncio.Event:
+        """Start the writer on ``loop`` if needed; returns its wakeup event."""
+        writer, wakeup = self._writer, self._wakeup
+        if (
+            writer is None
+            or wakeup is None
+            or writer.done()
+            or writer.get_loop() is not loop
+        ):
+            wakeup = asyncio.Event()
+            self._wakeup = wakeup
+            self._flush_lock = asyncio.Lock()
+            self._writer = loop.create_task(self._run_writer(wakeup))
+        return wakeup
+
+    async def _run_writer(self, wakeup: asyncio.Event) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Commit every queued event in batches; returns the number committed."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        committed = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self.batch_size, len(self._pending)))
+                ]
+                if not await self._write_batch(batch):
+                    self._retry_later(batch)
+                    break
+                committed += len(batch)
+        return committed
+
+    def _retry_later(self, batch: List[_PendingEvent]) -> None:
+        """Requeue a failed batch's buffered events, up to the attempt limit."""
+        # Callers waiting on durable events have already been told it failed
+        buffered = [(event, None) for event, outcome in batch if outcome is None]
+        self._failed_attempts += 1
+        if self._failed_attempts >= settings.audit_max_write_attempts:
+            logger.error(
+                "Dropping audit events after repeated write failures",
+                events=len(buffered),
+                attempts=self._failed_attempts,
+            )
+            self._failed_attempts = 0
+            return
+        self._pending.extendleft(reversed(buffered))
+
+    async def _write_batch(self, batch: List[_PendingEvent]) -> bool:
+        """Insert a batch in one transaction, extending the hash chain."""
+        try:
+            async for db in get_async_session():
+                # Held until commit, so the head cannot move under this batch
+                await db.execute(_AUDIT_CHAIN_LOCK)
+                result = await db.execute(_SELECT_CHAIN_HEAD)
+                previous_hash = result.scalar()
+
+                rows = []
+                for event, _ in batch:
+                    event_hash = event.generate_hash(previous_hash)
+                    rows.append(self._to_row(event, event_hash, previous_hash))
+                    previous_hash = event_hash
+
+                await db.execute(_INSERT_AUDIT_EVENT, rows)
+                await db.commit()
+                break
+            else:
+                raise RuntimeError("No database session available")
+
+        except Exception as e:
+            logger.error(f"Failed to write audit events: {e}", events=len(batch))
+            self._resolve(batch, False)
+            return False
+
+        self._failed_attempts = 0
+        self._resolve(batch, True)
+        return True
+
+    @staticmethod
+    def _resolve(batch: List[_PendingEvent], committed: bool) -> None:
+        for _, outcome in batch:
+            if outcome is not None and not outcome.done():
+                outcome.set_result(committed)
+
+    @staticmethod
+    def _to_row(
+        event: AuditEvent, event_hash: str, previous_hash: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "event_type": event.event_type.value,
+            "severity": event.severity.value,
+            "user_id": event.user_id,
+            "username": event.username,
+            "timestamp": event.timestamp,
+            "resource_type": event.resource_type,
+            "resource_id": event.resource_id,
+            "action": event.action,
+            "description": event.description,
+            "ip_address": event.ip_address,
+            "user_agent": event.user_agent,
+            "session_id": event.session_id,
+            "details": json.dumps(event.details),
+            "before_state": (
+                json.dumps(event.before_state) if event.before_state else None
+            ),
+            "after_state": (
+                json.dumps(event.after_state) if event.after_state else None
+            ),
+            "success": event.success,
+            "error_message": event.error_message,
+            "event_hash": event_hash,
+            "previous_hash": previous_hash,
+        }
+
+    async def close(self) -> None:
+        """Stop the background writer after committing everything queued."""
+        writer, self._writer = self._writer, None
+        wakeup = self._wakeup
+        self._stopping = True
+        try:
+            if writer is not None and not writer.done():
+                if writer.get_loop() is asyncio.get_running_loop():
+                    if wakeup is not None:
+                        wakeup.set()
+                    try:
+                        await asyncio.wait_for(
+                            writer, settings.audit_close_timeout_seconds
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            "Audit log writer did not finish before shutdown",
+                            pending=len(self._pending),
+                        )
+                    return
+                writer.cancel()
+            await self.flush()
+        finally:
+            self._stopping = False
+
     async def log_user_authentication(
         self,
         user_id: int,
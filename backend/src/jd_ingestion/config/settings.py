@@ -32,15 +32,81 @@ class Settings(BaseSettings):
     redis_socket_keepalive_options: dict = {}
     redis_connection_pool_kwargs: dict = {}
 
+    # In-process result cache (utils.caching.cache_result)
+    result_cache_max_entries: int = 1000
+    result_cache_max_bytes: int = 67108864  # 64 MiB
+
+    # Two-tier cache (utils.cache.CacheService): per-worker L1 in front of Redis
+    cache_l1_enabled: bool = True
+    cache_l1_ttl_seconds: int = 10
+    cache_l1_max_entries: int = 2000
+    cache_l1_max_bytes: int = 33554432  # 32 MiB
+    cache_compression_min_bytes: int = 4096  # Compress larger payloads
+
+    # Buffered usage analytics (services.analytics_buffer)
+    analytics_buffer_max_size: int = 10000
+    analytics_buffer_batch_size: int = 500
+    analytics_buffer_flush_interval_ms: int = 1000
+    analytics_buffer_overflow_sample_rate: float = 0.1  # Kept once half full
+    analytics_buffer_drain_timeout_seconds: float = 10.0
+
+    # Audit log writer (audit.logger): events are group-committed in batches
+    audit_batch_size: int = 200
+    audit_flush_interval_ms: int = 500
+    audit_max_pending: int = 10000  # Beyond this, callers wait for the commit
+    audit_max_write_attempts: int = 5
+    audit_close_timeout_seconds: float = 10.0
+    # Comma-separated severities whose log_event waits for the commit
+    audit_durable_severities: str = "critical"
+
+    # API rate limits (services.rate_limiting_service): "redis" shares them
+    # across every worker process, "memory" keeps them per process
+    rate_limit_backend: str = "redis"
+    rate_limit_key_prefix: str = "ratelimit"
+    rate_limit_lease_fraction: float = 0.02  # Bucket share leased per round trip
+    rate_limit_lease_ttl_seconds: float = 2.0
+    rate_limit_window_buckets: int = 60
+    rate_limit_redis_timeout_seconds: float = 0.25
+    rate_limit_redis_retry_seconds: float = 30.0  # Memory fallback after errors
+
+    # Collaborative editing sessions (services.collaboration_backend): "redis"
+    # shares sessions across worker processes, "memory" keeps them per process
+    collaboration_backend: str = "redis"
+    collaboration_key_prefix: str = "collab"
+    collaboration_snapshot_interval: int = 500  # Operations between snapshots
+    collaboration_session_ttl_seconds: int = 86400
+    collaboration_redis_timeout_seconds: float = 1.0
+    collaboration_redis_retry_seconds: float = 30.0  # Local sessions after errors
+
+    # Query suggestions (services.search_recommendations_service): until the
+    # autocomplete index is built, database strategies run concurrently and
+    # whatever finished within the budget is ranked
+    search_suggestions_budget_ms: int = 250
+    search_suggestions_partial_cache_seconds: int = 60  # Some strategy timed out
+
+    # Autocomplete index for /search/suggestions (services.suggestion_index),
+    # held in memory by every worker
+    suggestion_index_enabled: bool = True
+    suggestion_index_refresh_seconds: float = 30.0  # Adds new searches
+    suggestion_index_rebuild_seconds: float = 3600.0  # Reloads every source
+    suggestion_index_max_terms_per_source: int = 50000
+    suggestion_index_top_k: int = 10  # Suggestions kept per prefix
+
     # OpenAI Configuration
     openai_api_key: str = ""
     openai_organization: str = ""
+    openai_base_url: str = ""  # Override for proxies or a local fake server in tests
     openai_max_retries: int = 3
     openai_timeout: int = 60
     openai_request_timeout: int = 60
     openai_rate_limit_per_minute: int = 1000
     openai_cost_tracking_enabled: bool = True
 
+    # OpenAI request dispatcher (services.openai_dispatcher)
+    openai_dispatcher_max_concurrency: int = 8
+    openai_dispatcher_interactive_slots: int = 2  # Never used by bulk requests
+    openai_dispatcher_interactive_max_wait_seconds: float = 10.0
+
     # Application Settings
     debug: bool = False
     log_level: str = "INFO"
@@ -58,11 +124,21 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 50
     supported_extensions: str = ".txt,.doc,.docx,.pdf,.md"  # Comma-separated string
     data_dir: str = "./data"
+    file_discovery_workers: int = 8  # Threads hashing/sniffing files during scans
+    batch_parse_workers: int = 4  # Worker processes parsing batch-ingested files
+    batch_db_flush_size: int = 50  # Files persisted per bulk-insert transaction
 
     # Embedding Settings
     embedding_model: str = "text-embedding-ada-002"
     chunk_size: int = 512
     chunk_overlap: int = 50
+    embedding_batch_max_inputs: int = 100  # Texts packed into one embeddings request
+    embedding_batch_max_tokens: int = 100000  # Estimated token budget per request
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_local_entries: int = 10000  # Per-worker LRU size
+    embedding_cache_redis_ttl_seconds: int = 2592000  # 30 days
+    # Per-section weights for job-level (centroid) embeddings; unlisted sections = 1.0
+    job_embedding_section_weights: dict = {}
 
     # Retry Settings
     RETRY_MAX_RETRIES: int = 3
@@ -172,6 +248,15 @@ class Settings(BaseSettings):
         """Convert comma-separated accept content string to list."""
         return [content.strip() for content in self.celery_accept_content.split(",")]
 
+    @property
+    def audit_durable_severities_list(self) -> List[str]:
+        """Convert comma-separated durable audit severities string to list."""
+        return [
+            severity.strip().lower()
+            for severity in self.audit_durable_severities.split(",")
+            if severity.strip()
+        ]
+
     class Config:
         env_file = ".env"
         case_sensitive = False
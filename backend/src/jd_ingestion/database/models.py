@@ -1,6 +1,7 @@
 # backend/src/jd_ingestion/database/models.py
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -13,13 +14,15 @@ from sqlalchemy import (
     DECIMAL,
     Table,
     Float,
+    Index,
     UniqueConstraint,
 )
-from sqlalchemy.orm import relationship, DeclarativeBase, synonym
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, DeclarativeBase, deferred, synonym
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.types import TypeDecorator
 from pgvector.sqlalchemy import Vector
 from datetime import datetime
+from typing import Any
 from passlib.context import CryptContext
 
 # Password hashing configuration
@@ -57,6 +60,25 @@ class JSONBType(TypeDecorator):
         return "JSONB"
 
 
+# Type adapter that uses TSVECTOR for PostgreSQL, TEXT for other databases
+class TSVectorType(TypeDecorator):
+    """
+    Platform-agnostic full-text search document type.
+
+    Uses TSVECTOR for PostgreSQL. Falls back to TEXT for other databases
+    like SQLite, where full-text search is not available.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        else:
+            return dialect.type_descriptor(Text())
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -219,6 +241,32 @@ class JobDescription(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
     )
+    # Full-text search documents, written by database triggers in the job's
+    # language (see the add_job_search_vectors migration). search_vector
+    # weights the title A, sections B and body C; title_vector is the title
+    # alone. Deferred so that loading a job does not transfer them.
+    search_vector = deferred(Column(TSVectorType, nullable=True))
+    title_vector = deferred(Column(TSVectorType, nullable=True))
+
+    __table_args__ = (
+        Index(
+            "idx_job_descriptions_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "idx_job_descriptions_title_vector",
+            "title_vector",
+            postgresql_using="gin",
+        ),
+        # Trigram index for substring (ILIKE '%...%') title filters
+        Index(
+            "idx_job_descriptions_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     # Relationships with CASCADE delete-orphan for proper ORM-level deletion handling
     sections = relationship(
@@ -227,6 +275,12 @@ class JobDescription(Base):
     chunks = relationship(
         "ContentChunk", back_populates="job", cascade="all, delete-orphan"
     )
+    job_embedding = relationship(
+        "JobEmbedding",
+        back_populates="job",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
     job_metadata = relationship(
         "JobMetadata", back_populates="job", uselist=False, cascade="all, delete-orphan"
     )
@@ -276,6 +330,22 @@ class JobMetadata(Base):
     salary_budget = Column(Float, nullable=True)  # Use Float for SQLite compatibility
     effective_date = Column(Date, nullable=True)
 
+    # Trigram indexes for substring (ILIKE '%...%') filters
+    __table_args__ = (
+        Index(
+            "idx_job_metadata_department_trgm",
+            "department",
+            postgresql_using="gin",
+            postgresql_ops={"department": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_job_metadata_location_trgm",
+            "location",
+            postgresql_using="gin",
+            postgresql_ops={"location": "gin_trgm_ops"},
+        ),
+    )
+
     # Relationships
     job = relationship("JobDescription", back_populates="job_metadata")
 
@@ -293,12 +363,99 @@ class ContentChunk(Base):
     chunk_text = Column(Text, nullable=True)
     chunk_index = Column(Integer, nullable=True)
     embedding = Column(Vector(1536), nullable=True)
+    embedding_model = Column(String(100), nullable=True)
+    text_hash = Column(String(64), nullable=True, index=True)
 
     # Relationships
     job = relationship("JobDescription", back_populates="chunks")
     section = relationship("JobSection", back_populates="chunks")
 
 
+class JobEmbedding(Base):
+    """
+    Job Embedding - Mean-pooled chunk embedding for a whole job description.
+
+    Answers job-to-job similarity from one vector per job instead of scanning
+    every chunk. Refreshed whenever the job's chunk embeddings are regenerated.
+    """
+
+    __tablename__ = "job_embeddings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(
+        Integer,
+        ForeignKey("job_descriptions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        index=True,
+    )
+    embedding: Column[Any] = Column(Vector(1536), nullable=False)
+    embedding_model = Column(String(100), nullable=True)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
+
+    # Relationships
+    job = relationship("JobDescription", back_populates="job_embedding")
+
+
+class FileManifest(Base):
+    """
+    File Manifest - Stat signature and content hash of every ingested file.
+
+    Lets directory rescans skip files whose size, mtime and inode are unchanged
+    without re-reading them, and route edited files to the job they created.
+    """
+
+    __tablename__ = "file_manifest"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_path = Column(String(1000), unique=True, index=True, nullable=False)
+    file_size = Column(BigInteger, nullable=False, default=0)
+    mtime_ns = Column(BigInteger, nullable=False, default=0)
+    inode = Column(BigInteger, nullable=False, default=0)
+    file_hash = Column(String(64), nullable=False, index=True)
+    encoding = Column(String(50), nullable=True)
+    job_id = Column(
+        Integer,
+        ForeignKey("job_descriptions.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    last_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
+
+    # Relationships
+    job = relationship("JobDescription")
+
+
+class JobFacetCount(Base):
+    """
+    Job Facet Count - Precomputed search facet and filter statistics.
+
+    One row per (facet, value), e.g. ("classification", "EC"), with the number
+    of rows carrying that value. Numeric facets (salary, FTE, effective date)
+    have a single row with an empty value holding the count, sum, minimum and
+    maximum. Kept up to date incrementally by ``services.facet_store``.
+    """
+
+    __tablename__ = "job_facet_counts"
+
+    facet = Column(String(50), primary_key=True)
+    value = Column(String(500), primary_key=True, default="")
+    row_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=True)
+    value_min = Column(Float, nullable=True)
+    value_max = Column(Float, nullable=True)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True
+    )
+
+
 # Analytics and quality models
 class SearchAnalytics(Base):
     __tablename__ = "search_analytics"
@@ -412,6 +569,16 @@ class Skill(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, onupdate=datetime.utcnow, nullable=True)
 
+    # Trigram index for substring (ILIKE '%...%') skill name search
+    __table_args__ = (
+        Index(
+            "idx_skills_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
     # Relationships
     job_descriptions = relationship(
         "JobDescription",
@@ -3,13 +3,13 @@ Middleware for automatic analytics tracking.
 """
 
 import time
-import asyncio
-from typing import Callable, Optional
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from ..database.connection import async_session_context
-from ..services.analytics_service import analytics_service
+from ..services.analytics_buffer import AnalyticsBuffer, analytics_buffer
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -18,9 +18,15 @@ logger = get_logger(__name__)
 class AnalyticsMiddleware(BaseHTTPMiddleware):
     """Middleware to automatically track API requests and performance."""
 
-    def __init__(self, app, track_all_requests: bool = True):
+    def __init__(
+        self,
+        app,
+        track_all_requests: bool = True,
+        buffer: Optional[AnalyticsBuffer] = None,
+    ):
         super().__init__(app)
         self.track_all_requests = track_all_requests
+        self.buffer = buffer or analytics_buffer
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and track analytics."""
@@ -43,15 +49,13 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
             # Calculate response time
             response_time_ms = int((time.time() - start_time) * 1000)
 
-            # Track the activity asynchronously (fire and forget)
+            # Queue the activity for the background batch writer
             if self.track_all_requests:
-                asyncio.create_task(
-                    self._track_request(
-                        request=request,
-                        response=response,
-                        response_time_ms=response_time_ms,
-                        session_id=session_id,
-                    )
+                self._track_request(
+                    request=request,
+                    response=response,
+                    response_time_ms=response_time_ms,
+                    session_id=session_id,
                 )
 
             return response
@@ -61,98 +65,91 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
             response_time_ms = int((time.time() - start_time) * 1000)
 
             if self.track_all_requests:
-                asyncio.create_task(
-                    self._track_request(
-                        request=request,
-                        response=None,
-                        response_time_ms=response_time_ms,
-                        session_id=session_id,
-                        error=str(e),
-                    )
+                self._track_request(
+                    request=request,
+                    response=None,
+                    response_time_ms=response_time_ms,
+                    session_id=session_id,
+                    error=str(e),
                 )
 
             raise
 
-    async def _track_request(
+    def _track_request(
         self,
         request: Request,
         response: Optional[Response] = None,
         response_time_ms: int = 0,
         session_id: Optional[str] = None,
         error: Optional[str] = None,
-    ):
-        """Track request analytics in background."""
+    ) -> None:
+        """Queue request analytics; never raises into the request path."""
         try:
-            # Get database session using async context manager
-            async with async_session_context() as db:
-                try:
-                    # Determine action type based on endpoint
-                    action_type = self._determine_action_type(
-                        request.url.path, request.method
-                    )
-
-                    # Extract additional context
-                    search_query = None
-                    search_filters = None
-                    results_count = None
-
-                    # For search endpoints, try to extract query parameters
-                    if action_type == "search":
-                        search_query = request.query_params.get(
-                            "q"
-                        ) or request.query_params.get("query")
-                        if request.query_params:
-                            search_filters = dict(request.query_params)
-
-                    # Extract resource ID from path
-                    resource_id = self._extract_resource_id(request.url.path)
-
-                    # Get client information
-                    client_host = request.client.host if request.client else None
-                    user_agent = request.headers.get("user-agent")
-
-                    # Determine status code
-                    status_code = response.status_code if response else 500
-
-                    # Track the activity
-                    await analytics_service.track_activity(
-                        db=db,
-                        action_type=action_type,
-                        endpoint=request.url.path,
-                        http_method=request.method,
-                        session_id=session_id,
-                        ip_address=client_host,
-                        user_agent=user_agent,
-                        resource_id=resource_id,
-                        response_time_ms=response_time_ms,
-                        status_code=status_code,
-                        search_query=search_query,
-                        search_filters=search_filters,
-                        results_count=results_count,
-                        metadata={
-                            "error": error,
-                            "path_params": (
-                                dict(request.path_params)
-                                if request.path_params
-                                else None
-                            ),
-                            "query_params": (
-                                dict(request.query_params)
-                                if request.query_params
-                                else None
-                            ),
-                        },
-                    )
-
-                except Exception as track_error:
-                    logger.error(
-                        "Failed to track request analytics",
-                        path=request.url.path,
-                        error=str(track_error),
-                    )
-
-        except Exception as middleware_error:
-            logger.error("Analytics middleware error", error=str(middleware_error))
+            self.buffer.enqueue(
+                self._build_event(
+                    request=request,
+                    response=response,
+                    response_time_ms=response_time_ms,
+                    session_id=session_id,
+                    error=error,
+                )
+            )
+        except Exception as track_error:
+            logger.error(
+                "Failed to track request analytics",
+                path=request.url.path,
+                error=str(track_error),
+            )
+
+    def _build_event(
+        self,
+        request: Request,
+        response: Optional[Response] = None,
+        response_time_ms: int = 0,
+        session_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the ``UsageAnalytics`` row for a request."""
+        # Determine action type based on endpoint
+        action_type = self._determine_action_type(request.url.path, request.method)
+
+        # For search endpoints, try to extract query parameters
+        search_query = None
+        search_filters = None
+        if action_type == "search":
+            search_query = request.query_params.get("q") or request.query_params.get(
+                "query"
+            )
+            if request.query_params:
+                search_filters = dict(request.query_params)
+
+        return {
+            "timestamp": datetime.utcnow(),
+            "session_id": session_id or str(uuid.uuid4()),
+            "user_id": None,
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+            "action_type": action_type,
+            "endpoint": request.url.path,
+            "http_method": request.method,
+            "resource_id": self._extract_resource_id(request.url.path),
+            "response_time_ms": response_time_ms,
+            "status_code": response.status_code if response else 500,
+            "search_query": search_query,
+            "search_filters": search_filters,
+            "results_count": None,
+            "processing_time_ms": None,
+            "files_processed": None,
+            "request_metadata": {
+                "error": error,
+                "path_params": (
+                    dict(request.path_params) if request.path_params else None
+                ),
+                "query_params": (
+                    dict(request.query_params) if request.query_params else None
+                ),
+            },
+        }
 
     def _determine_action_type(self, path: str, method: str) -> str:
         """Determine action type based on endpoint path and method."""
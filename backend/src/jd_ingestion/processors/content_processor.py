@@ -1,7 +1,12 @@
 import re
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Pattern, Match, Tuple, Union
 from dataclasses import dataclass, field
 
+from ..config.settings import settings
+
+# Input limit of the OpenAI embedding models, in tokens
+EMBEDDING_MAX_INPUT_TOKENS = 8191
+
 
 @dataclass
 class StructuredFields:
@@ -22,96 +27,254 @@ class ProcessedContent:
     sections: Dict[str, str] = field(default_factory=dict)
     structured_fields: StructuredFields = field(default_factory=StructuredFields)
     processing_errors: list = field(default_factory=list)
+    preamble: str = ""  # Text before the first section header
 
 
-class ContentProcessor:
-    def __init__(self, raw_content: str = "", language: str = "en"):
-        self.raw_content = raw_content
-        self.language = language
-
-    def extract_sections(self) -> Dict[str, str]:
-        sections = {}
-        section_headers = [
-            "GENERAL ACCOUNTABILITY",
-            "ORGANIZATIONAL STRUCTURE",
-            "ORGANIZATION STRUCTURE",  # Alternative spelling
-            "NATURE & SCOPE",
-            "SPECIFIC ACCOUNTABILITIES",
-            "DIMENSIONS",
-            "EDUCATION",
-            "EXPERIENCE",
-            "KNOWLEDGE",
-            "ABILITIES",
-            "PERSONAL SUITABILITY",
-            "OFFICIAL LANGUAGE PROFICIENCY",
-            "CONDITIONS OF EMPLOYMENT",
-            "POSITION SUMMARY",
-            "KEY RESPONSIBILITIES",
-            "QUALIFICATIONS",
-        ]
-
-        # Use the actual raw content
-        processed_content = self.raw_content or ""
-
-        # Step 1: Find all header matches and their positions
-        header_matches: list[Dict[str, Union[str, int]]] = []
-        header_regex = re.compile(
+@dataclass
+class TextChunk:
+    text: str
+    section_type: Optional[str] = None  # None for text outside any section
+    token_count: int = 0
+
+
+# Section headers per language, in match priority order. A header is
+# recognised (case-insensitively) at the start of the text or after
+# whitespace, optionally followed by a colon.
+SECTION_HEADERS: Dict[str, Tuple[str, ...]] = {
+    "en": (
+        "GENERAL ACCOUNTABILITY",
+        "ORGANIZATIONAL STRUCTURE",
+        "ORGANIZATION STRUCTURE",  # Alternative spelling
+        "NATURE & SCOPE",
+        "SPECIFIC ACCOUNTABILITIES",
+        "DIMENSIONS",
+        "EDUCATION",
+        "EXPERIENCE",
+        "KNOWLEDGE",
+        "ABILITIES",
+        "PERSONAL SUITABILITY",
+        "OFFICIAL LANGUAGE PROFICIENCY",
+        "CONDITIONS OF EMPLOYMENT",
+        "POSITION SUMMARY",
+        "KEY RESPONSIBILITIES",
+        "QUALIFICATIONS",
+    ),
+    "fr": (
+        "RESPONSABILITÉS GÉNÉRALES",
+        "RESPONSABILITÉ GÉNÉRALE",
+        "STRUCTURE ORGANISATIONNELLE",
+        "NATURE ET PORTÉE",
+        "NATURE & PORTÉE",
+        "RESPONSABILITÉS SPÉCIFIQUES",
+        "RESPONSABILITÉS PARTICULIÈRES",
+        "DIMENSIONS",
+        "ÉTUDES",
+        "EXPÉRIENCE",
+        "CONNAISSANCES",
+        "CAPACITÉS",
+        "QUALITÉS PERSONNELLES",
+        "COMPÉTENCES EN LANGUES OFFICIELLES",
+        "EXIGENCES LINGUISTIQUES",
+        "CONDITIONS D'EMPLOI",
+        "RÉSUMÉ DU POSTE",
+        "RESPONSABILITÉS CLÉS",
+        "QUALIFICATIONS",
+    ),
+}
+
+# Structured-field patterns per language, in priority order: the first
+# pattern that matches anywhere in the text wins. Every pattern starts with a
+# literal, which is used to locate candidate offsets before matching.
+FIELD_PATTERNS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "en": {
+        "position_title": (
+            r"POSITION\s+TITLE[:\.\s]*(.+?)(?:\n|$)",
+            r"TITLE[:\.\s]*(.+?)(?:\n|$)",
+            r"ector,\s*(.+?)(?:\s+GROUP|$)",  # From sample: "ector, Bilateral and Regional Labour Affairs"
+        ),
+        "reports_to": (r"Reports\s+to:\s*(.+?)(?:\n|$)",),
+        "department": (r"Department:\s*(.+?)(?:\n|$)",),
+        "fte_count": (
+            r"Staff\s+Supervised:\s*(\d+)",
+            r"Supervises:\s*(\d+)\s*FTE",
+            r"Direct\s+Reports:\s*(\d+)",
+        ),
+        "salary_budget": (
+            r"Budget\s+Responsibility:\s*\$?([\d,\.]+)(?:\s*[MK])?",
+            r"Budget\s+Authority:\s*\$?([\d,\.]+)(?:\s*[MK])?",
+        ),
+        "budget_millions": (
+            r"Budget\s+(?:Responsibility|Authority):\s*\$?[\d,\.]+\s*M",
+        ),
+        "budget_thousands": (
+            r"Budget\s+(?:Responsibility|Authority):\s*\$?[\d,\.]+\s*K",
+        ),
+    },
+    "fr": {
+        "position_title": (
+            r"TITRE\s+DU\s+POSTE[:\.\s]*(.+?)(?:\n|$)",
+            r"TITRE[:\.\s]*(.+?)(?:\n|$)",
+        ),
+        "reports_to": (r"Relève\s+d[eu]\s*:\s*(.+?)(?:\n|$)",),
+        "department": (r"Ministère\s*:\s*(.+?)(?:\n|$)",),
+        "fte_count": (
+            r"Personnel\s+supervisé\s*:\s*(\d+)",
+            r"Subordonnés\s+directs\s*:\s*(\d+)",
+        ),
+    },
+}
+
+# What may follow a header: an optional colon, then whitespace. French
+# typography puts a (non-breaking) space before the colon.
+HEADER_TAILS: Dict[str, str] = {"en": r":?\s*", "fr": r"(?:[^\S\n]*:)?\s*"}
+_LITERAL_PREFIX = re.compile(r"[^\\\[\](){}?*+.|^$]*")
+# Characters that re.IGNORECASE folds onto ASCII letters but str.lower() does
+# not; texts containing them take the plain regex path.
+_CASEFOLD_SPECIALS = re.compile("[İıſ]")
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the lower-cased literal text every match of ``pattern`` starts with."""
+    prefix = _LITERAL_PREFIX.match(pattern).group(0)  # type: ignore[union-attr]
+    if pattern[len(prefix) : len(prefix) + 1] in ("?", "*", "{"):
+        prefix = prefix[:-1]  # The last literal character is optional
+    return prefix.lower()
+
+
+class _ExtractionEngine:
+    """Compiled header and field tables for one language."""
+
+    def __init__(
+        self,
+        headers: Tuple[str, ...],
+        field_patterns: Dict[str, Tuple[str, ...]],
+        header_tail: str,
+    ):
+        self.headers = tuple(dict.fromkeys(headers))
+        self.header_literals = tuple(header.lower() for header in self.headers)
+        self.header_tail = re.compile(header_tail)
+        # Used for texts where lower-casing cannot stand in for IGNORECASE
+        self.header_regex = re.compile(
             r"(?:\n|^|\s)(?P<header>"
-            + "|".join(re.escape(h) for h in section_headers)
-            + r"):?\s*",  # Match headers with optional colon and whitespace, including after spaces
-            re.IGNORECASE,  # Removed MULTILINE as it's handled by (?:\\n|^)
+            + "|".join(re.escape(h) for h in self.headers)
+            + ")"
+            + header_tail,
+            re.IGNORECASE,
         )
-        for match in header_regex.finditer(processed_content):
-            header_matches.append(
-                {
-                    "header": match.group("header").strip(),
-                    "start": match.start(),
-                    "end": match.end(),
-                }
+        self.field_rules: Dict[str, Tuple[Tuple[str, Pattern[str]], ...]] = {}
+        for name, patterns in field_patterns.items():
+            rules = []
+            for pattern in patterns:
+                anchor = _literal_prefix(pattern)
+                if not anchor:
+                    raise ValueError(f"Field pattern has no literal prefix: {pattern}")
+                rules.append((anchor, re.compile(pattern, re.IGNORECASE)))
+            self.field_rules[name] = tuple(rules)
+        self.anchors = tuple(
+            dict.fromkeys(
+                self.header_literals
+                + tuple(a for rules in self.field_rules.values() for a, _ in rules)
             )
+        )
 
-        # Step 2: Extract content between headers
-        for i, current_header_info in enumerate(header_matches):
-            header_text = str(current_header_info["header"])
-            content_start = int(current_header_info["end"])
-
+    def scan(self, text: str) -> "_DocumentScan":
+        """Locate every header and field anchor in ``text`` in one sweep."""
+        lowered = text.lower()
+        if len(lowered) != len(text) or _CASEFOLD_SPECIALS.search(text):
+            return _DocumentScan(self, text, None)
+
+        offsets: Dict[str, List[int]] = {}
+        for literal in self.anchors:
+            positions = []
+            index = lowered.find(literal)
+            while index != -1:
+                positions.append(index)
+                index = lowered.find(literal, index + 1)
+            offsets[literal] = positions
+        return _DocumentScan(self, text, offsets)
+
+
+class _DocumentScan:
+    """Anchor offsets for one document, resolved into sections and fields."""
+
+    def __init__(
+        self,
+        engine: _ExtractionEngine,
+        text: str,
+        offsets: Optional[Dict[str, List[int]]],
+    ):
+        self.engine = engine
+        self.text = text
+        self.offsets = offsets
+        self._headers: Optional[List[Tuple[str, int, int]]] = None
+
+    def _header_matches(self) -> List[Tuple[str, int, int]]:
+        if self._headers is None:
+            self._headers = self._find_headers()
+        return self._headers
+
+    def _find_headers(self) -> List[Tuple[str, int, int]]:
+        """Return ``(header, start, end)`` for each header, as re.finditer would."""
+        text = self.text
+        if self.offsets is None:
+            return [
+                (match.group("header").strip(), match.start(), match.end())
+                for match in self.engine.header_regex.finditer(text)
+            ]
+
+        candidates = sorted(
+            (position, index)
+            for index, literal in enumerate(self.engine.header_literals)
+            for position in self.offsets[literal]
+        )
+        matches = []
+        last_end = 0
+        for position, index in candidates:
+            # The match includes the preceding whitespace character, if any,
+            # and must not overlap the previous header's trailing whitespace
+            start = position - 1 if position else 0
+            if start < last_end or (position and not text[start].isspace()):
+                continue
+            header_end = position + len(self.engine.header_literals[index])
+            end = self.engine.header_tail.match(text, header_end).end()  # type: ignore[union-attr]
+            matches.append((text[position:header_end].strip(), start, end))
+            last_end = end
+        return matches
+
+    def sections(self) -> Dict[str, str]:
+        sections = {}
+        header_matches = self._header_matches()
+        for i, (header_text, _, content_start) in enumerate(header_matches):
             if i + 1 < len(header_matches):
                 # Content ends at the start of the next header
-                content_end = int(header_matches[i + 1]["start"])
+                content_end = header_matches[i + 1][1]
             else:
                 # Last header, content goes to the end of the document
-                content_end = len(processed_content)
-
-            content = processed_content[content_start:content_end].strip()
-            sections[header_text] = content
-
+                content_end = len(self.text)
+            sections[header_text] = self.text[content_start:content_end].strip()
         return sections
 
-    def clean_text(self, text: str) -> str:
-        """
-        Cleans the input text by removing common formatting artifacts,
-        extra whitespace, and normalizing content.
-        """
-        # Remove multiple spaces/tabs with a single space
-        text = re.sub(r"\s+", " ", text)
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        return text
-
-    def identify_language(self) -> str:
-        """
-        Identifies the language of the raw content.
-        For now, it returns the language passed in the constructor,
-        but can be enhanced with a language detection library (e.g., langdetect).
-        """
-        return self.language
+    def preamble(self) -> str:
+        header_matches = self._header_matches()
+        if not header_matches:
+            return ""
+        return self.text[: header_matches[0][1]].strip()
+
+    def _matches(self, name: str) -> Iterator[Match[str]]:
+        """Yield the leftmost match of each of ``name``'s patterns, in priority order."""
+        for anchor, pattern in self.engine.field_rules.get(name, ()):
+            if self.offsets is None:
+                match = pattern.search(self.text)
+            else:
+                match = None
+                for position in self.offsets[anchor]:
+                    match = pattern.match(self.text, position)
+                    if match:
+                        break
+            if match:
+                yield match
 
-    def parse_structured_fields(self) -> Dict[str, Any]:
-        """
-        Parses structured fields from the raw content, such as position title,
-        reporting structure, department, etc.
-        This will require specific regex patterns for each field.
-        """
+    def structured_fields(self) -> Dict[str, Any]:
         structured_fields: Dict[str, Optional[Union[str, int, float]]] = {
             "position_title": None,
             "reports_to": None,
@@ -122,80 +285,152 @@ class ContentProcessor:
             "effective_date": None,
         }
 
-        # Extract Position Title - multiple patterns
-        patterns = [
-            r"POSITION\s+TITLE[:\.\s]*(.+?)(?:\n|$)",
-            r"TITLE[:\.\s]*(.+?)(?:\n|$)",
-            r"ector,\s*(.+?)(?:\s+GROUP|$)",  # From sample: "ector, Bilateral and Regional Labour Affairs"
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.raw_content, re.IGNORECASE)
+        for name in ("position_title", "reports_to", "department"):
+            match = next(self._matches(name), None)
             if match:
-                structured_fields["position_title"] = self.clean_text(match.group(1))
+                structured_fields[name] = clean_text(match.group(1))
+
+        for match in self._matches("fte_count"):
+            try:
+                structured_fields["fte_count"] = int(match.group(1))
                 break
+            except ValueError:
+                continue
+
+        for match in self._matches("salary_budget"):
+            try:
+                # Remove commas and convert to float
+                budget_value = float(match.group(1).replace(",", ""))
+            except ValueError:
+                continue
+            # Check if it's in millions (M) or thousands (K)
+            if next(self._matches("budget_millions"), None):
+                budget_value = budget_value * 1_000_000
+            elif next(self._matches("budget_thousands"), None):
+                budget_value = budget_value * 1_000
+            structured_fields["salary_budget"] = budget_value
+            break
 
-        # Extract Reports To
-        match = re.search(
-            r"Reports\s+to:\s*(.+?)(?:\n|$)", self.raw_content, re.IGNORECASE
-        )
-        if match:
-            structured_fields["reports_to"] = self.clean_text(match.group(1))
+        return structured_fields
 
-        # Extract Department
-        match = re.search(
-            r"Department:\s*(.+?)(?:\n|$)", self.raw_content, re.IGNORECASE
-        )
-        if match:
-            structured_fields["department"] = self.clean_text(match.group(1))
 
-        # Extract Staff Supervised (FTE count) - multiple patterns
-        patterns = [
-            r"Staff\s+Supervised:\s*(\d+)",
-            r"Supervises:\s*(\d+)\s*FTE",
-            r"Direct\s+Reports:\s*(\d+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.raw_content, re.IGNORECASE)
-            if match:
-                try:
-                    structured_fields["fte_count"] = int(match.group(1))
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` (~4 characters per token)."""
+    return len(text) // 4
+
+
+def _split_text(text: str, max_chars: int, overlap_chars: int) -> Iterator[str]:
+    """
+    Split whitespace-normalised text into chunks of at most ``max_chars``.
+
+    Chunks end on whole words, preferably after a sentence ending in their
+    second half. Each chunk repeats up to ``overlap_chars`` of trailing words
+    from the previous one, but always starts past the previous start. Words
+    longer than ``max_chars`` are cut into pieces.
+    """
+    if not text:
+        return
+    words = text.split(" ")
+    start = 0
+    while start < len(words):
+        end = start
+        length = -1
+        while end < len(words) and length + 1 + len(words[end]) <= max_chars:
+            length += 1 + len(words[end])
+            end += 1
+
+        if end == start:
+            word = words[start]
+            for offset in range(0, len(word), max_chars):
+                yield word[offset : offset + max_chars]
+            start += 1
+            continue
+
+        if end < len(words):
+            for boundary in range(end, start + (end - start) // 2, -1):
+                if words[boundary - 1].endswith((".", "!", "?")):
+                    end = boundary
                     break
-                except ValueError:
-                    continue
 
-        # Extract Budget Responsibility - multiple patterns
-        patterns = [
-            r"Budget\s+Responsibility:\s*\$?([\d,\.]+)(?:\s*[MK])?",
-            r"Budget\s+Authority:\s*\$?([\d,\.]+)(?:\s*[MK])?",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, self.raw_content, re.IGNORECASE)
-            if match:
-                try:
-                    # Remove commas and convert to float
-                    budget_str = match.group(1).replace(",", "")
-                    budget_value = float(budget_str)
-
-                    # Check if it's in millions (M) or thousands (K)
-                    if re.search(
-                        r"Budget\s+(?:Responsibility|Authority):\s*\$?[\d,\.]+\s*M",
-                        self.raw_content,
-                        re.IGNORECASE,
-                    ):
-                        budget_value = budget_value * 1_000_000
-                    elif re.search(
-                        r"Budget\s+(?:Responsibility|Authority):\s*\$?[\d,\.]+\s*K",
-                        self.raw_content,
-                        re.IGNORECASE,
-                    ):
-                        budget_value = budget_value * 1_000
-
-                    structured_fields["salary_budget"] = budget_value
-                    break
-                except ValueError:
-                    continue
+        yield " ".join(words[start:end])
+        if end >= len(words):
+            break
+
+        next_start = end
+        length = -1
+        while (
+            next_start - 1 > start
+            and length + 1 + len(words[next_start - 1]) <= overlap_chars
+        ):
+            length += 1 + len(words[next_start - 1])
+            next_start -= 1
+        start = next_start
+
+
+def clean_text(text: str) -> str:
+    """Collapse runs of whitespace to a single space and strip the ends."""
+    # str.split() splits on exactly the characters matched by \s
+    return " ".join(text.split())
+
+
+def _build_engines() -> Dict[str, _ExtractionEngine]:
+    """Compile one engine per language; French documents also match English labels."""
+    engines = {
+        "en": _ExtractionEngine(
+            SECTION_HEADERS["en"], FIELD_PATTERNS["en"], HEADER_TAILS["en"]
+        )
+    }
+    fr_fields = {
+        name: FIELD_PATTERNS["fr"].get(name, ()) + patterns
+        for name, patterns in FIELD_PATTERNS["en"].items()
+    }
+    engines["fr"] = _ExtractionEngine(
+        SECTION_HEADERS["fr"] + SECTION_HEADERS["en"], fr_fields, HEADER_TAILS["fr"]
+    )
+    return engines
 
-        return structured_fields
+
+_ENGINES = _build_engines()
+
+
+def get_extraction_engine(language: str = "en") -> _ExtractionEngine:
+    """Return the compiled engine for ``language``, defaulting to English."""
+    return _ENGINES.get((language or "en").lower()[:2], _ENGINES["en"])
+
+
+class ContentProcessor:
+    def __init__(self, raw_content: str = "", language: str = "en"):
+        self.raw_content = raw_content
+        self.language = language
+
+    def _scan(self) -> _DocumentScan:
+        return get_extraction_engine(self.language).scan(self.raw_content or "")
+
+    def extract_sections(self) -> Dict[str, str]:
+        return self._scan().sections()
+
+    def clean_text(self, text: str) -> str:
+        """
+        Cleans the input text by removing common formatting artifacts,
+        extra whitespace, and normalizing content.
+        """
+        return clean_text(text)
+
+    def identify_language(self) -> str:
+        """
+        Identifies the language of the raw content.
+        For now, it returns the language passed in the constructor,
+        but can be enhanced with a language detection library (e.g., langdetect).
+        """
+        return self.language
+
+    def parse_structured_fields(self) -> Dict[str, Any]:
+        """
+        Parses structured fields from the raw content, such as position title,
+        reporting structure, department, etc., using the compiled patterns
+        for the processor's language.
+        """
+        return self._scan().structured_fields()
 
     def process_content(
         self, raw_content: str, language: str = "en"
@@ -217,18 +452,18 @@ class ContentProcessor:
             # Clean the content
             cleaned_content = self.clean_text(raw_content)
 
-            # Extract sections
-            sections = self.extract_sections()
-
-            # Parse structured fields
-            structured_fields_dict = self.parse_structured_fields()
-            structured_fields = StructuredFields(**structured_fields_dict)
+            # Extract sections and structured fields from a single scan
+            scan = self._scan()
+            sections = scan.sections()
+            structured_fields = StructuredFields(**scan.structured_fields())
+            preamble = scan.preamble()
 
             return ProcessedContent(
                 cleaned_content=cleaned_content,
                 sections=sections,
                 structured_fields=structured_fields,
                 processing_errors=[],
+                preamble=preamble,
             )
 
         except Exception as e:
@@ -279,3 +514,49 @@ class ContentProcessor:
             start = next_start
 
         return chunks
+
+    def iter_chunks(
+        self,
+        processed_content: ProcessedContent,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+    ) -> Iterator[TextChunk]:
+        """
+        Yield embedding-sized chunks that never cross a section boundary.
+
+        Text before the first header and each section are chunked on their
+        own, so a section's chunks depend only on its text: an unchanged
+        section yields identical chunks (and text hashes) on re-ingestion.
+        Documents without recognised sections are chunked as a whole.
+
+        Args:
+            processed_content: Output of ``process_content``
+            max_tokens: Estimated tokens per chunk (default: settings.chunk_size,
+                capped at the embedding model's input limit)
+            overlap_tokens: Estimated tokens repeated from the previous chunk
+                of the same section (default: settings.chunk_overlap)
+
+        Yields:
+            TextChunk objects in document order
+        """
+        max_tokens = min(max_tokens or settings.chunk_size, EMBEDDING_MAX_INPUT_TOKENS)
+        if overlap_tokens is None:
+            overlap_tokens = settings.chunk_overlap
+        max_chars = max(1, max_tokens) * 4
+        overlap_chars = max(0, min(overlap_tokens, max_tokens // 2)) * 4
+
+        segments: List[Tuple[Optional[str], str]]
+        if processed_content.sections:
+            segments = [(None, processed_content.preamble)]
+            segments.extend(processed_content.sections.items())
+        else:
+            segments = [(None, processed_content.cleaned_content)]
+
+        for section_type, content in segments:
+            text = clean_text(content or "")
+            for chunk_text in _split_text(text, max_chars, overlap_chars):
+                yield TextChunk(
+                    text=chunk_text,
+                    section_type=section_type,
+                    token_count=estimate_tokens(chunk_text),
+                )
@@ -30,6 +30,7 @@ except ImportError:
 
 from ..config.settings import settings
 from ..utils.logging import get_logger
+from .openai_dispatcher import RequestPriority, openai_dispatcher
 
 logger = get_logger(__name__)
 
@@ -47,6 +48,27 @@ class AIEnhancementService:
             except Exception as e:
                 logger.warning(f"Failed to initialize OpenAI client: {e}")
 
+    async def _create_chat_completion(
+        self,
+        operation_type: str,
+        priority: RequestPriority = RequestPriority.STANDARD,
+        **request: Any,
+    ) -> Any:
+        """Create a chat completion once the OpenAI dispatcher admits it."""
+        client = self.client
+        if client is None:
+            raise RuntimeError("OpenAI client is not configured")
+        prompt_chars = sum(
+            len(message.get("content") or "") for message in request["messages"]
+        )
+        return await openai_dispatcher.submit(
+            lambda: client.chat.completions.create(**request),
+            operation_type=operation_type,
+            # Approximate: 1 token per 4 characters, plus the completion budget
+            estimated_tokens=prompt_chars // 4 + request.get("max_tokens", 0),
+            priority=priority,
+        )
+
     async def generate_suggestions(
         self,
         text: str,
@@ -265,7 +287,8 @@ If no contextual bias is found, return an empty array.
 Return ONLY valid JSON, no other text."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "bias_analysis",
                 model="gpt-4",
                 messages=[
                     {
@@ -475,7 +498,8 @@ Return ONLY valid JSON, no other text."""
         """
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "text_suggestions",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -1390,7 +1414,8 @@ Keep the section names exactly the same."""
             if self.client is None:
                 raise ValueError("OpenAI client is not initialized")
 
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "template_generation",
                 model="gpt-4",
                 messages=[
                     {
@@ -2036,7 +2061,9 @@ Instructions:
 
 Return ONLY the completion (the new text to add), not the original partial content."""
 
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "section_completion",
+                priority=RequestPriority.INTERACTIVE,
                 model="gpt-4",
                 messages=[
                     {
@@ -2143,7 +2170,8 @@ CHANGES:
 - [change 2]
 ..."""
 
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "content_enhancement",
                 model="gpt-4",
                 messages=[
                     {
@@ -2231,7 +2259,8 @@ Original Text:
 
 Translated Text:
 """
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "translation",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2280,7 +2309,8 @@ Job Description:
 
 Job Posting:
 """
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "job_posting_generation",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2329,7 +2359,8 @@ Job Description:
 
 Predictive Analysis:
 """
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "predictive_analysis",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -2406,7 +2437,9 @@ Consider:
 
 Return ONLY valid JSON."""
 
-            response = await self.client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "inline_suggestions",
+                priority=RequestPriority.INTERACTIVE,
                 model="gpt-4",
                 messages=[
                     {
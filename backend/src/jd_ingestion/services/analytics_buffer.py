@@ -0,0 +1,183 @@
+"""
+Buffered usage analytics ingestion.
+
+Request analytics are appended to a bounded in-process queue and written by a
+single background flusher in multi-row INSERTs, every ``batch_size`` events or
+``flush_interval_ms`` milliseconds, whichever comes first. Recording an event
+is a non-blocking append, so tracking never competes with request handling
+for database connections.
+
+When the queue is more than half full, only a sample of successful requests
+is kept (server errors always are); when it is full, new events are dropped.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from ..config.settings import settings
+from ..database.connection import async_session_context
+from ..database.models import UsageAnalytics
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnalyticsBuffer:
+    """Bounded queue of ``UsageAnalytics`` rows flushed in batches."""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        overflow_sample_rate: Optional[float] = None,
+    ):
+        """Initialize an empty buffer; the flusher starts on first enqueue."""
+        self.max_size = max_size or settings.analytics_buffer_max_size
+        self.batch_size = batch_size or settings.analytics_buffer_batch_size
+        self.flush_interval = (
+            flush_interval_ms or settings.analytics_buffer_flush_interval_ms
+        ) / 1000
+        self.overflow_sample_rate = (
+            overflow_sample_rate
+            if overflow_sample_rate is not None
+            else settings.analytics_buffer_overflow_sample_rate
+        )
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._stats = {
+            "enqueued": 0,
+            "sampled_out": 0,
+            "dropped": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_depth": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting to be written."""
+        return len(self._queue)
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue a ``UsageAnalytics`` row without blocking.
+
+        Must be called from a running event loop. Returns False when the event
+        was sampled out or dropped because the queue is under pressure.
+        """
+        depth = len(self._queue)
+        if depth >= self.max_size:
+            self._stats["dropped"] += 1
+            return False
+        if (
+            depth >= self.max_size // 2
+            and (event.get("status_code") or 0) < 500
+            and random.random() >= self.overflow_sample_rate
+        ):
+            self._stats["sampled_out"] += 1
+            return False
+
+        self._queue.append(event)
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], depth + 1)
+        self._ensure_flusher()
+        if depth + 1 >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            wakeup = asyncio.Event()
+            self._wakeup = wakeup
+            self._task = loop.create_task(self._run(wakeup))
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write every queued event in batches; returns the number written."""
+        written = 0
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            if await self._write(batch):
+                written += len(batch)
+        return written
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        started = time.perf_counter()
+        try:
+            async with async_session_context() as db:
+                await db.execute(insert(UsageAnalytics), batch)
+                await db.commit()
+        except Exception as e:
+            self._stats["failed"] += len(batch)
+            logger.error(
+                "Failed to write analytics batch", events=len(batch), error=str(e)
+            )
+            return False
+
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+    async def stop(self) -> None:
+        """Stop the flusher after writing everything still queued."""
+        task, self._task = self._task, None
+        wakeup = self._wakeup
+        self._stopping = True
+        try:
+            if task is not None and not task.done():
+                if task.get_loop() is asyncio.get_running_loop():
+                    if wakeup is not None:
+                        wakeup.set()
+                    try:
+                        await asyncio.wait_for(
+                            task, settings.analytics_buffer_drain_timeout_seconds
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            "Analytics buffer drain timed out", pending=self.depth
+                        )
+                    return
+                task.cancel()
+            await self.flush()
+        finally:
+            self._stopping = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and throughput counters."""
+        return {
+            **self._stats,
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "flusher_running": self._task is not None and not self._task.done(),
+        }
+
+
+# Global analytics buffer instance
+analytics_buffer = AnalyticsBuffer()
@@ -0,0 +1,334 @@
+"""
+Redis-backed state for collaborative editing sessions shared by workers.
+
+Each session has an authoritative operation log in a Redis stream, with
+entry IDs equal to the operation sequence numbers. A worker commits
+operations with a Lua script. The script appends them only if the session
+is still at the sequence the worker transformed them against. On a
+conflict, the worker catches up and transforms again. The same script
+publishes the committed operations, so other workers apply and fan them out
+to their own websockets in sequence order.
+
+Every ``collaboration_snapshot_interval`` operations the committing worker
+stores a snapshot of the document and trims the log up to it. A worker
+joining a session loads the snapshot plus the operations after it, instead
+of replaying the whole history.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ..config.settings import settings
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# KEYS: session log stream, session meta hash.
+# ARGV: expected sequence, ttl seconds, channel, event, operations...
+# Appends the operations as entries "<sequence>-0" if the session is at the
+# expected sequence, and publishes the event. Returns {committed, sequence}.
+APPEND_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[2], 'sequence') or '0')
+if current ~= tonumber(ARGV[1]) then
+  return {0, current}
+end
+for i = 5, #ARGV do
+  current = current + 1
+  redis.call('XADD', KEYS[1], current .. '-0', 'op', ARGV[i])
+end
+redis.call('HSET', KEYS[2], 'sequence', current)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('PUBLISH', ARGV[3], ARGV[4])
+return {1, current}
+"""
+
+# KEYS: session log stream, session meta hash.
+# ARGV: snapshot sequence, document text.
+# Stores the snapshot unless a newer one exists and drops the log entries it
+# covers. Returns 1 if the snapshot was stored.
+SNAPSHOT_SCRIPT = """
+local existing = tonumber(redis.call('HGET', KEYS[2], 'snapshot_sequence') or '-1')
+if existing >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('HSET', KEYS[2], 'snapshot', ARGV[2], 'snapshot_sequence', ARGV[1])
+redis.call('XTRIM', KEYS[1], 'MINID', (tonumber(ARGV[1]) + 1) .. '-0')
+return 1
+"""
+
+# KEYS: session log stream, session meta hash.
+# Returns {snapshot, snapshot sequence, log entries} read atomically.
+LOAD_SCRIPT = """
+local meta = redis.call('HMGET', KEYS[2], 'snapshot', 'snapshot_sequence')
+return {meta[1] or '', meta[2] or '0', redis.call('XRANGE', KEYS[1], '-', '+')}
+"""
+
+# Handler for events published by other workers: (session_id, event)
+EventHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _entry_sequence(entry_id: Any) -> int:
+    return int(_text(entry_id).split("-", 1)[0])
+
+
+def _entry_operation(fields: Any) -> Dict[str, Any]:
+    if not isinstance(fields, dict):  # Flat [field, value, ...] list from Lua
+        fields = dict(zip(fields[::2], fields[1::2]))
+    return json.loads(fields.get(b"op", fields.get("op")))
+
+
+class RedisCollaborationBackend:
+    """Shared operation log, snapshots and cross-worker fan-out."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        client: Optional[Any] = None,
+        key_prefix: Optional[str] = None,
+        snapshot_interval: Optional[int] = None,
+        session_ttl_seconds: Optional[int] = None,
+        retry_seconds: Optional[float] = None,
+    ):
+        """Initialize the backend; the Redis client is created on first use."""
+        self.redis_url = redis_url or settings.redis_url
+        self.key_prefix = key_prefix or settings.collaboration_key_prefix
+        self.snapshot_interval = (
+            snapshot_interval or settings.collaboration_snapshot_interval
+        )
+        self.session_ttl = (
+            session_ttl_seconds or settings.collaboration_session_ttl_seconds
+        )
+        self.retry_seconds = (
+            retry_seconds
+            if retry_seconds is not None
+            else settings.collaboration_redis_retry_seconds
+        )
+        # Events published by this worker are skipped by its own listener
+        self.worker_id = uuid.uuid4().hex
+
+        self._client = client
+        self._owns_client = client is None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scripts: Optional[Dict[str, Any]] = None
+        self._handler: Optional[EventHandler] = None
+        self._on_subscribe: Optional[Callable[[], Awaitable[None]]] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        self._stats = {"commits": 0, "conflicts": 0, "snapshots": 0, "events": 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether Redis should be tried, i.e. no recent failure."""
+        return time.monotonic() >= self._retry_at
+
+    def mark_unavailable(self, error: Exception) -> None:
+        """Keep new sessions local for ``retry_seconds`` after a failure."""
+        self._retry_at = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Redis collaboration backend unavailable, using local sessions",
+            error=str(error),
+            retry_seconds=self.retry_seconds,
+        )
+
+    def _keys(self, session_id: str) -> List[str]:
+        # The hash tag keeps one session's keys in the same cluster slot
+        return [
+            f"{self.key_prefix}:{{{session_id}}}:log",
+            f"{self.key_prefix}:{{{session_id}}}:meta",
+        ]
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self.key_prefix}:events:{session_id}"
+
+    def _get_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._owns_client and self._client_loop is not loop:
+            # Async connections are bound to the loop that opened them
+            self._client = redis.from_url(
+                self.redis_url,
+                max_connections=settings.redis_max_connections,
+                socket_connect_timeout=settings.collaboration_redis_timeout_seconds,
+            )
+            self._client_loop = loop
+            self._scripts = None
+        return self._client
+
+    def _get_scripts(self) -> Dict[str, Any]:
+        client = self._get_client()
+        scripts = self._scripts
+        if scripts is None:
+            scripts = self._scripts = {
+                "append": client.register_script(APPEND_SCRIPT),
+                "snapshot": client.register_script(SNAPSHOT_SCRIPT),
+                "load": client.register_script(LOAD_SCRIPT),
+            }
+        return scripts
+
+    async def _run(self, script: str, session_id: str, args: List[Any]) -> Any:
+        scripts = self._get_scripts()
+        return await scripts[script](keys=self._keys(session_id), args=args)
+
+    async def load(self, session_id: str) -> Tuple[str, int, List[Dict[str, Any]]]:
+        """
+        Load a session's latest snapshot and the operations committed after it.
+
+        Returns (snapshot text, snapshot sequence, operations); a session
+        that was never shared loads as an empty document at sequence 0.
+        """
+        snapshot, snapshot_sequence, entries = await self._run("load", session_id, [])
+        snapshot_sequence = int(_text(snapshot_sequence))
+        operations = [
+            _entry_operation(fields)
+            for entry_id, fields in entries
+            if _entry_sequence(entry_id) > snapshot_sequence
+        ]
+        return _text(snapshot), snapshot_sequence, operations
+
+    async def read(
+        self, session_id: str, after_sequence: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read the operations committed after ``after_sequence``.
+
+        Returns None if some of them were already compacted into a snapshot,
+        in which case the session has to be loaded again.
+        """
+        entries = await self._get_client().xrange(
+            self._keys(session_id)[0], min=f"{after_sequence + 1}-0"
+        )
+        if entries and _entry_sequence(entries[0][0]) != after_sequence + 1:
+            return None
+        return [_entry_operation(fields) for _, fields in entries]
+
+    async def append(
+        self,
+        session_id: str,
+        expected_sequence: int,
+        operations: List[Dict[str, Any]],
+        event: Dict[str, Any],
+    ) -> Optional[int]:
+        """
+        Commit operations if the session is still at ``expected_sequence``.
+
+        ``event`` is published to the other workers on success. Returns the
+        new sequence, or None if another worker committed first.
+        """
+        committed, sequence = await self._run(
+            "append",
+            session_id,
+            [
+                expected_sequence,
+                self.session_ttl,
+                self._channel(session_id),
+                json.dumps(
+                    {**event, "origin": self.worker_id, "session_id": session_id}
+                ),
+                *(json.dumps(operation) for operation in operations),
+            ],
+        )
+        if not int(committed):
+            self._stats["conflicts"] += 1
+            return None
+        self._stats["commits"] += 1
+        return int(sequence)
+
+    async def save_snapshot(self, session_id: str, sequence: int, text: str) -> bool:
+        """Store a snapshot at ``sequence`` and trim the log it covers."""
+        stored = await self._run("snapshot", session_id, [sequence, text])
+        if int(stored):
+            self._stats["snapshots"] += 1
+        return bool(int(stored))
+
+    def should_snapshot(self, previous_sequence: int, sequence: int) -> bool:
+        """Whether a commit from ``previous_sequence`` crossed a snapshot point."""
+        interval = self.snapshot_interval
+        return sequence // interval > previous_sequence // interval
+
+    async def publish(self, session_id: str, event: Dict[str, Any]) -> None:
+        """Send an event that is not part of the operation log to other workers."""
+        await self._get_client().publish(
+            self._channel(session_id),
+            json.dumps({**event, "origin": self.worker_id, "session_id": session_id}),
+        )
+
+    def start(
+        self,
+        handler: EventHandler,
+        on_subscribe: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        """
+        Deliver events published by other workers to ``handler``.
+
+        ``on_subscribe`` runs after every (re)subscription, since events
+        published while unsubscribed are lost.
+        """
+        self._handler = handler
+        self._on_subscribe = on_subscribe
+        loop = asyncio.get_running_loop()
+        task = self._listener_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._listener_task = loop.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop the event listener started by this worker."""
+        task, self._listener_task = self._listener_task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._get_client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.key_prefix}:events:*")
+                if self._on_subscribe is not None:
+                    await self._on_subscribe()
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("origin") == self.worker_id:
+                        continue
+                    self._stats["events"] += 1
+                    handler = self._handler
+                    if handler is None:
+                        continue
+                    try:
+                        await handler(event["session_id"], event)
+                    except Exception as e:
+                        logger.error(
+                            "Failed to handle collaboration event",
+                            session_id=event.get("session_id"),
+                            error=str(e),
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Collaboration event listener failed", error=str(e))
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get commit, conflict and snapshot counters for this worker."""
+        return {
+            **self._stats,
+            "available": self.available,
+            "worker_id": self.worker_id,
+        }
@@ -0,0 +1,215 @@
+"""
+Content-addressed embedding cache.
+
+Embeddings are keyed by (model, sha256 of the prepared chunk text) so that
+identical text is only sent to OpenAI once, no matter how many job
+descriptions contain it. Lookups go through three tiers:
+
+1. an in-process LRU (per worker),
+2. Redis, shared by API and Celery workers,
+3. existing ``content_chunks`` rows with the same ``text_hash``.
+"""
+
+import base64
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import settings
+from ..database.models import ContentChunk
+from ..utils.cache import cache_service
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def compute_text_hash(text: str) -> str:
+    """Return the SHA-256 hex digest used to address a prepared chunk text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode_vector(embedding: List[float]) -> str:
+    """Pack an embedding as base64 float32, matching pgvector's precision."""
+    return base64.b64encode(array("f", embedding).tobytes()).decode("ascii")
+
+
+def _decode_vector(payload: str) -> List[float]:
+    """Unpack an embedding produced by ``_encode_vector``."""
+    vector = array("f")
+    vector.frombytes(base64.b64decode(payload))
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """Tiered cache of embedding vectors addressed by model and text hash."""
+
+    def __init__(
+        self,
+        max_local_entries: Optional[int] = None,
+        redis_ttl_seconds: Optional[int] = None,
+    ):
+        """Initialize the cache tiers."""
+        self.max_local_entries = (
+            max_local_entries or settings.embedding_cache_max_local_entries
+        )
+        self.redis_ttl_seconds = (
+            redis_ttl_seconds or settings.embedding_cache_redis_ttl_seconds
+        )
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "database_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "local_evictions": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def _key(model: str, text_hash: str) -> str:
+        return f"embedding:{model}:{text_hash}"
+
+    def _get_local(self, key: str) -> Optional[List[float]]:
+        embedding = self._local.get(key)
+        if embedding is not None:
+            self._local.move_to_end(key)
+        return embedding
+
+    def _set_local(self, key: str, embedding: List[float]) -> None:
+        self._local[key] = embedding
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+            self._stats["local_evictions"] += 1
+
+    async def get(self, model: str, text_hash: str) -> Optional[List[float]]:
+        """Get a cached embedding for a single text hash."""
+        result = await self.get_many(model, [text_hash])
+        return result.get(text_hash)
+
+    async def get_many(
+        self,
+        model: str,
+        text_hashes: Iterable[str],
+        db: Optional[AsyncSession] = None,
+    ) -> Dict[str, List[float]]:
+        """
+        Look up embeddings for several text hashes.
+
+        Checks the local LRU first, then Redis with a single MGET, then (when a
+        session is supplied) existing chunk rows. Hits from slower tiers are
+        promoted into the faster ones. Returns only the hashes that were found.
+        """
+        if not settings.embedding_cache_enabled:
+            return {}
+
+        pending = list(dict.fromkeys(text_hashes))
+        found: Dict[str, List[float]] = {}
+
+        for text_hash in pending:
+            embedding = self._get_local(self._key(model, text_hash))
+            if embedding is not None:
+                found[text_hash] = embedding
+                self._stats["local_hits"] += 1
+        pending = [h for h in pending if h not in found]
+
+        if pending and cache_service.redis_client:
+            try:
+                values = await cache_service.redis_client.mget(
+                    [self._key(model, h) for h in pending]
+                )
+                for text_hash, payload in zip(pending, values):
+                    if payload:
+                        embedding = _decode_vector(payload)
+                        found[text_hash] = embedding
+                        self._set_local(self._key(model, text_hash), embedding)
+                        self._stats["redis_hits"] += 1
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning("Embedding cache Redis lookup failed", error=str(e))
+            pending = [h for h in pending if h not in found]
+
+        if pending and db is not None:
+            try:
+                from_db = await self._get_many_from_database(db, model, pending)
+                for text_hash, embedding in from_db.items():
+                    found[text_hash] = embedding
+                    self._stats["database_hits"] += 1
+                await self.set_many(model, from_db)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning("Embedding cache database lookup failed", error=str(e))
+            pending = [h for h in pending if h not in found]
+
+        self._stats["misses"] += len(pending)
+        return found
+
+    async def _get_many_from_database(
+        self, db: AsyncSession, model: str, text_hashes: List[str]
+    ) -> Dict[str, List[float]]:
+        """Reuse embeddings already stored on chunks with identical text."""
+        result = await db.execute(
+            select(ContentChunk.text_hash, ContentChunk.embedding)
+            .where(ContentChunk.text_hash.in_(text_hashes))
+            .where(ContentChunk.embedding_model == model)
+            .where(ContentChunk.embedding.is_not(None))
+        )
+        found: Dict[str, List[float]] = {}
+        for row in result.all():
+            if row.text_hash not in found:
+                found[row.text_hash] = [float(x) for x in row.embedding]
+        return found
+
+    async def set(self, model: str, text_hash: str, embedding: List[float]) -> None:
+        """Store a single embedding in the local and Redis tiers."""
+        await self.set_many(model, {text_hash: embedding})
+
+    async def set_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Store several embeddings in the local and Redis tiers."""
+        if not settings.embedding_cache_enabled or not embeddings:
+            return
+
+        for text_hash, embedding in embeddings.items():
+            self._set_local(self._key(model, text_hash), embedding)
+        self._stats["stores"] += len(embeddings)
+
+        if not cache_service.redis_client:
+            return
+
+        try:
+            pipe = cache_service.redis_client.pipeline(transaction=False)
+            for text_hash, embedding in embeddings.items():
+                pipe.setex(
+                    self._key(model, text_hash),
+                    self.redis_ttl_seconds,
+                    _encode_vector(embedding),
+                )
+            await pipe.execute()
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Embedding cache Redis store failed", error=str(e))
+
+    def clear_local(self) -> None:
+        """Drop all entries from the in-process tier."""
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for all tiers."""
+        hits = (
+            self._stats["local_hits"]
+            + self._stats["redis_hits"]
+            + self._stats["database_hits"]
+        )
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "max_local_entries": self.max_local_entries,
+        }
@@ -7,19 +7,22 @@ import asyncio
 import math
 import openai
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 from datetime import datetime
 
 from ..config.settings import settings
-from ..database.models import ContentChunk
+from ..database.models import ContentChunk, JobSection
+from .facet_store import facet_store
 from ..utils.logging import get_logger
 from ..utils.circuit_breaker import (
     get_openai_circuit_breaker,
     CircuitBreakerOpenException,
 )
 from .analytics_service import analytics_service
+from .embedding_cache import EmbeddingCache, compute_text_hash
+from .openai_dispatcher import RequestPriority, openai_dispatcher
 from .rate_limiting_service import rate_limiting_service
 
 logger = get_logger(__name__)
@@ -36,13 +39,26 @@ class EmbeddingService:
             )
             self.client = None
         else:
-            self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+            self.client = openai.AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+            )
 
         # Initialize circuit breaker for OpenAI API calls
         self.circuit_breaker = get_openai_circuit_breaker()
 
-    async def generate_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for a given text using OpenAI API with circuit breaker protection."""
+        # Content-addressed cache so identical chunk text is embedded once
+        self.embedding_cache = EmbeddingCache()
+
+    async def generate_embedding(
+        self, text: str, priority: RequestPriority = RequestPriority.STANDARD
+    ) -> Optional[List[float]]:
+        """
+        Generate embedding for a given text using OpenAI API with circuit breaker protection.
+
+        The request is queued on the OpenAI dispatcher at ``priority``; use
+        INTERACTIVE when a user is waiting on the result.
+        """
         if not self.client:
             logger.warning(
                 "OpenAI client not available - skipping embedding generation"
@@ -55,44 +71,26 @@ class EmbeddingService:
             if not clean_text:
                 return None
 
+            text_hash = compute_text_hash(clean_text)
+            cached_embedding = await self.embedding_cache.get(
+                settings.embedding_model, text_hash
+            )
+            if cached_embedding is not None:
+                return cached_embedding
+
             # Estimate tokens for rate limiting (approximate: 1 token per 4 characters)
             estimated_tokens = len(clean_text) // 4
             estimated_cost = estimated_tokens * 0.0001 / 1000  # OpenAI pricing estimate
 
-            # Check rate limits before making API call
-            is_allowed, rate_statuses = await rate_limiting_service.check_rate_limit(
-                service="openai",
+            # Wait for admission under the rate limits, then call OpenAI
+            response, duration = await openai_dispatcher.submit(
+                lambda: self._create_embeddings(clean_text),
                 operation_type="embedding_generation",
                 estimated_tokens=estimated_tokens,
                 estimated_cost=estimated_cost,
+                priority=priority,
             )
 
-            if not is_allowed:
-                # Get recommended delay
-                delay = await rate_limiting_service.get_recommended_delay(
-                    "openai", "embedding_generation"
-                )
-                logger.warning(
-                    "Rate limit exceeded for OpenAI API",
-                    estimated_tokens=estimated_tokens,
-                    recommended_delay=delay,
-                )
-
-                if delay > 0 and delay < 5:  # Only wait if delay is reasonable
-                    await asyncio.sleep(delay)
-
-            start_time = datetime.utcnow()
-
-            # Use circuit breaker to protect OpenAI API call
-            async with self.circuit_breaker.protect("embedding_generation"):
-                # Generate embedding using OpenAI
-                response = await self.client.embeddings.create(
-                    model=settings.embedding_model, input=clean_text
-                )
-
-            end_time = datetime.utcnow()
-            duration = (end_time - start_time).total_seconds()
-
             # Extract embedding vector
             embedding = response.data[0].embedding
 
@@ -116,6 +114,10 @@ class EmbeddingService:
                 duration=duration,
             )
 
+            await self.embedding_cache.set(
+                settings.embedding_model, text_hash, embedding
+            )
+
             return embedding
 
         except CircuitBreakerOpenException as e:
@@ -133,35 +135,177 @@ class EmbeddingService:
         return await self.generate_embedding(text)
 
     async def generate_embeddings_batch(
-        self, texts: List[str], batch_size: int = 100
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        max_tokens_per_request: Optional[int] = None,
+        db: Optional[AsyncSession] = None,
+        priority: RequestPriority = RequestPriority.BULK,
     ) -> List[Optional[List[float]]]:
-        """Generate embeddings for multiple texts in batches."""
+        """
+        Generate embeddings for multiple texts using multi-input requests.
+
+        Texts already in the embedding cache (or, when ``db`` is given, already
+        embedded on another chunk with the same text hash) are served without
+        an API call, and duplicate texts are only embedded once. The remaining
+        texts are packed into as few ``embeddings.create`` calls as possible,
+        bounded by ``batch_size`` inputs and ``max_tokens_per_request``
+        estimated tokens per call. Returned vectors are mapped back to their
+        input position; texts that fail inside a batch are retried
+        individually so one bad input does not lose the whole request.
+        Requests are queued on the OpenAI dispatcher at ``priority``, which
+        defaults to BULK so batches yield to interactive calls.
+        """
         if not self.client:
             return [None] * len(texts)
 
-        embeddings: List[Optional[List[float]]] = []
+        model = settings.embedding_model
+        max_inputs = batch_size or settings.embedding_batch_max_inputs
+        max_tokens = max_tokens_per_request or settings.embedding_batch_max_tokens
+
+        hashes: List[Optional[str]] = []
+        unique_texts: Dict[str, str] = {}
+        for text_content in texts:
+            clean_text = self._prepare_text_for_embedding(text_content)
+            if not clean_text:
+                hashes.append(None)
+                continue
+            text_hash = compute_text_hash(clean_text)
+            hashes.append(text_hash)
+            unique_texts.setdefault(text_hash, clean_text)
+
+        vectors = await self.embedding_cache.get_many(model, unique_texts, db=db)
+        misses = [h for h in unique_texts if h not in vectors]
+        requests = self._pack_embedding_requests(
+            [(position, unique_texts[h]) for position, h in enumerate(misses)],
+            max_inputs,
+            max_tokens,
+        )
+
+        for request_items in requests:
+            try:
+                batch_embeddings = await self._embed_prepared_batch(
+                    [clean_text for _, clean_text in request_items], priority
+                )
+            except CircuitBreakerOpenException as e:
+                logger.warning("OpenAI API circuit breaker is open", error=str(e))
+                break
+            except Exception as e:
+                logger.error(
+                    "Batch embedding request failed, retrying items individually",
+                    batch_items=len(request_items),
+                    error=str(e),
+                )
+                batch_embeddings = None
+
+            if batch_embeddings is None:
+                for position, clean_text in request_items:
+                    embedding = await self.generate_embedding(clean_text, priority)
+                    if embedding:
+                        vectors[misses[position]] = embedding
+            else:
+                new_vectors = {
+                    misses[position]: emb
+                    for (position, _), emb in zip(request_items, batch_embeddings)
+                }
+                vectors.update(new_vectors)
+                await self.embedding_cache.set_many(model, new_vectors)
+
+        return [vectors.get(h) if h else None for h in hashes]
+
+    @staticmethod
+    def _pack_embedding_requests(
+        items: List[Tuple[int, str]], max_inputs: int, max_tokens: int
+    ) -> List[List[Tuple[int, str]]]:
+        """Group (index, text) pairs into requests within input and token budgets."""
+        requests: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+
+        for index, clean_text in items:
+            # Estimate tokens for batching (approximate: 1 token per 4 characters)
+            tokens = max(1, len(clean_text) // 4)
+            if current and (
+                len(current) >= max_inputs or current_tokens + tokens > max_tokens
+            ):
+                requests.append(current)
+                current, current_tokens = [], 0
+            current.append((index, clean_text))
+            current_tokens += tokens
+
+        if current:
+            requests.append(current)
+
+        return requests
+
+    async def _embed_prepared_batch(
+        self,
+        clean_texts: List[str],
+        priority: RequestPriority = RequestPriority.BULK,
+    ) -> Optional[List[List[float]]]:
+        """
+        Send one multi-input embeddings request for already-prepared texts.
+
+        Returns vectors in input order, or None if the response could not be
+        matched to the inputs (the caller then falls back to per-item calls).
+        """
+        estimated_tokens = sum(len(t) // 4 for t in clean_texts)
+        estimated_cost = estimated_tokens * 0.0001 / 1000  # OpenAI pricing estimate
+
+        response, duration = await openai_dispatcher.submit(
+            lambda: self._create_embeddings(clean_texts),
+            operation_type="embedding_generation",
+            estimated_tokens=estimated_tokens,
+            estimated_cost=estimated_cost,
+            priority=priority,
+        )
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            batch_embeddings = await asyncio.gather(
-                *[self.generate_embedding(text) for text in batch],
-                return_exceptions=True,
+        if len(response.data) != len(clean_texts):
+            logger.warning(
+                "Embedding response size mismatch",
+                expected=len(clean_texts),
+                received=len(response.data),
             )
+            return None
 
-            # Handle exceptions in batch results
-            for emb in batch_embeddings:
-                if isinstance(emb, BaseException):
-                    logger.error("Batch embedding generation failed", error=str(emb))
-                    embeddings.append(None)
-                else:
-                    # emb is Optional[List[float]] here
-                    embeddings.append(emb)
+        # The API reports each vector's input position; fall back to response
+        # order when the index is absent.
+        ordered: List[Optional[List[float]]] = [None] * len(clean_texts)
+        for position, item in enumerate(response.data):
+            index = getattr(item, "index", position)
+            if not isinstance(index, int) or not 0 <= index < len(clean_texts):
+                index = position
+            ordered[index] = item.embedding
 
-            # Add small delay between batches to respect rate limits
-            if i + batch_size < len(texts):
-                await asyncio.sleep(0.1)
+        if any(emb is None for emb in ordered):
+            return None
 
-        return embeddings
+        actual_tokens = response.usage.total_tokens
+        await rate_limiting_service.record_usage(
+            service="openai",
+            operation_type="embedding_generation",
+            tokens_used=actual_tokens,
+            cost=actual_tokens * 0.0001 / 1000,
+        )
+        await self._log_api_usage(
+            operation_type="embedding_generation",
+            model_name=settings.embedding_model,
+            input_tokens=actual_tokens,
+            duration=duration,
+        )
+
+        return ordered  # type: ignore[return-value]
+
+    async def _create_embeddings(self, clean_input: Any) -> Tuple[Any, float]:
+        """Call the embeddings API behind the circuit breaker; returns (response, seconds)."""
+        start_time = datetime.utcnow()
+
+        async with self.circuit_breaker.protect("embedding_generation"):
+            response = await self.client.embeddings.create(
+                model=settings.embedding_model, input=clean_input
+            )
+
+        return response, (datetime.utcnow() - start_time).total_seconds()
 
     async def find_similar_chunks(
         self,
@@ -282,7 +426,9 @@ class EmbeddingService:
         """
         try:
             # Generate embedding for the search query
-            query_embedding = await self.generate_embedding(query)
+            query_embedding = await self.generate_embedding(
+                query, RequestPriority.INTERACTIVE
+            )
             if not query_embedding:
                 logger.warning("Failed to generate query embedding")
                 return []
@@ -424,6 +570,11 @@ class EmbeddingService:
 
         return clean_text
 
+    def get_text_hash(self, text: str) -> Optional[str]:
+        """Return the content hash the embedding cache uses for ``text``."""
+        clean_text = self._prepare_text_for_embedding(text)
+        return compute_text_hash(clean_text) if clean_text else None
+
     async def _log_api_usage(
         self,
         operation_type: str,
@@ -522,6 +673,139 @@ class EmbeddingService:
             logger.error("Batch similarity search failed", error=str(e))
             return []
 
+    async def find_similar_jobs_multi_vector(
+        self,
+        job_id: int,
+        db: AsyncSession,
+        limit: int = 10,
+        similarity_threshold: float = 0.75,
+        classification_filter: Optional[str] = None,
+        language_filter: Optional[str] = None,
+        max_source_vectors: int = 3,
+        use_centroid: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find jobs similar to ``job_id`` with a single multi-vector kNN query.
+
+        The source vectors are read inside the query (either the job's first
+        ``max_source_vectors`` chunk embeddings or, with ``use_centroid``, the
+        mean of all of them), each one drives an index-backed kNN through a
+        LATERAL join, and matches are scored per job in the database using a
+        weighted average of the top three chunk similarities (0.5/0.3/0.2).
+
+        With ``use_centroid`` the stored job-level embedding is compared against
+        the ``job_embeddings`` ANN index instead; the chunk mean is only computed
+        on the fly for jobs that have no stored centroid yet.
+        """
+        if use_centroid:
+            centroid_matches = await self._find_similar_jobs_by_centroid(
+                job_id,
+                db,
+                limit=limit,
+                similarity_threshold=similarity_threshold,
+                classification_filter=classification_filter,
+                language_filter=language_filter,
+            )
+            if centroid_matches is not None:
+                return centroid_matches
+
+            source_vectors_sql = """
+            SELECT AVG(cc.embedding) AS query_vector
+            FROM content_chunks cc
+            WHERE cc.job_id = :job_id AND cc.embedding IS NOT NULL
+            HAVING COUNT(*) > 0
+            """
+        else:
+            source_vectors_sql = """
+            SELECT cc.embedding AS query_vector
+            FROM content_chunks cc
+            WHERE cc.job_id = :job_id AND cc.embedding IS NOT NULL
+            ORDER BY cc.chunk_index NULLS LAST, cc.id
+            LIMIT :max_source_vectors
+            """
+
+        candidate_filters = ""
+        params: Dict[str, Any] = {
+            "job_id": job_id,
+            "limit": limit,
+            "per_vector_limit": limit,
+            "similarity_threshold": similarity_threshold,
+            "max_source_vectors": max_source_vectors,
+        }
+        if classification_filter:
+            candidate_filters += " AND jd.classification = :classification"
+            params["classification"] = classification_filter
+        if language_filter:
+            candidate_filters += " AND jd.language = :language"
+            params["language"] = language_filter
+
+        similar_jobs_query = f"""
+        WITH source_vectors AS ({source_vectors_sql}),
+        matches AS (
+            SELECT nn.job_id, nn.similarity
+            FROM source_vectors sv
+            CROSS JOIN LATERAL (
+                SELECT cc.job_id, 1 - (cc.embedding <=> sv.query_vector) AS similarity
+                FROM content_chunks cc
+                JOIN job_descriptions jd ON cc.job_id = jd.id
+                WHERE cc.embedding IS NOT NULL
+                AND cc.job_id != :job_id{candidate_filters}
+                ORDER BY cc.embedding <=> sv.query_vector
+                LIMIT :per_vector_limit
+            ) nn
+            WHERE nn.similarity >= :similarity_threshold
+        ),
+        ranked AS (
+            SELECT
+                job_id,
+                similarity,
+                ROW_NUMBER() OVER (PARTITION BY job_id ORDER BY similarity DESC) AS rn,
+                COUNT(*) OVER (PARTITION BY job_id) AS matching_chunks
+            FROM matches
+        ),
+        scored AS (
+            SELECT
+                job_id,
+                MAX(matching_chunks) AS matching_chunks,
+                MAX(similarity) FILTER (WHERE rn = 1) AS top1,
+                MAX(similarity) FILTER (WHERE rn = 2) AS top2,
+                MAX(similarity) FILTER (WHERE rn = 3) AS top3
+            FROM ranked
+            WHERE rn <= 3
+            GROUP BY job_id
+        )
+        SELECT
+            jd.id AS job_id,
+            jd.job_number,
+            jd.title,
+            jd.classification,
+            jd.language,
+            s.matching_chunks,
+            CASE
+                WHEN s.top2 IS NULL THEN s.top1
+                ELSE s.top1 * 0.5 + s.top2 * 0.3 + COALESCE(s.top3, s.top2) * 0.2
+            END AS similarity_score
+        FROM scored s
+        JOIN job_descriptions jd ON jd.id = s.job_id
+        ORDER BY similarity_score DESC
+        LIMIT :limit
+        """  # nosec B608 - only fixed SQL fragments are interpolated
+
+        result = await db.execute(text(similar_jobs_query), params)
+
+        return [
+            {
+                "job_id": row.job_id,
+                "job_number": row.job_number,
+                "title": row.title,
+                "classification": row.classification,
+                "language": row.language,
+                "similarity_score": float(row.similarity_score),
+                "matching_chunks": row.matching_chunks,
+            }
+            for row in result.fetchall()
+        ]
+
     async def get_performance_stats(self, db: AsyncSession) -> Dict[str, Any]:
         """
         Get performance statistics for embedding operations.
@@ -668,7 +952,9 @@ class EmbeddingService:
         embeddings = []
         for text_content in texts:
             try:
-                embedding = await self.generate_embedding(text_content)
+                embedding = await self.generate_embedding(
+                    text_content, RequestPriority.BULK
+                )
                 embeddings.append(embedding)
             except Exception as e:
                 logger.error("Failed to generate embedding for text", error=str(e))
@@ -683,8 +969,20 @@ class EmbeddingService:
         limit: int = 5,
         similarity_threshold: float = 0.7,
     ) -> List[Dict[str, Any]]:
-        """Find jobs similar to the given job ID based on embedding similarity."""
+        """
+        Find jobs similar to the given job ID based on embedding similarity.
+
+        Jobs with a stored centroid are compared job-to-job, so their results
+        carry ``matching_chunks=None``; otherwise chunk-level search is used.
+        """
         try:
+            # Prefer the job-level centroid index: one kNN over one row per job
+            centroid_matches = await self._find_similar_jobs_by_centroid(
+                job_id, db, limit=limit, similarity_threshold=similarity_threshold
+            )
+            if centroid_matches is not None:
+                return centroid_matches
+
             # Get embeddings for the reference job
             result = await db.execute(
                 select(ContentChunk.embedding)
@@ -729,6 +1027,199 @@ class EmbeddingService:
             logger.error(f"Failed to find similar jobs for job {job_id}", error=str(e))
             return []
 
+    async def _find_similar_jobs_by_centroid(
+        self,
+        job_id: int,
+        db: AsyncSession,
+        limit: int = 10,
+        similarity_threshold: float = 0.7,
+        classification_filter: Optional[str] = None,
+        language_filter: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run a job-level kNN against the ``job_embeddings`` HNSW index.
+
+        Returns ``None`` when the source job has no stored centroid so callers
+        can fall back to chunk-level search.
+        """
+        candidate_filters = ""
+        params: Dict[str, Any] = {"job_id": job_id, "limit": limit}
+        if classification_filter:
+            candidate_filters += " AND jd.classification = :classification"
+            params["classification"] = classification_filter
+        if language_filter:
+            candidate_filters += " AND jd.language = :language"
+            params["language"] = language_filter
+
+        # LEFT JOIN keeps one row for an existing source centroid even when no
+        # neighbours qualify, which distinguishes "no matches" from "no centroid"
+        centroid_query = f"""
+        SELECT
+            nn.job_id,
+            nn.job_number,
+            nn.title,
+            nn.classification,
+            nn.language,
+            nn.similarity_score
+        FROM job_embeddings src
+        LEFT JOIN LATERAL (
+            SELECT
+                jd.id AS job_id,
+                jd.job_number,
+                jd.title,
+                jd.classification,
+                jd.language,
+                1 - (je.embedding <=> src.embedding) AS similarity_score
+            FROM job_embeddings je
+            JOIN job_descriptions jd ON jd.id = je.job_id
+            WHERE je.job_id != :job_id{candidate_filters}
+            ORDER BY je.embedding <=> src.embedding
+            LIMIT :limit
+        ) nn ON TRUE
+        WHERE src.job_id = :job_id
+        """  # nosec B608 - only fixed SQL fragments are interpolated
+
+        result = await db.execute(text(centroid_query), params)
+        rows = result.fetchall()
+        if not rows:
+            return None
+
+        return [
+            {
+                "job_id": row.job_id,
+                "job_number": row.job_number,
+                "title": row.title,
+                "classification": row.classification,
+                "language": row.language,
+                "similarity_score": float(row.similarity_score),
+                "matching_chunks": None,
+            }
+            for row in rows
+            if row.job_id is not None
+            and float(row.similarity_score) >= similarity_threshold
+        ]
+
+    async def update_job_embedding(
+        self,
+        job_id: int,
+        db: AsyncSession,
+        section_weights: Optional[Dict[str, float]] = None,
+    ) -> bool:
+        """
+        Recompute and upsert the job-level embedding (mean of chunk vectors).
+
+        Without section weights the mean is computed by pgvector in a single
+        ``INSERT ... SELECT AVG()`` upsert. With weights (argument or
+        ``settings.job_embedding_section_weights``) chunks are weighted by the
+        type of the section they came from; unlisted sections count as 1.0.
+        Returns ``True`` when a centroid was stored.
+        """
+        weights = (
+            settings.job_embedding_section_weights
+            if section_weights is None
+            else section_weights
+        )
+        params: Dict[str, Any] = {"job_id": job_id, "model": settings.embedding_model}
+
+        try:
+            if not weights:
+                result = await db.execute(
+                    text(
+                        """
+                        INSERT INTO job_embeddings
+                            (job_id, embedding, embedding_model, chunk_count,
+                             created_at, updated_at)
+                        SELECT :job_id, AVG(cc.embedding), :model, COUNT(*), NOW(), NOW()
+                        FROM content_chunks cc
+                        WHERE cc.job_id = :job_id AND cc.embedding IS NOT NULL
+                        HAVING COUNT(*) > 0
+                        ON CONFLICT (job_id) DO UPDATE SET
+                            embedding = EXCLUDED.embedding,
+                            embedding_model = EXCLUDED.embedding_model,
+                            chunk_count = EXCLUDED.chunk_count,
+                            updated_at = NOW()
+                        RETURNING job_id
+                        """
+                    ),
+                    params,
+                )
+                stored = result.first() is not None
+            else:
+                result = await db.execute(
+                    select(ContentChunk.embedding, JobSection.section_type)
+                    .outerjoin(JobSection, ContentChunk.section_id == JobSection.id)
+                    .where(ContentChunk.job_id == job_id)
+                    .where(ContentChunk.embedding.is_not(None))
+                )
+                rows = result.all()
+                centroid = self._weighted_mean(
+                    [
+                        (
+                            [float(x) for x in row.embedding],
+                            float(weights.get(row.section_type, 1.0)),
+                        )
+                        for row in rows
+                    ]
+                )
+                stored = centroid is not None
+                if centroid is not None:
+                    params["embedding"] = "[" + ",".join(map(str, centroid)) + "]"
+                    params["chunk_count"] = len(rows)
+                    await db.execute(
+                        text(
+                            """
+                            INSERT INTO job_embeddings
+                                (job_id, embedding, embedding_model, chunk_count,
+                                 created_at, updated_at)
+                            VALUES (:job_id, CAST(:embedding AS vector), :model,
+                                    :chunk_count, NOW(), NOW())
+                            ON CONFLICT (job_id) DO UPDATE SET
+                                embedding = EXCLUDED.embedding,
+                                embedding_model = EXCLUDED.embedding_model,
+                                chunk_count = EXCLUDED.chunk_count,
+                                updated_at = NOW()
+                            """
+                        ),
+                        params,
+                    )
+
+            await db.commit()
+            return stored
+
+        except Exception as e:
+            logger.error(
+                f"Failed to update job embedding for job {job_id}", error=str(e)
+            )
+            await db.rollback()
+            return False
+
+    async def update_job_embeddings(
+        self, job_ids: Iterable[int], db: AsyncSession
+    ) -> int:
+        """Refresh the centroids of several jobs; returns how many were stored."""
+        stored = 0
+        for job_id in sorted(set(job_ids)):
+            stored += await self.update_job_embedding(job_id, db)
+        return stored
+
+    @staticmethod
+    def _weighted_mean(
+        weighted_vectors: List[Tuple[List[float], float]],
+    ) -> Optional[List[float]]:
+        """Weighted element-wise mean of vectors; ``None`` if total weight is 0."""
+        total_weight = sum(weight for _, weight in weighted_vectors if weight > 0)
+        if not weighted_vectors or total_weight <= 0:
+            return None
+
+        dimension = len(weighted_vectors[0][0])
+        centroid = [0.0] * dimension
+        for vector, weight in weighted_vectors:
+            if weight <= 0:
+                continue
+            for i, value in enumerate(vector):
+                centroid[i] += value * weight
+        return [value / total_weight for value in centroid]
+
     async def generate_embeddings_for_job(self, job_id: int, db: AsyncSession) -> bool:
         """Generate embeddings for all content chunks of a specific job."""
         try:
@@ -754,7 +1245,9 @@ class EmbeddingService:
                         if not isinstance(chunk.chunk_text, str)
                         else chunk.chunk_text
                     )
-                    embedding = await self.generate_embedding(chunk_text)
+                    embedding = await self.generate_embedding(
+                        chunk_text, RequestPriority.BULK
+                    )
                     if embedding:
                         chunk.embedding = embedding  # type: ignore[assignment]
                         success_count += 1
@@ -768,7 +1261,10 @@ class EmbeddingService:
                     )
 
             # Commit the changes
+            await facet_store.record_embeddings(db, success_count)
             await db.commit()
+            if success_count:
+                await self.update_job_embedding(job_id, db)
 
             logger.info(
                 f"Generated embeddings for job {job_id}: {success_count}/{total_count} chunks successful"
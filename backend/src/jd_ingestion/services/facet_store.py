@@ -0,0 +1,391 @@
+"""
+Precomputed search facet and filter statistics.
+
+The search facet endpoints read ``job_facet_counts`` in one query instead of
+running GROUP BY / MIN / MAX / AVG queries over the job tables per call.
+The table is kept current incrementally. Code that changes jobs calls
+``track`` with the jobs it is about to touch, makes its changes, and calls
+``apply`` on the returned change before committing. The facet contributions
+of those jobs are read before and after, and the difference is added in
+the same transaction.
+
+Counted facets (classification, language, department, location, section
+type) have one row per value. Numeric facets (salary, FTE, effective date)
+have one row holding the count, sum, minimum and maximum. When a value is
+removed, the extremes are recomputed from ``job_metadata``. Dates are stored
+as ordinals.
+"""
+
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.models import (
+    ContentChunk,
+    JobDescription,
+    JobFacetCount,
+    JobMetadata,
+    JobSection,
+)
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SECTION_TYPE = "section_type"
+EMBEDDED_CHUNKS = "embedded_chunks"
+NUMERIC_FACETS = {
+    "salary_budget": JobMetadata.salary_budget,
+    "fte_count": JobMetadata.fte_count,
+    "effective_date": JobMetadata.effective_date,
+}
+
+# Filters accepted by filtered_counts: exact match or case-insensitive substring
+FILTER_COLUMNS = {
+    "classification": (JobDescription.classification, False),
+    "language": (JobDescription.language, False),
+    "department": (JobMetadata.department, True),
+    "location": (JobMetadata.location, True),
+}
+
+# (facet, value) -> number of rows; numeric facets use the number as value
+Contributions = Counter
+
+
+def _number(value: Any) -> float:
+    return float(value.toordinal()) if isinstance(value, date) else float(value)
+
+
+def facet_rows(
+    counts: Dict[str, int], limit: Optional[int] = None
+) -> List[Tuple[str, int]]:
+    """(value, count) pairs of a counted facet, most common first."""
+    rows = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return rows[:limit] if limit else rows
+
+
+class FacetChange:
+    """Facet contributions of some jobs before a change, see ``FacetStore.track``."""
+
+    def __init__(
+        self,
+        store: "FacetStore",
+        db: AsyncSession,
+        job_ids: List[int],
+        before: Optional[Contributions],
+    ):
+        self.store = store
+        self.db = db
+        self.job_ids = job_ids
+        self.before = before
+
+    async def apply(self, new_job_ids: Iterable[int] = ()) -> None:
+        """
+        Add the change in facet counts of the tracked jobs and ``new_job_ids``.
+
+        Runs in a savepoint of the caller's transaction, so a failure is
+        logged without aborting the change to the jobs; the caller commits.
+        """
+        if self.before is None:
+            return
+        job_ids = [*self.job_ids, *new_job_ids]
+        try:
+            async with self.db.begin_nested():
+                after = await self.store.contributions(self.db, job_ids)
+                await self.store.apply_delta(
+                    self.db, after - self.before, self.before - after
+                )
+        except Exception as e:
+            logger.error("Failed to update facet counts", job_ids=job_ids, error=str(e))
+
+
+class FacetStore:
+    """Service for the ``job_facet_counts`` summary table."""
+
+    async def track(self, db: AsyncSession, job_ids: Iterable[int] = ()) -> FacetChange:
+        """
+        Read the facet contributions of jobs that are about to change.
+
+        Pass no IDs for jobs that are being created; their IDs go to
+        ``FacetChange.apply`` instead.
+        """
+        job_ids = list(job_ids)
+        try:
+            before: Optional[Contributions] = await self.contributions(db, job_ids)
+        except Exception as e:
+            logger.error("Failed to read facet counts", job_ids=job_ids, error=str(e))
+            before = None
+        return FacetChange(self, db, job_ids, before)
+
+    async def add_jobs(self, db: AsyncSession, job_ids: Iterable[int]) -> None:
+        """Count newly created jobs; the caller commits."""
+        change = await self.track(db)
+        await change.apply(job_ids)
+
+    async def record_embeddings(self, db: AsyncSession, chunk_count: int) -> None:
+        """Count chunks that just got their first embedding; the caller commits."""
+        if chunk_count <= 0:
+            return
+        try:
+            async with db.begin_nested():
+                await self.apply_delta(
+                    db, Counter({(EMBEDDED_CHUNKS, ""): chunk_count}), Counter()
+                )
+        except Exception as e:
+            logger.error("Failed to update embedding count", error=str(e))
+
+    async def contributions(
+        self, db: AsyncSession, job_ids: Optional[List[int]]
+    ) -> Contributions:
+        """Count the facet values of the given jobs, or of every job for None."""
+        contributions: Contributions = Counter()
+        if job_ids is not None and not job_ids:
+            return contributions
+
+        def scoped(statement: Any, column: Any) -> Any:
+            return (
+                statement if job_ids is None else statement.where(column.in_(job_ids))
+            )
+
+        jobs = await db.execute(
+            scoped(
+                select(
+                    JobDescription.classification,
+                    JobDescription.language,
+                    func.count(),
+                ).group_by(JobDescription.classification, JobDescription.language),
+                JobDescription.id,
+            )
+        )
+        for classification, language, count in jobs.all():
+            if classification:
+                contributions["classification", classification] += count
+            if language:
+                contributions["language", language] += count
+
+        metadata = await db.execute(
+            scoped(
+                select(
+                    JobMetadata.department,
+                    JobMetadata.location,
+                    *NUMERIC_FACETS.values(),
+                ),
+                JobMetadata.job_id,
+            )
+        )
+        for department, location, *numbers in metadata.all():
+            if department:
+                contributions["department", department] += 1
+            if location:
+                contributions["location", location] += 1
+            for facet, value in zip(NUMERIC_FACETS, numbers):
+                if value is not None:
+                    contributions[facet, _number(value)] += 1
+
+        sections = await db.execute(
+            scoped(
+                select(JobSection.section_type, func.count())
+                .where(JobSection.section_type.isnot(None))
+                .group_by(JobSection.section_type),
+                JobSection.job_id,
+            )
+        )
+        for section_type, count in sections.all():
+            contributions[SECTION_TYPE, section_type] += count
+
+        embedded = await db.execute(
+            scoped(
+                select(func.count())
+                .select_from(ContentChunk)
+                .where(ContentChunk.embedding.isnot(None)),
+                ContentChunk.job_id,
+            )
+        )
+        contributions[EMBEDDED_CHUNKS, ""] += embedded.scalar() or 0
+        return +contributions
+
+    async def apply_delta(
+        self, db: AsyncSession, added: Contributions, removed: Contributions
+    ) -> None:
+        """Add ``added`` to and subtract ``removed`` from the stored counts."""
+        counts: Counter = Counter()
+        numeric: Dict[str, Dict[str, Any]] = {}
+        for sign, contributions in ((1, added), (-1, removed)):
+            for (facet, value), count in contributions.items():
+                if facet not in NUMERIC_FACETS:
+                    counts[facet, value] += sign * count
+                    continue
+                stats = numeric.setdefault(
+                    facet, {"count": 0, "sum": 0.0, "added": [], "removed": False}
+                )
+                stats["count"] += sign * count
+                stats["sum"] += sign * count * value
+                if sign > 0:
+                    stats["added"].append(value)
+                else:
+                    stats["removed"] = True
+
+        rows = [
+            {"facet": facet, "value": value, "row_count": count}
+            for (facet, value), count in counts.items()
+            if count
+        ]
+        if rows:
+            statement = insert(JobFacetCount).values(rows)
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["facet", "value"],
+                    set_={
+                        "row_count": JobFacetCount.row_count
+                        + statement.excluded.row_count,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+            await db.execute(
+                delete(JobFacetCount).where(
+                    tuple_(JobFacetCount.facet, JobFacetCount.value).in_(
+                        [(row["facet"], row["value"]) for row in rows]
+                    ),
+                    JobFacetCount.row_count <= 0,
+                )
+            )
+
+        for facet, stats in numeric.items():
+            await self._apply_numeric(db, facet, stats)
+
+    async def _apply_numeric(
+        self, db: AsyncSession, facet: str, stats: Dict[str, Any]
+    ) -> None:
+        added = stats["added"]
+        statement = insert(JobFacetCount).values(
+            facet=facet,
+            value="",
+            row_count=stats["count"],
+            value_sum=stats["sum"],
+            value_min=min(added, default=None),
+            value_max=max(added, default=None),
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["facet", "value"],
+                set_={
+                    "row_count": JobFacetCount.row_count + statement.excluded.row_count,
+                    "value_sum": func.coalesce(JobFacetCount.value_sum, 0)
+                    + statement.excluded.value_sum,
+                    # LEAST/GREATEST ignore NULLs
+                    "value_min": func.least(
+                        JobFacetCount.value_min, statement.excluded.value_min
+                    ),
+                    "value_max": func.greatest(
+                        JobFacetCount.value_max, statement.excluded.value_max
+                    ),
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        if stats["removed"]:
+            # A removed value may have been an extreme
+            column = NUMERIC_FACETS[facet]
+            extremes = (
+                await db.execute(select(func.min(column), func.max(column)))
+            ).one()
+            await db.execute(
+                update(JobFacetCount)
+                .where(JobFacetCount.facet == facet, JobFacetCount.value == "")
+                .values(
+                    value_min=None if extremes[0] is None else _number(extremes[0]),
+                    value_max=None if extremes[1] is None else _number(extremes[1]),
+                )
+            )
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Recount every facet from the job tables; the caller commits."""
+        contributions = await self.contributions(db, None)
+        await db.execute(delete(JobFacetCount))
+        await self.apply_delta(db, contributions, Counter())
+        logger.info("Rebuilt facet counts", values=len(contributions))
+        return len(contributions)
+
+    async def load(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Read every stored facet in one query.
+
+        Returns {"counts": {facet: {value: count}}, "numeric": {facet:
+        {"count", "min", "max", "avg"}}}; dates are converted back.
+        """
+        result = await db.execute(select(JobFacetCount))
+        counts: Dict[str, Dict[str, int]] = {}
+        numeric: Dict[str, Dict[str, Any]] = {}
+        for row in result.scalars().all():
+            facet, row_count = str(row.facet), int(row.row_count)
+            if facet not in NUMERIC_FACETS:
+                counts.setdefault(facet, {})[str(row.value)] = row_count
+                continue
+            low: Any = row.value_min
+            high: Any = row.value_max
+            value_sum: Optional[float] = (
+                None if row.value_sum is None else float(row.value_sum)
+            )
+            if facet == "effective_date":
+                low = date.fromordinal(int(low)) if low is not None else None
+                high = date.fromordinal(int(high)) if high is not None else None
+            numeric[facet] = {
+                "count": row_count,
+                "min": low,
+                "max": high,
+                "avg": (
+                    value_sum / row_count
+                    if row_count and value_sum is not None
+                    else None
+                ),
+            }
+        return {"counts": counts, "numeric": numeric}
+
+    async def filtered_counts(
+        self, db: AsyncSession, filters: Dict[str, Optional[str]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Count the jobs matching ``filters`` by each counted facet.
+
+        One query with GROUPING SETS replaces a GROUP BY query per facet.
+        """
+        columns = [column for column, _ in FILTER_COLUMNS.values()]
+        statement = (
+            select(
+                *columns,
+                *(func.grouping(column) for column in columns),
+                func.count(func.distinct(JobDescription.id)),
+            )
+            .select_from(JobDescription)
+            .outerjoin(JobMetadata, JobMetadata.job_id == JobDescription.id)
+            .group_by(func.grouping_sets(*columns))
+        )
+        for name, value in filters.items():
+            if value:
+                column, substring = FILTER_COLUMNS[name]
+                statement = statement.where(
+                    column.ilike(f"%{value}%") if substring else column == value
+                )
+
+        facets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in FILTER_COLUMNS}
+        names = list(FILTER_COLUMNS)
+        for row in (await db.execute(statement)).all():
+            values, grouping, count = (
+                row[: len(names)],
+                row[len(names) : 2 * len(names)],
+                row[-1],
+            )
+            for name, value, ungrouped in zip(names, values, grouping):
+                if not ungrouped and value is not None:
+                    facets[name].append({"value": value, "count": count})
+        for entries in facets.values():
+            entries.sort(key=lambda entry: (-entry["count"], entry["value"]))
+        return facets
+
+
+# Global facet store instance
+facet_store = FacetStore()
@@ -0,0 +1,121 @@
+"""
+File Manifest Service
+
+Persists the stat signature and content hash of ingested files so that
+directory rescans only hash files that changed, skip the ones that did not,
+and update edited files in place instead of inserting duplicates.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.file_discovery import FileDiscovery, FileMetadata, ManifestEntry
+from ..database.models import FileManifest, JobDescription
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class FileManifestService:
+    """Service for loading and recording the ingested-file manifest."""
+
+    # Rows per statement, keeping well below PostgreSQL's bind-parameter limit
+    UPSERT_BATCH_SIZE = 1000
+
+    async def load(self, db: AsyncSession, root: Path) -> Dict[str, ManifestEntry]:
+        """Load manifest entries for every recorded file under ``root``."""
+        prefix = FileDiscovery.manifest_key(root)
+        result = await db.execute(
+            select(FileManifest).where(
+                FileManifest.file_path.startswith(prefix, autoescape=True)
+            )
+        )
+        manifest = {
+            str(row.file_path): ManifestEntry(
+                file_size=int(row.file_size),
+                mtime_ns=int(row.mtime_ns),
+                inode=int(row.inode),
+                file_hash=str(row.file_hash),
+                encoding=str(row.encoding or "utf-8"),
+                job_id=int(row.job_id) if row.job_id is not None else None,
+            )
+            for row in result.scalars().all()
+        }
+        logger.info("Loaded file manifest", root=prefix, entries=len(manifest))
+        return manifest
+
+    async def record(
+        self, db: AsyncSession, files_metadata: Iterable[FileMetadata]
+    ) -> int:
+        """
+        Upsert manifest rows for the given files.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        now = datetime.utcnow()
+        rows: Dict[str, Dict] = {}
+        for metadata in files_metadata:
+            key = FileDiscovery.manifest_key(metadata.file_path)
+            rows[key] = {
+                "file_path": key,
+                "file_size": metadata.file_size,
+                "mtime_ns": metadata.mtime_ns,
+                "inode": metadata.inode,
+                "file_hash": metadata.file_hash,
+                "encoding": metadata.encoding,
+                "job_id": metadata.job_id,
+                "last_seen_at": now,
+                "updated_at": now,
+            }
+        values = list(rows.values())
+        for start in range(0, len(values), self.UPSERT_BATCH_SIZE):
+            statement = insert(FileManifest).values(
+                values[start : start + self.UPSERT_BATCH_SIZE]
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[FileManifest.file_path],
+                set_={
+                    "file_size": statement.excluded.file_size,
+                    "mtime_ns": statement.excluded.mtime_ns,
+                    "inode": statement.excluded.inode,
+                    "file_hash": statement.excluded.file_hash,
+                    "encoding": statement.excluded.encoding,
+                    "job_id": statement.excluded.job_id,
+                    "last_seen_at": statement.excluded.last_seen_at,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+            await db.execute(statement)
+        return len(values)
+
+    async def find_jobs_by_hash(
+        self, db: AsyncSession, file_hashes: Iterable[str]
+    ) -> Dict[str, int]:
+        """Map content hashes to the IDs of jobs already ingested from them."""
+        hashes: List[str] = sorted({h for h in file_hashes if h})
+        if not hashes:
+            return {}
+
+        jobs: Dict[str, int] = {}
+        for start in range(0, len(hashes), self.UPSERT_BATCH_SIZE):
+            result = await db.execute(
+                select(JobDescription.file_hash, JobDescription.id)
+                .where(
+                    JobDescription.file_hash.in_(
+                        hashes[start : start + self.UPSERT_BATCH_SIZE]
+                    )
+                )
+                .order_by(JobDescription.id)
+            )
+            for row in result.all():
+                jobs.setdefault(row.file_hash, row.id)
+        return jobs
+
+
+# Global service instance
+file_manifest_service = FileManifestService()
@@ -25,6 +25,7 @@ from ..database.models import (
 )
 from ..config import settings
 from ..utils.logging import get_logger
+from .openai_dispatcher import openai_dispatcher
 
 logger = get_logger(__name__)
 
@@ -35,6 +36,26 @@ class JobAnalysisService:
     def __init__(self):
         self.openai_client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
 
+    async def _create_chat_completion(self, operation_type: str, **request: Any) -> Any:
+        """Create a chat completion once the OpenAI dispatcher admits it."""
+        prompt_chars = sum(len(message["content"]) for message in request["messages"])
+        return await openai_dispatcher.submit(
+            lambda: self.openai_client.chat.completions.create(**request),
+            operation_type=operation_type,
+            # Approximate: 1 token per 4 characters, plus the completion budget
+            estimated_tokens=prompt_chars // 4 + request.get("max_tokens", 0),
+        )
+
+    async def _create_embedding(self, text: str) -> Any:
+        """Create an embedding once the OpenAI dispatcher admits it."""
+        return await openai_dispatcher.submit(
+            lambda: self.openai_client.embeddings.create(
+                model="text-embedding-ada-002", input=text
+            ),
+            operation_type="embedding_generation",
+            estimated_tokens=len(text) // 4,
+        )
+
     async def get_compensation_analysis(
         self,
         db: AsyncSession,
@@ -438,7 +459,8 @@ class JobAnalysisService:
         """
 
         try:
-            response = await self.openai_client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "skill_extraction",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -560,15 +582,9 @@ class JobAnalysisService:
         """Calculate similarity between two text strings using OpenAI embeddings."""
         try:
             # Get embeddings for both texts
-            response_a = await self.openai_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text_a[:8000],  # Limit to avoid token limits
-            )
-
-            response_b = await self.openai_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text_b[:8000],  # Limit to avoid token limits
-            )
+            # Limit to avoid token limits
+            response_a = await self._create_embedding(text_a[:8000])
+            response_b = await self._create_embedding(text_b[:8000])
 
             # Extract embedding vectors
             embedding_a = np.array(response_a.data[0].embedding)
@@ -686,7 +702,8 @@ class JobAnalysisService:
         """
 
         try:
-            response = await self.openai_client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "similarity_insights",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -842,7 +859,8 @@ class JobAnalysisService:
             }}
             """
 
-            response = await self.openai_client.chat.completions.create(
+            response = await self._create_chat_completion(
+                "requirement_extraction",
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -0,0 +1,317 @@
+"""
+Admission-controlled dispatcher for OpenAI API calls.
+
+All OpenAI traffic in a process goes through one queue. A queued request is
+started only when a concurrency slot is free and the rate limiter admits its
+estimated tokens and cost; a denial keeps it queued for the recommended delay
+instead of sending it anyway.
+
+Requests are served strictly by priority class, so interactive calls such as
+search query embeddings overtake a running backfill, and
+``openai_dispatcher_interactive_slots`` slots are only ever used by
+interactive requests. Within a class, flows (by default one per operation
+type) take turns, so one caller's burst cannot hold up the others.
+"""
+
+import asyncio
+import time
+from contextlib import suppress
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from ..config.settings import settings
+from ..utils.logging import get_logger
+from .rate_limiting_service import RateLimitingService, rate_limiting_service
+
+logger = get_logger(__name__)
+
+# Bounds on how long a throttled request waits before admission is retried
+MIN_BACKOFF_SECONDS = 0.05
+MAX_BACKOFF_SECONDS = 5.0
+
+
+class RequestPriority(IntEnum):
+    """Priority classes, served lowest value first."""
+
+    INTERACTIVE = 0  # A user is waiting, e.g. search query embeddings
+    STANDARD = 1
+    BULK = 2  # Backfills and batch processing
+
+
+class AdmissionTimeoutError(Exception):
+    """Raised when a request is not admitted within its maximum wait."""
+
+
+@dataclass
+class _QueuedRequest:
+    call: Callable[[], Awaitable[Any]]
+    operation_type: str
+    estimated_tokens: int
+    estimated_cost: float
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started: bool = False
+
+
+class OpenAIDispatcher:
+    """Priority queue with concurrency and rate-limit admission control."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        interactive_slots: Optional[int] = None,
+        rate_limiter: Optional[RateLimitingService] = None,
+        service: str = "openai",
+    ):
+        """Initialize an empty dispatcher; the admitter starts on first submit."""
+        self.max_concurrency = (
+            max_concurrency or settings.openai_dispatcher_max_concurrency
+        )
+        self.interactive_slots = min(
+            (
+                interactive_slots
+                if interactive_slots is not None
+                else settings.openai_dispatcher_interactive_slots
+            ),
+            self.max_concurrency - 1,
+        )
+        self.rate_limiter = rate_limiter or rate_limiting_service
+        self.service = service
+
+        self._queues: Dict[
+            RequestPriority, "OrderedDict[str, Deque[_QueuedRequest]]"
+        ] = {priority: OrderedDict() for priority in RequestPriority}
+        self._active = 0
+        self._running: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Priority of the request waiting out a rate-limit delay, if any
+        self._throttled: Optional[RequestPriority] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "throttled": 0,
+            "timed_out": 0,
+            "max_queue_wait_ms": 0.0,
+        }
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        operation_type: str,
+        estimated_tokens: int = 1,
+        estimated_cost: float = 0.0,
+        priority: RequestPriority = RequestPriority.STANDARD,
+        flow: Optional[str] = None,
+        max_wait_seconds: Optional[float] = None,
+    ) -> Any:
+        """
+        Queue ``call`` and return its result once admitted and run.
+
+        ``flow`` groups requests that take turns with other flows of the same
+        priority. Interactive requests wait at most
+        ``openai_dispatcher_interactive_max_wait_seconds`` for admission unless
+        ``max_wait_seconds`` is given; AdmissionTimeoutError is raised when a
+        request is still queued after its maximum wait.
+        """
+        self._ensure_admitter()
+        request = _QueuedRequest(
+            call=call,
+            operation_type=operation_type,
+            estimated_tokens=estimated_tokens,
+            estimated_cost=estimated_cost,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._queues[priority].setdefault(flow or operation_type, deque()).append(
+            request
+        )
+        self._stats["submitted"] += 1
+        self._notify(priority)
+
+        if max_wait_seconds is None and priority == RequestPriority.INTERACTIVE:
+            max_wait_seconds = settings.openai_dispatcher_interactive_max_wait_seconds
+        if max_wait_seconds is not None:
+            try:
+                await asyncio.wait([request.future], timeout=max_wait_seconds)
+            except asyncio.CancelledError:
+                # Drop the request so an abandoned call is never sent
+                request.future.cancel()
+                raise
+            if not request.started:
+                request.future.cancel()
+                self._stats["timed_out"] += 1
+                raise AdmissionTimeoutError(
+                    f"{operation_type} not admitted within {max_wait_seconds}s"
+                )
+        return await request.future
+
+    def _ensure_admitter(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Requests queued on a finished loop (e.g. a previous Celery
+            # task) can never complete, so start from an empty queue.
+            for flows in self._queues.values():
+                flows.clear()
+            self._active = 0
+            self._running = set()
+            self._throttled = None
+            self._loop = loop
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            wakeup = asyncio.Event()
+            self._wakeup = wakeup
+            self._task = loop.create_task(self._run(wakeup))
+
+    def _notify(self, priority: Optional[RequestPriority] = None) -> None:
+        """Wake the admitter to re-check the queue."""
+        # While a request waits out a rate-limit delay, only a higher-priority
+        # arrival should interrupt it; re-checking earlier would be denied too
+        if self._wakeup is None:
+            return
+        if self._throttled is None or (
+            priority is not None and priority < self._throttled
+        ):
+            self._wakeup.set()
+
+    def _peek(self) -> Optional[Tuple[_QueuedRequest, RequestPriority]]:
+        """Next request to admit: highest priority, then the first flow in turn."""
+        for priority, flows in self._queues.items():
+            while flows:
+                flow, requests = next(iter(flows.items()))
+                while requests and requests[0].future.done():
+                    requests.popleft()  # Cancelled or timed out while queued
+                if requests:
+                    return requests[0], priority
+                del flows[flow]
+        return None
+
+    def _pop(self, priority: RequestPriority) -> None:
+        flows = self._queues[priority]
+        flow, requests = next(iter(flows.items()))
+        requests.popleft()
+        # The flow's next request goes behind every other flow
+        del flows[flow]
+        if requests:
+            flows[flow] = requests
+
+    def _has_slot(self, priority: RequestPriority) -> bool:
+        if priority == RequestPriority.INTERACTIVE:
+            return self._active < self.max_concurrency
+        return self._active < self.max_concurrency - self.interactive_slots
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while True:
+            head = self._peek()
+            if head is None or not self._has_slot(head[1]):
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            request, priority = head
+
+            is_allowed, _ = await self.rate_limiter.check_rate_limit(
+                service=self.service,
+                operation_type=request.operation_type,
+                estimated_tokens=request.estimated_tokens,
+                estimated_cost=request.estimated_cost,
+            )
+            if not is_allowed:
+                await self._back_off(request, priority, wakeup)
+                continue
+
+            if request.future.done():
+                continue  # Cancelled while admission was checked
+            # New arrivals only join the back of their flow's queue, so the
+            # admitted request is still at the head of the first flow
+            self._pop(priority)
+            self._start(request)
+
+    async def _back_off(
+        self, request: _QueuedRequest, priority: RequestPriority, wakeup: asyncio.Event
+    ) -> None:
+        self._stats["throttled"] += 1
+        delay = await self.rate_limiter.get_recommended_delay(
+            self.service,
+            request.operation_type,
+            estimated_tokens=request.estimated_tokens,
+            estimated_cost=request.estimated_cost,
+        )
+        delay = min(max(delay, MIN_BACKOFF_SECONDS), MAX_BACKOFF_SECONDS)
+        logger.debug(
+            "OpenAI request throttled",
+            operation_type=request.operation_type,
+            priority=priority.name,
+            delay=delay,
+        )
+
+        self._throttled = priority
+        wakeup.clear()
+        try:
+            await asyncio.wait_for(wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._throttled = None
+
+    def _start(self, request: _QueuedRequest) -> None:
+        request.started = True
+        wait_ms = (time.monotonic() - request.enqueued_at) * 1000
+        self._stats["max_queue_wait_ms"] = max(
+            self._stats["max_queue_wait_ms"], round(wait_ms, 2)
+        )
+        self._active += 1
+        task = asyncio.get_running_loop().create_task(self._execute(request))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, request: _QueuedRequest) -> None:
+        try:
+            result = await request.call()
+        except asyncio.CancelledError:
+            request.future.cancel()
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            self._stats["completed"] += 1
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            self._active -= 1
+            self._notify()
+
+    async def stop(self) -> None:
+        """Stop admitting requests and cancel those still queued."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            if task.get_loop() is asyncio.get_running_loop():
+                with suppress(asyncio.CancelledError):
+                    await task
+        for flows in self._queues.values():
+            for requests in flows.values():
+                for request in requests:
+                    request.future.cancel()
+            flows.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depths per priority class and admission counters."""
+        return {
+            **self._stats,
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "interactive_slots": self.interactive_slots,
+            "queued": {
+                priority.name.lower(): sum(len(r) for r in flows.values())
+                for priority, flows in self._queues.items()
+            },
+        }
+
+
+# Global dispatcher shared by every OpenAI caller in the process
+openai_dispatcher = OpenAIDispatcher()
@@ -3,21 +3,27 @@ Rate Limiting Service
 
 API rate limiting and cost management for external services, particularly OpenAI API.
 Implements token bucket algorithm with sliding window counters for precise rate limiting.
+
+With a ``RedisRateLimiter`` attached, bucket and window state is shared by all
+worker processes; the per-process limiters below take over whenever Redis is
+unreachable.
 """
 
 import asyncio
 import time
+from contextlib import AsyncExitStack
 from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime, timedelta
-from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
+from ..config.settings import settings
 from ..database.models import AIUsageTracking
 from ..utils.logging import get_logger
+from .redis_rate_limiter import RedisRateLimiter
 
 logger = get_logger(__name__)
 
@@ -64,19 +70,35 @@ class TokenBucket:
 
     async def consume(self, tokens: int = 1) -> bool:
         """Attempt to consume tokens from bucket."""
-        async with self._lock:
-            now = time.time()
-            # Add tokens based on time passed
-            time_passed = now - self.last_refill
-            self.tokens = min(
-                self.capacity, self.tokens + (time_passed * self.refill_rate)
-            )
-            self.last_refill = now
+        return (await self.consume_all([(self, tokens)]))[0]
 
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            return False
+    @staticmethod
+    async def consume_all(requests: List[Tuple["TokenBucket", int]]) -> List[bool]:
+        """
+        Take the given tokens from every bucket, all or nothing.
+
+        Returns whether each bucket had enough tokens; nothing is consumed
+        unless all of them did.
+        """
+        async with AsyncExitStack() as stack:
+            for bucket, _ in requests:
+                await stack.enter_async_context(bucket._lock)
+
+            sufficient = []
+            for bucket, tokens in requests:
+                bucket._refill()
+                sufficient.append(bucket.tokens >= tokens)
+            if all(sufficient):
+                for bucket, tokens in requests:
+                    bucket.tokens -= tokens
+        return sufficient
+
+    def _refill(self) -> None:
+        """Add tokens based on time passed; the caller holds the lock."""
+        now = time.time()
+        time_passed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + (time_passed * self.refill_rate))
+        self.last_refill = now
 
     async def get_status(self) -> Dict[str, float]:
         """Get current bucket status."""
@@ -96,41 +118,76 @@ class TokenBucket:
 
 
 class SlidingWindowCounter:
-    """Sliding window counter for tracking usage over time windows."""
+    """
+    Sliding window counter for tracking usage over time windows.
 
-    def __init__(self, window_seconds: int):
+    The window is split into ``buckets`` sub-windows kept in a ring array with
+    a running total, so recording and counting are O(1) and memory is
+    O(buckets) regardless of the request rate. Usage leaves the window one
+    sub-window at a time.
+    """
+
+    def __init__(self, window_seconds: int, buckets: Optional[int] = None):
         self.window_seconds = window_seconds
-        self.requests: deque = deque()
-        self._lock = asyncio.Lock()
+        self.bucket_count = buckets or settings.rate_limit_window_buckets
+        self.bucket_seconds = window_seconds / self.bucket_count
+        self.counts: List[int] = [0] * self.bucket_count
+        self.total = 0
+        # Absolute index of the newest sub-window, None until first use
+        self.head: Optional[int] = None
 
     async def add_request(
         self, amount: int = 1, timestamp: Optional[float] = None
     ) -> None:
         """Add a request to the counter."""
-        if timestamp is None:
-            timestamp = time.time()
-
-        async with self._lock:
-            self.requests.append((timestamp, amount))
-            await self._cleanup_old_requests()
+        now = time.time()
+        index = int(
+            (timestamp if timestamp is not None else now) // self.bucket_seconds
+        )
+        head = self._advance(max(index, int(now // self.bucket_seconds)))
+
+        # Backdated usage lands in its own sub-window while that is still
+        # inside the window
+        if index > head - self.bucket_count:
+            self.counts[index % self.bucket_count] += amount
+            self.total += amount
 
     async def get_count(self) -> int:
         """Get current count within the window."""
-        async with self._lock:
-            await self._cleanup_old_requests()
-            return sum(amount for _, amount in self.requests)
+        self._advance(int(time.time() // self.bucket_seconds))
+        return self.total
+
+    def _advance(self, index: int) -> int:
+        """
+        Move the head to ``index``, clearing sub-windows that left the window.
 
-    async def _cleanup_old_requests(self) -> None:
-        """Remove requests outside the current window."""
-        cutoff = time.time() - self.window_seconds
-        while self.requests and self.requests[0][0] < cutoff:
-            self.requests.popleft()
+        Returns the head index, which never moves backwards.
+        """
+        if self.head is None:
+            self.head = index
+            return index
+        if index <= self.head:
+            return self.head
+
+        if index - self.head >= self.bucket_count:
+            self.counts = [0] * self.bucket_count
+            self.total = 0
+        else:
+            for expired in range(self.head + 1, index + 1):
+                slot = expired % self.bucket_count
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+        self.head = index
+        return index
 
 
 class RateLimitingService:
     """Service for managing API rate limits and cost optimization."""
 
-    def __init__(self):
+    def __init__(self, distributed: Optional[RedisRateLimiter] = None):
+        # Shared limiter state; None keeps limits per process
+        self.distributed = distributed
+
         # Rate limit configurations
         self.rate_limits: Dict[str, Dict[RateLimitType, RateLimit]] = {
             "openai": {
@@ -195,30 +252,24 @@ class RateLimitingService:
             statuses = []
             is_allowed = True
 
-            # Check each rate limit type
+            # Determine request amount for each rate limit type
             limits = self.rate_limits[service]
+            amounts = {}
+            for limit_type in limits:
+                amount = self._limit_amount(
+                    limit_type, estimated_tokens, estimated_cost
+                )
+                if amount is not None:
+                    amounts[limit_type] = amount
 
-            for limit_type, rate_limit in limits.items():
-                # Determine request amount based on limit type
-                if limit_type == RateLimitType.REQUESTS_PER_MINUTE:
-                    amount = 1
-                elif limit_type == RateLimitType.TOKENS_PER_MINUTE:
-                    amount = estimated_tokens
-                elif limit_type in [
-                    RateLimitType.COST_PER_HOUR,
-                    RateLimitType.COST_PER_DAY,
-                ]:
-                    amount = int(estimated_cost * 100)  # Convert to cents for precision
-                else:
-                    continue
-
-                # Check token bucket
-                bucket = self.token_buckets[service][limit_type]
-                can_consume = await bucket.consume(amount)
+            # Consume from token buckets and read sliding window counts
+            usage = await self._consume_distributed(service, amounts)
+            if usage is None:
+                usage = await self._consume_local(service, amounts)
 
-                # Get sliding window count
-                window = self.sliding_windows[service][limit_type]
-                current_usage = await window.get_count()
+            for limit_type, amount in amounts.items():
+                rate_limit = limits[limit_type]
+                can_consume, current_usage = usage[limit_type]
 
                 # Calculate window reset time
                 reset_time = datetime.now() + timedelta(
@@ -260,6 +311,77 @@ class RateLimitingService:
             # Fail open - allow request if rate limiting fails
             return True, []
 
+    @staticmethod
+    def _limit_amount(
+        limit_type: RateLimitType, tokens: int, cost: float
+    ) -> Optional[int]:
+        """Amount a request counts against a limit type."""
+        if limit_type == RateLimitType.REQUESTS_PER_MINUTE:
+            return 1
+        if limit_type == RateLimitType.TOKENS_PER_MINUTE:
+            return tokens
+        if limit_type in [RateLimitType.COST_PER_HOUR, RateLimitType.COST_PER_DAY]:
+            return int(cost * 100)  # Convert to cents for precision
+        return None
+
+    async def _consume_local(
+        self, service: str, amounts: Dict[RateLimitType, int]
+    ) -> Dict[RateLimitType, Tuple[bool, int]]:
+        """
+        Consume from this process's buckets, all or nothing.
+
+        Returns (had enough tokens, window count) per limit type; a request
+        denied by one limit takes nothing from the others.
+        """
+        buckets = self.token_buckets[service]
+        sufficient = await TokenBucket.consume_all(
+            [(buckets[limit_type], amount) for limit_type, amount in amounts.items()]
+        )
+        usage = {}
+        for (limit_type, _), can_consume in zip(amounts.items(), sufficient):
+            current_usage = await self.sliding_windows[service][limit_type].get_count()
+            usage[limit_type] = (can_consume, current_usage)
+        return usage
+
+    async def _consume_distributed(
+        self, service: str, amounts: Dict[RateLimitType, int]
+    ) -> Optional[Dict[RateLimitType, Tuple[bool, int]]]:
+        """Consume from the shared buckets, or None to fall back to local ones."""
+        if self.distributed is None or not self.distributed.available:
+            return None
+
+        limits = self.rate_limits[service]
+        try:
+            sufficient = await self.distributed.acquire(
+                service,
+                {
+                    limit_type.value: (
+                        int(
+                            limits[limit_type].limit
+                            * limits[limit_type].burst_allowance
+                        ),
+                        limits[limit_type].limit / limits[limit_type].window_seconds,
+                        amount,
+                    )
+                    for limit_type, amount in amounts.items()
+                },
+            )
+            counts = await self.distributed.window_counts(
+                service,
+                {
+                    limit_type.value: limits[limit_type].window_seconds
+                    for limit_type in amounts
+                },
+            )
+        except Exception as e:
+            self.distributed.mark_unavailable(e)
+            return None
+
+        return {
+            limit_type: (sufficient[limit_type.value], counts[limit_type.value])
+            for limit_type in amounts
+        }
+
     async def record_usage(
         self,
         service: str,
@@ -274,6 +396,19 @@ class RateLimitingService:
             if service not in self.rate_limits:
                 return
 
+            # Shared windows are stamped with the Redis clock, so an explicit
+            # timestamp is only honoured by the per-process windows
+            if await self._record_distributed(service, tokens_used, cost):
+                logger.debug(
+                    "Recorded API usage",
+                    service=service,
+                    operation_type=operation_type,
+                    tokens=tokens_used,
+                    cost=cost,
+                    user_id=user_id,
+                )
+                return
+
             if timestamp is None:
                 timestamp = time.time()
 
@@ -303,6 +438,48 @@ class RateLimitingService:
         except Exception as e:
             logger.error("Error recording API usage", service=service, error=str(e))
 
+    async def _record_distributed(self, service: str, tokens: int, cost: float) -> bool:
+        """Add usage to the shared windows; False when Redis is not in use."""
+        if self.distributed is None or not self.distributed.available:
+            return False
+
+        limits = self.rate_limits[service]
+        windows: Dict[str, Tuple[int, int]] = {}
+        for limit_type in self.sliding_windows[service]:
+            amount = self._limit_amount(limit_type, tokens, cost)
+            if amount is not None:
+                windows[limit_type.value] = (limits[limit_type].window_seconds, amount)
+        try:
+            await self.distributed.add_usage(service, windows)
+        except Exception as e:
+            self.distributed.mark_unavailable(e)
+            return False
+        return True
+
+    async def _window_counts(self, service: str) -> Dict[RateLimitType, int]:
+        """Current sliding window totals, shared when Redis is in use."""
+        limits = self.rate_limits[service]
+        if self.distributed is not None and self.distributed.available:
+            try:
+                counts = await self.distributed.window_counts(
+                    service,
+                    {
+                        limit_type.value: limits[limit_type].window_seconds
+                        for limit_type in self.sliding_windows[service]
+                    },
+                )
+                return {
+                    limit_type: counts[limit_type.value]
+                    for limit_type in self.sliding_windows[service]
+                }
+            except Exception as e:
+                self.distributed.mark_unavailable(e)
+
+        return {
+            limit_type: await window.get_count()
+            for limit_type, window in self.sliding_windows[service].items()
+        }
+
     async def get_usage_stats(
         self, db: AsyncSession, service: str, period_hours: int = 24
     ) -> Dict[str, Any]:
@@ -330,8 +507,8 @@ class RateLimitingService:
             # Get current rate limit statuses
             current_statuses = {}
             if service in self.sliding_windows:
-                for limit_type, window in self.sliding_windows[service].items():
-                    current_count = await window.get_count()
+                window_counts = await self._window_counts(service)
+                for limit_type, current_count in window_counts.items():
                     limit = self.rate_limits[service][limit_type].limit
 
                     current_statuses[limit_type.value] = {
@@ -541,6 +718,9 @@ class RateLimitingService:
                     capacity, refill_rate
                 )
 
+            if self.distributed is not None:
+                self.distributed.reset(service)
+
             logger.info("Updated rate limits", service=service, limits=new_limits)
             return True
 
@@ -548,20 +728,57 @@ class RateLimitingService:
             logger.error("Error updating rate limits", service=service, error=str(e))
             return False
 
-    async def get_recommended_delay(self, service: str, operation_type: str) -> float:
-        """Get recommended delay before next request to avoid rate limits."""
+    async def get_recommended_delay(
+        self,
+        service: str,
+        operation_type: str,
+        estimated_tokens: int = 1,
+        estimated_cost: float = 0.0,
+    ) -> float:
+        """
+        Get recommended delay before next request to avoid rate limits.
+
+        The delay covers the whole request: it lasts until every bucket
+        refills enough for ``estimated_tokens`` and ``estimated_cost``.
+        """
         try:
             if service not in self.token_buckets:
                 return 0.0
 
+            # Every bucket must hold at least one token, as before
+            limits = self.rate_limits[service]
+            amounts = {
+                limit_type: max(
+                    1,
+                    self._limit_amount(limit_type, estimated_tokens, estimated_cost)
+                    or 0,
+                )
+                for limit_type in limits
+            }
+
+            if self.distributed is not None and self.distributed.available:
+                delay = self.distributed.recommended_delay(
+                    service,
+                    {
+                        limit_type.value: (
+                            int(rate_limit.limit * rate_limit.burst_allowance),
+                            rate_limit.limit / rate_limit.window_seconds,
+                            amounts[limit_type],
+                        )
+                        for limit_type, rate_limit in limits.items()
+                    },
+                )
+                return min(delay, 60.0)
+
             # Check token bucket status
             max_delay = 0.0
 
             for limit_type, bucket in self.token_buckets[service].items():
                 status = await bucket.get_status()
-                if status["current_tokens"] < 1:
-                    # Calculate delay needed to get at least 1 token
-                    delay = (1 - status["current_tokens"]) / status["fill_rate"]
+                needed = amounts[limit_type]
+                if status["current_tokens"] < needed:
+                    # Calculate delay until the bucket covers the request
+                    delay = (needed - status["current_tokens"]) / status["fill_rate"]
                     max_delay = max(max_delay, delay)
 
             return min(max_delay, 60.0)  # Cap at 60 seconds
@@ -574,4 +791,6 @@ class RateLimitingService:
 
 
 # Global instance
-rate_limiting_service = RateLimitingService()
+rate_limiting_service = RateLimitingService(
+    distributed=RedisRateLimiter() if settings.rate_limit_backend == "redis" else None
+)
@@ -0,0 +1,351 @@
+"""
+Redis-backed rate limiter state shared by every worker process.
+
+Token buckets and sliding window counters live in Redis and are updated by
+Lua scripts, so a check-and-consume is atomic no matter how many uvicorn or
+Celery processes share a limit. Bucket levels are computed from the Redis
+server clock, which keeps hosts with skewed clocks consistent.
+
+To keep hot paths off the network, a successful acquire also leases a small
+share of each bucket (``rate_limit_lease_fraction`` of its capacity) to the
+calling process. Later checks are served from the lease until it runs out or
+expires after ``rate_limit_lease_ttl_seconds``; unused leased tokens expire
+with it, so leasing can under-use a limit but never exceed it.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from ..config.settings import settings
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# KEYS: one hash per bucket.
+# ARGV: four values per key: capacity, refill rate (tokens/s), need, want.
+# Refills every bucket; only if each holds at least ``need`` tokens, takes up
+# to ``want`` from each. Returns {allowed, granted_1, level_1, granted_2, ...}.
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels = {}
+local allowed = 1
+for i = 1, #KEYS do
+  local base = (i - 1) * 4
+  local capacity = tonumber(ARGV[base + 1])
+  local rate = tonumber(ARGV[base + 2])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local level = tonumber(state[1])
+  if level == nil then
+    level = capacity
+  else
+    level = math.min(capacity, level + math.max(0, now - tonumber(state[2])) * rate)
+  end
+  levels[i] = level
+  if level < tonumber(ARGV[base + 3]) then
+    allowed = 0
+  end
+end
+local result = {allowed}
+for i = 1, #KEYS do
+  local base = (i - 1) * 4
+  local capacity = tonumber(ARGV[base + 1])
+  local rate = tonumber(ARGV[base + 2])
+  local granted = 0
+  if allowed == 1 then
+    granted = math.min(levels[i], tonumber(ARGV[base + 4]))
+  end
+  local level = levels[i] - granted
+  redis.call('HSET', KEYS[i], 'tokens', tostring(level), 'ts', tostring(now))
+  if rate > 0 then
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 1)
+  end
+  result[#result + 1] = tostring(granted)
+  result[#result + 1] = tostring(level)
+end
+return result
+"""
+
+# KEYS: one hash per window; fields are sub-window indexes.
+# ARGV: three values per key: window seconds, sub-window seconds, amount.
+# Adds ``amount`` to the current sub-window, drops expired sub-windows and
+# returns the total of each window.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local result = {}
+for i = 1, #KEYS do
+  local base = (i - 1) * 3
+  local window = tonumber(ARGV[base + 1])
+  local width = tonumber(ARGV[base + 2])
+  local amount = tonumber(ARGV[base + 3])
+  local current = math.floor(now / width)
+  local oldest = current - math.ceil(window / width) + 1
+  if amount > 0 then
+    redis.call('HINCRBY', KEYS[i], current, amount)
+    redis.call('EXPIRE', KEYS[i], window + width)
+  end
+  local fields = redis.call('HGETALL', KEYS[i])
+  local stale = {}
+  local total = 0
+  for j = 1, #fields, 2 do
+    if tonumber(fields[j]) < oldest then
+      stale[#stale + 1] = fields[j]
+    else
+      total = total + tonumber(fields[j + 1])
+    end
+  end
+  if #stale > 0 then
+    redis.call('HDEL', KEYS[i], unpack(stale))
+  end
+  result[i] = total
+end
+return result
+"""
+
+# (capacity, refill rate, amount) per bucket name
+BucketRequest = Tuple[float, float, float]
+
+
+class RedisRateLimiter:
+    """Shared token buckets and sliding windows with per-process leases."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        client: Optional[Any] = None,
+        key_prefix: Optional[str] = None,
+        lease_fraction: Optional[float] = None,
+        lease_ttl_seconds: Optional[float] = None,
+        window_buckets: Optional[int] = None,
+        retry_seconds: Optional[float] = None,
+    ):
+        """Initialize the limiter; the Redis client is created on first use."""
+        self.redis_url = redis_url or settings.redis_url
+        self.key_prefix = key_prefix or settings.rate_limit_key_prefix
+        self.lease_fraction = (
+            lease_fraction
+            if lease_fraction is not None
+            else settings.rate_limit_lease_fraction
+        )
+        self.lease_ttl = (
+            lease_ttl_seconds
+            if lease_ttl_seconds is not None
+            else settings.rate_limit_lease_ttl_seconds
+        )
+        self.window_buckets = window_buckets or settings.rate_limit_window_buckets
+        self.retry_seconds = (
+            retry_seconds
+            if retry_seconds is not None
+            else settings.rate_limit_redis_retry_seconds
+        )
+
+        self._client = client
+        self._owns_client = client is None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scripts: Optional[Dict[str, Any]] = None
+
+        # Per (service, name): [remaining tokens, expires_at]
+        self._leases: Dict[Tuple[str, str], List[float]] = {}
+        # Last bucket level seen in Redis: (level, observed_at)
+        self._levels: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        # Last window total seen in Redis: (count, observed_at)
+        self._window_counts: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+        self._retry_at = 0.0
+        self._stats = {"lease_hits": 0, "redis_calls": 0, "failures": 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether Redis should be tried, i.e. no recent failure."""
+        return time.monotonic() >= self._retry_at
+
+    def mark_unavailable(self, error: Exception) -> None:
+        """Use the in-memory fallback for ``retry_seconds`` after a failure."""
+        self._retry_at = time.monotonic() + self.retry_seconds
+        self._stats["failures"] += 1
+        self._leases.clear()
+        logger.warning(
+            "Redis rate limiter unavailable, using in-memory limits",
+            error=str(error),
+            retry_seconds=self.retry_seconds,
+        )
+
+    def _key(self, service: str, name: str, kind: str) -> str:
+        # The hash tag keeps one service's keys in the same cluster slot
+        return f"{self.key_prefix}:{{{service}}}:{name}:{kind}"
+
+    def _lease(self, slot: Tuple[str, str], now: float) -> float:
+        lease = self._leases.get(slot)
+        if lease is None or lease[1] <= now:
+            return 0.0
+        return lease[0]
+
+    async def _get_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._owns_client and self._client_loop is not loop:
+            # Async connections are bound to the loop that opened them, and
+            # Celery tasks run each on a fresh loop.
+            if self._client is not None:
+                await self._close_client(self._client)
+            self._client = redis.from_url(
+                self.redis_url,
+                max_connections=settings.redis_max_connections,
+                socket_timeout=settings.rate_limit_redis_timeout_seconds,
+                socket_connect_timeout=settings.rate_limit_redis_timeout_seconds,
+            )
+            self._client_loop = loop
+            self._scripts = None
+        return self._client
+
+    async def _get_scripts(self) -> Dict[str, Any]:
+        client = await self._get_client()
+        scripts = self._scripts
+        if scripts is None:
+            scripts = self._scripts = {
+                "bucket": client.register_script(TOKEN_BUCKET_SCRIPT),
+                "window": client.register_script(SLIDING_WINDOW_SCRIPT),
+            }
+        return scripts
+
+    @staticmethod
+    async def _close_client(client: Any) -> None:
+        """Release a client opened on a previous event loop and its pool."""
+        try:
+            await client.aclose()
+        except Exception as e:
+            # The loop it was bound to is usually closed by now; the pool is
+            # still emptied, so the sockets are freed with their transports.
+            logger.debug("Closed stale rate limiter Redis client", error=str(e))
+
+    async def _run(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        self._stats["redis_calls"] += 1
+        scripts = await self._get_scripts()
+        return await scripts[script](keys=keys, args=args)
+
+    async def acquire(
+        self, service: str, buckets: Dict[str, BucketRequest]
+    ) -> Dict[str, bool]:
+        """
+        Take ``amount`` tokens from every named bucket, all or nothing.
+
+        Returns whether each bucket had enough tokens; nothing is consumed
+        unless all of them did. Raises on Redis errors.
+        """
+        now = time.monotonic()
+        leased = {name: self._lease((service, name), now) for name in buckets}
+
+        if all(leased[name] >= amount for name, (_, _, amount) in buckets.items()):
+            for name, (_, _, amount) in buckets.items():
+                self._leases[(service, name)][0] -= amount
+            self._stats["lease_hits"] += 1
+            return {name: True for name in buckets}
+
+        keys: List[str] = []
+        args: List[Any] = []
+        for name, (capacity, rate, amount) in buckets.items():
+            need = max(0.0, amount - leased[name])
+            want = need + capacity * self.lease_fraction if need > 0 else 0.0
+            keys.append(self._key(service, name, "bucket"))
+            args.extend([capacity, rate, need, want])
+
+        result = await self._run("bucket", keys, args)
+        allowed = int(result[0]) == 1
+        observed = time.monotonic()
+
+        sufficient = {}
+        for i, (name, (_, _, amount)) in enumerate(buckets.items()):
+            slot = (service, name)
+            granted = float(result[1 + 2 * i])
+            level = float(result[2 + 2 * i])
+            self._levels[slot] = (level, observed)
+            if allowed:
+                lease = self._leases.get(slot)
+                expires_at = (
+                    observed + self.lease_ttl
+                    if granted > 0 or lease is None
+                    else lease[1]
+                )
+                self._leases[slot] = [leased[name] + granted - amount, expires_at]
+            sufficient[name] = allowed or level + leased[name] >= amount
+        return sufficient
+
+    def recommended_delay(
+        self, service: str, buckets: Dict[str, BucketRequest]
+    ) -> float:
+        """Seconds until every bucket holds ``amount``, from the last levels seen."""
+        now = time.monotonic()
+        delay = 0.0
+        for name, (capacity, rate, amount) in buckets.items():
+            slot = (service, name)
+            snapshot = self._levels.get(slot)
+            if snapshot is None or rate <= 0:
+                continue
+            level, observed = snapshot
+            tokens = min(capacity, level + (now - observed) * rate)
+            tokens += self._lease(slot, now)
+            if tokens < amount:
+                delay = max(delay, (amount - tokens) / rate)
+        return delay
+
+    async def add_usage(
+        self, service: str, windows: Dict[str, Tuple[int, int]]
+    ) -> Dict[str, int]:
+        """Add ``(window_seconds, amount)`` to each window; returns the totals."""
+        return await self._update_windows(service, windows)
+
+    async def window_counts(
+        self, service: str, windows: Dict[str, int]
+    ) -> Dict[str, int]:
+        """Window totals, re-read from Redis at most once per lease TTL."""
+        now = time.monotonic()
+        counts: Dict[str, int] = {}
+        stale: Dict[str, Tuple[int, int]] = {}
+        for name, window_seconds in windows.items():
+            cached = self._window_counts.get((service, name))
+            if cached is not None and now - cached[1] < self.lease_ttl:
+                counts[name] = cached[0]
+            else:
+                stale[name] = (window_seconds, 0)
+        if stale:
+            counts.update(await self._update_windows(service, stale))
+        return counts
+
+    async def _update_windows(
+        self, service: str, windows: Dict[str, Tuple[int, int]]
+    ) -> Dict[str, int]:
+        keys: List[str] = []
+        args: List[Any] = []
+        for name, (window_seconds, amount) in windows.items():
+            width = max(1, math.ceil(window_seconds / self.window_buckets))
+            keys.append(self._key(service, name, "window"))
+            args.extend([window_seconds, width, int(amount)])
+
+        result = await self._run("window", keys, args)
+        observed = time.monotonic()
+
+        counts = {}
+        for name, count in zip(windows, result):
+            counts[name] = int(count)
+            self._window_counts[(service, name)] = (counts[name], observed)
+        return counts
+
+    def reset(self, service: str) -> None:
+        """Forget local leases and snapshots for a service, e.g. on new limits."""
+        for state in (self._leases, self._levels, self._window_counts):
+            for slot in [slot for slot in state if slot[0] == service]:
+                del state[slot]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lease and round-trip counters."""
+        return {
+            **self._stats,
+            "available": self.available,
+            "active_leases": len(self._leases),
+            "lease_fraction": self.lease_fraction,
+            "lease_ttl_seconds": self.lease_ttl,
+        }
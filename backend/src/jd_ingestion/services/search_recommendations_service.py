@@ -9,23 +9,35 @@ ML-powered query suggestions and search recommendations based on:
 """
 
 import re
+import time
 import asyncio
-from typing import List, Dict, Any, Optional, cast
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, cast
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_, or_, text
 
+from ..config.settings import settings
+from ..database.connection import async_session_context
 from ..database.models import (
     SearchAnalytics,
     JobDescription,
     JobMetadata,
 )
 from ..services.embedding_service import embedding_service
+from ..services.openai_dispatcher import RequestPriority
+from ..services.suggestion_index import suggestion_index
 from ..utils.logging import get_logger
 from ..utils.cache import cache_service
 
 logger = get_logger(__name__)
 
+# Recent durations kept per suggestion strategy for latency percentiles
+STRATEGY_TIMING_WINDOW = 500
+
+# A suggestion strategy and its arguments after the database session
+Strategy = Tuple[Callable[..., Awaitable[List[Dict[str, Any]]]], Tuple[Any, ...]]
+
 
 class SearchRecommendationsService:
     """Service for ML-powered search recommendations and query suggestions."""
@@ -35,6 +47,11 @@ class SearchRecommendationsService:
         self.max_suggestions = 10
         self.similarity_threshold = 0.7
         self.cache_ttl = 3600  # 1 hour
+        self.suggestion_budget_seconds = settings.search_suggestions_budget_ms / 1000
+        # Each concurrent suggestion strategy opens its own pooled session
+        self.session_factory = async_session_context
+        self._strategy_stats: Dict[str, Dict[str, Any]] = {}
+        self._partial_responses = 0
 
     async def get_query_suggestions(
         self,
@@ -47,15 +64,26 @@ class SearchRecommendationsService:
         """
         Generate query suggestions based on partial input using ML analysis.
 
-        Combines:
+        Once this worker's suggestion index is built, keystrokes are answered
+        from it without OpenAI calls; only the user's own history is still
+        read from the database, under the same budget. Until then, combines:
         - Popular search patterns
         - Semantic similarity
         - User history (if available)
         - Content-based suggestions
+
+        These strategies run concurrently; those still running after
+        ``suggestion_budget_seconds`` are cancelled and the rest are ranked.
         """
         if len(partial_query.strip()) < self.min_query_length:
             return []
 
+        indexed = suggestion_index.suggest(partial_query, limit)
+        if indexed is not None:
+            return await self._get_indexed_suggestions(
+                indexed, partial_query, user_id, session_id, limit
+            )
+
         try:
             # Check cache first
             cache_key = f"query_suggestions:{partial_query.lower()}:{limit}"
@@ -68,44 +96,22 @@ class SearchRecommendationsService:
                 )
                 return cached
 
-            suggestions = []
-
-            # 1. Get popular similar queries from analytics
-            try:
-                popular_queries = await self._get_popular_similar_queries(
-                    db, partial_query, limit
-                )
-                suggestions.extend(popular_queries)
-            except Exception as e:
-                logger.warning("Failed to get popular similar queries", error=str(e))
-
-            # 2. Generate semantic-based suggestions
-            try:
-                semantic_suggestions = await self._get_semantic_suggestions(
-                    db, partial_query, limit
-                )
-                suggestions.extend(semantic_suggestions)
-            except Exception as e:
-                logger.warning("Failed to get semantic suggestions", error=str(e))
-
-            # 3. Get user-specific suggestions if available
+            # Strategies run concurrently, listed in the order they are ranked
+            strategies: Dict[str, Strategy] = {
+                "popular": (self._get_popular_similar_queries, (partial_query, limit)),
+                "semantic": (self._get_semantic_suggestions, (partial_query, limit)),
+            }
             if user_id or session_id:
-                try:
-                    user_suggestions = await self._get_user_based_suggestions(
-                        db, partial_query, user_id, session_id, limit
-                    )
-                    suggestions.extend(user_suggestions)
-                except Exception as e:
-                    logger.warning("Failed to get user-based suggestions", error=str(e))
-
-            # 4. Generate content-based suggestions
-            try:
-                content_suggestions = await self._get_content_based_suggestions(
-                    db, partial_query, limit
+                strategies["personal"] = (
+                    self._get_user_based_suggestions,
+                    (partial_query, user_id, session_id, limit),
                 )
-                suggestions.extend(content_suggestions)
-            except Exception as e:
-                logger.warning("Failed to get content-based suggestions", error=str(e))
+            strategies["content"] = (
+                self._get_content_based_suggestions,
+                (partial_query, limit),
+            )
+            results, timed_out = await self._run_strategies(strategies)
+            suggestions = [s for name in strategies for s in results.get(name, [])]
 
             # Deduplicate and rank suggestions
             final_suggestions = self._rank_and_deduplicate_suggestions(
@@ -116,10 +122,16 @@ class SearchRecommendationsService:
             if not final_suggestions:
                 final_suggestions = self._get_fallback_suggestions(partial_query, limit)
 
-            # Cache results
+            # Cache results; partial ones only briefly
             try:
                 await cache_service.set(
-                    cache_key, final_suggestions, expiry_seconds=self.cache_ttl
+                    cache_key,
+                    final_suggestions,
+                    expiry_seconds=(
+                        settings.search_suggestions_partial_cache_seconds
+                        if timed_out
+                        else self.cache_ttl
+                    ),
                 )
             except Exception as cache_error:
                 logger.warning(
@@ -130,6 +142,7 @@ class SearchRecommendationsService:
                 "Generated query suggestions",
                 query=partial_query,
                 count=len(final_suggestions),
+                timed_out=timed_out,
             )
             return final_suggestions
 
@@ -139,6 +152,120 @@ class SearchRecommendationsService:
             )
             return []
 
+    async def _get_indexed_suggestions(
+        self,
+        indexed: List[Dict[str, Any]],
+        partial_query: str,
+        user_id: Optional[str],
+        session_id: Optional[str],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Put the user's own recent searches ahead of suggestions from the index.
+
+        Index scores are not on the strategies' scale, so the two lists are
+        concatenated rather than ranked together.
+        """
+        suggestions = indexed
+        if user_id or session_id:
+            results, _ = await self._run_strategies(
+                {
+                    "personal": (
+                        self._get_user_based_suggestions,
+                        (partial_query, user_id, session_id, limit),
+                    )
+                }
+            )
+            seen = set()
+            suggestions = []
+            for suggestion in results.get("personal", []) + indexed:
+                text_lower = suggestion["text"].lower()
+                if text_lower not in seen:
+                    seen.add(text_lower)
+                    suggestions.append(suggestion)
+            suggestions = suggestions[:limit]
+        return suggestions or self._get_fallback_suggestions(partial_query, limit)
+
+    async def _run_strategies(
+        self, strategies: Dict[str, Strategy]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """
+        Run suggestion strategies concurrently under the latency budget.
+
+        Returns the suggestions of each strategy that finished in time and
+        the names of those that were cancelled at the deadline.
+        """
+        tasks = {
+            asyncio.create_task(self._run_strategy(name, strategy, args)): name
+            for name, (strategy, args) in strategies.items()
+        }
+        done, pending = await asyncio.wait(
+            tasks, timeout=self.suggestion_budget_seconds
+        )
+        for task in pending:
+            task.cancel()
+        # Wait for the cancelled strategies to return their sessions
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        timed_out = [tasks[task] for task in pending]
+        if timed_out:
+            self._partial_responses += 1
+        return {tasks[task]: task.result() for task in done}, timed_out
+
+    async def _run_strategy(
+        self,
+        name: str,
+        strategy: Callable[..., Awaitable[List[Dict[str, Any]]]],
+        args: Tuple[Any, ...],
+    ) -> List[Dict[str, Any]]:
+        """Run one suggestion strategy on its own session and time it."""
+        started = time.perf_counter()
+        outcome = "failed"
+        try:
+            async with self.session_factory() as db:
+                suggestions = await strategy(db, *args)
+            outcome = "completed"
+            return suggestions
+        except asyncio.CancelledError:
+            outcome = "timed_out"
+            raise
+        except Exception as e:
+            logger.warning("Suggestion strategy failed", strategy=name, error=str(e))
+            return []
+        finally:
+            stats = self._strategy_stats.setdefault(
+                name,
+                {
+                    "completed": 0,
+                    "failed": 0,
+                    "timed_out": 0,
+                    "durations_ms": deque(maxlen=STRATEGY_TIMING_WINDOW),
+                },
+            )
+            stats[outcome] += 1
+            stats["durations_ms"].append((time.perf_counter() - started) * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get outcome counters and recent latency of each suggestion strategy."""
+        strategies = {}
+        for name, stats in self._strategy_stats.items():
+            durations: Deque[float] = stats["durations_ms"]
+            ordered = sorted(durations)
+            strategies[name] = {
+                "completed": stats["completed"],
+                "failed": stats["failed"],
+                "timed_out": stats["timed_out"],
+                "avg_ms": round(sum(ordered) / len(ordered), 2),
+                "p95_ms": round(ordered[int(len(ordered) * 0.95)], 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+        return {
+            "budget_ms": round(self.suggestion_budget_seconds * 1000),
+            "partial_responses": self._partial_responses,
+            "strategies": strategies,
+            "suggestion_index": suggestion_index.get_stats(),
+        }
+
     async def get_search_recommendations(
         self,
         db: AsyncSession,
@@ -281,7 +408,9 @@ class SearchRecommendationsService:
                 return []
 
             # Generate embedding for partial query
-            query_embedding = await embedding_service.generate_embedding(partial_query)
+            query_embedding = await embedding_service.generate_embedding(
+                partial_query, RequestPriority.INTERACTIVE
+            )
             if not query_embedding:
                 return []
 
@@ -390,7 +519,7 @@ class SearchRecommendationsService:
                         "score": 0.9,
                         "metadata": {
                             "total_results": row.total_results,
-                            "last_used": row.created_at.isoformat(),
+                            "last_used": row.timestamp.isoformat(),
                         },
                     }
                 )
@@ -0,0 +1,295 @@
+"""
+In-memory autocomplete index behind /search/suggestions.
+
+Each worker keeps a ``PrefixIndex`` of popular search queries, job titles,
+classifications and skill names, so a keystroke is answered from memory
+without touching Postgres or OpenAI. A background task builds the index on
+startup and rebuilds it every ``suggestion_index_rebuild_seconds``, which
+also ages out queries older than the popularity window. In between, every
+``suggestion_index_refresh_seconds`` it adds the searches recorded in
+``search_analytics`` since the previous refresh.
+
+Until the first build completes, ``suggest`` returns None and suggestions
+come from the database strategies of ``SearchRecommendationsService``.
+"""
+
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import settings
+from ..database.connection import async_session_context
+from ..database.models import JobDescription, JobSkill, SearchAnalytics
+from ..utils.logging import get_logger
+from ..utils.prefix_index import PrefixIndex, normalize
+
+logger = get_logger(__name__)
+
+# Relative weight of a term by where it came from; a term found in several
+# sources keeps its best score
+SOURCE_WEIGHTS = {"query": 1.0, "title": 0.9, "classification": 0.8, "skill": 0.7}
+POPULAR_QUERY_DAYS = 30
+MIN_TERM_LENGTH = 3
+MAX_TERM_LENGTH = 100
+
+
+def _score(source: str, count: int) -> float:
+    return SOURCE_WEIGHTS[source] * (1.0 + math.log1p(count))
+
+
+def _payload(source: str, count: int) -> Dict[str, Any]:
+    return {"source": source, "count": count}
+
+
+class SuggestionIndex:
+    """Per-worker autocomplete index, refreshed from the database."""
+
+    def __init__(
+        self,
+        refresh_seconds: Optional[float] = None,
+        rebuild_seconds: Optional[float] = None,
+        max_terms_per_source: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ):
+        """Initialize an empty index; ``start`` begins building it."""
+        self.refresh_seconds = (
+            refresh_seconds or settings.suggestion_index_refresh_seconds
+        )
+        self.rebuild_seconds = (
+            rebuild_seconds or settings.suggestion_index_rebuild_seconds
+        )
+        self.max_terms_per_source = (
+            max_terms_per_source or settings.suggestion_index_max_terms_per_source
+        )
+        self.top_k = top_k or settings.suggestion_index_top_k
+        self._index: Optional[PrefixIndex] = None
+        # Popular query counts by normalized text, for incremental refreshes
+        self._query_counts: Dict[str, int] = {}
+        self._watermark = 0  # Highest search_analytics.id already counted
+        self._built_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"builds": 0, "refreshes": 0, "failures": 0, "lookups": 0}
+
+    @property
+    def ready(self) -> bool:
+        """Whether the first build has completed."""
+        return self._index is not None
+
+    def suggest(
+        self, partial_query: str, limit: int = 5
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get suggestions for a partial query from memory.
+
+        Returns None until the index has been built.
+        """
+        index = self._index
+        if index is None:
+            return None
+        self._stats["lookups"] += 1
+        return [
+            {
+                "text": term.text,
+                "type": "popular" if term.payload["source"] == "query" else "content",
+                "score": round(term.score, 4),
+                "metadata": dict(term.payload),
+            }
+            for term in index.search(partial_query, limit)
+        ]
+
+    def start(self) -> None:
+        """Start building and refreshing the index in the background."""
+        if not settings.suggestion_index_enabled:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if (
+                    self._index is None
+                    or time.monotonic() - self._built_at >= self.rebuild_seconds
+                ):
+                    await self.rebuild()
+                else:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failures"] += 1
+                logger.error("Failed to refresh suggestion index", error=str(e))
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def rebuild(self) -> None:
+        """Load every source from the database and swap in a new index."""
+        started = time.perf_counter()
+        async with async_session_context() as db:
+            watermark = (
+                await db.execute(select(func.max(SearchAnalytics.id)))
+            ).scalar() or 0
+            sources = {
+                "query": await self._load_queries(db, watermark),
+                "title": await self._load_counts(
+                    db, JobDescription.title, JobDescription.id
+                ),
+                "classification": await self._load_counts(
+                    db, JobDescription.classification, JobDescription.id
+                ),
+                "skill": await self._load_counts(
+                    db, JobSkill.skill_name, JobSkill.job_id
+                ),
+            }
+
+        # Sorting the keys takes a while for large catalogues
+        index, query_counts = await asyncio.to_thread(self._build, sources)
+        self._index, self._query_counts = index, query_counts
+        self._watermark = watermark
+        self._built_at = time.monotonic()
+        self._stats["builds"] += 1
+        logger.info(
+            "Built suggestion index",
+            terms=len(index),
+            keys=index.key_count,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+
+    async def refresh(self) -> None:
+        """Add the searches recorded since the previous build or refresh."""
+        index = self._index
+        if index is None:
+            await self.rebuild()
+            return
+
+        async with async_session_context() as db:
+            result = await db.execute(
+                select(
+                    SearchAnalytics.query_text,
+                    func.count(SearchAnalytics.id),
+                    func.max(SearchAnalytics.id),
+                )
+                .where(
+                    SearchAnalytics.id > self._watermark,
+                    SearchAnalytics.query_text.isnot(None),
+                    SearchAnalytics.total_results > 0,
+                )
+                .group_by(SearchAnalytics.query_text)
+            )
+            rows = result.all()
+
+        for query_text, count, last_id in rows:
+            self._add_query(index, query_text, count)
+            self._watermark = max(self._watermark, last_id)
+        self._stats["refreshes"] += 1
+
+    async def _load_queries(
+        self, db: AsyncSession, watermark: int
+    ) -> List[Tuple[str, int]]:
+        result = await db.execute(
+            select(SearchAnalytics.query_text, func.count(SearchAnalytics.id))
+            .where(
+                SearchAnalytics.id <= watermark,
+                SearchAnalytics.query_text.isnot(None),
+                SearchAnalytics.total_results > 0,
+                SearchAnalytics.timestamp
+                >= datetime.now() - timedelta(days=POPULAR_QUERY_DAYS),
+            )
+            .group_by(SearchAnalytics.query_text)
+            .order_by(desc(func.count(SearchAnalytics.id)))
+            .limit(self.max_terms_per_source)
+        )
+        return [(text, count) for text, count in result.all()]
+
+    async def _load_counts(
+        self, db: AsyncSession, column: Any, counted: Any
+    ) -> List[Tuple[str, int]]:
+        """Distinct values of ``column`` with how many ``counted`` have each."""
+        count = func.count(func.distinct(counted))
+        result = await db.execute(
+            select(column, count)
+            .where(column.isnot(None))
+            .group_by(column)
+            .order_by(desc(count))
+            .limit(self.max_terms_per_source)
+        )
+        return [(text, count) for text, count in result.all()]
+
+    def _build(
+        self, sources: Mapping[str, Iterable[Tuple[str, int]]]
+    ) -> Tuple[PrefixIndex, Dict[str, int]]:
+        terms: Dict[str, Tuple[str, float, Dict[str, Any]]] = {}
+        query_counts: Dict[str, int] = {}
+        for source, rows in sources.items():
+            for text, count in rows:
+                text = text.strip()
+                normalized = normalize(text)
+                if not MIN_TERM_LENGTH <= len(normalized) <= MAX_TERM_LENGTH:
+                    continue
+                existing = terms.get(normalized)
+                if (
+                    source == "query"
+                    and normalized in query_counts
+                    and existing is not None
+                ):
+                    # Differently cased searches count as one query, shown
+                    # as its most frequent spelling (rows come most used first)
+                    count += query_counts[normalized]
+                    text = existing[0]
+                if source == "query":
+                    query_counts[normalized] = count
+                score = _score(source, count)
+                if existing is None or existing[1] < score:
+                    terms[normalized] = (text, score, _payload(source, count))
+        index = PrefixIndex.build(terms.values(), top_k=self.top_k)
+        return index, query_counts
+
+    def _add_query(self, index: PrefixIndex, text: str, count: int) -> None:
+        text = text.strip()
+        normalized = normalize(text)
+        if not MIN_TERM_LENGTH <= len(normalized) <= MAX_TERM_LENGTH:
+            return
+        count += self._query_counts.get(normalized, 0)
+        self._query_counts[normalized] = count
+        score = _score("query", count)
+        existing = index.get(text)
+        if existing is not None and existing.score >= score:
+            return
+        display = existing.text if existing is not None else text
+        index.add(display, score, _payload("query", count))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, refresh counters and the age of the last build."""
+        index = self._index
+        return {
+            **self._stats,
+            "ready": index is not None,
+            "terms": len(index) if index is not None else 0,
+            "keys": index.key_count if index is not None else 0,
+            "watermark": self._watermark,
+            "age_seconds": (
+                round(time.monotonic() - self._built_at, 1)
+                if index is not None
+                else None
+            ),
+        }
+
+
+# Global suggestion index instance
+suggestion_index = SuggestionIndex()
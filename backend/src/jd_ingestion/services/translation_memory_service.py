@@ -26,6 +26,7 @@ from ..database.models import (
     TranslationEmbedding,
 )
 from ..services.embedding_service import EmbeddingService
+from ..services.openai_dispatcher import RequestPriority
 
 logger = logging.getLogger(__name__)
 
@@ -187,7 +188,7 @@ class TranslationMemoryService:
         # Generate embedding for query text
         try:
             query_embedding = await self.embedding_service.generate_embedding(
-                query_text
+                query_text, RequestPriority.INTERACTIVE
             )
         except Exception as e:
             logger.error(f"Failed to generate query embedding: {e}")
@@ -3,7 +3,7 @@ Celery tasks for embedding generation.
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy import select
 
@@ -11,6 +11,7 @@ from .celery_app import celery_app
 from ..config.settings import settings
 from ..database.models import ContentChunk
 from ..services.embedding_service import embedding_service
+from ..services.facet_store import facet_store
 from ..utils.logging import get_logger
 from ..utils.retry_utils import is_retryable_error
 
@@ -137,8 +138,9 @@ async def _generate_embeddings_for_job_async(job_id: int, task) -> Dict[str, Any
             successful_embeddings = 0
             failed_embeddings = 0
 
-            # Process chunks in batches for better progress tracking
-            batch_size = 5
+            # Process chunks in batches; each batch is embedded with
+            # multi-input requests and committed together
+            batch_size = settings.embedding_batch_max_inputs
             total_chunks = len(chunks)
 
             for i in range(0, len(chunks), batch_size):
@@ -156,42 +158,49 @@ async def _generate_embeddings_for_job_async(job_id: int, task) -> Dict[str, Any
                     },
                 )
 
-                # Generate embeddings for this batch
-                for chunk in batch:
-                    try:
-                        embedding = await embedding_service.generate_embedding(
-                            str(chunk.chunk_text)
-                            if not isinstance(chunk.chunk_text, str)
-                            else chunk.chunk_text
-                        )
+                texts = [
+                    str(chunk.chunk_text)
+                    if not isinstance(chunk.chunk_text, str)
+                    else chunk.chunk_text
+                    for chunk in batch
+                ]
+                embeddings = await embedding_service.generate_embeddings_batch(
+                    texts, db=db
+                )
 
-                        if embedding:
-                            chunk.embedding = embedding  # type: ignore[assignment]
-                            successful_embeddings += 1
-                        else:
-                            logger.warning(
-                                "Failed to generate embedding for chunk",
-                                chunk_id=chunk.id,
-                            )
-                            failed_embeddings += 1
-
-                    except Exception as e:
-                        logger.error(
-                            "Error generating embedding for chunk",
+                newly_embedded = 0
+                for chunk, text_content, embedding in zip(batch, texts, embeddings):
+                    if embedding:
+                        newly_embedded += chunk.embedding is None
+                        chunk.embedding = embedding  # type: ignore[assignment]
+                        chunk.embedding_model = settings.embedding_model  # type: ignore[assignment]
+                        chunk.text_hash = embedding_service.get_text_hash(text_content)  # type: ignore[assignment]
+                        successful_embeddings += 1
+                    else:
+                        logger.warning(
+                            "Failed to generate embedding for chunk",
                             chunk_id=chunk.id,
-                            error=str(e),
                         )
                         failed_embeddings += 1
 
                 # Commit batch
+                await facet_store.record_embeddings(db, newly_embedded)
                 await db.commit()
 
+            # Refresh the job-level centroid used by similar-job search
+            job_embedding_updated = False
+            if successful_embeddings > 0:
+                job_embedding_updated = await embedding_service.update_job_embedding(
+                    job_id, db
+                )
+
             result = {
                 "status": "completed",
                 "job_id": job_id,
                 "chunks_processed": len(chunks),
                 "successful_embeddings": successful_embeddings,
                 "failed_embeddings": failed_embeddings,
+                "job_embedding_updated": job_embedding_updated,
             }
 
             logger.info(
@@ -398,9 +407,10 @@ async def _generate_missing_embeddings_async(
 
             successful_embeddings = 0
             failed_embeddings = 0
+            embedded_job_ids: Set[int] = set()
 
-            # Process chunks with progress tracking
-            batch_size = 10
+            # Process chunks with progress tracking; one commit per batch
+            batch_size = settings.embedding_batch_max_inputs
             total_chunks = len(chunks)
 
             for i in range(0, len(chunks), batch_size):
@@ -426,25 +436,37 @@ async def _generate_missing_embeddings_async(
                     for chunk in batch
                 ]
                 embeddings = await embedding_service.generate_embeddings_batch(
-                    texts, batch_size=len(batch)
+                    texts, db=db
                 )
 
                 # Update chunks with embeddings
-                for chunk, embedding in zip(batch, embeddings):
+                newly_embedded = 0
+                for chunk, text_content, embedding in zip(batch, texts, embeddings):
                     if embedding:
+                        newly_embedded += chunk.embedding is None
                         chunk.embedding = embedding  # type: ignore[assignment]
+                        chunk.embedding_model = settings.embedding_model  # type: ignore[assignment]
+                        chunk.text_hash = embedding_service.get_text_hash(text_content)  # type: ignore[assignment]
+                        embedded_job_ids.add(int(chunk.job_id))
                         successful_embeddings += 1
                     else:
                         failed_embeddings += 1
 
                 # Commit batch
+                await facet_store.record_embeddings(db, newly_embedded)
                 await db.commit()
 
+            # Refresh the job-level centroids used by similar-job search
+            job_embeddings_updated = await embedding_service.update_job_embeddings(
+                embedded_job_ids, db
+            )
+
             result = {
                 "status": "completed",
                 "chunks_processed": len(chunks),
                 "successful_embeddings": successful_embeddings,
                 "failed_embeddings": failed_embeddings,
+                "job_embeddings_updated": job_embeddings_updated,
             }
 
             logger.info(
@@ -3,15 +3,39 @@ Celery tasks for job description processing.
 """
 
 import asyncio
+import multiprocessing
+import threading
+from contextlib import aclosing
+from datetime import datetime
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Optional,
+    Dict,
+    Any,
+    List,
+    Tuple,
+    Union,
+)
+from sqlalchemy import delete, insert, update
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from .celery_app import celery_app
 from ..config.settings import settings
-from ..core.file_discovery import FileDiscovery
+from ..core.file_discovery import FileDiscovery, FileMetadata, ManifestEntry
 from ..processors.content_processor import ContentProcessor, ProcessedContent
-from ..database.models import JobDescription, JobSection, JobMetadata, ContentChunk
+from ..database.models import (
+    JobDescription,
+    JobSection,
+    JobMetadata,
+    ContentChunk,
+    JobEmbedding,
+)
+from ..services.facet_store import facet_store
+from ..services.file_manifest_service import file_manifest_service
+from ..utils.cache import cache_service
 from ..utils.logging import get_logger
 from ..utils.retry_utils import is_retryable_error
 
@@ -193,11 +217,7 @@ async def _process_single_file_async(
 
             # Generate chunks
             try:
-                cleaned_content = processed_content.cleaned_content
-                if not isinstance(cleaned_content, str):
-                    cleaned_content = str(cleaned_content)
-
-                chunks = content_processor.chunk_content(cleaned_content)
+                chunks = list(content_processor.iter_chunks(processed_content))
                 logger.info("Chunk generation completed", chunk_count=len(chunks))
             except Exception as e:
                 logger.error("Chunk generation failed", error=str(e))
@@ -223,6 +243,7 @@ async def _process_single_file_async(
                 await db.flush()  # Get the ID
 
                 # Save sections
+                job_sections: Dict[Optional[str], JobSection] = {}
                 for section_type, section_content in processed_content.sections.items():
                     if section_content and section_content.strip():
                         job_section = JobSection(
@@ -234,6 +255,7 @@ async def _process_single_file_async(
                             ),
                         )
                         db.add(job_section)
+                        job_sections[section_type] = job_section
 
                 # Save metadata if available
                 if (
@@ -250,17 +272,19 @@ async def _process_single_file_async(
                     db.add(job_metadata)
 
                 # Save chunks
-                for i, chunk_text in enumerate(chunks):
-                    if chunk_text and chunk_text.strip():
-                        content_chunk = ContentChunk(
-                            job_id=job_description.id,
-                            chunk_text=chunk_text,
-                            chunk_index=i,
-                        )
-                        db.add(content_chunk)
+                for i, chunk in enumerate(chunks):
+                    content_chunk = ContentChunk(
+                        job_id=job_description.id,
+                        section=job_sections.get(chunk.section_type),
+                        chunk_text=chunk.text,
+                        chunk_index=i,
+                    )
+                    db.add(content_chunk)
 
+                job_id = int(job_description.id)
+                await facet_store.add_jobs(db, [job_id])
                 await db.commit()
-                job_id = job_description.id
+                await cache_service.invalidate_job_cache(job_id)
 
                 logger.info("Job saved to database", job_id=job_id, file_path=file_path)
 
@@ -314,6 +338,7 @@ def batch_process_files_task(
     max_files: Optional[int] = None,
     recursive: bool = True,
     generate_embeddings: bool = True,
+    incremental: bool = True,
 ) -> Dict[str, Any]:
     """
     Process multiple job description files from a directory.
@@ -323,6 +348,8 @@ def batch_process_files_task(
         max_files: Maximum number of files to process
         recursive: Whether to scan subdirectories
         generate_embeddings: Whether to generate embeddings after processing
+        incremental: Skip files unchanged since the last scan (per the file
+            manifest) and update edited files in place
 
     Returns:
         Dictionary with batch processing results
@@ -342,69 +369,32 @@ def batch_process_files_task(
             raise FileNotFoundError(f"Directory does not exist: {directory_path}")
 
         file_discovery = FileDiscovery(data_path)
-        files_metadata = file_discovery.scan_directory(recursive=recursive)
-
-        # Filter valid files
-        valid_files = [f for f in files_metadata if f.is_valid]
 
-        # Limit files if specified
-        if max_files:
-            valid_files = valid_files[:max_files]
+        # Scan, then parse and bulk-insert changed files, all on one event loop
+        batch_result = asyncio.run(
+            _batch_process_directory_async(
+                file_discovery,
+                self,
+                recursive=recursive,
+                max_files=max_files,
+                incremental=incremental,
+            )
+        )
 
-        if not valid_files:
+        if not batch_result["valid_files_found"]:
             return {"status": "error", "message": "No valid files found for processing"}
 
-        # Process files
-        total_files = len(valid_files)
-        processed_files = 0
-        successful_files = []
-        failed_files = []
-
-        for file_metadata in valid_files:
-            try:
-                self.update_state(
-                    state="PROCESSING",
-                    meta={
-                        "status": f"Processing file {processed_files + 1} of {total_files}",
-                        "current_file": file_metadata.file_path.name,
-                        "progress": int((processed_files / total_files) * 100),
-                    },
-                )
-
-                # Process single file (without triggering separate embedding task)
-                result = asyncio.run(
-                    _process_single_file_async(
-                        str(file_metadata.file_path), self, generate_embeddings=False
-                    )
-                )
-
-                if result["status"] == "success":
-                    successful_files.append(
-                        {
-                            "file_path": str(file_metadata.file_path),
-                            "job_id": result["job_id"],
-                        }
-                    )
-                else:
-                    failed_files.append(
-                        {
-                            "file_path": str(file_metadata.file_path),
-                            "error": result.get("errors", "Unknown error"),
-                        }
-                    )
+        successful_files = batch_result["successful"]
+        failed_files = batch_result["failed"]
+        processed_files = len(successful_files) + len(failed_files)
 
-                processed_files += 1
+        # Trigger quality metrics calculation once for all new jobs
+        if successful_files:
+            from .quality_tasks import batch_calculate_quality_metrics_task
 
-            except Exception as e:
-                logger.error(
-                    "Failed to process file in batch",
-                    file_path=str(file_metadata.file_path),
-                    error=str(e),
-                )
-                failed_files.append(
-                    {"file_path": str(file_metadata.file_path), "error": str(e)}
-                )
-                processed_files += 1
+            batch_calculate_quality_metrics_task.delay(
+                [f["job_id"] for f in successful_files]
+            )
 
         # Trigger batch embedding generation for all successful jobs
         if generate_embeddings and successful_files:
@@ -416,11 +406,14 @@ def batch_process_files_task(
         result = {
             "status": "completed",
             "directory": directory_path,
-            "total_files_found": len(files_metadata),
-            "valid_files_found": len(valid_files),
+            "total_files_found": batch_result["total_files_found"],
+            "valid_files_found": batch_result["valid_files_found"],
             "files_processed": processed_files,
             "successful_files": len(successful_files),
+            "updated_files": sum(1 for f in successful_files if f.get("updated")),
             "failed_files": len(failed_files),
+            "unchanged_files": batch_result["unchanged_files"],
+            "duplicate_files": batch_result["duplicate_files"],
             "results": {"successful": successful_files, "failed": failed_files},
         }
 
@@ -429,6 +422,7 @@ def batch_process_files_task(
             directory=directory_path,
             successful=len(successful_files),
             failed=len(failed_files),
+            unchanged=batch_result["unchanged_files"],
             task_id=self.request.id,
         )
 
@@ -482,6 +476,515 @@ def batch_process_files_task(
             raise
 
 
+def _parse_file_for_ingestion(
+    file_path: str, encoding: str = "utf-8", language: str = "en"
+) -> Dict[str, Any]:
+    """
+    Read, parse and chunk a single file for batch ingestion.
+
+    Runs inside a worker process, so it only takes and returns plain
+    picklable data.
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        raw_content = f.read()
+
+    content_processor = ContentProcessor("")
+    processed_content = content_processor.process_content(raw_content, language)
+    processing_errors = list(processed_content.processing_errors)
+
+    try:
+        chunks = [
+            {"chunk_text": chunk.text, "section_type": chunk.section_type}
+            for chunk in content_processor.iter_chunks(processed_content)
+        ]
+    except Exception as e:
+        processing_errors.append(f"Chunk generation failed: {str(e)}")
+        chunks = []
+
+    structured_fields = processed_content.structured_fields
+    return {
+        "raw_content": raw_content,
+        "sections": dict(processed_content.sections),
+        "department": structured_fields.department or None,
+        "reports_to": structured_fields.reports_to or None,
+        "chunks": chunks,
+        "processing_errors": processing_errors,
+    }
+
+
+def _create_parse_executor(max_workers: int) -> Executor:
+    """
+    Create the executor used for CPU-bound parsing.
+
+    Celery prefork children are daemonic and may not start processes of their
+    own, so threads are used there (and when only one worker is requested).
+    """
+    if max_workers > 1 and not multiprocessing.current_process().daemon:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+
+async def _bulk_write_parsed_files(
+    db: AsyncSession, parsed_files: List[Tuple[FileMetadata, Dict[str, Any]]]
+) -> List[int]:
+    """
+    Persist a group of parsed files with one multi-row INSERT per table.
+
+    New files get new job rows. Files the manifest marks as modified update
+    their existing job in place, and its sections, metadata, chunks and job
+    embedding are replaced. Returns the job IDs in the same order as
+    ``parsed_files``. The caller owns the transaction boundaries.
+    """
+    facet_change = await facet_store.track(
+        db,
+        [
+            file_metadata.job_id
+            for file_metadata, _ in parsed_files
+            if file_metadata.change_status == "modified" and file_metadata.job_id
+        ],
+    )
+    job_ids: List[Optional[int]] = [None] * len(parsed_files)
+    new_positions: List[int] = []
+    job_rows: List[Dict[str, Any]] = []
+    for position, (file_metadata, parsed) in enumerate(parsed_files):
+        job_row = {
+            "job_number": file_metadata.job_number or "UNKNOWN",
+            "title": file_metadata.title or "Untitled",
+            "classification": file_metadata.classification or "UNKNOWN",
+            "language": file_metadata.language or "en",
+            "file_path": str(file_metadata.file_path),
+            "raw_content": parsed["raw_content"],
+            "file_hash": file_metadata.file_hash,
+        }
+        if file_metadata.change_status == "modified" and file_metadata.job_id:
+            await db.execute(
+                update(JobDescription)
+                .where(JobDescription.id == file_metadata.job_id)
+                .values(**job_row, processed_date=datetime.utcnow())
+            )
+            job_ids[position] = file_metadata.job_id
+        else:
+            new_positions.append(position)
+            job_rows.append(job_row)
+
+    updated_job_ids = [job_id for job_id in job_ids if job_id is not None]
+    if updated_job_ids:
+        # Chunks go first: they reference sections
+        for model in (ContentChunk, JobSection, JobMetadata, JobEmbedding):
+            await db.execute(delete(model).where(model.job_id.in_(updated_job_ids)))
+
+    if job_rows:
+        result = await db.execute(
+            insert(JobDescription).returning(
+                JobDescription.id, sort_by_parameter_order=True
+            ),
+            job_rows,
+        )
+        for position, job_id in zip(new_positions, result.scalars().all()):
+            job_ids[position] = job_id
+    # Every file has a job by now
+    written_job_ids = [job_id for job_id in job_ids if job_id is not None]
+
+    section_rows: List[Dict[str, Any]] = []
+    metadata_rows: List[Dict[str, Any]] = []
+    for job_id, (_, parsed) in zip(written_job_ids, parsed_files):
+        for section_order, (section_type, section_content) in enumerate(
+            parsed["sections"].items()
+        ):
+            if section_content and section_content.strip():
+                section_rows.append(
+                    {
+                        "job_id": job_id,
+                        "section_type": section_type,
+                        "section_content": section_content,
+                        "section_order": section_order,
+                    }
+                )
+
+        if parsed["department"]:
+            metadata_rows.append(
+                {
+                    "job_id": job_id,
+                    "department": parsed["department"],
+                    "reports_to": parsed["reports_to"],
+                }
+            )
+
+    # Chunks reference their section, so section IDs are needed first
+    section_ids: Dict[Tuple[int, str], int] = {}
+    if section_rows:
+        result = await db.execute(
+            insert(JobSection).returning(JobSection.id, sort_by_parameter_order=True),
+            section_rows,
+        )
+        for row, section_id in zip(section_rows, result.scalars().all()):
+            section_ids[(row["job_id"], row["section_type"])] = section_id
+
+    chunk_rows: List[Dict[str, Any]] = []
+    for job_id, (_, parsed) in zip(written_job_ids, parsed_files):
+        for chunk_index, chunk in enumerate(parsed["chunks"]):
+            if chunk["chunk_text"] and chunk["chunk_text"].strip():
+                chunk_rows.append(
+                    {
+                        "job_id": job_id,
+                        "section_id": section_ids.get((job_id, chunk["section_type"])),
+                        "chunk_text": chunk["chunk_text"],
+                        "chunk_index": chunk_index,
+                    }
+                )
+
+    for model, rows in ((JobMetadata, metadata_rows), (ContentChunk, chunk_rows)):
+        if rows:
+            await db.execute(insert(model), rows)
+
+    await facet_change.apply([written_job_ids[position] for position in new_positions])
+    return written_job_ids
+
+
+# Marks the end of a directory scan running in a worker thread
+_SCAN_DONE = object()
+
+
+async def _iter_scan_async(
+    file_discovery: FileDiscovery,
+    recursive: bool,
+    manifest: Optional[Dict[str, ManifestEntry]],
+) -> AsyncGenerator[FileMetadata, None]:
+    """
+    Run ``FileDiscovery.iter_scan`` in a thread, yielding files as they arrive.
+
+    The thread blocks while a flush group of results is waiting, so a slow
+    consumer throttles the scan; closing the generator stops it.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.batch_db_flush_size))
+    stop = threading.Event()
+
+    def produce() -> None:
+        def put(item: Any) -> None:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        try:
+            for file_metadata in file_discovery.iter_scan(recursive, manifest):
+                if stop.is_set():
+                    break
+                put(file_metadata)
+        finally:
+            put(_SCAN_DONE)
+
+    producer = asyncio.ensure_future(asyncio.to_thread(produce))
+    item: Any = None
+    try:
+        while True:
+            item = await queue.get()
+            if item is _SCAN_DONE:
+                break
+            yield item
+    finally:
+        stop.set()
+        while item is not _SCAN_DONE:
+            item = await queue.get()
+        # Re-raises anything the scan itself raised
+        await producer
+
+
+async def _iter_files(
+    files: List[FileMetadata],
+) -> AsyncGenerator[FileMetadata, None]:
+    for file_metadata in files:
+        yield file_metadata
+
+
+async def _batch_process_files_async(
+    valid_files: Union[List[FileMetadata], AsyncIterator[FileMetadata]], task
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Pipelined batch ingestion.
+
+    Files are read and parsed concurrently in a worker pool
+    (``settings.batch_parse_workers``) and handed through a bounded queue to a
+    single writer, which persists them ``settings.batch_db_flush_size`` at a
+    time. If a group insert fails, its files are retried one per transaction
+    so a single bad file only fails itself.
+
+    ``valid_files`` may be an async iterator, e.g. a directory scan still in
+    progress; files start parsing as soon as they are yielded.
+    """
+    total_files: Optional[int] = None
+    if isinstance(valid_files, list):
+        total_files = len(valid_files)
+        valid_files = _iter_files(valid_files)
+    submitted = 0
+    flush_size = max(1, settings.batch_db_flush_size)
+    parse_workers = max(1, settings.batch_parse_workers)
+
+    successful: List[Dict[str, Any]] = []
+    failed: List[Dict[str, Any]] = []
+    queue: asyncio.Queue = asyncio.Queue(maxsize=flush_size * 2)
+    parse_slots = asyncio.Semaphore(parse_workers * 2)
+    loop = asyncio.get_running_loop()
+
+    def report_progress() -> None:
+        processed = len(successful) + len(failed)
+        # While a scan is still streaming in, only the files seen so far count
+        total = total_files if total_files is not None else submitted
+        task.update_state(
+            state="PROCESSING",
+            meta={
+                "status": f"Processed {processed} of {total} files",
+                "files_processed": processed,
+                "successful": len(successful),
+                "failed": len(failed),
+                "progress": int((processed / total) * 100) if total else 100,
+            },
+        )
+
+    def record_failure(file_metadata: FileMetadata, error: Exception) -> None:
+        logger.error(
+            "Failed to process file in batch",
+            file_path=str(file_metadata.file_path),
+            error=str(error),
+        )
+        failed.append({"file_path": str(file_metadata.file_path), "error": str(error)})
+
+    async def persist(group: List[Tuple[FileMetadata, Dict[str, Any]]]) -> None:
+        async with AsyncSessionLocal() as db:
+            try:
+                job_ids = await _bulk_write_parsed_files(db, group)
+                for (file_metadata, _), job_id in zip(group, job_ids):
+                    file_metadata.job_id = job_id
+                await file_manifest_service.record(db, [meta for meta, _ in group])
+                await db.commit()
+                await cache_service.invalidate_jobs_cache(
+                    job_id for job_id in job_ids if job_id is not None
+                )
+                for file_metadata, _ in group:
+                    successful.append(
+                        {
+                            "file_path": str(file_metadata.file_path),
+                            "job_id": file_metadata.job_id,
+                            "updated": file_metadata.change_status == "modified",
+                        }
+                    )
+                return
+            except Exception as e:
+                await db.rollback()
+                if len(group) == 1:
+                    record_failure(group[0][0], e)
+                    return
+                logger.warning(
+                    "Bulk insert failed, retrying files individually",
+                    group_size=len(group),
+                    error=str(e),
+                )
+
+        for item in group:
+            await persist([item])
+
+    async def parse_one(executor: Executor, file_metadata: FileMetadata) -> None:
+        try:
+            parsed = await loop.run_in_executor(
+                executor,
+                _parse_file_for_ingestion,
+                str(file_metadata.file_path),
+                file_metadata.encoding,
+                file_metadata.language or "en",
+            )
+            await queue.put((file_metadata, parsed, None))
+        except Exception as e:
+            await queue.put((file_metadata, None, e))
+        finally:
+            parse_slots.release()
+
+    async def parse_stage(executor: Executor) -> None:
+        nonlocal submitted
+        parsing: List[asyncio.Task] = []
+        try:
+            async for file_metadata in valid_files:
+                # Pull from the source only as fast as files can be parsed
+                await parse_slots.acquire()
+                submitted += 1
+                parsing.append(asyncio.create_task(parse_one(executor, file_metadata)))
+            await asyncio.gather(*parsing)
+        finally:
+            for pending in parsing:
+                pending.cancel()
+            await queue.put(None)
+
+    async def persist_stage() -> None:
+        group: List[Tuple[FileMetadata, Dict[str, Any]]] = []
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            file_metadata, parsed, error = item
+            if error is not None:
+                record_failure(file_metadata, error)
+                continue
+            group.append((file_metadata, parsed))
+            if len(group) >= flush_size:
+                await persist(group)
+                group = []
+                report_progress()
+        if group:
+            await persist(group)
+        report_progress()
+
+    with _create_parse_executor(parse_workers) as executor:
+        await asyncio.gather(parse_stage(executor), persist_stage())
+
+    return {"successful": successful, "failed": failed}
+
+
+async def _batch_process_directory_async(
+    file_discovery: FileDiscovery,
+    task,
+    recursive: bool = True,
+    max_files: Optional[int] = None,
+    incremental: bool = True,
+) -> Dict[str, Any]:
+    """
+    Scan a directory and ingest the files that need it.
+
+    Ingestion starts while the scan is still running: files are classified
+    as ``iter_scan`` yields them and fed straight into the ingestion pipeline.
+    ``max_files`` caps the files ingested, but the scan still covers the
+    whole directory so the summary counts do too.
+
+    In incremental mode the scan runs against the persisted file manifest, so
+    only files whose stat signature changed are hashed. Unchanged files are
+    skipped, modified ones are updated in place, and new files whose content
+    hash is already ingested are skipped as duplicates. Duplicates are
+    recorded in the manifest without a job, so a later edit to the copy is
+    ingested as a new job rather than overwriting the original's.
+    """
+    manifest: Optional[Dict[str, ManifestEntry]] = None
+    if incremental:
+        async with AsyncSessionLocal() as db:
+            manifest = await file_manifest_service.load(
+                db, file_discovery.data_directory
+            )
+
+    summary: Dict[str, Any] = {
+        "total_files_found": 0,
+        "valid_files_found": 0,
+        "unchanged_files": 0,
+        "duplicate_files": 0,
+        "successful": [],
+        "failed": [],
+    }
+    manifest_refresh: List[FileMetadata] = []
+    seen_hashes = set()
+    queued = 0
+
+    def signature_changed(entry: ManifestEntry, file_metadata: FileMetadata) -> bool:
+        return (
+            entry.file_size != file_metadata.file_size
+            or entry.mtime_ns != file_metadata.mtime_ns
+            or entry.inode != file_metadata.inode
+        )
+
+    async def resolve_new_files(new_files: List[FileMetadata]) -> List[FileMetadata]:
+        """Skip new files whose content is already ingested; return the rest."""
+        async with AsyncSessionLocal() as db:
+            existing_jobs = await file_manifest_service.find_jobs_by_hash(
+                db, [f.file_hash for f in new_files]
+            )
+        to_ingest = []
+        for file_metadata in new_files:
+            if file_metadata.file_hash in existing_jobs:
+                # The job belongs to the file it was ingested from, so the
+                # copy is tracked without one and never updates it in place
+                assert manifest is not None
+                entry = manifest.get(
+                    FileDiscovery.manifest_key(file_metadata.file_path)
+                )
+                if (
+                    entry is None
+                    or entry.job_id is not None
+                    or entry.file_hash != file_metadata.file_hash
+                    or signature_changed(entry, file_metadata)
+                ):
+                    manifest_refresh.append(file_metadata)
+                summary["duplicate_files"] += 1
+            elif file_metadata.file_hash in seen_hashes:
+                summary["duplicate_files"] += 1
+            else:
+                seen_hashes.add(file_metadata.file_hash)
+                to_ingest.append(file_metadata)
+        return to_ingest
+
+    def admit(ready: List[FileMetadata]) -> List[FileMetadata]:
+        nonlocal queued
+        if max_files:
+            ready = ready[: max(0, max_files - queued)]
+        queued += len(ready)
+        return ready
+
+    async def files_to_process() -> AsyncGenerator[FileMetadata, None]:
+        # New files are looked up by content hash one flush group at a time
+        lookup_size = max(1, settings.batch_db_flush_size)
+        new_files: List[FileMetadata] = []
+
+        async with aclosing(
+            _iter_scan_async(file_discovery, recursive, manifest)
+        ) as scan:
+            async for file_metadata in scan:
+                summary["total_files_found"] += 1
+                if not file_metadata.is_valid:
+                    continue
+                summary["valid_files_found"] += 1
+
+                ready: List[FileMetadata] = []
+                if manifest is None:
+                    ready.append(file_metadata)
+                elif (
+                    file_metadata.change_status == "unchanged" and file_metadata.job_id
+                ):
+                    summary["unchanged_files"] += 1
+                    entry = manifest[
+                        FileDiscovery.manifest_key(file_metadata.file_path)
+                    ]
+                    if signature_changed(entry, file_metadata):
+                        # Touched but identical content: just refresh the signature
+                        manifest_refresh.append(file_metadata)
+                elif file_metadata.change_status == "modified" and file_metadata.job_id:
+                    ready.append(file_metadata)
+                else:
+                    # Never seen, or its job has since been deleted
+                    file_metadata.change_status = "new"
+                    file_metadata.job_id = None
+                    new_files.append(file_metadata)
+                    if len(new_files) >= lookup_size:
+                        ready.extend(await resolve_new_files(new_files))
+                        new_files = []
+
+                for ready_file in admit(ready):
+                    yield ready_file
+
+        if new_files:
+            for ready_file in admit(await resolve_new_files(new_files)):
+                yield ready_file
+
+    async with aclosing(files_to_process()) as files:
+        summary.update(await _batch_process_files_async(files, task))
+
+    if manifest is not None:
+        if manifest_refresh:
+            async with AsyncSessionLocal() as db:
+                await file_manifest_service.record(db, manifest_refresh)
+                await db.commit()
+
+        logger.info(
+            "Incremental scan classified files",
+            to_process=queued,
+            unchanged=summary["unchanged_files"],
+            duplicates=summary["duplicate_files"],
+        )
+
+    return summary
+
+
 def _handle_task_failure(task, exc: Exception, task_name: str, **context) -> None:
     """
     Handle task failure by logging and potentially sending to dead letter queue.
@@ -1,26 +1,103 @@
 """
 Redis-based caching utilities for performance optimization.
+
+Values are cached in two tiers: a short-lived in-process L1 per worker in
+front of Redis (L2). Deletes and tag invalidations are broadcast over Redis
+pub/sub so every worker drops its L1 copy immediately; otherwise an L1 entry
+lives at most ``settings.cache_l1_ttl_seconds``.
 """
 
 import json
 import asyncio
 import hashlib
-from typing import Any, Optional, Dict, List, Union
+import zlib
+from typing import Any, Iterable, Optional, Dict, List, Set, Union
 import redis.asyncio as redis
 from functools import wraps
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
 from ..config import settings
+from .caching import _MISSING, ResultCache
 from .logging import get_logger, PerformanceTimer
 
 logger = get_logger(__name__)
 
+# First byte of a cached payload; values written before the header was
+# introduced are plain JSON text and never start with these bytes
+_FORMAT_JSON = b"\x01"
+_FORMAT_ZLIB = b"\x02"
+_FORMAT_ZSTD = b"\x03"
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a value to a compact, optionally compressed payload."""
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            data = None  # e.g. integers wider than 64 bits; fall back to json
+    if data is None:
+        data = json.dumps(value, default=str, separators=(",", ":")).encode()
+
+    if len(data) < settings.cache_compression_min_bytes:
+        return _FORMAT_JSON + data
+    if zstandard is not None:
+        return _FORMAT_ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return _FORMAT_ZLIB + zlib.compress(data, 1)
+
+
+def _loads(payload: Union[bytes, str]) -> Any:
+    """Deserialize a payload produced by ``_dumps`` (or legacy JSON text)."""
+    if isinstance(payload, str):
+        return json.loads(payload)
+
+    header, data = payload[:1], payload[1:]
+    if header == _FORMAT_ZLIB:
+        data = zlib.decompress(data)
+    elif header == _FORMAT_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is required to read this cache entry")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif header != _FORMAT_JSON:
+        data = payload
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
 class CacheService:
-    """Redis-based caching service for performance optimization."""
+    """
+    Redis-based caching service for performance optimization.
+
+    Entries can be tagged with the jobs they depend on. Each tag is a Redis
+    set of entry keys, so invalidating a job deletes exactly the entries
+    registered for it instead of scanning the keyspace.
+    """
+
+    # Tag sets outlive any entry registered in them; refreshed on every write
+    TAG_TTL_SECONDS = 86400
+    # Tag for entries aggregated over all jobs (facets, filter statistics)
+    JOBS_AGGREGATE_TAG = "jobs:aggregate"
+    INVALIDATION_CHANNEL = "cache:invalidate"
 
     def __init__(self):
         """Initialize the cache service."""
         self.redis_client = None
+        self.local_cache: Optional[ResultCache] = None
+        if settings.cache_l1_enabled:
+            self.local_cache = ResultCache(
+                max_entries=settings.cache_l1_max_entries,
+                max_bytes=settings.cache_l1_max_bytes,
+            )
+        self._listener_task: Optional[asyncio.Task] = None
         self._init_redis()
 
     def _init_redis(self):
@@ -28,7 +105,7 @@ class CacheService:
         try:
             self.redis_client = redis.from_url(
                 settings.redis_url,
-                decode_responses=True,
+                decode_responses=False,
                 max_connections=settings.redis_max_connections,
                 retry_on_timeout=settings.redis_retry_on_timeout,
                 socket_keepalive=settings.redis_socket_keepalive,
@@ -59,30 +136,129 @@ class CacheService:
         hash_key = hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
         return f"{prefix}:{hash_key}"
 
+    def _get_local(self, key: str) -> Any:
+        if self.local_cache is None:
+            return _MISSING
+        payload = self.local_cache.get(key)
+        return payload if payload is _MISSING else _loads(payload)
+
+    def _set_local(self, key: str, payload: bytes, expiry_seconds: int) -> None:
+        if self.local_cache is not None:
+            ttl = min(expiry_seconds, settings.cache_l1_ttl_seconds)
+            self.local_cache.set(key, payload, ttl)
+
+    def _evict_local(self, keys: Iterable[Union[bytes, str]]) -> None:
+        if self.local_cache is None:
+            return
+        for key in keys:
+            self.local_cache.delete(key.decode() if isinstance(key, bytes) else key)
+
+    async def _publish_invalidation(self, keys: Iterable[Union[bytes, str]]) -> None:
+        """Drop ``keys`` from this worker's L1 and tell the other workers to."""
+        names = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        self._evict_local(names)
+        if not names or self.local_cache is None:
+            return
+        try:
+            await self.redis_client.publish(self.INVALIDATION_CHANNEL, "\n".join(names))
+        except Exception as e:
+            logger.warning("Cache invalidation broadcast failed", error=str(e))
+
     async def get(self, key: str) -> Optional[Any]:
-        """Get cached value by key."""
+        """Get cached value by key, checking the in-process L1 first."""
         if not self.redis_client:
             return None
 
         try:
+            value = self._get_local(key)
+            if value is not _MISSING:
+                return value
+
             with PerformanceTimer("cache_get", tags={"key_prefix": key.split(":")[0]}):
                 cached_data = await self.redis_client.get(key)
                 if cached_data:
-                    return json.loads(cached_data)
+                    value = _loads(cached_data)
+                    if isinstance(cached_data, bytes):
+                        self._set_local(key, cached_data, settings.cache_l1_ttl_seconds)
+                    return value
                 return None
         except Exception as e:
             logger.error("Cache get failed", key=key, error=str(e))
             return None
 
-    async def set(self, key: str, value: Any, expiry_seconds: int = 3600) -> bool:
-        """Set cache value with expiry."""
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several cached values with a single MGET.
+
+        Keys found in L1 are not sent to Redis. Returns only the keys found.
+        """
+        found: Dict[str, Any] = {}
+        if not self.redis_client:
+            return found
+
+        try:
+            pending = []
+            for key in dict.fromkeys(keys):
+                value = self._get_local(key)
+                if value is _MISSING:
+                    pending.append(key)
+                else:
+                    found[key] = value
+            if not pending:
+                return found
+
+            with PerformanceTimer("cache_get_many", tags={"keys": len(pending)}):
+                for key, cached_data in zip(
+                    pending, await self.redis_client.mget(pending)
+                ):
+                    if cached_data:
+                        found[key] = _loads(cached_data)
+                        if isinstance(cached_data, bytes):
+                            self._set_local(
+                                key, cached_data, settings.cache_l1_ttl_seconds
+                            )
+            return found
+        except Exception as e:
+            logger.error("Cache get_many failed", error=str(e))
+            return found
+
+    @staticmethod
+    def job_tag(job_id: int) -> str:
+        """Tag for entries that depend on a job description."""
+        return f"job:{job_id}"
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"tag:{tag}"
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiry_seconds: int = 3600,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Set cache value with expiry, registering it under ``tags``."""
         if not self.redis_client:
             return False
 
         try:
             with PerformanceTimer("cache_set", tags={"key_prefix": key.split(":")[0]}):
-                serialized_value = json.dumps(value, default=str)
-                await self.redis_client.setex(key, expiry_seconds, serialized_value)
+                serialized_value = _dumps(value)
+                tag_keys = {self._tag_key(tag) for tag in tags or ()}
+                if not tag_keys:
+                    await self.redis_client.setex(key, expiry_seconds, serialized_value)
+                    self._set_local(key, serialized_value, expiry_seconds)
+                    return True
+
+                tag_ttl = max(expiry_seconds, self.TAG_TTL_SECONDS)
+                pipe = self.redis_client.pipeline(transaction=True)
+                pipe.setex(key, expiry_seconds, serialized_value)
+                for tag_key in sorted(tag_keys):
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, tag_ttl)
+                await pipe.execute()
+                self._set_local(key, serialized_value, expiry_seconds)
                 return True
         except Exception as e:
             logger.error("Cache set failed", key=key, error=str(e))
@@ -95,11 +271,35 @@ class CacheService:
 
         try:
             await self.redis_client.delete(key)
+            await self._publish_invalidation([key])
             return True
         except Exception as e:
             logger.error("Cache delete failed", key=key, error=str(e))
             return False
 
+    async def set_many(
+        self, values: Dict[str, Any], expiry_seconds: int = 3600
+    ) -> bool:
+        """Set several cache values with expiry in one pipelined round trip."""
+        if not self.redis_client:
+            return False
+        if not values:
+            return True
+
+        try:
+            with PerformanceTimer("cache_set_many", tags={"keys": len(values)}):
+                payloads = {key: _dumps(value) for key, value in values.items()}
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    pipe.setex(key, expiry_seconds, payload)
+                await pipe.execute()
+                for key, payload in payloads.items():
+                    self._set_local(key, payload, expiry_seconds)
+                return True
+        except Exception as e:
+            logger.error("Cache set_many failed", error=str(e))
+            return False
+
     async def get_or_set(
         self, key: str, fetch_func, expiry_seconds: int = 3600, *args, **kwargs
     ) -> Optional[Any]:
@@ -132,12 +332,22 @@ class CacheService:
         filters: Dict[str, Any],
         results: List[Dict],
         expiry_seconds: int = 1800,  # 30 minutes
+        job_ids: Iterable[int] = (),
     ) -> bool:
-        """Cache search results."""
+        """
+        Cache search results, invalidated when any of ``job_ids`` changes.
+
+        Jobs that start matching the query only appear once the entry expires.
+        """
         cache_key = self._generate_cache_key(
             "search", {"query": query, "filters": filters}
         )
-        return await self.set(cache_key, results, expiry_seconds)
+        return await self.set(
+            cache_key,
+            results,
+            expiry_seconds,
+            tags=[self.job_tag(job_id) for job_id in job_ids],
+        )
 
     async def get_cached_search_results(
         self, query: str, filters: Dict[str, Any]
@@ -154,22 +364,58 @@ class CacheService:
         limit: int,
         results: List[Dict],
         expiry_seconds: int = 3600,  # 1 hour
+        related_job_ids: Iterable[int] = (),
+        use_centroid: bool = False,
+        classification_filter: Optional[str] = None,
+        language_filter: Optional[str] = None,
     ) -> bool:
-        """Cache similar jobs results."""
-        cache_key = self._generate_cache_key(
-            "similar", {"job_id": job_id, "limit": limit}
+        """
+        Cache similar jobs results.
+
+        Invalidated when the source job or any of ``related_job_ids`` (the
+        jobs in the results) changes.
+        """
+        cache_key = self._similar_jobs_key(
+            job_id, limit, use_centroid, classification_filter, language_filter
         )
-        return await self.set(cache_key, results, expiry_seconds)
+        tags = [self.job_tag(job_id)]
+        tags.extend(self.job_tag(related_id) for related_id in related_job_ids)
+        return await self.set(cache_key, results, expiry_seconds, tags=tags)
 
     async def get_cached_similar_jobs(
-        self, job_id: int, limit: int
+        self,
+        job_id: int,
+        limit: int,
+        use_centroid: bool = False,
+        classification_filter: Optional[str] = None,
+        language_filter: Optional[str] = None,
     ) -> Optional[List[Dict]]:
         """Get cached similar jobs."""
-        cache_key = self._generate_cache_key(
-            "similar", {"job_id": job_id, "limit": limit}
+        cache_key = self._similar_jobs_key(
+            job_id, limit, use_centroid, classification_filter, language_filter
         )
         return await self.get(cache_key)
 
+    def _similar_jobs_key(
+        self,
+        job_id: int,
+        limit: int,
+        use_centroid: bool,
+        classification_filter: Optional[str],
+        language_filter: Optional[str],
+    ) -> str:
+        """Build the cache key for a similar jobs request."""
+        return self._generate_cache_key(
+            "similar",
+            {
+                "job_id": job_id,
+                "limit": limit,
+                "use_centroid": use_centroid,
+                "classification": classification_filter,
+                "language": language_filter,
+            },
+        )
+
     async def cache_job_comparison(
         self,
         job_id1: int,
@@ -183,7 +429,12 @@ class CacheService:
         cache_key = self._generate_cache_key(
             "comparison", {"job_id1": ids[0], "job_id2": ids[1]}
         )
-        return await self.set(cache_key, comparison_data, expiry_seconds)
+        return await self.set(
+            cache_key,
+            comparison_data,
+            expiry_seconds,
+            tags=[self.job_tag(job_id) for job_id in ids],
+        )
 
     async def get_cached_job_comparison(
         self, job_id1: int, job_id2: int
@@ -195,29 +446,51 @@ class CacheService:
         )
         return await self.get(cache_key)
 
-    async def invalidate_job_cache(self, job_id: int) -> bool:
-        """Invalidate all cache entries related to a specific job."""
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every entry registered under any of ``tags``, and the tags.
+
+        Costs O(entries registered under the tags); returns the number of
+        entry keys deleted, or -1 if the cache is unavailable or fails.
+        """
+        tag_keys = sorted({self._tag_key(tag) for tag in tags})
         if not self.redis_client:
-            return False
+            return -1
+        if not tag_keys:
+            return 0
 
         try:
-            # Find keys that contain this job_id
-            patterns = [
-                f"search:*job_id*{job_id}*",
-                f"similar:*job_id*{job_id}*",
-                f"comparison:*job_id*{job_id}*",
-            ]
-
-            for pattern in patterns:
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
-
-            logger.info("Job cache invalidated", job_id=job_id)
-            return True
+            pipe = self.redis_client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members: Set[bytes] = set()
+            for tag_members in await pipe.execute():
+                members.update(tag_members or ())
+
+            await self.redis_client.delete(*members, *tag_keys)
+            await self._publish_invalidation(members)
+            return len(members)
         except Exception as e:
-            logger.error("Cache invalidation failed", job_id=job_id, error=str(e))
+            logger.error("Cache tag invalidation failed", tags=tag_keys, error=str(e))
+            return -1
+
+    async def invalidate_job_cache(self, job_id: int) -> bool:
+        """Invalidate all cache entries related to a specific job."""
+        return await self.invalidate_jobs_cache([job_id])
+
+    async def invalidate_jobs_cache(self, job_ids: Iterable[int]) -> bool:
+        """
+        Invalidate all cache entries related to any of ``job_ids``.
+
+        Entries aggregated over all jobs are invalidated as well.
+        """
+        job_ids = list(job_ids)
+        tags = [self.job_tag(job_id) for job_id in job_ids]
+        deleted = await self.invalidate_tags([self.JOBS_AGGREGATE_TAG, *tags])
+        if deleted < 0:
             return False
+        logger.info("Job cache invalidated", job_ids=job_ids, entries=deleted)
+        return True
 
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache usage statistics."""
@@ -241,6 +514,10 @@ class CacheService:
                 ),
                 "expired_keys": info.get("expired_keys", 0),
                 "evicted_keys": info.get("evicted_keys", 0),
+                "serializer": "orjson" if orjson is not None else "json",
+                "local_cache": (
+                    self.local_cache.stats() if self.local_cache is not None else None
+                ),
             }
 
             return stats
@@ -248,6 +525,50 @@ class CacheService:
             logger.error("Failed to get cache stats", error=str(e))
             return {"status": "error", "error": str(e)}
 
+    async def start_invalidation_listener(self) -> bool:
+        """Start evicting L1 entries invalidated by other workers."""
+        if not self.redis_client or self.local_cache is None:
+            return False
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen_for_invalidations())
+        return True
+
+    async def stop_invalidation_listener(self) -> None:
+        """Stop the invalidation listener started by this worker."""
+        task, self._listener_task = self._listener_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen_for_invalidations(self) -> None:
+        local_cache = self.local_cache
+        assert local_cache is not None, "listener started without an L1 cache"
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                # Anything invalidated while unsubscribed may still be in L1
+                local_cache.delete_matching()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        data = message["data"]
+                        if isinstance(data, bytes):
+                            data = data.decode()
+                        self._evict_local(data.split("\n"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener failed", error=str(e))
+                await asyncio.sleep(settings.cache_l1_ttl_seconds)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
 
 # Global cache service instance
 cache_service = CacheService()
@@ -1,40 +1,200 @@
 """
 Caching utilities for expensive operations.
 
-Provides simple Redis-based caching for API endpoints and service methods.
+Provides an in-process result cache for API endpoints and service methods:
+entries expire after their TTL, the least recently used entries are evicted
+once the entry or byte budget is exceeded, and concurrent misses for the same
+key share a single call of the wrapped function.
 Optimized for ≤100 concurrent users.
 """
 
-from functools import wraps
-from typing import Any, Callable, Optional
+import asyncio
 import hashlib
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import settings
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-# Simple in-memory cache as fallback if Redis unavailable
-_memory_cache: dict[str, Any] = {}
+_MISSING = object()
+# Nesting depth walked when estimating the size of a cached value
+_SIZE_ESTIMATE_DEPTH = 6
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """Approximate the memory footprint of ``value`` in bytes."""
+    size = sys.getsizeof(value, 64)
+    if depth >= _SIZE_ESTIMATE_DEPTH:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            _estimate_size(k, depth + 1) + _estimate_size(v, depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, depth + 1) for item in value)
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry expiry and a byte budget."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size); ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or ``_MISSING`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        """Store ``value`` for ``ttl`` seconds (no expiry if falsy)."""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return False
+        expires_at = time.monotonic() + ttl if ttl and ttl > 0 else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.total_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def delete(self, key: str) -> bool:
+        """Remove ``key``; returns whether it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def delete_matching(self, pattern: Optional[str] = None) -> int:
+        """Remove entries whose key contains ``pattern`` (all if None)."""
+        with self._lock:
+            if pattern is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self.total_bytes = 0
+                return count
+            keys = [key for key in self._entries if pattern in key]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+        }
+
+
+_memory_cache = ResultCache(
+    max_entries=settings.result_cache_max_entries,
+    max_bytes=settings.result_cache_max_bytes,
+)
 _cache_enabled = True
 
+# Misses currently being computed, for single-flight coalescing
+_async_inflight: Dict[str, asyncio.Future] = {}
+_sync_inflight: Dict[str, threading.Event] = {}
+_sync_inflight_lock = threading.Lock()
+
 
-def _generate_cache_key(prefix: str, *args, **kwargs) -> str:
-    """Generate deterministic cache key from function arguments."""
-    key_data = f"{prefix}:{str(args)}:{str(sorted(kwargs.items()))}"
-    return hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
+def _generate_cache_key(
+    prefix: str, *args, ignore_args: Iterable[str] = (), **kwargs
+) -> str:
+    """
+    Generate deterministic cache key from function arguments.
+
+    Database sessions and arguments named in ``ignore_args`` are left out, so
+    endpoint calls that only differ by their injected session share a key.
+    """
+    key_args = [arg for arg in args if not isinstance(arg, AsyncSession)]
+    key_kwargs = sorted(
+        (name, value)
+        for name, value in kwargs.items()
+        if name not in ignore_args and not isinstance(value, AsyncSession)
+    )
+    key_data = f"{prefix}:{str(key_args)}:{str(key_kwargs)}"
+    digest = hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
+    return f"{prefix}:{digest}"
 
 
 def cache_result(
     ttl: int = 300,  # 5 minutes default
     key_prefix: Optional[str] = None,
     use_redis: bool = False,  # Memory cache by default for ≤100 users
+    ignore_args: Iterable[str] = (),
 ):
     """
     Decorator to cache function results.
 
+    Concurrent calls that miss on the same key wait for the first caller's
+    result instead of running the function again. Exceptions are not cached.
+
     Args:
         ttl: Time-to-live in seconds (default 300s / 5min)
         key_prefix: Custom key prefix (default: function name)
         use_redis: Use Redis instead of memory (for larger deployments)
+        ignore_args: Keyword argument names left out of the cache key
+            (database sessions are always left out)
 
     Usage:
         @cache_result(ttl=60)
@@ -42,77 +202,100 @@ def cache_result(
             # Expensive operation
             return result
     """
+    ignored = frozenset(ignore_args)
 
     def decorator(func: Callable) -> Callable:
         prefix = key_prefix or f"{func.__module__}.{func.__name__}"
 
+        def store(cache_key: str, result: Any) -> None:
+            try:
+                _memory_cache.set(cache_key, result, ttl)
+            except Exception as e:
+                logger.warning(f"Cache write failed: {e}", cache_key=cache_key)
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             if not _cache_enabled:
                 return await func(*args, **kwargs)
 
-            cache_key = _generate_cache_key(prefix, *args, **kwargs)
+            cache_key = _generate_cache_key(
+                prefix, *args, ignore_args=ignored, **kwargs
+            )
+            cached = _memory_cache.get(cache_key)
+            if cached is not _MISSING:
+                logger.debug(f"Cache HIT: {prefix}", cache_key=cache_key)
+                return cached
 
-            # Try to get from cache
-            try:
-                if cache_key in _memory_cache:
-                    logger.debug(f"Cache HIT: {prefix}", cache_key=cache_key)
-                    return _memory_cache[cache_key]
-            except Exception as e:
-                logger.warning(f"Cache read failed: {e}", cache_key=cache_key)
+            loop = asyncio.get_running_loop()
+            pending = _async_inflight.get(cache_key)
+            if pending is not None and pending.get_loop() is loop:
+                _memory_cache.coalesced += 1
+                try:
+                    return await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise
+                    # The caller computing the value was cancelled; compute it here
 
             # Cache miss - execute function
             logger.debug(f"Cache MISS: {prefix}", cache_key=cache_key)
-            result = await func(*args, **kwargs)
-
-            # Store in cache
+            future = loop.create_future()
+            _async_inflight[cache_key] = future
             try:
-                _memory_cache[cache_key] = result
-                # Simple TTL: Just limit cache size to 1000 entries for ≤100 users
-                if len(_memory_cache) > 1000:
-                    # Remove oldest 20% of entries
-                    keys_to_remove = list(_memory_cache.keys())[:200]
-                    for key in keys_to_remove:
-                        del _memory_cache[key]
-            except Exception as e:
-                logger.warning(f"Cache write failed: {e}", cache_key=cache_key)
-
-            return result
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved when nobody is waiting
+                raise
+            else:
+                store(cache_key, result)
+                future.set_result(result)
+                return result
+            finally:
+                if _async_inflight.get(cache_key) is future:
+                    del _async_inflight[cache_key]
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             if not _cache_enabled:
                 return func(*args, **kwargs)
 
-            cache_key = _generate_cache_key(prefix, *args, **kwargs)
+            cache_key = _generate_cache_key(
+                prefix, *args, ignore_args=ignored, **kwargs
+            )
+            cached = _memory_cache.get(cache_key)
+            if cached is not _MISSING:
+                logger.debug(f"Cache HIT: {prefix}", cache_key=cache_key)
+                return cached
 
-            # Try to get from cache
-            try:
-                if cache_key in _memory_cache:
-                    logger.debug(f"Cache HIT: {prefix}", cache_key=cache_key)
-                    return _memory_cache[cache_key]
-            except Exception as e:
-                logger.warning(f"Cache read failed: {e}", cache_key=cache_key)
+            with _sync_inflight_lock:
+                pending = _sync_inflight.get(cache_key)
+                if pending is None:
+                    done = _sync_inflight[cache_key] = threading.Event()
+            if pending is not None:
+                _memory_cache.coalesced += 1
+                pending.wait()
+                cached = _memory_cache.get(cache_key)
+                if cached is not _MISSING:
+                    return cached
+                # The first caller failed; run the function ourselves
+                return func(*args, **kwargs)
 
             # Cache miss - execute function
             logger.debug(f"Cache MISS: {prefix}", cache_key=cache_key)
-            result = func(*args, **kwargs)
-
-            # Store in cache
             try:
-                _memory_cache[cache_key] = result
-                if len(_memory_cache) > 1000:
-                    keys_to_remove = list(_memory_cache.keys())[:200]
-                    for key in keys_to_remove:
-                        del _memory_cache[key]
-            except Exception as e:
-                logger.warning(f"Cache write failed: {e}", cache_key=cache_key)
-
-            return result
+                result = func(*args, **kwargs)
+                store(cache_key, result)
+                return result
+            finally:
+                with _sync_inflight_lock:
+                    del _sync_inflight[cache_key]
+                done.set()
 
         # Return appropriate wrapper based on function type
-        import inspect
-
         if inspect.iscoroutinefunction(func):
             return async_wrapper
         else:
@@ -122,23 +305,18 @@ def cache_result(
 
 
 def clear_cache(pattern: Optional[str] = None):
-    """Clear cache entries matching pattern, or all if pattern is None."""
-    global _memory_cache
+    """Clear cache entries matching pattern (e.g. a key prefix), or all if None."""
+    count = _memory_cache.delete_matching(pattern)
     if pattern is None:
-        _memory_cache.clear()
         logger.info("Cache cleared completely")
     else:
-        keys_to_remove = [k for k in _memory_cache.keys() if pattern in k]
-        for key in keys_to_remove:
-            del _memory_cache[key]
-        logger.info(f"Cache cleared for pattern: {pattern}", count=len(keys_to_remove))
+        logger.info(f"Cache cleared for pattern: {pattern}", count=count)
 
 
 def get_cache_stats() -> dict:
     """Get cache statistics for monitoring."""
     return {
         "enabled": _cache_enabled,
-        "entries": len(_memory_cache),
-        "max_entries": 1000,
+        **_memory_cache.stats(),
         "type": "memory",
     }
@@ -12,6 +12,8 @@ Based on the principles from:
 from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 
+from .rope import Rope
+
 
 class OperationType(str, Enum):
     """Types of operations supported."""
@@ -101,12 +103,34 @@ def apply_operation(document: str, operation: Operation) -> str:
 
     elif operation.type == OperationType.DELETE:
         start = operation.start or 0
-        end = operation.end or start + 1
+        end = operation.end if operation.end is not None else start + 1
         return document[:start] + document[end:]
 
     return document
 
 
+def apply_operation_to_rope(document: Rope, operation: Operation) -> Rope:
+    """
+    Apply an operation to a rope in place.
+
+    Args:
+        document: Current document text
+        operation: Operation to apply
+
+    Returns:
+        The same rope, modified
+    """
+    if operation.type == OperationType.INSERT:
+        document.insert(operation.position or 0, operation.text or "")
+
+    elif operation.type == OperationType.DELETE:
+        start = operation.start or 0
+        end = operation.end if operation.end is not None else start + 1
+        document.delete(start, end)
+
+    return document
+
+
 def transform_operations(
     op1: Operation, op2: Operation, side: str = "left"
 ) -> Tuple[Operation, Operation]:
@@ -151,7 +175,7 @@ def transform_operations(
     elif op1.type == OperationType.INSERT and op2.type == OperationType.DELETE:
         pos1 = op1.position or 0
         start2 = op2.start or 0
-        end2 = op2.end or start2 + 1
+        end2 = op2.end if op2.end is not None else start2 + 1
 
         if pos1 <= start2:
             # Insert happens before delete range
@@ -190,9 +214,9 @@ def transform_operations(
     # DELETE vs DELETE
     elif op1.type == OperationType.DELETE and op2.type == OperationType.DELETE:
         start1 = op1.start or 0
-        end1 = op1.end or start1 + 1
+        end1 = op1.end if op1.end is not None else start1 + 1
         start2 = op2.start or 0
-        end2 = op2.end or start2 + 1
+        end2 = op2.end if op2.end is not None else start2 + 1
 
         if end1 <= start2:
             # Delete ranges don't overlap, op1 is before op2
@@ -258,7 +282,8 @@ def compose_operations(op1: Operation, op2: Operation) -> Optional[Operation]:
     Compose two sequential operations into a single operation.
 
     This is used to optimize operation history by combining
-    consecutive operations when possible.
+    consecutive operations when possible: typing and backspacing
+    produce runs of adjacent inserts and deletes that compose into one.
 
     Args:
         op1: First operation
@@ -267,33 +292,80 @@ def compose_operations(op1: Operation, op2: Operation) -> Optional[Operation]:
     Returns:
         Composed operation, or None if operations cannot be composed
     """
-    # INSERT + INSERT at same position
-    if (
-        op1.type == OperationType.INSERT
-        and op2.type == OperationType.INSERT
-        and op1.position == op2.position
-    ):
-        return Operation(
-            OperationType.INSERT,
-            position=op1.position,
-            text=(op1.text or "") + (op2.text or ""),
-        )
+    # INSERT + INSERT that lands inside or at either end of the first text
+    if op1.type == OperationType.INSERT and op2.type == OperationType.INSERT:
+        pos1 = op1.position or 0
+        pos2 = op2.position or 0
+        text1 = op1.text or ""
+        if pos1 <= pos2 <= pos1 + len(text1):
+            offset = pos2 - pos1
+            return Operation(
+                OperationType.INSERT,
+                position=pos1,
+                text=text1[:offset] + (op2.text or "") + text1[offset:],
+            )
 
-    # INSERT + DELETE that deletes the inserted text
-    if (
-        op1.type == OperationType.INSERT
-        and op2.type == OperationType.DELETE
-        and op1.position is not None
-        and op2.start == op1.position
-        and op2.end == op1.position + len(op1.text or "")
-    ):
-        # Operations cancel out
-        return None
+    # INSERT + DELETE within the inserted text
+    if op1.type == OperationType.INSERT and op2.type == OperationType.DELETE:
+        pos1 = op1.position or 0
+        text1 = op1.text or ""
+        start2 = op2.start or 0
+        end2 = op2.end if op2.end is not None else start2 + 1
+        if pos1 <= start2 and end2 <= pos1 + len(text1):
+            # Deleting all of the inserted text leaves an empty insert
+            return Operation(
+                OperationType.INSERT,
+                position=pos1,
+                text=text1[: start2 - pos1] + text1[end2 - pos1 :],
+            )
+
+    # DELETE + DELETE of adjacent ranges (backspace or forward delete runs)
+    if op1.type == OperationType.DELETE and op2.type == OperationType.DELETE:
+        start1 = op1.start or 0
+        end1 = op1.end if op1.end is not None else start1 + 1
+        start2 = op2.start or 0
+        end2 = op2.end if op2.end is not None else start2 + 1
+        if start2 <= start1 <= end2:
+            return Operation(
+                OperationType.DELETE,
+                start=start2,
+                end=end2 + (end1 - start1),
+            )
 
     # Cannot compose
     return None
 
 
+def compose_operation_sequence(operations: List[Operation]) -> List[Operation]:
+    """
+    Coalesce consecutive composable operations in a sequence.
+
+    Args:
+        operations: Operations in the order they are applied
+
+    Returns:
+        Equivalent, usually shorter, list of operations without no-ops
+    """
+    composed: List[Operation] = []
+    for operation in operations:
+        if composed:
+            merged = compose_operations(composed[-1], operation)
+            if merged is not None:
+                composed[-1] = merged
+                continue
+        composed.append(operation)
+    return [op for op in composed if not _is_noop(op)]
+
+
+def _is_noop(operation: Operation) -> bool:
+    if operation.type == OperationType.INSERT:
+        return not operation.text
+    if operation.type == OperationType.DELETE:
+        start = operation.start or 0
+        return operation.end is not None and operation.end <= start
+    return operation.type == OperationType.RETAIN
+
+
 def transform_against_history(
     operation: Operation, history: List[Operation]
 ) -> Operation:
@@ -313,7 +385,35 @@ def transform_against_history(
     transformed = operation
 
     for hist_op in history:
-        transformed, _ = transform_operations(hist_op, transformed, "left")
+        _, transformed = transform_operations(hist_op, transformed, "left")
+
+    return transformed
+
+
+def transform_batch_against_history(
+    operations: List[Operation], history: List[Operation]
+) -> List[Operation]:
+    """
+    Transform a sequence of operations against a history of operations.
+
+    Each operation in ``operations`` applies after the previous one, so the
+    history is transformed past every operation in turn before it is used
+    for the next one.
+
+    Args:
+        operations: Sequential operations made against the same base
+        history: List of operations that have been applied since that base
+
+    Returns:
+        Transformed operations
+    """
+    history = list(history)
+    transformed = []
+
+    for operation in operations:
+        for i, hist_op in enumerate(history):
+            history[i], operation = transform_operations(hist_op, operation, "left")
+        transformed.append(operation)
 
     return transformed
 
@@ -335,7 +435,7 @@ def validate_operation(operation: Operation, document_length: int) -> bool:
 
     elif operation.type == OperationType.DELETE:
         start = operation.start or 0
-        end = operation.end or start + 1
+        end = operation.end if operation.end is not None else start + 1
         return (
             0 <= start <= document_length
             and 0 <= end <= document_length
@@ -0,0 +1,177 @@
+"""
+Sorted-array prefix index for query autocomplete.
+
+Every term is stored under each of its word starts, so "senior policy
+analyst" is found by "sen", "pol" and "ana". The keys are kept in one
+sorted list, and the keys matching a prefix form the contiguous range
+between two bisections.
+
+The array is split into blocks of ``BLOCK_SIZE`` keys, each with the top-k
+terms among its keys. A short prefix can match tens of thousands of keys,
+but ranking it only looks at the keys in the partial blocks at either end
+of its range and the top-k of each block in between. Results are also
+memoized per prefix until the index changes.
+
+Terms added after the build go into a small second sorted array instead of
+shifting the main one; the index is meant to be rebuilt periodically.
+"""
+
+import bisect
+import heapq
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+BLOCK_SIZE = 256
+MAX_WORD_STARTS = 8  # Keys per term; later words of long titles are not indexed
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD_START = re.compile(r"(?<!\w)\w")
+_END = "\U0010ffff"  # Sorts after every character, bounds a prefix range
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse whitespace, the form terms are matched in."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _word_suffixes(normalized: str) -> List[str]:
+    starts = [m.start() for m in _WORD_START.finditer(normalized)][:MAX_WORD_STARTS]
+    return [normalized[start:] for start in starts]
+
+
+def _range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    low = bisect.bisect_left(keys, prefix)
+    return low, bisect.bisect_left(keys, prefix + _END, low)
+
+
+class IndexedTerm(NamedTuple):
+    """A term as returned by a search."""
+
+    text: str
+    score: float
+    payload: Any
+
+
+class PrefixIndex:
+    """Scored terms, searchable by a prefix of any of their words."""
+
+    def __init__(self, top_k: int = 10, max_memoized_prefixes: int = 10000):
+        self.top_k = top_k
+        self.max_memoized_prefixes = max_memoized_prefixes
+        self._terms: Dict[str, IndexedTerm] = {}
+        # Parallel sorted arrays: word-start key and the term it belongs to
+        self._keys: List[str] = []
+        self._owners: List[str] = []
+        self._block_top: List[List[str]] = []
+        # The same for terms added since the build
+        self._added: Set[str] = set()
+        self._added_keys: List[str] = []
+        self._added_owners: List[str] = []
+        self._top: Dict[str, List[IndexedTerm]] = {}
+
+    @classmethod
+    def build(
+        cls, terms: Iterable[Tuple[str, float, Any]], **kwargs: Any
+    ) -> "PrefixIndex":
+        """Build an index from (text, score, payload) tuples in one sort."""
+        index = cls(**kwargs)
+        for text, score, payload in terms:
+            normalized = normalize(text)
+            if normalized:
+                index._terms[normalized] = IndexedTerm(text, score, payload)
+        pairs = sorted(
+            (key, normalized)
+            for normalized in index._terms
+            for key in _word_suffixes(normalized)
+        )
+        index._keys = [key for key, _ in pairs]
+        index._owners = [normalized for _, normalized in pairs]
+        index._block_top = [
+            index._best(set(index._owners[start : start + BLOCK_SIZE]))
+            for start in range(0, len(pairs), BLOCK_SIZE)
+        ]
+        return index
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def key_count(self) -> int:
+        """Number of word-start keys in the sorted arrays."""
+        return len(self._keys) + len(self._added_keys)
+
+    def get(self, text: str) -> Optional[IndexedTerm]:
+        """Get an indexed term by its text, in any case or spacing."""
+        return self._terms.get(normalize(text))
+
+    def add(self, text: str, score: float, payload: Any = None) -> None:
+        """Add a term, or replace the text, score and payload of an indexed one."""
+        normalized = normalize(text)
+        if not normalized:
+            return
+        is_new = normalized not in self._terms
+        self._terms[normalized] = IndexedTerm(text, score, payload)
+        if is_new:
+            self._added.add(normalized)
+            for key in _word_suffixes(normalized):
+                position = bisect.bisect_left(self._added_keys, key)
+                self._added_keys.insert(position, key)
+                self._added_owners.insert(position, normalized)
+        elif normalized not in self._added:
+            self._rerank_blocks(normalized)
+        self._top.clear()
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[IndexedTerm]:
+        """
+        Get the highest scoring terms with a word starting with ``prefix``.
+
+        Ties go to the shorter term. At most ``top_k`` terms are returned.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        top = self._top.get(prefix)
+        if top is None:
+            top = [self._terms[normalized] for normalized in self._rank(prefix)]
+            if len(self._top) >= self.max_memoized_prefixes:
+                self._top.clear()
+            self._top[prefix] = top
+        return top[: limit or self.top_k]
+
+    def _rank(self, prefix: str) -> List[str]:
+        low, high = _range(self._keys, prefix)
+        first_block, last_block = -(-low // BLOCK_SIZE), high // BLOCK_SIZE
+        if first_block < last_block:
+            candidates = set(self._owners[low : first_block * BLOCK_SIZE])
+            candidates.update(self._owners[last_block * BLOCK_SIZE : high])
+            for block in self._block_top[first_block:last_block]:
+                candidates.update(block)
+        else:
+            candidates = set(self._owners[low:high])
+        added_low, added_high = _range(self._added_keys, prefix)
+        candidates.update(self._added_owners[added_low:added_high])
+        return self._best(candidates)
+
+    def _best(self, candidates: Set[str]) -> List[str]:
+        terms = self._terms
+        return heapq.nsmallest(
+            self.top_k,
+            candidates,
+            key=lambda normalized: (
+                -terms[normalized].score,
+                len(normalized),
+                normalized,
+            ),
+        )
+
+    def _rerank_blocks(self, normalized: str) -> None:
+        """Recompute the top-k of the blocks holding a re-scored term's keys."""
+        for key in _word_suffixes(normalized):
+            position = bisect.bisect_left(self._keys, key)
+            while self._owners[position] != normalized:
+                position += 1
+            block = position // BLOCK_SIZE
+            start = block * BLOCK_SIZE
+            self._block_top[block] = self._best(
+                set(self._owners[start : start + BLOCK_SIZE])
+            )
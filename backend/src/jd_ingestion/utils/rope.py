@@ -0,0 +1,119 @@
+"""
+Mutable text buffer for collaborative editing sessions.
+
+A ``Rope`` keeps the document as a list of chunks of roughly
+``chunk_size`` characters. An edit rebuilds only the chunk it touches, so a
+keystroke in a 50 KB job description costs a couple of kilobytes of copying
+instead of the whole document. Edits from one user tend to be close
+together, so the chunk of the previous edit is remembered and the next
+position is found by walking from there rather than from the start.
+
+The full text is joined lazily and cached until the next edit.
+"""
+
+from typing import List, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+class Rope:
+    """Text stored as a list of bounded chunks, edited in place."""
+
+    def __init__(self, text: str = "", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._chunks: List[str] = self._split(text)
+        self._length = len(text)
+        self._text: Optional[str] = text
+        # (chunk index, offset of the chunk) of the most recent lookup
+        self._hint: Tuple[int, int] = (0, 0)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._chunks)
+        return self._text
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Rope):
+            return str(self) == str(other)
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Rope(length={self._length}, chunks={len(self._chunks)})"
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of chunks the text is currently split into."""
+        return len(self._chunks)
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert ``text`` before the character at ``position``."""
+        if not 0 <= position <= self._length:
+            raise IndexError(f"Insert position {position} out of range")
+        if not text:
+            return
+        if not self._chunks:
+            self._chunks = self._split(text)
+            self._hint = (0, 0)
+        else:
+            index, offset = self._locate(position)
+            chunk = self._chunks[index]
+            cut = position - offset
+            updated = chunk[:cut] + text + chunk[cut:]
+            if len(updated) > 2 * self.chunk_size:
+                self._chunks[index : index + 1] = self._split(updated)
+            else:
+                self._chunks[index] = updated
+        self._length += len(text)
+        self._text = None
+
+    def delete(self, start: int, end: int) -> None:
+        """Delete the characters from ``start`` up to, not including, ``end``."""
+        if not 0 <= start <= end <= self._length:
+            raise IndexError(f"Delete range {start}-{end} out of range")
+        if start == end:
+            return
+        first, first_offset = self._locate(start)
+        last, last_offset = first, first_offset
+        while end > last_offset + len(self._chunks[last]):
+            last_offset += len(self._chunks[last])
+            last += 1
+
+        remainder = (
+            self._chunks[first][: start - first_offset]
+            + self._chunks[last][end - last_offset :]
+        )
+        # Merge a small remainder into the next chunk so deletions do not
+        # leave the document fragmented into tiny chunks
+        if len(remainder) < self.chunk_size // 2 and last + 1 < len(self._chunks):
+            last += 1
+            remainder += self._chunks[last]
+        self._chunks[first : last + 1] = [remainder] if remainder else []
+        self._length -= end - start
+        self._text = None
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """Find the chunk holding ``position`` and the offset the chunk starts at."""
+        index, offset = self._hint
+        if index >= len(self._chunks):
+            index, offset = 0, 0
+        while position < offset:
+            index -= 1
+            offset -= len(self._chunks[index])
+        while index < len(self._chunks) - 1 and position > offset + len(
+            self._chunks[index]
+        ):
+            offset += len(self._chunks[index])
+            index += 1
+        self._hint = (index, offset)
+        return index, offset
+
+    def _split(self, text: str) -> List[str]:
+        size = self.chunk_size
+        return [text[i : i + size] for i in range(0, len(text), size)]
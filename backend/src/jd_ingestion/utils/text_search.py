@@ -0,0 +1,40 @@
+"""
+Query helpers for the indexed job text search columns.
+
+``job_descriptions.search_vector`` (title, sections and body) and
+``title_vector`` are built by database triggers with the text search
+configuration of each job's language; see the add_job_search_vectors
+migration. Searches match them with ``@@`` so the GIN indexes are used.
+"""
+
+from typing import Any, Optional
+
+from sqlalchemy import Text, cast, func
+from sqlalchemy.dialects.postgresql import TSQUERY
+
+# Text search configuration by job language; must match job_search_config()
+# in the add_job_search_vectors migration
+TEXT_SEARCH_CONFIGS = {"en": "english", "fr": "french"}
+
+
+def text_search_query(query: str, language: Optional[str] = None) -> Any:
+    """
+    Build a tsquery for ``query`` to match against the stored job vectors.
+
+    Each job is indexed in its own language. When no language is given, the
+    query is parsed with every configuration and a job matching any of the
+    parsed forms is a match.
+    """
+    if language:
+        configs = [TEXT_SEARCH_CONFIGS.get(language.lower(), "english")]
+    else:
+        configs = list(TEXT_SEARCH_CONFIGS.values())
+    tsquery: Any = func.plainto_tsquery(configs[0], query)
+    for config in configs[1:]:
+        tsquery = tsquery.op("||")(func.plainto_tsquery(config, query))
+    return tsquery
+
+
+def any_term(tsquery: Any) -> Any:
+    """Relax a parsed tsquery to match documents containing any of its terms."""
+    return cast(func.replace(cast(tsquery, Text), "&", "|"), TSQUERY)
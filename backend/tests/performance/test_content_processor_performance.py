@@ -0,0 +1,116 @@
+"""
+Content Processor Performance Tests
+
+Micro-benchmarks for section and structured-field extraction, the CPU hot
+path of every ingestion, over a synthetic English/French corpus.
+"""
+
+import re
+
+import pytest
+
+from src.jd_ingestion.processors.content_processor import (
+    SECTION_HEADERS,
+    ContentProcessor,
+)
+
+PARAGRAPH = (
+    "Under the direction of the Director General, responsible for managing "
+    "and directing a comprehensive business analysis program to support "
+    "strategic planning and operational effectiveness across the organization. "
+) * 3
+
+PARAGRAPHE = (
+    "Sous la direction du directeur général, responsable de la gestion et de "
+    "l'orientation d'un programme d'analyse des activités à l'appui de la "
+    "planification stratégique et de l'efficacité opérationnelle. "
+) * 3
+
+
+def _english_document(index: int) -> str:
+    return (
+        f"POSITION TITLE: Director, Business Analysis {index}\n"
+        "Department: Strategic Policy\n"
+        f"GENERAL ACCOUNTABILITY\n{PARAGRAPH}\n"
+        f"ORGANIZATION STRUCTURE\n{PARAGRAPH}\n"
+        "Reports to: Director General, Strategic Planning\n"
+        f"Supervises: {index % 20 + 1} FTE (Business Analysts)\n"
+        "Budget Authority: $2.3M annually\n"
+        f"NATURE & SCOPE\n{PARAGRAPH * 4}\n"
+        f"SPECIFIC ACCOUNTABILITIES\n{PARAGRAPH * 3}\n"
+        f"DIMENSIONS\n{PARAGRAPH}\n"
+        f"KNOWLEDGE\n{PARAGRAPH}\n"
+    )
+
+
+def _french_document(index: int) -> str:
+    return (
+        f"Titre du poste : Directeur, Analyse des activités {index}\n"
+        "Ministère : Politique stratégique\n"
+        f"RESPONSABILITÉS GÉNÉRALES\n{PARAGRAPHE}\n"
+        f"STRUCTURE ORGANISATIONNELLE\n{PARAGRAPHE}\n"
+        "Relève de : Directeur général, Planification stratégique\n"
+        f"Personnel supervisé : {index % 20 + 1}\n"
+        f"NATURE ET PORTÉE\n{PARAGRAPHE * 4}\n"
+        f"RESPONSABILITÉS SPÉCIFIQUES\n{PARAGRAPHE * 3}\n"
+        f"DIMENSIONS\n{PARAGRAPHE}\n"
+        f"CONNAISSANCES\n{PARAGRAPHE}\n"
+    )
+
+
+CORPUS = [(_english_document(i), "en") for i in range(20)] + [
+    (_french_document(i), "fr") for i in range(20)
+]
+
+
+def _baseline_extract(raw_content: str) -> None:
+    """Reference extraction: header regex built per call, one search per pattern."""
+    header_regex = re.compile(
+        r"(?:\n|^|\s)(?P<header>"
+        + "|".join(re.escape(h) for h in SECTION_HEADERS["en"])
+        + r"):?\s*",
+        re.IGNORECASE,
+    )
+    list(header_regex.finditer(raw_content))
+    for pattern in (
+        r"POSITION\s+TITLE[:\.\s]*(.+?)(?:\n|$)",
+        r"TITLE[:\.\s]*(.+?)(?:\n|$)",
+        r"Reports\s+to:\s*(.+?)(?:\n|$)",
+        r"Department:\s*(.+?)(?:\n|$)",
+        r"Staff\s+Supervised:\s*(\d+)",
+        r"Supervises:\s*(\d+)\s*FTE",
+        r"Direct\s+Reports:\s*(\d+)",
+        r"Budget\s+Responsibility:\s*\$?([\d,\.]+)(?:\s*[MK])?",
+        r"Budget\s+Authority:\s*\$?([\d,\.]+)(?:\s*[MK])?",
+        r"Budget\s+(?:Responsibility|Authority):\s*\$?[\d,\.]+\s*M",
+    ):
+        re.search(pattern, raw_content, re.IGNORECASE)
+    re.sub(r"\s+", " ", raw_content).strip()
+
+
+class TestContentProcessorPerformance:
+    """Throughput of content extraction over the sample corpus."""
+
+    @pytest.mark.benchmark(group="content_extraction")
+    def test_process_content_corpus(self, benchmark):
+        """Sections, structured fields and cleaned text for every document."""
+        processor = ContentProcessor()
+
+        def process_corpus():
+            return [
+                processor.process_content(text, language) for text, language in CORPUS
+            ]
+
+        results = benchmark(process_corpus)
+        assert all(len(result.sections) == 6 for result in results)
+        assert all(result.structured_fields.fte_count for result in results)
+
+    @pytest.mark.benchmark(group="content_extraction")
+    def test_baseline_regex_corpus(self, benchmark):
+        """Per-call compiled header regex and sequential field searches."""
+
+        def extract_corpus():
+            for text, _ in CORPUS:
+                _baseline_extract(text)
+
+        benchmark(extract_corpus)
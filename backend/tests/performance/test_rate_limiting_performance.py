@@ -0,0 +1,103 @@
+"""
+Rate Limiting Performance Tests
+
+Micro-benchmarks for the sliding window counters consulted on every
+``check_rate_limit`` call: a window already full of 10k requests per minute
+of traffic, then one check and one record per request.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from src.jd_ingestion.services.rate_limiting_service import SlidingWindowCounter
+
+REQUESTS_PER_MINUTE = 10_000
+CALLS_PER_ROUND = 100
+
+
+class DequeWindowCounter:
+    """Reference counter: one deque entry per request, summed on every read."""
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self.requests: deque = deque()
+
+    async def add_request(
+        self, amount: int = 1, timestamp: Optional[float] = None
+    ) -> None:
+        self.requests.append((timestamp or time.time(), amount))
+        self._cleanup_old_requests()
+
+    async def get_count(self) -> int:
+        self._cleanup_old_requests()
+        return sum(amount for _, amount in self.requests)
+
+    def _cleanup_old_requests(self) -> None:
+        cutoff = time.time() - self.window_seconds
+        while self.requests and self.requests[0][0] < cutoff:
+            self.requests.popleft()
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock shared by both counters, advanced per request."""
+    now = [1_700_000_000.0]
+    with (
+        patch(
+            "src.jd_ingestion.services.rate_limiting_service.time.time",
+            lambda: now[0],
+        ),
+        patch(f"{__name__}.time.time", lambda: now[0]),
+    ):
+        yield now
+
+
+async def _traffic(counter, clock: list, requests: int) -> int:
+    count = 0
+    for _ in range(requests):
+        clock[0] += 60 / REQUESTS_PER_MINUTE
+        count = await counter.get_count()
+        await counter.add_request(1)
+    return count
+
+
+async def _fill(counter, clock: list, requests: int) -> None:
+    for _ in range(requests):
+        clock[0] += 60 / REQUESTS_PER_MINUTE
+        await counter.add_request(1)
+
+
+def _benchmark_window(benchmark, counter, clock, window_seconds: int) -> None:
+    full_window = window_seconds * REQUESTS_PER_MINUTE // 60
+    asyncio.run(_fill(counter, clock, full_window))
+
+    count = benchmark.pedantic(
+        lambda: asyncio.run(_traffic(counter, clock, CALLS_PER_ROUND)),
+        rounds=3,
+        iterations=1,
+    )
+    # Sub-window granularity may count up to one extra sub-window
+    assert full_window * 0.98 <= count <= full_window * 1.02
+
+
+class TestSlidingWindowPerformance:
+    """Check-and-record cost with a full window at 10k requests per minute."""
+
+    @pytest.mark.benchmark(group="sliding_window")
+    @pytest.mark.parametrize("window_seconds", [60, 3600])
+    def test_bucketed_counter(self, benchmark, clock, window_seconds):
+        """Ring of sub-windows with a running total."""
+        counter = SlidingWindowCounter(window_seconds=window_seconds)
+        _benchmark_window(benchmark, counter, clock, window_seconds)
+
+    @pytest.mark.benchmark(group="sliding_window")
+    @pytest.mark.parametrize("window_seconds", [60, 3600])
+    def test_deque_counter(self, benchmark, clock, window_seconds):
+        """Previous implementation: the whole deque is summed on every check."""
+        counter = DequeWindowCounter(window_seconds=window_seconds)
+        _benchmark_window(benchmark, counter, clock, window_seconds)
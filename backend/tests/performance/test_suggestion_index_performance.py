@@ -0,0 +1,101 @@
+"""
+Autocomplete Performance Tests
+
+Keystroke lookups against a suggestion index the size of a large
+deployment: 50,000 distinct popular queries, job titles and skills. Every
+keystroke must be answered in under 5 ms; the 99th percentile is checked
+because a garbage collection pass can land on any single lookup.
+"""
+
+import random
+import time
+from typing import List, Tuple
+
+import pytest
+
+from src.jd_ingestion.utils.prefix_index import PrefixIndex, normalize
+
+WORDS = (
+    "senior junior policy data program project analyst advisor officer manager "
+    "director general business financial human resources security information "
+    "technology communications procurement planning operations research science "
+    "engineer specialist coordinator administrator clerk assistant chief deputy "
+    "regional national strategic digital services compliance audit evaluation"
+).split()
+TERMS = 50_000
+
+
+def _terms(seed: int = 42) -> List[Tuple[str, float, None]]:
+    rng = random.Random(seed)
+    terms = {}
+    while len(terms) < TERMS:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        text = f"{text} {rng.randint(1, 5000)}" if rng.random() < 0.6 else text
+        terms[text] = (text, rng.paretovariate(1.2), None)
+    return list(terms.values())
+
+
+def _keystrokes(seed: int = 7) -> List[str]:
+    """Every prefix of 3+ characters a user types for 200 searches."""
+    rng = random.Random(seed)
+    prefixes = []
+    for _ in range(200):
+        query = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        prefixes.extend(query[:end] for end in range(3, len(query) + 1))
+    return prefixes
+
+
+def _scan(terms, prefix: str, limit: int = 10) -> List[str]:
+    """Reference lookup: check the word starts of every term."""
+    prefix = normalize(prefix)
+    matches = [
+        (-score, len(normalized), normalized, text)
+        for text, score, _ in terms
+        for normalized in [normalize(text)]
+        if normalized.startswith(prefix) or f" {prefix}" in normalized
+    ]
+    return [match[-1] for match in sorted(matches)[:limit]]
+
+
+class TestSuggestionIndexPerformance:
+    """Keystroke lookups: cold prefixes, then warm (memoized) ones."""
+
+    @pytest.mark.benchmark(group="suggestion_index")
+    def test_cold_keystrokes(self, benchmark):
+        terms, keystrokes = _terms(), _keystrokes()
+        index = PrefixIndex.build(terms)
+
+        def run():
+            index._top.clear()
+            timings = []
+            for prefix in keystrokes:
+                started = time.perf_counter()
+                index.search(prefix, 10)
+                timings.append(time.perf_counter() - started)
+            return sorted(timings)
+
+        timings = benchmark.pedantic(run, rounds=3, iterations=1)
+        assert timings[int(len(timings) * 0.99)] < 0.005
+
+    @pytest.mark.benchmark(group="suggestion_index")
+    def test_warm_keystrokes(self, benchmark):
+        terms, keystrokes = _terms(), _keystrokes()
+        index = PrefixIndex.build(terms)
+        for prefix in keystrokes:
+            index.search(prefix, 10)
+
+        def run():
+            for prefix in keystrokes:
+                index.search(prefix, 10)
+
+        benchmark.pedantic(run, rounds=5, iterations=1)
+
+    @pytest.mark.benchmark(group="suggestion_index_build")
+    def test_build(self, benchmark):
+        terms = _terms()
+
+        index = benchmark.pedantic(lambda: PrefixIndex.build(terms), rounds=3)
+
+        assert len(index) == TERMS
+        for prefix in ["sen", "senior pol", "data 12", "audit"]:
+            assert [t.text for t in index.search(prefix)] == _scan(terms, prefix)
@@ -0,0 +1,223 @@
+"""
+Collaborative Editing Performance Tests
+
+Ten editors typing into one 50 KB job description at once. Each editor
+types at their own cursor and occasionally backspaces; cursors shift as
+other editors insert and delete in front of them.
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+import pytest
+
+from src.jd_ingestion.api.endpoints.websocket import (
+    OPERATION_HISTORY_SIZE,
+    ConnectionManager,
+)
+from src.jd_ingestion.utils.operational_transform import (
+    Operation,
+    apply_operation,
+    apply_operation_to_rope,
+    create_delete_operation,
+    create_insert_operation,
+)
+from src.jd_ingestion.utils.rope import Rope
+
+EDITORS = 10
+KEYSTROKES_PER_EDITOR = 100
+DOCUMENT = ("Responsible for planning and delivering program outcomes. " * 900)[:50_000]
+
+
+class StringDocument:
+    """Reference session state: a str rebuilt per operation, list history."""
+
+    def __init__(self, text: str):
+        self.document = text
+        self.history: List[Operation] = []
+
+    def apply(self, operation: Operation) -> None:
+        self.document = apply_operation(self.document, operation)
+        self.history.append(operation)
+        if len(self.history) > 1000:
+            self.history = self.history[-1000:]
+
+    def text(self) -> str:
+        return self.document
+
+
+class RopeDocument:
+    """Current session state: rope edited in place, ring-buffer history."""
+
+    def __init__(self, text: str):
+        self.document = Rope(text)
+        self.history: Deque[Operation] = deque(maxlen=OPERATION_HISTORY_SIZE)
+
+    def apply(self, operation: Operation) -> None:
+        apply_operation_to_rope(self.document, operation)
+        self.history.append(operation)
+
+    def text(self) -> str:
+        return str(self.document)
+
+
+def _keystrokes(
+    length: int = len(DOCUMENT), seed: int = 42
+) -> List[List[Tuple[int, dict]]]:
+    """Per round, one keystroke from every editor, in arrival order."""
+    rng = random.Random(seed)
+    cursors = sorted(rng.sample(range(length), EDITORS))
+    rounds = []
+    for _ in range(KEYSTROKES_PER_EDITOR):
+        keystrokes = []
+        for editor in rng.sample(range(EDITORS), EDITORS):
+            position = cursors[editor]
+            if rng.random() < 0.15 and position > 0:
+                op = {"type": "delete", "start": position - 1, "end": position}
+                shift = -1
+            else:
+                op = {"type": "insert", "position": position, "text": "a"}
+                shift = 1
+            keystrokes.append((editor, op))
+            for other in range(EDITORS):
+                if cursors[other] > position or other == editor:
+                    cursors[other] += shift
+        rounds.append(keystrokes)
+    return rounds
+
+
+def _batches(seed: int = 42, size: int = 10) -> List[Dict[int, List[dict]]]:
+    """
+    Per round, a batch of ``size`` keystrokes from every editor.
+
+    Every batch in a round is made against the same base document; the
+    server transforms each one past the batches that arrived before it.
+    """
+    rng = random.Random(seed)
+    cursors = sorted(rng.sample(range(len(DOCUMENT)), EDITORS))
+    rounds = []
+    for _ in range(KEYSTROKES_PER_EDITOR // size):
+        batches, shifts = {}, []
+        for editor in range(EDITORS):
+            position, typed, ops = cursors[editor], 0, []
+            for _ in range(size):
+                if typed and rng.random() < 0.15:
+                    ops.append(
+                        {"type": "delete", "start": position - 1, "end": position}
+                    )
+                    position, typed = position - 1, typed - 1
+                else:
+                    ops.append({"type": "insert", "position": position, "text": "a"})
+                    position, typed = position + 1, typed + 1
+            batches[editor] = ops
+            shifts.append(typed)
+        # Cursors are distinct and each editor only edits at its own cursor
+        cursors = [
+            cursor + sum(shifts[: editor + 1]) for editor, cursor in enumerate(cursors)
+        ]
+        rounds.append(batches)
+    return rounds
+
+
+def _operation(op: dict) -> Operation:
+    if op["type"] == "insert":
+        return create_insert_operation(op["position"], op["text"])
+    return create_delete_operation(op["start"], op["end"])
+
+
+class _Socket:
+    async def send_text(self, data: str) -> None:
+        pass
+
+
+def _session_manager() -> ConnectionManager:
+    manager = ConnectionManager()
+    sockets = [_Socket() for _ in range(EDITORS)]
+    manager.editing_sessions["bench"] = {
+        "job_id": 1,
+        "participants": set(range(EDITORS)),
+        "document_state": Rope(DOCUMENT),
+        "operation_count": 0,
+    }
+    manager.active_connections["bench"] = sockets
+    for user_id, socket in enumerate(sockets):
+        manager.user_sessions[socket] = {"user_id": user_id, "session_id": "bench"}
+    return manager
+
+
+class TestCollaborativeDocumentPerformance:
+    """
+    Cost of applying 1,000 keystrokes to the session document.
+
+    Copying a 50 KB string is only a few microseconds, so the string holds
+    up at that size; the rope's cost per keystroke stays flat as the
+    document grows.
+    """
+
+    @pytest.mark.benchmark(group="collaborative_document")
+    @pytest.mark.parametrize("size", [50_000, 500_000])
+    @pytest.mark.parametrize("document_class", [RopeDocument, StringDocument])
+    def test_apply_keystrokes(self, benchmark, document_class, size):
+        text = (DOCUMENT * (size // len(DOCUMENT) + 1))[:size]
+        operations = [_operation(op) for keys in _keystrokes(size) for _, op in keys]
+
+        def run():
+            document = document_class(text)
+            for operation in operations:
+                document.apply(operation)
+            return document
+
+        document = benchmark.pedantic(run, rounds=5, iterations=1)
+
+        expected = text
+        for operation in operations:
+            expected = apply_operation(expected, operation)
+        assert document.text() == expected
+
+
+class TestCollaborativeSessionPerformance:
+    """Ten editors through ConnectionManager, including broadcasts."""
+
+    @pytest.mark.benchmark(group="collaborative_session")
+    def test_operation_per_keystroke(self, benchmark):
+        rounds = _keystrokes()
+
+        async def run():
+            manager = _session_manager()
+            sockets = manager.active_connections["bench"]
+            for keystrokes in rounds:
+                for editor, op in keystrokes:
+                    await manager.apply_operation("bench", op, sockets[editor])
+            return manager
+
+        manager = benchmark.pedantic(lambda: asyncio.run(run()), rounds=3)
+        assert manager.editing_sessions["bench"]["operation_count"] == 1000
+
+    @pytest.mark.benchmark(group="collaborative_session")
+    def test_batched_keystrokes(self, benchmark):
+        """Each editor sends ten keystrokes per batch; runs are coalesced."""
+        rounds = _batches()
+
+        async def run():
+            manager = _session_manager()
+            sockets = manager.active_connections["bench"]
+            for batches in rounds:
+                base_sequence = manager.editing_sessions["bench"]["operation_count"]
+                for editor, ops in batches.items():
+                    await manager.apply_operations(
+                        "bench", ops, sockets[editor], base_sequence
+                    )
+            return manager
+
+        manager = benchmark.pedantic(lambda: asyncio.run(run()), rounds=3)
+        session = manager.editing_sessions["bench"]
+        typed = sum(
+            op["type"] == "insert" and 1 or -1
+            for batches in rounds
+            for ops in batches.values()
+            for op in ops
+        )
+        assert session["operation_count"] < EDITORS * KEYSTROKES_PER_EDITOR
+        assert len(session["document_state"]) == len(DOCUMENT) + typed
@@ -0,0 +1,115 @@
+"""
+Tests for the buffered usage analytics writer.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from jd_ingestion.services.analytics_buffer import AnalyticsBuffer
+
+
+def make_event(status_code=200):
+    return {"endpoint": "/api/jobs", "status_code": status_code}
+
+
+@pytest.fixture
+def mock_db():
+    """Patch the buffer's session factory with a recording session."""
+    db = AsyncMock()
+
+    @asynccontextmanager
+    async def session_context():
+        yield db
+
+    with patch(
+        "jd_ingestion.services.analytics_buffer.async_session_context",
+        session_context,
+    ):
+        yield db
+
+
+def written_batches(db):
+    return [call.args[1] for call in db.execute.call_args_list]
+
+
+class TestAnalyticsBuffer:
+    """Test queueing, backpressure and batch writes."""
+
+    async def test_flush_writes_multi_row_batches(self, mock_db):
+        buffer = AnalyticsBuffer(max_size=100, batch_size=3, flush_interval_ms=60000)
+        for _ in range(7):
+            buffer.enqueue(make_event())
+
+        assert await buffer.flush() == 7
+
+        assert [len(batch) for batch in written_batches(mock_db)] == [3, 3, 1]
+        assert mock_db.commit.await_count == 3
+        assert buffer.depth == 0
+        stats = buffer.get_stats()
+        assert stats["written"] == 7
+        assert stats["batches"] == 3
+        await buffer.stop()
+
+    async def test_full_batch_wakes_the_flusher(self, mock_db):
+        buffer = AnalyticsBuffer(max_size=100, batch_size=2, flush_interval_ms=60000)
+        buffer.enqueue(make_event())
+        buffer.enqueue(make_event())
+
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert written_batches(mock_db) == [[make_event(), make_event()]]
+        await buffer.stop()
+
+    async def test_interval_flushes_partial_batches(self, mock_db):
+        buffer = AnalyticsBuffer(max_size=100, batch_size=50, flush_interval_ms=10)
+        buffer.enqueue(make_event())
+
+        await asyncio.sleep(0.05)
+
+        assert written_batches(mock_db) == [[make_event()]]
+        await buffer.stop()
+
+    async def test_stop_drains_queued_events(self, mock_db):
+        buffer = AnalyticsBuffer(max_size=100, batch_size=50, flush_interval_ms=60000)
+        for _ in range(5):
+            buffer.enqueue(make_event())
+
+        await buffer.stop()
+
+        assert sum(len(batch) for batch in written_batches(mock_db)) == 5
+        assert buffer.get_stats()["flusher_running"] is False
+
+    async def test_samples_when_half_full_and_drops_when_full(self, mock_db):
+        buffer = AnalyticsBuffer(
+            max_size=4, batch_size=100, flush_interval_ms=60000, overflow_sample_rate=0
+        )
+        accepted = [buffer.enqueue(make_event()) for _ in range(3)]
+        assert accepted == [True, True, False]
+
+        # Server errors are kept under pressure until the queue is full
+        assert buffer.enqueue(make_event(status_code=503)) is True
+        assert buffer.enqueue(make_event(status_code=500)) is True
+        assert buffer.enqueue(make_event(status_code=500)) is False
+
+        stats = buffer.get_stats()
+        assert stats["depth"] == 4
+        assert stats["sampled_out"] == 1
+        assert stats["dropped"] == 1
+        await buffer.stop()
+
+    async def test_failed_batches_are_counted_and_skipped(self, mock_db):
+        mock_db.execute.side_effect = [Exception("connection lost"), None]
+        buffer = AnalyticsBuffer(max_size=100, batch_size=2, flush_interval_ms=60000)
+        for _ in range(4):
+            buffer.enqueue(make_event())
+
+        assert await buffer.flush() == 2
+
+        stats = buffer.get_stats()
+        assert stats["failed"] == 2
+        assert stats["written"] == 2
+        await buffer.stop()
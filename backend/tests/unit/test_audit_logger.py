@@ -1,8 +1,9 @@
 """Tests for audit/logger.py module."""
 
+import asyncio
 import pytest
 from datetime import datetime
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from jd_ingestion.audit.logger import (
     AuditEvent,
@@ -17,6 +18,35 @@ from jd_ingestion.audit.logger import (
 )
 
 
+def mock_audit_db(chain_head=None):
+    """Mock session whose chain head starts at ``chain_head``.
+
+    Inserted rows move the head, as they would in ``audit_log``.
+    """
+    db = AsyncMock()
+    head = [chain_head]
+
+    async def execute(statement, rows=None):
+        if rows is not None:
+            head[0] = rows[-1]["event_hash"]
+        return Mock(scalar=Mock(return_value=head[0]))
+
+    db.execute.side_effect = execute
+    return db
+
+
+def session_factory(db):
+    """Replacement for get_async_session yielding ``db`` on every call."""
+
+    def get_session():
+        async def session_gen():
+            yield db
+
+        return session_gen()
+
+    return get_session
+
+
 class TestAuditEventType:
     """Test AuditEventType enum."""
 
@@ -208,35 +238,42 @@ class TestAuditLogger:
 
     @pytest.mark.asyncio
     async def test_log_event_success(self, logger, sample_event):
-        """Test successful event logging."""
+        """Test buffered events are queued, then written on flush."""
         with (
             patch("jd_ingestion.audit.logger.get_async_session") as mock_session,
             patch("jd_ingestion.audit.logger.logger") as mock_logger,
         ):
-            # Mock database session
-            mock_db = AsyncMock()
-
-            async def mock_async_gen():
-                yield mock_db
-
-            mock_session.return_value = mock_async_gen()
+            mock_db = mock_audit_db()
+            mock_session.side_effect = session_factory(mock_db)
 
             result = await logger.log_event(sample_event)
 
             assert result is True
             assert len(logger.events_cache) == 1
             assert logger.events_cache[0] == sample_event
+            assert logger.pending_count == 1
+            mock_db.commit.assert_not_called()
+
+            assert await logger.flush() == 1
 
-            # Verify database call
-            mock_db.execute.assert_called_once()
+            # Chain lock and head lookup, then one multi-row insert in one
+            # transaction
+            assert mock_db.execute.call_count == 3
+            assert "pg_advisory_xact_lock" in str(
+                mock_db.execute.call_args_list[0].args[0]
+            )
+            rows = mock_db.execute.call_args_list[2].args[1]
+            assert rows[0]["event_hash"] == sample_event.generate_hash(None)
+            assert rows[0]["previous_hash"] is None
             mock_db.commit.assert_called_once()
 
             # Verify logging call
-            mock_logger.info.assert_called_once()
+            mock_logger.warning.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_log_event_database_error(self, logger, sample_event):
-        """Test event logging with database error."""
+        """Test durable event logging with database error."""
+        sample_event.severity = AuditSeverity.CRITICAL
         with (
             patch("jd_ingestion.audit.logger.get_async_session") as mock_session,
             patch("jd_ingestion.audit.logger.logger") as mock_logger,
@@ -249,6 +286,8 @@ class TestAuditLogger:
             assert result is False
             assert len(logger.events_cache) == 0
             mock_logger.error.assert_called_once()
+            # Durable events are reported to the caller, not retried
+            assert logger.pending_count == 0
 
     @pytest.mark.asyncio
     async def test_log_event_cache_management(self, logger):
@@ -299,12 +338,7 @@ class TestAuditLogger:
             patch("jd_ingestion.audit.logger.logger") as mock_logger,
         ):
             # Mock successful database operations
-            mock_db = AsyncMock()
-
-            async def mock_async_gen():
-                yield mock_db
-
-            mock_session.return_value = mock_async_gen()
+            mock_session.side_effect = session_factory(mock_audit_db())
 
             test_cases = [
                 (AuditSeverity.CRITICAL, mock_logger.critical),
@@ -525,12 +559,8 @@ class TestAuditLogger:
             patch("jd_ingestion.audit.logger.get_async_session") as mock_session,
             patch("jd_ingestion.audit.logger.logger"),
         ):
-            mock_db = AsyncMock()
-
-            async def mock_async_gen():
-                yield mock_db
-
-            mock_session.return_value = mock_async_gen()
+            mock_db = mock_audit_db()
+            mock_session.side_effect = session_factory(mock_db)
 
             result = await logger.log_security_event(
                 event_description="Suspicious login attempt",
@@ -642,6 +672,186 @@ class TestAuditLogger:
             mock_logger.error.assert_called_once()
 
 
+class TestAuditPipeline:
+    """Test batched, hash-chained audit writes."""
+
+    @staticmethod
+    def make_event(severity=AuditSeverity.LOW, resource_id=1):
+        return AuditEvent(
+            event_type=AuditEventType.DOCUMENT_INSERT,
+            severity=severity,
+            user_id=7,
+            username="editor",
+            timestamp=datetime(2024, 1, 1, 12, 0, resource_id),
+            resource_type="job_description",
+            resource_id=resource_id,
+            action="insert",
+            description="Document insert operation by editor",
+            ip_address=None,
+            user_agent=None,
+            session_id="session_1",
+            details={"position": resource_id},
+        )
+
+    def test_chained_hash_depends_on_previous_hash(self):
+        event = self.make_event()
+        assert event.generate_hash(None) == event.generate_hash()
+        assert event.generate_hash("a" * 64) != event.generate_hash()
+        assert event.generate_hash("a" * 64) != event.generate_hash("b" * 64)
+
+    @pytest.mark.asyncio
+    async def test_events_are_group_committed_in_batches(self):
+        logger = AuditLogger(batch_size=2, flush_interval_ms=60000)
+        mock_db = mock_audit_db(chain_head="f" * 64)
+        events = [self.make_event(resource_id=i) for i in range(5)]
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger"),
+        ):
+            for event in events:
+                assert await logger.log_event(event) is True
+            await logger.close()
+
+        inserts = [
+            call.args[1]
+            for call in mock_db.execute.call_args_list
+            if len(call.args) > 1
+        ]
+        assert [len(rows) for rows in inserts] == [2, 2, 1]
+        assert mock_db.commit.await_count == 3
+
+        rows = [row for batch in inserts for row in batch]
+        assert rows[0]["previous_hash"] == "f" * 64
+        for previous, row, event in zip([None, *rows], rows, events):
+            if previous is not None:
+                assert row["previous_hash"] == previous["event_hash"]
+            assert row["event_hash"] == event.generate_hash(row["previous_hash"])
+
+    @pytest.mark.asyncio
+    async def test_each_batch_chains_from_the_stored_head(self):
+        logger = AuditLogger(batch_size=10, flush_interval_ms=60000)
+        mock_db = mock_audit_db(chain_head="a" * 64)
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger"),
+        ):
+            await logger.log_event(self.make_event(resource_id=1))
+            await logger.flush()
+
+            # Another process appends to audit_log between our batches
+            await mock_db.execute(None, [{"event_hash": "b" * 64}])
+
+            await logger.log_event(self.make_event(resource_id=2))
+            await logger.flush()
+            await logger.close()
+
+        rows = mock_db.execute.call_args_list[-1].args[1]
+        assert rows[0]["previous_hash"] == "b" * 64
+
+    @pytest.mark.asyncio
+    async def test_critical_events_are_committed_before_returning(self):
+        logger = AuditLogger(batch_size=100, flush_interval_ms=60000)
+        mock_db = mock_audit_db()
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger"),
+        ):
+            await logger.log_event(self.make_event(resource_id=1))
+            result = await logger.log_event(
+                self.make_event(severity=AuditSeverity.CRITICAL, resource_id=2)
+            )
+
+            assert result is True
+            # The queued low-severity event joins the same commit
+            mock_db.commit.assert_awaited_once()
+            assert len(mock_db.execute.call_args_list[-1].args[1]) == 2
+            assert logger.pending_count == 0
+            await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_retried(self):
+        logger = AuditLogger(batch_size=10, flush_interval_ms=60000)
+        mock_db = mock_audit_db()
+        mock_db.commit.side_effect = [Exception("connection lost"), None]
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger"),
+        ):
+            await logger.log_event(self.make_event(resource_id=1))
+            await logger.log_event(self.make_event(resource_id=2))
+
+            assert await logger.flush() == 0
+            assert logger.pending_count == 2
+            assert await logger.flush() == 2
+            assert logger.pending_count == 0
+            await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_makes_callers_wait_for_the_commit(self):
+        logger = AuditLogger(batch_size=100, flush_interval_ms=60000, max_pending=2)
+        mock_db = mock_audit_db()
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger"),
+        ):
+            for i in range(3):
+                await logger.log_event(self.make_event(resource_id=i))
+
+            mock_db.commit.assert_awaited_once()
+            assert logger.pending_count == 0
+            await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_close_gives_up_on_a_hung_database(self):
+        logger = AuditLogger(batch_size=100, flush_interval_ms=60000)
+        mock_db = mock_audit_db()
+        mock_db.commit.side_effect = asyncio.Event().wait  # Never returns
+
+        with (
+            patch(
+                "jd_ingestion.audit.logger.get_async_session",
+                side_effect=session_factory(mock_db),
+            ),
+            patch("jd_ingestion.audit.logger.logger") as mock_logger,
+            patch(
+                "jd_ingestion.audit.logger.settings.audit_close_timeout_seconds", 0.05
+            ),
+        ):
+            await logger.log_event(self.make_event())
+            await asyncio.wait_for(logger.close(), 1)
+
+        mock_logger.warning.assert_called_once()
+
+    def test_events_cache_is_a_ring_buffer(self):
+        logger = AuditLogger()
+        logger.max_cache_size = 3
+        for i in range(5):
+            logger.events_cache.append(self.make_event(resource_id=i))
+
+        assert logger.max_cache_size == 3
+        assert [event.resource_id for event in logger.events_cache] == [2, 3, 4]
+
+
 class TestConvenienceFunctions:
     """Test convenience functions."""
 
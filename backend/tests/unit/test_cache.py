@@ -1,6 +1,11 @@
+import asyncio
+from decimal import Decimal
+
 import pytest
-from unittest.mock import AsyncMock, Mock, patch
-from jd_ingestion.utils.cache import CacheService, cached
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from jd_ingestion.utils import cache as cache_module
+from jd_ingestion.utils import caching
+from jd_ingestion.utils.cache import CacheService, _dumps, _loads, cached
 
 
 class TestCacheService:
@@ -20,6 +25,10 @@ class TestCacheService:
         mock_client.setex.return_value = True
         mock_client.delete.return_value = 1
         mock_client.keys.return_value = []
+        # redis.asyncio pipelines are created synchronously and only execute() awaits
+        pipeline = MagicMock()
+        pipeline.execute = AsyncMock(return_value=[])
+        mock_client.pipeline = Mock(return_value=pipeline)
         mock_client.info.return_value = {
             "used_memory": 1024000,
             "used_memory_human": "1.00M",
@@ -170,9 +179,14 @@ class TestCacheService:
         filters = {"type": "job"}
         results = [{"id": 1, "title": "Test Job"}]
 
-        result = await cache_service.cache_search_results(query, filters, results)
+        result = await cache_service.cache_search_results(
+            query, filters, results, job_ids=[1]
+        )
         assert result is True
-        mock_redis_client.setex.assert_called_once()
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.setex.assert_called_once()
+        tagged = {call[0][0] for call in pipeline.sadd.call_args_list}
+        assert tagged == {"tag:job:1"}
 
     @pytest.mark.asyncio
     async def test_get_cached_search_results(self, cache_service, mock_redis_client):
@@ -197,9 +211,18 @@ class TestCacheService:
         limit = 10
         results = [{"id": 124, "similarity": 0.9}]
 
-        result = await cache_service.cache_similar_jobs(job_id, limit, results)
+        result = await cache_service.cache_similar_jobs(
+            job_id, limit, results, related_job_ids=[124]
+        )
         assert result is True
-        mock_redis_client.setex.assert_called_once()
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.setex.assert_called_once()
+        key = pipeline.setex.call_args[0][0]
+        assert sorted(call[0] for call in pipeline.sadd.call_args_list) == [
+            ("tag:job:123", key),
+            ("tag:job:124", key),
+        ]
+        pipeline.execute.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_get_cached_similar_jobs(self, cache_service, mock_redis_client):
@@ -211,6 +234,24 @@ class TestCacheService:
         result = await cache_service.get_cached_similar_jobs(123, 10)
         assert result == cached_results
 
+    @pytest.mark.asyncio
+    async def test_similar_jobs_key_includes_options(
+        self, cache_service, mock_redis_client
+    ):
+        """Test similar jobs keys differ by comparison mode and filters."""
+        cache_service.redis_client = mock_redis_client
+        mock_redis_client.get.return_value = None
+
+        await cache_service.get_cached_similar_jobs(123, 10)
+        await cache_service.get_cached_similar_jobs(123, 10, use_centroid=True)
+        await cache_service.get_cached_similar_jobs(
+            123, 10, classification_filter="EX-01"
+        )
+        await cache_service.get_cached_similar_jobs(123, 10, language_filter="fr")
+
+        keys = [call[0][0] for call in mock_redis_client.get.call_args_list]
+        assert len(set(keys)) == 4
+
     @pytest.mark.asyncio
     async def test_cache_job_comparison(self, cache_service, mock_redis_client):
         """Test caching job comparison results."""
@@ -220,7 +261,10 @@ class TestCacheService:
 
         result = await cache_service.cache_job_comparison(123, 456, comparison_data)
         assert result is True
-        mock_redis_client.setex.assert_called_once()
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.setex.assert_called_once()
+        tagged = {call[0][0] for call in pipeline.sadd.call_args_list}
+        assert tagged == {"tag:job:123", "tag:job:456"}
 
     @pytest.mark.asyncio
     async def test_cache_job_comparison_normalized_ids(
@@ -236,7 +280,9 @@ class TestCacheService:
         await cache_service.cache_job_comparison(123, 456, comparison_data)
 
         # Both calls should generate the same cache key
-        assert mock_redis_client.setex.call_count == 2
+        setex_calls = mock_redis_client.pipeline.return_value.setex.call_args_list
+        assert len(setex_calls) == 2
+        assert setex_calls[0][0][0] == setex_calls[1][0][0]
 
     @pytest.mark.asyncio
     async def test_get_cached_job_comparison(self, cache_service, mock_redis_client):
@@ -250,17 +296,59 @@ class TestCacheService:
 
     @pytest.mark.asyncio
     async def test_invalidate_job_cache(self, cache_service, mock_redis_client):
-        """Test job cache invalidation."""
+        """Test job cache invalidation deletes the job's tagged entries."""
         cache_service.redis_client = mock_redis_client
-        mock_redis_client.keys.return_value = ["search:key1", "similar:key2"]
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.execute.return_value = [{"search:key1", "similar:key2"}]
 
         result = await cache_service.invalidate_job_cache(123)
         assert result is True
 
-        # Should call keys for each pattern
-        assert mock_redis_client.keys.call_count == 3
-        # Delete is called 3 times (once for each pattern that returns keys)
-        assert mock_redis_client.delete.call_count == 3
+        # No keyspace scans; only the job's and the aggregate tag sets are read
+        mock_redis_client.keys.assert_not_called()
+        assert [call[0][0] for call in pipeline.smembers.call_args_list] == [
+            "tag:job:123",
+            "tag:jobs:aggregate",
+        ]
+        mock_redis_client.delete.assert_awaited_once()
+        assert set(mock_redis_client.delete.call_args[0]) == {
+            "search:key1",
+            "similar:key2",
+            "tag:job:123",
+            "tag:jobs:aggregate",
+        }
+
+    @pytest.mark.asyncio
+    async def test_invalidate_jobs_cache_reads_each_tag_once(
+        self, cache_service, mock_redis_client
+    ):
+        """Test invalidating several jobs deletes shared entries once."""
+        cache_service.redis_client = mock_redis_client
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.execute.return_value = [{"comparison:a"}, {"comparison:a"}]
+
+        assert await cache_service.invalidate_tags(["job:1", "job:2", "job:1"]) == 1
+        assert pipeline.smembers.call_count == 2
+        assert sorted(mock_redis_client.delete.call_args[0]) == [
+            "comparison:a",
+            "tag:job:1",
+            "tag:job:2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_job_cache_failure(self, cache_service, mock_redis_client):
+        """Test invalidation reports Redis failures."""
+        cache_service.redis_client = mock_redis_client
+        pipeline = mock_redis_client.pipeline.return_value
+        pipeline.execute.side_effect = Exception("Redis down")
+
+        assert await cache_service.invalidate_job_cache(123) is False
+
+    @pytest.mark.asyncio
+    async def test_invalidate_job_cache_no_redis_client(self, cache_service):
+        """Test invalidation without Redis."""
+        cache_service.redis_client = None
+        assert await cache_service.invalidate_job_cache(123) is False
 
     @pytest.mark.asyncio
     async def test_get_cache_stats_success(self, cache_service, mock_redis_client):
@@ -292,6 +380,131 @@ class TestCacheService:
         assert stats["status"] == "unavailable"
 
 
+class TestSerialization:
+    """Test the cache payload format."""
+
+    def test_small_values_round_trip_uncompressed(self):
+        payload = _dumps({"classifications": [{"value": "EX-01", "count": 3}]})
+        assert payload[:1] == b"\x01"
+        assert _loads(payload) == {"classifications": [{"value": "EX-01", "count": 3}]}
+
+    def test_large_values_are_compressed(self):
+        value = [{"title": "Director of Operations", "id": i} for i in range(500)]
+        payload = _dumps(value)
+        assert payload[:1] in (b"\x02", b"\x03")
+        assert len(payload) < len(str(value)) // 4
+        assert _loads(payload) == value
+
+    def test_non_json_types_are_stringified(self):
+        assert _loads(_dumps({1: Decimal("1.5")})) == {"1": "1.5"}
+
+    def test_legacy_json_values_are_readable(self):
+        assert _loads('{"result": "cached"}') == {"result": "cached"}
+        assert _loads(b"[1, 2]") == [1, 2]
+
+
+class TestTwoTierCache:
+    """Test the in-process L1 tier in front of Redis."""
+
+    @pytest.fixture
+    def cache_service(self):
+        service = CacheService()
+        service.redis_client = AsyncMock()
+        pipeline = MagicMock()
+        pipeline.execute = AsyncMock(return_value=[])
+        service.redis_client.pipeline = Mock(return_value=pipeline)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_redis_hits_are_served_from_l1_afterwards(self, cache_service):
+        cache_service.redis_client.get.return_value = _dumps({"count": 7})
+
+        assert await cache_service.get("facets:search") == {"count": 7}
+        assert await cache_service.get("facets:search") == {"count": 7}
+        cache_service.redis_client.get.assert_awaited_once_with("facets:search")
+
+    @pytest.mark.asyncio
+    async def test_l1_returns_independent_copies(self, cache_service):
+        await cache_service.set("facets:search", {"items": [1]}, 60)
+        first = await cache_service.get("facets:search")
+        first["items"].append(2)
+        assert await cache_service.get("facets:search") == {"items": [1]}
+        cache_service.redis_client.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_l1_entries_expire_after_l1_ttl(self, cache_service):
+        cache_service.redis_client.get.return_value = None
+        with patch.object(caching.time, "monotonic", return_value=100.0):
+            await cache_service.set("k", 1, 3600)
+            assert await cache_service.get("k") == 1
+        expired = 100.0 + cache_module.settings.cache_l1_ttl_seconds
+        with patch.object(caching.time, "monotonic", return_value=expired):
+            assert await cache_service.get("k") is None
+        cache_service.redis_client.get.assert_awaited_once_with("k")
+
+    @pytest.mark.asyncio
+    async def test_get_many_only_fetches_l1_misses(self, cache_service):
+        await cache_service.set("a", "cached", 60)
+        cache_service.redis_client.mget.return_value = [_dumps("remote"), None]
+
+        result = await cache_service.get_many(["a", "b", "c", "a"])
+
+        assert result == {"a": "cached", "b": "remote"}
+        cache_service.redis_client.mget.assert_awaited_once_with(["b", "c"])
+        assert await cache_service.get("b") == "remote"
+
+    @pytest.mark.asyncio
+    async def test_set_many_pipelines_writes(self, cache_service):
+        assert await cache_service.set_many({"a": 1, "b": [2]}, 120) is True
+
+        pipeline = cache_service.redis_client.pipeline.return_value
+        assert [call[0][:2] for call in pipeline.setex.call_args_list] == [
+            ("a", 120),
+            ("b", 120),
+        ]
+        pipeline.execute.assert_awaited_once()
+        assert await cache_service.get_many(["a", "b"]) == {"a": 1, "b": [2]}
+        cache_service.redis_client.mget.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_evicts_l1_and_broadcasts(self, cache_service):
+        await cache_service.set("k", 1, 60)
+        cache_service.redis_client.get.return_value = None
+
+        await cache_service.delete("k")
+
+        assert await cache_service.get("k") is None
+        cache_service.redis_client.publish.assert_awaited_once_with(
+            CacheService.INVALIDATION_CHANNEL, "k"
+        )
+
+    @pytest.mark.asyncio
+    async def test_listener_evicts_keys_invalidated_elsewhere(self, cache_service):
+        delivered = asyncio.Event()
+
+        async def listen():
+            await cache_service.set("a", 1, 60)
+            await cache_service.set("b", 2, 60)
+            yield {"type": "message", "data": b"a\nmissing"}
+            delivered.set()
+            await asyncio.Event().wait()
+
+        pubsub = MagicMock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.listen = listen
+        cache_service.redis_client.pubsub = Mock(return_value=pubsub)
+
+        assert await cache_service.start_invalidation_listener() is True
+        await asyncio.wait_for(delivered.wait(), 1)
+        await cache_service.stop_invalidation_listener()
+
+        assert cache_service.local_cache.get("a") is caching._MISSING
+        assert cache_service.local_cache.get("b") is not caching._MISSING
+        pubsub.subscribe.assert_awaited_once_with(CacheService.INVALIDATION_CHANNEL)
+        pubsub.aclose.assert_awaited_once()
+
+
 class TestCachedDecorator:
     """Test suite for the @cached decorator."""
 
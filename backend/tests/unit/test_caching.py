@@ -0,0 +1,240 @@
+"""Tests for the in-process result cache in utils.caching."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from jd_ingestion.utils import caching
+from jd_ingestion.utils.caching import (
+    ResultCache,
+    _generate_cache_key,
+    cache_result,
+    clear_cache,
+    get_cache_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Give every test its own empty cache."""
+    with patch.object(
+        caching, "_memory_cache", ResultCache(max_entries=100, max_bytes=1_000_000)
+    ):
+        yield caching._memory_cache
+
+
+class TestResultCache:
+    """Test the LRU/TTL cache engine."""
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResultCache(max_entries=10, max_bytes=10_000)
+        with patch.object(caching.time, "monotonic", return_value=100.0):
+            cache.set("a", 1, ttl=5)
+            assert cache.get("a") == 1
+        with patch.object(caching.time, "monotonic", return_value=105.0):
+            assert cache.get("a") is caching._MISSING
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_zero_ttl_never_expires(self):
+        cache = ResultCache(max_entries=10, max_bytes=10_000)
+        cache.set("a", 1, ttl=0)
+        with patch.object(
+            caching.time, "monotonic", return_value=time.monotonic() + 1e9
+        ):
+            assert cache.get("a") == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2, max_bytes=10_000)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("b") is caching._MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_to_stay_within_byte_budget(self):
+        value = "x" * 400
+        cache = ResultCache(max_entries=100, max_bytes=1_000)
+        cache.set("a", value, ttl=60)
+        cache.set("b", value, ttl=60)
+        cache.set("c", value, ttl=60)
+
+        assert len(cache) == 2
+        assert cache.get("a") is caching._MISSING
+        assert cache.stats()["bytes"] <= 1_000
+
+    def test_values_larger_than_budget_are_not_cached(self):
+        cache = ResultCache(max_entries=100, max_bytes=100)
+        assert cache.set("a", "x" * 1_000, ttl=60) is False
+        assert len(cache) == 0
+
+    def test_replacing_a_key_updates_byte_total(self):
+        cache = ResultCache(max_entries=10, max_bytes=100_000)
+        cache.set("a", "x" * 1_000, ttl=60)
+        cache.set("a", "y", ttl=60)
+        assert cache.stats()["bytes"] == caching._estimate_size("y")
+
+    def test_delete_matching(self):
+        cache = ResultCache(max_entries=10, max_bytes=10_000)
+        cache.set("jobs_stats:1", 1, ttl=60)
+        cache.set("jobs_status:2", 2, ttl=60)
+        assert cache.delete_matching("jobs_stats") == 1
+        assert len(cache) == 1
+        assert cache.delete_matching() == 1
+        assert cache.stats()["bytes"] == 0
+
+
+class TestCacheKey:
+    """Test cache key generation."""
+
+    def test_database_sessions_are_not_part_of_the_key(self):
+        first = _generate_cache_key("p", db=Mock(spec=AsyncSession), limit=5)
+        second = _generate_cache_key("p", db=Mock(spec=AsyncSession), limit=5)
+        assert first == second
+        assert first.startswith("p:")
+
+    def test_ignored_arguments(self):
+        first = _generate_cache_key("p", api_key="a", ignore_args={"api_key"})
+        second = _generate_cache_key("p", api_key="b", ignore_args={"api_key"})
+        assert first == second
+        assert _generate_cache_key("p", api_key="a") != _generate_cache_key(
+            "p", api_key="b"
+        )
+
+
+class TestCacheResultDecorator:
+    """Test the cache_result decorator."""
+
+    @pytest.mark.asyncio
+    async def test_async_results_are_cached(self):
+        calls = []
+
+        @cache_result(ttl=60, key_prefix="test_async")
+        async def compute(value):
+            calls.append(value)
+            return value * 2
+
+        assert await compute(2) == 4
+        assert await compute(2) == 4
+        assert calls == [2]
+        stats = get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_misses_share_one_call(self):
+        calls = 0
+        release = asyncio.Event()
+
+        @cache_result(ttl=60, key_prefix="test_single_flight")
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"total": 42}
+
+        tasks = [asyncio.create_task(compute()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert results == [{"total": 42}] * 5
+        assert get_cache_stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_async_exceptions_are_shared_but_not_cached(self):
+        calls = 0
+        release = asyncio.Event()
+
+        @cache_result(ttl=60, key_prefix="test_failure")
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(compute()) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert get_cache_stats()["entries"] == 0
+        with pytest.raises(ValueError):
+            await compute()
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_waiters_recompute_when_first_caller_is_cancelled(self):
+        calls = 0
+        release = asyncio.Event()
+
+        @cache_result(ttl=60, key_prefix="test_cancel")
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        leader = asyncio.create_task(compute())
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(compute())
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == "value"
+        assert calls == 2
+
+    def test_sync_concurrent_misses_share_one_call(self):
+        calls = 0
+        started = threading.Event()
+        release = threading.Event()
+
+        @cache_result(ttl=60, key_prefix="test_sync")
+        def compute():
+            nonlocal calls
+            calls += 1
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(compute()))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(compute())) for _ in range(3)
+        ]
+        for thread in followers:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while get_cache_stats()["coalesced"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        assert calls == 1
+        assert results == ["value"] * 4
+
+    def test_clear_cache_by_prefix(self):
+        @cache_result(ttl=60, key_prefix="test_clear")
+        def compute(value):
+            return value
+
+        compute(1)
+        compute(2)
+        clear_cache("test_clear")
+        assert get_cache_stats()["entries"] == 0
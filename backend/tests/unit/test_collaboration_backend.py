@@ -0,0 +1,334 @@
+"""Tests for collaborative editing sessions shared across workers through Redis"""
+
+import asyncio
+import fnmatch
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from jd_ingestion.api.endpoints.websocket import ConnectionManager
+from jd_ingestion.services.collaboration_backend import (
+    APPEND_SCRIPT,
+    LOAD_SCRIPT,
+    SNAPSHOT_SCRIPT,
+    RedisCollaborationBackend,
+)
+
+
+class FakePubSub:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.patterns = []
+        self.queue = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+        self.redis_client.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        if self in self.redis_client.subscribers:
+            self.redis_client.subscribers.remove(self)
+
+
+class FakeRedis:
+    """
+    In-memory Redis with streams, pub/sub and Python models of the scripts.
+
+    A script yields once, like a network round trip, then runs its model
+    without awaiting, so it is atomic like a script on a real server.
+    """
+
+    def __init__(self):
+        self.streams = {}
+        self.hashes = {}
+        self.subscribers = []
+        self.fail = False
+
+    def register_script(self, source):
+        models = {
+            APPEND_SCRIPT: self._append,
+            SNAPSHOT_SCRIPT: self._snapshot,
+            LOAD_SCRIPT: self._load,
+        }
+        model = models[source]
+
+        async def script(keys=None, args=None):
+            await asyncio.sleep(0)  # Let other "workers" interleave
+            self._check()
+            return model(keys, args)
+
+        return script
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("Connection refused")
+
+    def _append(self, keys, args):
+        log, meta = keys
+        current = int(self.hashes.get(meta, {}).get("sequence", 0))
+        if current != args[0]:
+            return [0, current]
+        for payload in args[4:]:
+            current += 1
+            self.streams.setdefault(log, []).append((current, payload.encode()))
+        self.hashes.setdefault(meta, {})["sequence"] = current
+        self._publish(args[2], args[3])
+        return [1, current]
+
+    def _snapshot(self, keys, args):
+        log, meta = keys
+        sequence, text = args
+        state = self.hashes.setdefault(meta, {})
+        if int(state.get("snapshot_sequence", -1)) >= sequence:
+            return 0
+        state.update(snapshot=text, snapshot_sequence=sequence)
+        self.streams[log] = [e for e in self.streams.get(log, []) if e[0] > sequence]
+        return 1
+
+    def _load(self, keys, args):
+        log, meta = keys
+        state = self.hashes.get(meta, {})
+        entries = [
+            [f"{seq}-0".encode(), [b"op", payload]]
+            for seq, payload in self.streams.get(log, [])
+        ]
+        return [
+            state.get("snapshot", "").encode(),
+            str(state.get("snapshot_sequence", 0)).encode(),
+            entries,
+        ]
+
+    async def xrange(self, key, min="-", max="+"):
+        await asyncio.sleep(0)
+        self._check()
+        first = int(min.split("-")[0])
+        return [
+            (f"{seq}-0".encode(), {b"op": payload})
+            for seq, payload in self.streams.get(key, [])
+            if seq >= first
+        ]
+
+    async def publish(self, channel, data):
+        await asyncio.sleep(0)
+        self._check()
+        self._publish(channel, data)
+
+    def _publish(self, channel, data):
+        for pubsub in self.subscribers:
+            if any(fnmatch.fnmatchcase(channel, p) for p in pubsub.patterns):
+                pubsub.queue.put_nowait({"type": "pmessage", "data": data.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+def make_socket():
+    websocket = Mock()
+    websocket.accept = AsyncMock()
+    websocket.send_text = AsyncMock()
+    return websocket
+
+
+def messages(websocket, message_type=None):
+    sent = [json.loads(call.args[0]) for call in websocket.send_text.call_args_list]
+    return [m for m in sent if message_type is None or m["type"] == message_type]
+
+
+async def settle():
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+async def cluster():
+    """Worker factory: one ConnectionManager per worker over shared Redis."""
+    redis_client = FakeRedis()
+    workers = []
+
+    def start_worker(**kwargs):
+        backend = RedisCollaborationBackend(client=redis_client, **kwargs)
+        workers.append(ConnectionManager(backend=backend))
+        return workers[-1]
+
+    start_worker.redis = redis_client
+    yield start_worker
+    for worker in workers:
+        await worker.stop()
+
+
+def document(worker, session_id="jd-1"):
+    return str(worker.editing_sessions[session_id]["document_state"])
+
+
+class TestSharedSessions:
+    async def test_workers_converge_on_one_document(self, cluster):
+        """Editors on different workers see each other's edits"""
+        first, second = cluster(), cluster()
+        alice, bob = make_socket(), make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await second.connect(bob, "jd-1", 2, 10)
+
+        await first.apply_operation(
+            "jd-1", {"type": "insert", "position": 0, "text": "Hello"}, alice
+        )
+        await settle()
+        await second.apply_operation(
+            "jd-1", {"type": "insert", "position": 5, "text": " world"}, bob
+        )
+        await settle()
+
+        assert document(first) == document(second) == "Hello world"
+        assert [m["operation"]["text"] for m in messages(bob, "operation")] == ["Hello"]
+        assert [m["operation"]["text"] for m in messages(alice, "operation")] == [
+            " world"
+        ]
+
+    async def test_concurrent_commits_are_transformed_again(self, cluster):
+        """A worker that loses the commit race catches up and retries"""
+        first, second = cluster(), cluster()
+        alice, bob = make_socket(), make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await second.connect(bob, "jd-1", 2, 10)
+
+        await asyncio.gather(
+            first.apply_operation(
+                "jd-1",
+                {"type": "insert", "position": 0, "text": "abc", "base_sequence": 0},
+                alice,
+            ),
+            second.apply_operation(
+                "jd-1",
+                {"type": "insert", "position": 0, "text": "xyz", "base_sequence": 0},
+                bob,
+            ),
+        )
+        await settle()
+
+        assert document(first) == document(second)
+        assert sorted(document(first)[i : i + 3] for i in (0, 3)) == ["abc", "xyz"]
+        conflicts = [w.backend.get_stats()["conflicts"] for w in (first, second)]
+        assert sorted(conflicts) == [0, 1]
+        assert first.editing_sessions["jd-1"]["operation_count"] == 2
+
+    async def test_batches_are_shared(self, cluster):
+        """Coalesced batches are committed and relayed like single operations"""
+        first, second = cluster(), cluster()
+        alice, bob = make_socket(), make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await second.connect(bob, "jd-1", 2, 10)
+
+        await first.apply_operations(
+            "jd-1",
+            [
+                {"type": "insert", "position": i, "text": char}
+                for i, char in enumerate("Draft")
+            ],
+            alice,
+        )
+        await settle()
+
+        assert document(second) == "Draft"
+        assert second.editing_sessions["jd-1"]["operation_count"] == 1
+        assert len(messages(bob, "operations")) == 1
+
+    async def test_late_joiner_loads_snapshot_and_log_tail(self, cluster):
+        """Compaction keeps joins from replaying the whole history"""
+        first = cluster(snapshot_interval=10)
+        alice = make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        for i in range(25):
+            await first.apply_operation(
+                "jd-1", {"type": "insert", "position": i, "text": "x"}, alice
+            )
+
+        log = cluster.redis.streams["collab:{jd-1}:log"]
+        assert [seq for seq, _ in log] == [21, 22, 23, 24, 25]
+
+        late = cluster()
+        await late.connect(make_socket(), "jd-1", 2, 10)
+        assert document(late) == "x" * 25
+        assert late.editing_sessions["jd-1"]["operation_count"] == 25
+
+    async def test_concurrent_connections_wait_for_the_join(self, cluster):
+        """A second socket is not handed the replica before it is loaded"""
+        first = cluster()
+        alice = make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await first.apply_operation(
+            "jd-1", {"type": "insert", "position": 0, "text": "Hello"}, alice
+        )
+
+        late = cluster()
+
+        async def connect(user_id):
+            await late.connect(make_socket(), "jd-1", user_id, 10)
+            return document(late)
+
+        assert await asyncio.gather(connect(2), connect(3)) == ["Hello", "Hello"]
+
+    async def test_lagging_worker_reloads_after_compaction(self, cluster):
+        """A worker that missed compacted operations reloads the snapshot"""
+        first, second = cluster(snapshot_interval=10), cluster()
+        alice, bob = make_socket(), make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await second.connect(bob, "jd-1", 2, 10)
+        await settle()
+        cluster.redis.subscribers.clear()  # Second worker misses every event
+
+        for i in range(15):
+            await first.apply_operation(
+                "jd-1", {"type": "insert", "position": i, "text": "x"}, alice
+            )
+        await second.apply_operation(
+            "jd-1", {"type": "insert", "position": 0, "text": ">"}, bob
+        )
+
+        # Bob's edit was based on compacted operations, so Bob reloads
+        assert document(second) == "x" * 15
+        assert messages(bob, "session_state")[-1]["operation_count"] == 15
+        assert messages(bob)[-1]["type"] == "operation_error"
+
+        await second.apply_operation(
+            "jd-1",
+            {"type": "insert", "position": 0, "text": ">", "base_sequence": 15},
+            bob,
+        )
+        assert document(second) == ">" + "x" * 15
+
+    async def test_presence_reaches_other_workers(self, cluster):
+        """Join and cursor messages are relayed to other workers"""
+        first, second = cluster(), cluster()
+        alice, bob = make_socket(), make_socket()
+        await first.connect(alice, "jd-1", 1, 10)
+        await settle()
+        await second.connect(bob, "jd-1", 2, 10)
+        await second.publish_to_session(
+            "jd-1", {"type": "cursor_update", "user_id": 2, "position": 4}, bob
+        )
+        await settle()
+
+        assert [m["user_id"] for m in messages(alice, "user_joined")] == [2]
+        assert messages(alice, "cursor_update")[0]["position"] == 4
+        assert messages(bob, "cursor_update") == []
+
+
+class TestFallback:
+    async def test_sessions_stay_local_when_redis_is_down(self, cluster):
+        """Editing keeps working on one worker without Redis"""
+        cluster.redis.fail = True
+        worker = cluster()
+        alice = make_socket()
+
+        await worker.connect(alice, "jd-1", 1, 10)
+        await worker.apply_operation(
+            "jd-1", {"type": "insert", "position": 0, "text": "offline"}, alice
+        )
+
+        assert document(worker) == "offline"
+        assert not worker.editing_sessions["jd-1"].get("shared")
+        assert worker.backend.available is False
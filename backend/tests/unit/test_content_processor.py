@@ -1,6 +1,7 @@
 import pytest
 from pathlib import Path
 from jd_ingestion.processors.content_processor import (
+    EMBEDDING_MAX_INPUT_TOKENS,
     ContentProcessor,
     ProcessedContent,
 )
@@ -138,6 +139,93 @@ def test_parse_structured_fields_no_matches(empty_processor):
     )
 
 
+@pytest.mark.unit
+def test_extract_sections_header_boundaries():
+    """Headers need preceding whitespace and do not reuse consumed whitespace."""
+    processor = ContentProcessor(
+        raw_content="EDUCATION\n\nEXPERIENCE: ten years\nWORKEXPERIENCE KNOWLEDGE: policy",
+        language="en",
+    )
+    sections = processor.extract_sections()
+    assert sections == {
+        "EDUCATION": "EXPERIENCE: ten years\nWORKEXPERIENCE",
+        "KNOWLEDGE": "policy",
+    }
+
+    processor.raw_content = "Education: degree\nexperience - five years"
+    assert processor.extract_sections() == {
+        "Education": "degree",
+        "experience": "- five years",
+    }
+
+
+@pytest.mark.unit
+def test_parse_structured_fields_pattern_priority():
+    """The first pattern that matches anywhere wins, as with sequential searches."""
+    processor = ContentProcessor(
+        raw_content=(
+            "Job Title: Analyst\nPOSITION TITLE: Senior Analyst\n"
+            "Direct Reports: 3\nStaff Supervised: 7\n"
+            "Budget Authority: $500K\nBudget Responsibility: 1,200,000\n"
+        ),
+        language="en",
+    )
+    fields = processor.parse_structured_fields()
+    assert fields["position_title"] == "Senior Analyst"
+    assert fields["fte_count"] == 7
+    assert fields["salary_budget"] == 1_200_000_000.0  # K applies to any budget
+
+
+@pytest.mark.unit
+def test_extract_casefold_special_characters_use_regex_path():
+    """Texts whose case folding differs from str.lower() match like IGNORECASE."""
+    processor = ContentProcessor(
+        raw_content="İ note\nPOſITION TITLE: Analyst\nEDUCATION degree",
+        language="en",
+    )
+    assert processor.parse_structured_fields()["position_title"] == "Analyst"
+    assert processor.extract_sections() == {"EDUCATION": "degree"}
+
+
+@pytest.mark.unit
+def test_french_sections_and_fields():
+    """French documents use the French tables and still match English labels."""
+    processor = ContentProcessor(
+        raw_content=(
+            "Titre du poste : Directeur, Analyse\n"
+            "Relève de : Directrice générale\n"
+            "Ministère : Emploi et Développement social\n"
+            "Personnel supervisé : 8\n"
+            "Budget Authority: $1.5M\n"
+            "RESPONSABILITÉS GÉNÉRALES\nDiriger le programme.\n"
+            "EXPÉRIENCE : Dix ans.\n"
+            "DIMENSIONS\nBudget annuel."
+        ),
+        language="fr",
+    )
+    result = processor.process_content(processor.raw_content, "fr")
+    assert result.sections == {
+        "RESPONSABILITÉS GÉNÉRALES": "Diriger le programme.",
+        "EXPÉRIENCE": "Dix ans.",
+        "DIMENSIONS": "Budget annuel.",
+    }
+    fields = result.structured_fields
+    assert fields.position_title == "Directeur, Analyse"
+    assert fields.reports_to == "Directrice générale"
+    assert fields.department == "Emploi et Développement social"
+    assert fields.fte_count == 8
+    assert fields.salary_budget == 1_500_000.0
+
+
+@pytest.mark.unit
+def test_english_documents_ignore_french_headers():
+    """English processing keeps the English header table only."""
+    processor = ContentProcessor(
+        raw_content="EXPÉRIENCE\nDix ans.\nEXPERIENCE\nTen years.", language="en"
+    )
+    assert processor.extract_sections() == {"EXPERIENCE": "Ten years."}
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_process_content_success(processor):
@@ -203,6 +291,93 @@ def test_chunk_content_with_overlap(processor):
     assert len(chunks) >= 2
 
 
+@pytest.mark.unit
+def test_iter_chunks_respects_sections(processor, sample_job_description_text):
+    """Chunks never span two sections and record the section they came from."""
+    processed = processor.process_content(sample_job_description_text, "en")
+    chunks = list(processor.iter_chunks(processed, max_tokens=40, overlap_tokens=5))
+
+    assert chunks
+    section_types = {chunk.section_type for chunk in chunks}
+    assert section_types <= set(processed.sections) | {None}
+    for chunk in chunks:
+        assert chunk.token_count <= 40
+        if chunk.section_type is None:
+            assert chunk.text in processor.clean_text(processed.preamble)
+        else:
+            section_text = processor.clean_text(processed.sections[chunk.section_type])
+            assert chunk.text in section_text
+
+
+@pytest.mark.unit
+def test_iter_chunks_unchanged_section_is_identical(processor):
+    """Editing one section leaves the other sections' chunks byte-identical."""
+    body = "The incumbent leads policy analysis. " * 40
+    original = processor.process_content(
+        f"GENERAL ACCOUNTABILITY\n{body}\nDIMENSIONS\nBudget of $2M.", "en"
+    )
+    edited = processor.process_content(
+        f"GENERAL ACCOUNTABILITY\n{body}\nDIMENSIONS\nBudget of $3M.", "en"
+    )
+
+    def section_chunks(processed, section_type):
+        return [
+            chunk.text
+            for chunk in processor.iter_chunks(processed, max_tokens=64)
+            if chunk.section_type == section_type
+        ]
+
+    assert section_chunks(original, "GENERAL ACCOUNTABILITY") == section_chunks(
+        edited, "GENERAL ACCOUNTABILITY"
+    )
+    assert section_chunks(original, "DIMENSIONS") != section_chunks(
+        edited, "DIMENSIONS"
+    )
+
+
+@pytest.mark.unit
+def test_iter_chunks_overlap_and_progress():
+    """Chunks overlap by whole words, prefer sentence ends and always advance."""
+    processor = ContentProcessor()
+    processed = ProcessedContent(
+        cleaned_content="One two three. Four five six seven eight nine ten."
+    )
+    chunks = [
+        chunk.text
+        for chunk in processor.iter_chunks(processed, max_tokens=5, overlap_tokens=2)
+    ]
+    assert chunks == [
+        "One two three.",
+        "three. Four five six",
+        "five six seven eight",
+        "eight nine ten.",
+    ]
+
+    processed = ProcessedContent(cleaned_content="x" * 30 + " tail")
+    chunks = [
+        chunk.text
+        for chunk in processor.iter_chunks(processed, max_tokens=3, overlap_tokens=1)
+    ]
+    assert chunks == ["x" * 12, "x" * 12, "x" * 6, "tail"]
+
+
+@pytest.mark.unit
+def test_iter_chunks_caps_tokens_at_model_limit():
+    """Requested chunk sizes above the embedding model's input limit are capped."""
+    processor = ContentProcessor()
+    processed = ProcessedContent(cleaned_content="word " * 20000)
+    chunks = list(processor.iter_chunks(processed, max_tokens=100000))
+    assert len(chunks) > 1
+    assert all(chunk.token_count <= EMBEDDING_MAX_INPUT_TOKENS for chunk in chunks)
+
+
+@pytest.mark.unit
+def test_iter_chunks_empty_content():
+    """Empty documents produce no chunks."""
+    processor = ContentProcessor()
+    assert list(processor.iter_chunks(ProcessedContent())) == []
+
+
 @pytest.mark.unit
 @pytest.mark.benchmark
 def test_process_large_file_performance(processor, sample_job_description_text):
@@ -0,0 +1,160 @@
+"""
+Unit tests for the content-addressed embedding cache.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from jd_ingestion.services.embedding_cache import (
+    EmbeddingCache,
+    _decode_vector,
+    _encode_vector,
+    compute_text_hash,
+)
+
+
+class FakeRedisPipeline:
+    """Minimal pipeline that buffers SETEX calls."""
+
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    async def execute(self):
+        for key, ttl, value in self.commands:
+            self.store[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the async Redis client."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self.store)
+
+
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Test EmbeddingCache tiers and metrics."""
+
+    MODEL = "text-embedding-ada-002"
+
+    @pytest.fixture
+    def fake_redis(self):
+        """Patch the shared cache service with a fake Redis client."""
+        fake = FakeRedis()
+        with patch(
+            "jd_ingestion.services.embedding_cache.cache_service.redis_client", fake
+        ):
+            yield fake
+
+    @pytest.fixture
+    def no_redis(self):
+        """Disable the Redis tier."""
+        with patch(
+            "jd_ingestion.services.embedding_cache.cache_service.redis_client", None
+        ):
+            yield
+
+    def test_compute_text_hash_is_sha256(self):
+        """Text hash is a stable 64-character SHA-256 digest."""
+        text_hash = compute_text_hash("Key Activities")
+        assert len(text_hash) == 64
+        assert text_hash == compute_text_hash("Key Activities")
+        assert text_hash != compute_text_hash("Key activities")
+
+    def test_vector_round_trip(self):
+        """Vectors survive float32 encoding."""
+        vector = [0.5, -0.25, 1.0]
+        assert _decode_vector(_encode_vector(vector)) == vector
+
+    @pytest.mark.asyncio
+    async def test_local_hit_and_miss_counters(self, no_redis):
+        """Local tier serves repeated lookups and counts hits and misses."""
+        cache = EmbeddingCache(max_local_entries=10)
+
+        assert await cache.get(self.MODEL, "abc") is None
+        await cache.set(self.MODEL, "abc", [0.1, 0.2])
+
+        assert await cache.get(self.MODEL, "abc") == [0.1, 0.2]
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["local_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_by_model(self, no_redis):
+        """The same text hash under another model is a miss."""
+        cache = EmbeddingCache(max_local_entries=10)
+        await cache.set(self.MODEL, "abc", [0.1])
+
+        assert await cache.get("text-embedding-3-small", "abc") is None
+
+    @pytest.mark.asyncio
+    async def test_local_lru_eviction(self, no_redis):
+        """Least recently used entries are evicted first."""
+        cache = EmbeddingCache(max_local_entries=2)
+        await cache.set(self.MODEL, "a", [1.0])
+        await cache.set(self.MODEL, "b", [2.0])
+        await cache.get(self.MODEL, "a")  # "b" is now least recently used
+        await cache.set(self.MODEL, "c", [3.0])
+
+        assert await cache.get(self.MODEL, "b") is None
+        assert await cache.get(self.MODEL, "a") == [1.0]
+        assert cache.get_stats()["local_evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_workers(self, fake_redis):
+        """A vector stored by one worker is a Redis hit for another."""
+        writer = EmbeddingCache(max_local_entries=10)
+        reader = EmbeddingCache(max_local_entries=10)
+        await writer.set_many(self.MODEL, {"h1": [0.5], "h2": [0.25]})
+
+        found = await reader.get_many(self.MODEL, ["h1", "h2", "h3"])
+
+        assert found == {"h1": [0.5], "h2": [0.25]}
+        stats = reader.get_stats()
+        assert stats["redis_hits"] == 2
+        assert stats["misses"] == 1
+        # Redis hits are promoted to the local tier
+        assert await reader.get(self.MODEL, "h1") == [0.5]
+        assert reader.get_stats()["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_database_tier_reuses_chunk_embeddings(self, no_redis):
+        """Chunks with the same text hash supply embeddings when a session is given."""
+        cache = EmbeddingCache(max_local_entries=10)
+        row = MagicMock(text_hash="h1", embedding=[0.75, 0.5])
+        result = MagicMock()
+        result.all.return_value = [row]
+        db = AsyncMock()
+        db.execute.return_value = result
+
+        found = await cache.get_many(self.MODEL, ["h1", "h2"], db=db)
+
+        assert found == {"h1": [0.75, 0.5]}
+        assert cache.get_stats()["database_hits"] == 1
+        db.execute.assert_awaited_once()
+        # Promoted to the local tier, so the database is not queried again
+        assert await cache.get(self.MODEL, "h1") == [0.75, 0.5]
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_is_a_no_op(self, no_redis):
+        """Nothing is stored or returned when the cache is disabled."""
+        cache = EmbeddingCache(max_local_entries=10)
+        with patch(
+            "jd_ingestion.services.embedding_cache.settings.embedding_cache_enabled",
+            False,
+        ):
+            await cache.set(self.MODEL, "abc", [0.1])
+            assert await cache.get(self.MODEL, "abc") is None
+        assert cache.get_stats()["local_entries"] == 0
@@ -2,10 +2,22 @@
 Unit tests for the EmbeddingService.
 """
 
+import json
+
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 
 from jd_ingestion.services.embedding_service import EmbeddingService
+from jd_ingestion.services.openai_dispatcher import openai_dispatcher
+
+
+@pytest.fixture(autouse=True)
+def no_shared_embedding_cache():
+    """Keep the Redis embedding cache tier out of these tests."""
+    with patch(
+        "jd_ingestion.services.embedding_cache.cache_service.redis_client", None
+    ):
+        yield
 
 
 @pytest.mark.unit
@@ -434,12 +446,11 @@ class TestEmbeddingService:
         mock_embeddings = Mock()
         mock_embeddings.create = AsyncMock()
 
-        # Simulate mixed success/failure
-        call_count = [0]
-
+        # Simulate a batch rejected because of one bad input; the per-item
+        # retries then succeed for every other text
         def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 2:
+            inputs = kwargs["input"]
+            if "Text 2" in inputs:
                 raise Exception("API Error")
             return Mock(
                 data=[Mock(embedding=mock_openai_embedding)],
@@ -848,6 +859,213 @@ class TestEmbeddingService:
 
             assert results == []
 
+    # Tests for find_similar_jobs_multi_vector
+    @pytest.mark.asyncio
+    async def test_find_similar_jobs_multi_vector_single_query(self, embedding_service):
+        """All source vectors are searched and aggregated in one round trip."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.fetchall.return_value = [
+            Mock(
+                job_id=7,
+                job_number="JD-7",
+                title="Data Analyst",
+                classification="EC-04",
+                language="en",
+                similarity_score=0.91,
+                matching_chunks=4,
+            )
+        ]
+        mock_session.execute.return_value = mock_result
+
+        results = await embedding_service.find_similar_jobs_multi_vector(
+            job_id=1,
+            db=mock_session,
+            limit=5,
+            classification_filter="EC-04",
+            language_filter="en",
+        )
+
+        mock_session.execute.assert_awaited_once()
+        sql, params = mock_session.execute.call_args[0]
+        assert "CROSS JOIN LATERAL" in str(sql)
+        assert "jd.classification = :classification" in str(sql)
+        assert params["job_id"] == 1
+        assert params["classification"] == "EC-04"
+        assert params["language"] == "en"
+        assert params["max_source_vectors"] == 3
+        assert results == [
+            {
+                "job_id": 7,
+                "job_number": "JD-7",
+                "title": "Data Analyst",
+                "classification": "EC-04",
+                "language": "en",
+                "similarity_score": 0.91,
+                "matching_chunks": 4,
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_find_similar_jobs_multi_vector_centroid(self, embedding_service):
+        """Centroid mode averages chunk vectors when no job embedding is stored."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.fetchall.return_value = []
+        mock_session.execute.return_value = mock_result
+
+        results = await embedding_service.find_similar_jobs_multi_vector(
+            job_id=1, db=mock_session, use_centroid=True
+        )
+
+        # First the stored centroid is tried, then the on-the-fly mean
+        assert mock_session.execute.call_count == 2
+        assert "FROM job_embeddings src" in str(
+            mock_session.execute.call_args_list[0][0][0]
+        )
+        sql = str(mock_session.execute.call_args[0][0])
+        assert "AVG(cc.embedding)" in sql
+        assert "LIMIT :max_source_vectors" not in sql
+        assert results == []
+
+    @pytest.mark.asyncio
+    async def test_find_similar_jobs_multi_vector_stored_centroid(
+        self, embedding_service
+    ):
+        """Centroid mode uses the job_embeddings kNN when a centroid exists."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.fetchall.return_value = [
+            Mock(
+                job_id=7,
+                job_number="JD-7",
+                title="Data Analyst",
+                classification="EC-04",
+                language="en",
+                similarity_score=0.9,
+            ),
+            Mock(
+                job_id=8,
+                job_number="JD-8",
+                title="Clerk",
+                classification="CR-04",
+                language="en",
+                similarity_score=0.5,
+            ),
+        ]
+        mock_session.execute.return_value = mock_result
+
+        results = await embedding_service.find_similar_jobs_multi_vector(
+            job_id=1,
+            db=mock_session,
+            use_centroid=True,
+            language_filter="en",
+        )
+
+        mock_session.execute.assert_called_once()
+        sql = str(mock_session.execute.call_args[0][0])
+        params = mock_session.execute.call_args[0][1]
+        assert "FROM job_embeddings je" in sql
+        assert "jd.language = :language" in sql
+        assert params["language"] == "en"
+        # Below-threshold neighbours are dropped
+        assert [r["job_id"] for r in results] == [7]
+        assert results[0]["matching_chunks"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_similar_jobs_uses_job_embeddings(self, embedding_service):
+        """Similar jobs come from the job-level index when a centroid exists."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        # A source centroid with no qualifying neighbours yields one NULL row
+        mock_result.fetchall.return_value = [
+            Mock(
+                job_id=None,
+                job_number=None,
+                title=None,
+                classification=None,
+                language=None,
+                similarity_score=None,
+            )
+        ]
+        mock_session.execute.return_value = mock_result
+
+        with patch.object(embedding_service, "find_similar_chunks") as mock_chunks:
+            results = await embedding_service.get_similar_jobs(
+                job_id=1, db=mock_session
+            )
+
+        assert results == []
+        mock_chunks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_update_job_embedding_unweighted(self, embedding_service):
+        """Without weights the centroid is upserted with a single AVG query."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.first.return_value = (1,)
+        mock_session.execute.return_value = mock_result
+
+        with patch(
+            "jd_ingestion.services.embedding_service.settings.job_embedding_section_weights",
+            {},
+        ):
+            stored = await embedding_service.update_job_embedding(1, mock_session)
+
+        assert stored is True
+        mock_session.execute.assert_called_once()
+        sql = str(mock_session.execute.call_args[0][0])
+        assert "AVG(cc.embedding)" in sql
+        assert "ON CONFLICT (job_id) DO UPDATE" in sql
+        mock_session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_job_embedding_section_weights(self, embedding_service):
+        """Section weights produce a weighted mean computed client-side."""
+        mock_session = AsyncMock()
+        chunk_result = Mock()
+        chunk_result.all.return_value = [
+            Mock(embedding=[1.0, 0.0], section_type="duties"),
+            Mock(embedding=[0.0, 1.0], section_type="general"),
+        ]
+        mock_session.execute.side_effect = [chunk_result, Mock()]
+
+        stored = await embedding_service.update_job_embedding(
+            1, mock_session, section_weights={"duties": 3.0}
+        )
+
+        assert stored is True
+        params = mock_session.execute.call_args_list[1][0][1]
+        assert params["embedding"] == "[0.75,0.25]"
+        assert params["chunk_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_update_job_embedding_no_chunks(self, embedding_service):
+        """Nothing is stored when the job has no embedded chunks."""
+        mock_session = AsyncMock()
+        mock_result = Mock()
+        mock_result.first.return_value = None
+        mock_session.execute.return_value = mock_result
+
+        stored = await embedding_service.update_job_embedding(
+            1, mock_session, section_weights={}
+        )
+
+        assert stored is False
+
+    @pytest.mark.asyncio
+    async def test_update_job_embedding_database_error(self, embedding_service):
+        """Database errors are logged, rolled back and reported as False."""
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = Exception("Database error")
+
+        stored = await embedding_service.update_job_embedding(
+            1, mock_session, section_weights={}
+        )
+
+        assert stored is False
+        mock_session.rollback.assert_awaited_once()
+
     # Tests for get_performance_stats
     @pytest.mark.asyncio
     async def test_get_performance_stats_success(self, embedding_service):
@@ -935,6 +1153,8 @@ class TestEmbeddingService:
         mock_chunk = Mock()
         mock_chunk.embedding = [0.1] * 1536
         mock_embedding_result.first.return_value = mock_chunk
+        # No stored job-level centroid, so the chunk-level path is used
+        mock_embedding_result.fetchall.return_value = []
 
         # Mock find_similar_chunks to return results
         with patch.object(
@@ -967,6 +1187,7 @@ class TestEmbeddingService:
         # Mock empty result
         mock_result = Mock()
         mock_result.first.return_value = None
+        mock_result.fetchall.return_value = []
         mock_session.execute.return_value = mock_result
 
         results = await embedding_service.get_similar_jobs(job_id=1, db=mock_session)
@@ -999,7 +1220,12 @@ class TestEmbeddingService:
         mock_result.scalars.return_value.all.return_value = mock_chunks
         mock_session.execute.return_value = mock_result
 
-        with patch.object(embedding_service, "generate_embedding") as mock_generate:
+        with (
+            patch.object(embedding_service, "generate_embedding") as mock_generate,
+            patch.object(
+                embedding_service, "update_job_embedding", new_callable=AsyncMock
+            ) as mock_update_centroid,
+        ):
             mock_generate.return_value = [0.1] * 1536
 
             success = await embedding_service.generate_embeddings_for_job(
@@ -1009,6 +1235,7 @@ class TestEmbeddingService:
             assert success is True
             assert mock_generate.call_count == len(mock_chunks)
             mock_session.commit.assert_called_once()
+            mock_update_centroid.assert_awaited_once_with(1, mock_session)
 
     @pytest.mark.asyncio
     async def test_generate_embeddings_for_job_already_exists(self, embedding_service):
@@ -1042,7 +1269,12 @@ class TestEmbeddingService:
         mock_result.scalars.return_value.all.return_value = mock_chunks
         mock_session.execute.return_value = mock_result
 
-        with patch.object(embedding_service, "generate_embedding") as mock_generate:
+        with (
+            patch.object(embedding_service, "generate_embedding") as mock_generate,
+            patch.object(
+                embedding_service, "update_job_embedding", new_callable=AsyncMock
+            ),
+        ):
             # First succeeds, second fails, third succeeds
             mock_generate.side_effect = [[0.1] * 1536, None, [0.2] * 1536]
 
@@ -1354,3 +1586,145 @@ class TestEmbeddingService:
         similarity = embedding_service.calculate_similarity(emb1, emb2)
         # Use pytest.approx for floating point comparison
         assert similarity == pytest.approx(1.0, rel=1e-9)
+
+
+@pytest.mark.unit
+class TestEmbeddingBatchingAgainstFakeServer:
+    """Test multi-input batching against a local fake OpenAI embeddings server."""
+
+    BASE_URL = "http://fake-openai.test/v1"
+
+    @pytest.fixture
+    def fake_server(self):
+        """Fake /embeddings endpoint that encodes each input's text in its vector."""
+        import httpx
+        import respx
+
+        requests_seen = []
+
+        def handler(request):
+            payload = json.loads(request.content)
+            inputs = payload["input"]
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            requests_seen.append(inputs)
+            if any("poison" in text for text in inputs) and len(inputs) > 1:
+                return httpx.Response(400, json={"error": {"message": "bad input"}})
+            if any("poison" in text for text in inputs):
+                return httpx.Response(500, json={"error": {"message": "boom"}})
+            # Return items out of order to exercise index-based reassembly
+            data = [
+                {"object": "embedding", "index": i, "embedding": [float(len(text))]}
+                for i, text in enumerate(inputs)
+            ][::-1]
+            return httpx.Response(
+                200,
+                json={
+                    "object": "list",
+                    "data": data,
+                    "model": payload["model"],
+                    "usage": {"prompt_tokens": 10, "total_tokens": 10},
+                },
+            )
+
+        with respx.mock(base_url=self.BASE_URL, assert_all_called=False) as router:
+            router.post("/embeddings").mock(side_effect=handler)
+            yield requests_seen
+
+    @pytest.fixture
+    def service(self):
+        """EmbeddingService pointed at the fake server with rate limits stubbed."""
+        from jd_ingestion.config.settings import settings
+
+        with (
+            patch.object(settings, "openai_api_key", "sk-test"),
+            patch.object(settings, "openai_base_url", self.BASE_URL),
+            patch.object(settings, "openai_max_retries", 0),
+            patch(
+                "jd_ingestion.services.embedding_service.rate_limiting_service"
+            ) as mock_rate_limiter,
+            patch.object(openai_dispatcher, "rate_limiter", mock_rate_limiter),
+        ):
+            mock_rate_limiter.check_rate_limit = AsyncMock(return_value=(True, []))
+            mock_rate_limiter.record_usage = AsyncMock()
+            service = EmbeddingService()
+            service.client = service.client.with_options(max_retries=0)
+            service._log_api_usage = AsyncMock()
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_single_request_preserves_order(self, fake_server, service):
+        """Many texts are sent in one request and mapped back in input order."""
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+        embeddings = await service.generate_embeddings_batch(texts)
+
+        assert len(fake_server) == 1
+        assert fake_server[0] == texts
+        assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        service._log_api_usage.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_requests_bounded_by_inputs_and_tokens(self, fake_server, service):
+        """Requests are split by max inputs and by estimated token budget."""
+        texts = [f"{i}" + "x" * 39 for i in range(5)]  # ~10 estimated tokens each
+
+        embeddings = await service.generate_embeddings_batch(
+            texts, batch_size=3, max_tokens_per_request=25
+        )
+
+        assert [len(inputs) for inputs in fake_server] == [2, 2, 1]
+        assert all(emb == [40.0] for emb in embeddings)
+
+    @pytest.mark.asyncio
+    async def test_empty_texts_are_not_sent(self, fake_server, service):
+        """Blank texts get None without being included in the request."""
+        embeddings = await service.generate_embeddings_batch(["one", "   ", "three"])
+
+        assert fake_server == [["one", "three"]]
+        assert embeddings == [[3.0], None, [5.0]]
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_isolated_per_item(self, fake_server, service):
+        """A rejected batch is retried per item so only the bad text fails."""
+        embeddings = await service.generate_embeddings_batch(
+            ["good", "poison pill", "fine"]
+        )
+
+        assert embeddings[0] == [4.0]
+        assert embeddings[1] is None
+        assert embeddings[2] == [4.0]
+        # One batched attempt followed by one request per item
+        assert [len(inputs) for inputs in fake_server] == [3, 1, 1, 1]
+
+    def test_pack_embedding_requests_oversized_item(self):
+        """An item larger than the token budget still gets its own request."""
+        items = [(0, "a" * 400), (1, "b" * 4), (2, "c" * 4)]
+
+        requests = EmbeddingService._pack_embedding_requests(
+            items, max_inputs=10, max_tokens=50
+        )
+
+        assert [[i for i, _ in request] for request in requests] == [[0], [1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_and_cached_texts_skip_the_api(self, fake_server, service):
+        """Repeated texts are embedded once and cached texts are not re-sent."""
+        first = await service.generate_embeddings_batch(["same", "other", "same"])
+
+        assert fake_server == [["same", "other"]]
+        assert first == [[4.0], [5.0], [4.0]]
+
+        second = await service.generate_embeddings_batch(["other", "new"])
+
+        assert fake_server[1:] == [["new"]]
+        assert second == [[5.0], [3.0]]
+        assert service.embedding_cache.get_stats()["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_generate_embedding_uses_cache(self, fake_server, service):
+        """A single-text call is served from the cache on repeat."""
+        assert await service.generate_embedding("repeat me") == [9.0]
+        assert await service.generate_embedding("  repeat   me ") == [9.0]
+
+        assert len(fake_server) == 1
@@ -324,14 +324,15 @@ class TestAsyncImplementations:
         # Mock database query - need proper async mock chain
         mock_scalars = MagicMock()
         mock_scalars.all.return_value = mock_chunks
-        mock_result = AsyncMock()
+        mock_result = MagicMock()
         mock_result.scalars.return_value = mock_scalars
         mock_db.execute.return_value = mock_result
 
         # Mock embedding service
-        mock_embedding_service.generate_embedding = AsyncMock(
-            return_value=[0.1, 0.2, 0.3]
+        mock_embedding_service.generate_embeddings_batch = AsyncMock(
+            return_value=[[0.1, 0.2, 0.3]] * 3
         )
+        mock_embedding_service.update_job_embedding = AsyncMock(return_value=True)
 
         # Mock task
         mock_task = MagicMock()
@@ -344,11 +345,17 @@ class TestAsyncImplementations:
         assert result["chunks_processed"] == 3
         assert result["successful_embeddings"] == 3
         assert result["failed_embeddings"] == 0
+        assert result["job_embedding_updated"] is True
 
         # Verify embeddings were set
         for chunk in mock_chunks:
             assert chunk.embedding == [0.1, 0.2, 0.3]
 
+        # Job-level centroid is refreshed once after all batches
+        mock_embedding_service.update_job_embedding.assert_awaited_once_with(
+            123, mock_db
+        )
+
         # Verify database commit
         mock_db.commit.assert_called()
 
@@ -365,7 +372,7 @@ class TestAsyncImplementations:
         # Mock empty result
         mock_scalars = MagicMock()
         mock_scalars.all.return_value = []
-        mock_result = AsyncMock()
+        mock_result = MagicMock()
         mock_result.scalars.return_value = mock_scalars
         mock_db.execute.return_value = mock_result
 
@@ -393,20 +400,15 @@ class TestAsyncImplementations:
         # Mock database query - need proper async mock chain
         mock_scalars = MagicMock()
         mock_scalars.all.return_value = mock_chunks
-        mock_result = AsyncMock()
+        mock_result = MagicMock()
         mock_result.scalars.return_value = mock_scalars
         mock_db.execute.return_value = mock_result
 
-        # Mock embedding service with alternating success/failure
-        async def mock_generate_embedding(text):
-            if "chunk 1" in text:
-                return [0.1, 0.2, 0.3]
-            elif "chunk 2" in text:
-                return None  # Failure
-            else:
-                raise Exception("Embedding error")
-
-        mock_embedding_service.generate_embedding = mock_generate_embedding
+        # Mock embedding service with per-item failures inside the batch
+        mock_embedding_service.generate_embeddings_batch = AsyncMock(
+            return_value=[[0.1, 0.2, 0.3], None, None]
+        )
+        mock_embedding_service.update_job_embedding = AsyncMock(return_value=True)
 
         # Mock task
         mock_task = MagicMock()
@@ -417,6 +419,37 @@ class TestAsyncImplementations:
         assert result["status"] == "completed"
         assert result["successful_embeddings"] == 1
         assert result["failed_embeddings"] == 2
+        mock_embedding_service.update_job_embedding.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("jd_ingestion.tasks.embedding_tasks.AsyncSessionLocal")
+    @patch("jd_ingestion.tasks.embedding_tasks.embedding_service")
+    async def test_generate_embeddings_for_job_async_skips_centroid_when_all_fail(
+        self, mock_embedding_service, mock_session_local, mock_chunks
+    ):
+        """The job-level embedding is not touched when no chunk was embedded."""
+        mock_db = AsyncMock()
+        mock_session_local.return_value.__aenter__.return_value = mock_db
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = mock_chunks
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        mock_db.execute.return_value = mock_result
+
+        mock_embedding_service.generate_embeddings_batch = AsyncMock(
+            return_value=[None, None, None]
+        )
+        mock_embedding_service.update_job_embedding = AsyncMock(return_value=True)
+
+        mock_task = MagicMock()
+        mock_task.update_state = MagicMock()
+
+        result = await _generate_embeddings_for_job_async(123, mock_task)
+
+        assert result["failed_embeddings"] == 3
+        assert result["job_embedding_updated"] is False
+        mock_embedding_service.update_job_embedding.assert_not_awaited()
 
     @pytest.mark.asyncio
     @patch("jd_ingestion.tasks.embedding_tasks.AsyncSessionLocal")
@@ -528,7 +561,7 @@ class TestAsyncImplementations:
         # Mock database query - need proper async mock chain
         mock_scalars = MagicMock()
         mock_scalars.all.return_value = mock_chunks
-        mock_result = AsyncMock()
+        mock_result = MagicMock()
         mock_result.scalars.return_value = mock_scalars
         mock_db.execute.return_value = mock_result
 
@@ -537,6 +570,7 @@ class TestAsyncImplementations:
         mock_embedding_service.generate_embeddings_batch = AsyncMock(
             return_value=embeddings
         )
+        mock_embedding_service.update_job_embeddings = AsyncMock(return_value=1)
 
         # Mock task
         mock_task = MagicMock()
@@ -553,6 +587,12 @@ class TestAsyncImplementations:
         for i, chunk in enumerate(mock_chunks):
             assert chunk.embedding == embeddings[i]
 
+        # The centroid of every job that gained embeddings is refreshed
+        mock_embedding_service.update_job_embeddings.assert_awaited_once_with(
+            {123}, mock_db
+        )
+        assert result["job_embeddings_updated"] == 1
+
     @pytest.mark.asyncio
     @patch("jd_ingestion.tasks.embedding_tasks.AsyncSessionLocal")
     async def test_generate_missing_embeddings_async_no_chunks(
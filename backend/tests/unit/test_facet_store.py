@@ -0,0 +1,316 @@
+"""
+Tests for the precomputed facet store behind the search facet endpoints.
+"""
+
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from jd_ingestion.api.endpoints.search import (
+    get_filter_statistics,
+    get_popular_filters,
+    get_search_facets,
+)
+from jd_ingestion.services.facet_store import FacetStore
+
+
+def result(rows=None, scalar=None):
+    result = Mock()
+    result.all = Mock(return_value=rows or [])
+    result.one = Mock(return_value=(rows or [None])[0])
+    result.scalar = Mock(return_value=scalar)
+    result.scalars = Mock(return_value=Mock(all=Mock(return_value=rows or [])))
+    return result
+
+
+def session(*results):
+    db = Mock()
+    db.execute = AsyncMock(side_effect=list(results))
+
+    @asynccontextmanager
+    async def begin_nested():
+        yield
+
+    db.begin_nested = begin_nested
+    return db
+
+
+def params(call):
+    statement = call[0][0]
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+def stored_row(facet, value="", count=0, total=None, low=None, high=None):
+    return SimpleNamespace(
+        facet=facet,
+        value=value,
+        row_count=count,
+        value_sum=total,
+        value_min=low,
+        value_max=high,
+    )
+
+
+STORED = [
+    stored_row("classification", "EC", 40),
+    stored_row("classification", "AS", 60),
+    stored_row("language", "en", 90),
+    stored_row("department", "Finance", 7),
+    stored_row("location", "Ottawa", 12),
+    stored_row("section_type", "general_accountability", 95),
+    stored_row("embedded_chunks", "", 500),
+    stored_row("salary_budget", "", 4, 400000.0, 50000.0, 150000.0),
+    stored_row("fte_count", "", 2, 5.0, 1.0, 4.0),
+    stored_row(
+        "effective_date",
+        "",
+        2,
+        None,
+        float(date(2020, 1, 1).toordinal()),
+        float(date(2024, 12, 31).toordinal()),
+    ),
+]
+
+
+class TestFacetContributions:
+    """Test reading what a set of jobs contributes to each facet."""
+
+    async def test_counts_every_facet(self):
+        db = session(
+            result([("EC", "en", 2), ("AS", None, 1)]),
+            result(
+                [
+                    ("Finance", "Ottawa", 90000.0, 3, date(2024, 1, 1)),
+                    ("Finance", None, None, None, None),
+                ]
+            ),
+            result([("general_accountability", 3)]),
+            result(scalar=6),
+        )
+
+        contributions = await FacetStore().contributions(db, [1, 2, 3])
+
+        assert contributions == Counter(
+            {
+                ("classification", "EC"): 2,
+                ("classification", "AS"): 1,
+                ("language", "en"): 2,
+                ("department", "Finance"): 2,
+                ("location", "Ottawa"): 1,
+                ("salary_budget", 90000.0): 1,
+                ("fte_count", 3.0): 1,
+                ("effective_date", float(date(2024, 1, 1).toordinal())): 1,
+                ("section_type", "general_accountability"): 3,
+                ("embedded_chunks", ""): 6,
+            }
+        )
+
+    async def test_no_jobs_skips_database(self):
+        db = session()
+
+        assert await FacetStore().contributions(db, []) == Counter()
+        db.execute.assert_not_awaited()
+
+
+class TestFacetChanges:
+    """Test that a tracked change applies the difference in contributions."""
+
+    async def test_applies_difference(self):
+        store = FacetStore()
+        before = Counter({("classification", "EC"): 1, ("language", "en"): 1})
+        after = Counter({("classification", "AS"): 1, ("language", "en"): 1})
+        store.contributions = AsyncMock(side_effect=[before, after])
+        store.apply_delta = AsyncMock()
+        db = session()
+
+        change = await store.track(db, [7])
+        await change.apply([8])
+
+        store.contributions.assert_awaited_with(db, [7, 8])
+        store.apply_delta.assert_awaited_once_with(
+            db,
+            Counter({("classification", "AS"): 1}),
+            Counter({("classification", "EC"): 1}),
+        )
+
+    async def test_failures_do_not_reach_the_caller(self):
+        store = FacetStore()
+        store.contributions = AsyncMock(return_value=Counter())
+        store.apply_delta = AsyncMock(side_effect=Exception("relation does not exist"))
+
+        change = await store.track(session(), [7])
+        await change.apply()
+
+        store.contributions = AsyncMock(side_effect=Exception("connection reset"))
+        change = await store.track(session(), [7])
+        await change.apply()
+
+        assert change.before is None
+        assert store.apply_delta.await_count == 1
+
+
+class TestApplyDelta:
+    """Test the upserts written for a delta."""
+
+    async def test_counted_facets_are_upserted_then_pruned(self):
+        db = session(result(), result())
+
+        await FacetStore().apply_delta(
+            db,
+            Counter({("classification", "AS"): 1, ("language", "en"): 1}),
+            Counter({("classification", "EC"): 1, ("language", "en"): 1}),
+        )
+
+        upsert, prune = db.execute.call_args_list
+        assert "ON CONFLICT (facet, value) DO UPDATE" in str(
+            upsert[0][0].compile(dialect=postgresql.dialect())
+        )
+        values = params(upsert)
+        # Unchanged language count is not written
+        assert sorted(v for k, v in values.items() if k.startswith("row_count")) == [
+            -1,
+            1,
+        ]
+        assert str(prune[0][0]).startswith("DELETE FROM job_facet_counts")
+
+    async def test_removed_numbers_recompute_extremes(self):
+        db = session(result(), result([(40000.0, 95000.0)]), result())
+
+        await FacetStore().apply_delta(
+            db,
+            Counter({("salary_budget", 95000.0): 1}),
+            Counter({("salary_budget", 120000.0): 1}),
+        )
+
+        upsert, _, update = db.execute.call_args_list
+        values = params(upsert)
+        assert values["row_count"] == 0
+        assert values["value_sum"] == -25000.0
+        assert values["value_max"] == 95000.0
+        assert params(update)["value_max"] == 95000.0
+        assert params(update)["value_min"] == 40000.0
+
+    async def test_added_numbers_only_widen_extremes(self):
+        db = session(result())
+
+        await FacetStore().apply_delta(
+            db, Counter({("fte_count", 2.0): 1, ("fte_count", 6.0): 1}), Counter()
+        )
+
+        assert db.execute.await_count == 1
+        values = params(db.execute.call_args_list[0])
+        assert (values["value_min"], values["value_max"]) == (2.0, 6.0)
+        assert values["row_count"] == 2
+
+
+class TestFacetReads:
+    """Test reading the stored facets and filtered counts."""
+
+    async def test_load_groups_rows(self):
+        stored = await FacetStore().load(session(result(STORED)))
+
+        assert stored["counts"]["classification"] == {"EC": 40, "AS": 60}
+        assert stored["numeric"]["salary_budget"] == {
+            "count": 4,
+            "min": 50000.0,
+            "max": 150000.0,
+            "avg": 100000.0,
+        }
+        assert stored["numeric"]["effective_date"]["min"] == date(2020, 1, 1)
+        assert stored["numeric"]["effective_date"]["avg"] is None
+
+    async def test_filtered_counts_use_one_grouped_query(self):
+        db = session(
+            result(
+                [
+                    ("EC", None, None, None, 0, 1, 1, 1, 3),
+                    ("AS", None, None, None, 0, 1, 1, 1, 5),
+                    (None, "en", None, None, 1, 0, 1, 1, 8),
+                    (None, None, "Finance", None, 1, 1, 0, 1, 8),
+                    (None, None, None, None, 1, 1, 1, 0, 2),
+                ]
+            )
+        )
+
+        facets = await FacetStore().filtered_counts(
+            db, {"department": "fin", "language": None}
+        )
+
+        assert db.execute.await_count == 1
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "GROUPING SETS" in sql
+        assert facets == {
+            "classification": [
+                {"value": "AS", "count": 5},
+                {"value": "EC", "count": 3},
+            ],
+            "language": [{"value": "en", "count": 8}],
+            "department": [{"value": "Finance", "count": 8}],
+            "location": [],
+        }
+
+
+@pytest.fixture
+def no_cache():
+    with patch("jd_ingestion.api.endpoints.search.cache_service") as cache:
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock()
+        yield cache
+
+
+class TestFacetEndpoints:
+    """Test that the facet endpoints are built from the stored rows."""
+
+    async def test_filter_statistics(self, no_cache):
+        stats = await get_filter_statistics(db=session(result(STORED)))
+
+        assert stats["salary_statistics"] == {
+            "min_salary": 50000.0,
+            "max_salary": 150000.0,
+            "avg_salary": 100000.0,
+            "salary_count": 4,
+        }
+        assert stats["date_statistics"]["earliest_date"] == "2020-01-01"
+        assert stats["fte_statistics"]["max_fte"] == 4
+        assert stats["classification_distribution"] == [
+            {"classification": "AS", "count": 60},
+            {"classification": "EC", "count": 40},
+        ]
+        assert stats["department_distribution"] == [
+            {"department": "Finance", "count": 7}
+        ]
+        no_cache.set.assert_awaited_once()
+
+    async def test_search_facets(self, no_cache):
+        facets = await get_search_facets(
+            classification=None,
+            language=None,
+            department=None,
+            location=None,
+            db=session(result(STORED)),
+        )
+
+        assert facets["classifications"] == [
+            {"value": "AS", "count": 60},
+            {"value": "EC", "count": 40},
+        ]
+        assert facets["embedding_stats"] == {
+            "chunks_with_embeddings": 500,
+            "semantic_search_available": True,
+        }
+
+    async def test_popular_filters(self):
+        filters = await get_popular_filters(
+            query=None, limit=1, db=session(result(STORED))
+        )
+
+        assert filters["classifications"] == [
+            {"value": "AS", "count": 60, "label": "Classification: AS"}
+        ]
+        assert filters["languages"][0]["value"] == "en"
+        assert len(filters["date_ranges"]) == 4
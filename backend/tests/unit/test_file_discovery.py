@@ -1,6 +1,6 @@
 import pytest
 from pathlib import Path
-from jd_ingestion.core.file_discovery import FileDiscovery, FileMetadata
+from jd_ingestion.core.file_discovery import FileDiscovery, FileMetadata, ManifestEntry
 
 
 # Mock the logger to prevent actual logging during tests
@@ -159,3 +159,158 @@ def test_extract_metadata_from_filename_case_insensitivity(file_discovery_instan
     file_discovery_instance._extract_metadata_from_filename(filename, metadata)
     assert metadata.language == "fr"
     assert metadata.title == "directeur"
+
+
+def _manifest_for(discovery, file_path, **overrides):
+    stats = file_path.stat()
+    entry = ManifestEntry(
+        file_size=stats.st_size,
+        mtime_ns=stats.st_mtime_ns,
+        inode=stats.st_ino,
+        file_hash=discovery._calculate_file_hash(file_path),
+        encoding="utf-8",
+        job_id=42,
+    )
+    for key, value in overrides.items():
+        setattr(entry, key, value)
+    return {FileDiscovery.manifest_key(file_path): entry}
+
+
+def test_scan_directory_without_manifest_marks_files_new(tmp_path):
+    (tmp_path / "EX-01 Director 100001 - JD.txt").write_text("content")
+    metadata = FileDiscovery(tmp_path).scan_directory()
+
+    assert [m.change_status for m in metadata] == ["new"]
+    assert metadata[0].inode and metadata[0].mtime_ns
+
+
+def test_scan_directory_skips_hashing_unchanged_files(tmp_path, monkeypatch):
+    file_path = tmp_path / "EX-01 Director 100001 - JD.txt"
+    file_path.write_text("content")
+    discovery = FileDiscovery(tmp_path)
+    manifest = _manifest_for(discovery, file_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged files must not be re-read")
+
+    monkeypatch.setattr(discovery, "_calculate_file_hash", fail)
+    monkeypatch.setattr(discovery, "_detect_encoding", fail)
+
+    [metadata] = discovery.scan_directory(manifest=manifest)
+
+    assert metadata.change_status == "unchanged"
+    assert metadata.job_id == 42
+    assert (
+        metadata.file_hash == manifest[FileDiscovery.manifest_key(file_path)].file_hash
+    )
+
+
+def test_scan_directory_detects_modified_files(tmp_path):
+    file_path = tmp_path / "EX-01 Director 100001 - JD.txt"
+    file_path.write_text("content")
+    discovery = FileDiscovery(tmp_path)
+    manifest = _manifest_for(discovery, file_path, file_hash="0" * 64, mtime_ns=1)
+
+    [metadata] = discovery.scan_directory(manifest=manifest)
+
+    assert metadata.change_status == "modified"
+    assert metadata.job_id == 42
+    assert metadata.file_hash != "0" * 64
+
+
+def test_scan_directory_touched_file_with_same_content_is_unchanged(tmp_path):
+    file_path = tmp_path / "EX-01 Director 100001 - JD.txt"
+    file_path.write_text("content")
+    discovery = FileDiscovery(tmp_path)
+    # Stat signature differs (e.g. the file was copied back) but bytes are equal
+    manifest = _manifest_for(discovery, file_path, mtime_ns=1)
+
+    [metadata] = discovery.scan_directory(manifest=manifest)
+
+    assert metadata.change_status == "unchanged"
+    assert metadata.mtime_ns == file_path.stat().st_mtime_ns
+
+
+def _write_job_files(directory, count):
+    for i in range(count):
+        (directory / f"EX-01 Director {100000 + i} - JD.txt").write_text(
+            f"Job description {i} – café"
+        )
+
+
+def test_concurrent_scan_matches_serial_scan(tmp_path):
+    _write_job_files(tmp_path, 12)
+
+    serial = FileDiscovery(tmp_path, max_workers=1).scan_directory()
+    concurrent = FileDiscovery(tmp_path, max_workers=4).scan_directory()
+
+    def summary(files):
+        return [(str(f.file_path), f.file_hash, f.encoding) for f in files]
+
+    assert len(concurrent) == 12
+    assert summary(concurrent) == summary(serial)
+
+
+def test_iter_scan_streams_results(tmp_path):
+    _write_job_files(tmp_path, 20)
+    discovery = FileDiscovery(tmp_path, max_workers=2)
+
+    stream = discovery.iter_scan()
+    first = next(stream)
+    stream.close()
+
+    assert isinstance(first, FileMetadata)
+    assert first.file_hash
+
+
+def test_iter_scan_missing_directory_yields_nothing(tmp_path):
+    assert list(FileDiscovery(tmp_path / "missing").iter_scan()) == []
+
+
+def test_detect_encoding_utf8_fast_path_skips_chardet(tmp_path, monkeypatch):
+    file_path = tmp_path / "utf8.txt"
+    # Put a multi-byte character across the sample boundary
+    file_path.write_bytes(
+        b"a" * (FileDiscovery.ENCODING_SAMPLE_SIZE - 1) + "é".encode()
+    )
+
+    def fail(_):
+        raise AssertionError("chardet should not run for valid UTF-8")
+
+    monkeypatch.setattr("jd_ingestion.core.file_discovery.chardet.detect", fail)
+
+    assert FileDiscovery(tmp_path)._detect_encoding(file_path) == "utf-8"
+
+
+def test_detect_encoding_utf8_bom(tmp_path):
+    file_path = tmp_path / "bom.txt"
+    file_path.write_bytes(b"\xef\xbb\xbfhello")
+
+    assert FileDiscovery(tmp_path)._detect_encoding(file_path) == "utf-8-sig"
+
+
+def test_detect_encoding_falls_back_to_chardet(tmp_path, monkeypatch):
+    file_path = tmp_path / "latin1.txt"
+    file_path.write_bytes("Compétences linguistiques".encode("latin-1"))
+    monkeypatch.setattr(
+        "jd_ingestion.core.file_discovery.chardet.detect",
+        lambda _: {"encoding": "ISO-8859-1", "confidence": 0.9},
+    )
+
+    assert FileDiscovery(tmp_path)._detect_encoding(file_path) == "ISO-8859-1"
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 1024 * 1024 * 1024])
+def test_calculate_file_hash_matches_hashlib(tmp_path, mmap_threshold):
+    import hashlib
+
+    content = bytes(range(256)) * 9000  # > 2 read buffers
+    file_path = tmp_path / "large.txt"
+    file_path.write_bytes(content)
+    discovery = FileDiscovery(tmp_path)
+    discovery.HASH_READ_SIZE = 1024 * 1024
+    discovery.HASH_MMAP_THRESHOLD = mmap_threshold
+
+    assert discovery._calculate_file_hash(file_path) == (
+        hashlib.sha256(content).hexdigest()
+    )
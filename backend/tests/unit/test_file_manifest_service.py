@@ -0,0 +1,116 @@
+"""Tests for the persisted file manifest service."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from jd_ingestion.core.file_discovery import FileDiscovery, FileMetadata
+from jd_ingestion.services.file_manifest_service import FileManifestService
+
+
+@pytest.mark.unit
+class TestFileManifestService:
+    """Test loading and recording manifest entries."""
+
+    @pytest.fixture
+    def service(self):
+        return FileManifestService()
+
+    @pytest.mark.asyncio
+    async def test_load_returns_entries_keyed_by_path(self, service):
+        """Rows under the scanned root become ManifestEntry objects."""
+        db = AsyncMock()
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = [
+            MagicMock(
+                file_path="/data/a.txt",
+                file_size=10,
+                mtime_ns=123,
+                inode=7,
+                file_hash="abc",
+                encoding=None,
+                job_id=5,
+            )
+        ]
+        db.execute.return_value = result
+
+        manifest = await service.load(db, Path("/data"))
+
+        entry = manifest["/data/a.txt"]
+        assert (entry.file_size, entry.mtime_ns, entry.inode) == (10, 123, 7)
+        assert entry.encoding == "utf-8"
+        assert entry.job_id == 5
+        sql = str(db.execute.call_args[0][0])
+        assert "file_manifest.file_path LIKE" in sql
+
+    @pytest.mark.asyncio
+    async def test_record_upserts_in_batches(self, service):
+        """Entries are upserted on file_path, a bounded number per statement."""
+        db = AsyncMock()
+        service.UPSERT_BATCH_SIZE = 2
+        files = [
+            FileMetadata(file_path=Path(f"/data/{i}.txt"), file_hash=f"h{i}", job_id=i)
+            for i in range(3)
+        ]
+
+        recorded = await service.record(db, files)
+
+        assert recorded == 3
+        assert db.execute.await_count == 2
+        sql = str(
+            db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect())
+        )
+        assert "ON CONFLICT (file_path) DO UPDATE" in sql
+
+    @pytest.mark.asyncio
+    async def test_record_deduplicates_paths(self, service):
+        """The same path twice in one call is written once (last wins)."""
+        db = AsyncMock()
+        path = Path("/data/a.txt")
+
+        recorded = await service.record(
+            db,
+            [
+                FileMetadata(file_path=path, file_hash="old"),
+                FileMetadata(file_path=path, file_hash="new"),
+            ],
+        )
+
+        assert recorded == 1
+        params = db.execute.call_args[0][0].compile(dialect=postgresql.dialect()).params
+        assert params["file_hash_m0"] == "new"
+        assert params["file_path_m0"] == FileDiscovery.manifest_key(path)
+
+    @pytest.mark.asyncio
+    async def test_record_nothing(self, service):
+        """No statement is issued for an empty batch."""
+        db = AsyncMock()
+
+        assert await service.record(db, []) == 0
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_find_jobs_by_hash_keeps_oldest_job(self, service):
+        """When several jobs share a hash the lowest ID is returned."""
+        db = AsyncMock()
+        result = MagicMock()
+        result.all.return_value = [
+            MagicMock(file_hash="abc", id=1),
+            MagicMock(file_hash="abc", id=4),
+        ]
+        db.execute.return_value = result
+
+        jobs = await service.find_jobs_by_hash(db, ["abc", "", "abc"])
+
+        assert jobs == {"abc": 1}
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_find_jobs_by_hash_empty(self, service):
+        """No query is issued without hashes."""
+        db = AsyncMock()
+
+        assert await service.find_jobs_by_hash(db, [""]) == {}
+        db.execute.assert_not_awaited()
@@ -15,6 +15,7 @@ from jd_ingestion.api.main import app
 from jd_ingestion.database.models import (
     ContentChunk,
 )
+from jd_ingestion.processors.content_processor import TextChunk
 
 
 @pytest.fixture
@@ -32,7 +33,7 @@ def mock_content_processor():
     """Mock content processor."""
     processor = Mock()
     processor.process_content = Mock()
-    processor.chunk_content = Mock()
+    processor.iter_chunks = Mock()
     return processor
 
 
@@ -184,7 +185,10 @@ class TestProcessFileEndpoint:
         # Mock ContentProcessor
         mock_processor = Mock()
         mock_processor.process_content.return_value = sample_processed_content
-        mock_processor.chunk_content.return_value = ["chunk1", "chunk2"]
+        mock_processor.iter_chunks.return_value = [
+            TextChunk(text="chunk1"),
+            TextChunk(text="chunk2"),
+        ]
         mock_content_processor_class.return_value = mock_processor
 
         with patch("pathlib.Path.exists", return_value=True):
@@ -239,7 +243,10 @@ class TestProcessFileEndpoint:
 
         mock_processor = Mock()
         mock_processor.process_content.return_value = sample_processed_content
-        mock_processor.chunk_content.return_value = ["chunk1", "chunk2"]
+        mock_processor.iter_chunks.return_value = [
+            TextChunk(text="chunk1"),
+            TextChunk(text="chunk2"),
+        ]
         mock_content_processor_class.return_value = mock_processor
 
         mock_embedding_service.generate_embeddings_batch = AsyncMock(
@@ -165,6 +165,38 @@ class TestListJobs:
         # Verify that the query was built with filters
         assert mock_session.execute.call_count == 2
 
+    def test_list_filters_use_indexed_columns(self):
+        """Search matches the title by substring and content by full-text search."""
+        from sqlalchemy import select
+        from sqlalchemy.dialects import postgresql
+
+        from jd_ingestion.api.endpoints.jobs import _job_list_filters
+
+        filters = _job_list_filters(
+            search="analyst", department="Treasury", skill_ids="3, 5,3"
+        )
+        sql = str(
+            select(JobDescription.id)
+            .where(*filters)
+            .compile(dialect=postgresql.dialect())
+        )
+
+        assert "raw_content" not in sql
+        assert "job_descriptions.title ILIKE" in sql
+        assert "job_descriptions.search_vector @@" in sql
+        assert "EXISTS (SELECT 1 \nFROM job_metadata" in sql
+        # All skills are required, checked in one grouped subquery
+        assert "GROUP BY job_description_skills.job_id" in sql
+        assert "HAVING count(DISTINCT job_description_skills.skill_id)" in sql
+        assert _job_list_filters() == []
+
+        fallback = _job_list_filters(search="analyst", full_text=False)
+        assert "job_descriptions.raw_content ILIKE" in str(
+            select(JobDescription.id)
+            .where(*fallback)
+            .compile(dialect=postgresql.dialect())
+        )
+
     @pytest.mark.asyncio
     async def test_list_jobs_database_error(self, mock_session):
         """Test job listing with database error."""
@@ -469,6 +501,20 @@ class TestDeleteJob:
 
         assert exc_info.value.status_code == 500
 
+    @pytest.mark.asyncio
+    async def test_delete_job_invalidates_job_cache(self, sample_job):
+        """Test job deletion drops cached entries tagged with the job."""
+        mock_session = AsyncMock()
+        result_mock = Mock()
+        result_mock.scalar_one_or_none.return_value = sample_job
+        mock_session.execute.return_value = result_mock
+
+        with patch("jd_ingestion.api.endpoints.jobs.cache_service") as mock_cache:
+            mock_cache.invalidate_job_cache = AsyncMock(return_value=True)
+            await delete_job(job_id=1, db=mock_session, api_key="test_key")
+
+        mock_cache.invalidate_job_cache.assert_awaited_once_with(1)
+
 
 class TestBulkExportJobs:
     """Test bulk job export endpoint."""
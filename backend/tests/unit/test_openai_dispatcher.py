@@ -0,0 +1,248 @@
+"""
+Tests for the admission-controlled OpenAI request dispatcher.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from jd_ingestion.services.openai_dispatcher import (
+    AdmissionTimeoutError,
+    OpenAIDispatcher,
+    RequestPriority,
+)
+
+
+@pytest.fixture
+def rate_limiter():
+    """A rate limiter that admits everything unless told otherwise."""
+    limiter = Mock()
+    limiter.check_rate_limit = AsyncMock(return_value=(True, []))
+    limiter.get_recommended_delay = AsyncMock(return_value=0.0)
+    return limiter
+
+
+@pytest.fixture
+async def make_dispatcher(rate_limiter):
+    """Create dispatchers over the fake limiter and stop them afterwards."""
+    dispatchers = []
+
+    def factory(**kwargs):
+        dispatchers.append(OpenAIDispatcher(rate_limiter=rate_limiter, **kwargs))
+        return dispatchers[-1]
+
+    yield factory
+    for dispatcher in dispatchers:
+        await dispatcher.stop()
+
+
+class Recorder:
+    """Builds calls that record their start order and can be held open."""
+
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    def call(self, name, hold=False):
+        async def run():
+            self.started.append(name)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                if hold:
+                    await self.release.wait()
+                else:
+                    await asyncio.sleep(0)
+                return name
+            finally:
+                self.running -= 1
+
+        return run
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestOpenAIDispatcher:
+    """Test priority, fairness, concurrency and admission control."""
+
+    async def test_interactive_requests_overtake_bulk(self, make_dispatcher):
+        dispatcher = make_dispatcher(max_concurrency=1, interactive_slots=0)
+        recorder = Recorder()
+
+        blocker = asyncio.create_task(
+            dispatcher.submit(recorder.call("blocker", hold=True), "embedding")
+        )
+        await settle()
+        queued = [
+            asyncio.create_task(
+                dispatcher.submit(
+                    recorder.call(f"bulk-{i}"),
+                    "embedding",
+                    priority=RequestPriority.BULK,
+                )
+            )
+            for i in range(2)
+        ]
+        await settle()
+        queued.append(
+            asyncio.create_task(
+                dispatcher.submit(
+                    recorder.call("search"),
+                    "embedding",
+                    priority=RequestPriority.INTERACTIVE,
+                )
+            )
+        )
+        await settle()
+
+        recorder.release.set()
+        results = await asyncio.gather(blocker, *queued)
+
+        assert recorder.started == ["blocker", "search", "bulk-0", "bulk-1"]
+        assert results == ["blocker", "bulk-0", "bulk-1", "search"]
+
+    async def test_flows_take_turns_within_a_priority(self, make_dispatcher):
+        dispatcher = make_dispatcher(max_concurrency=1, interactive_slots=0)
+        recorder = Recorder()
+
+        blocker = asyncio.create_task(
+            dispatcher.submit(recorder.call("blocker", hold=True), "embedding")
+        )
+        await settle()
+        queued = [
+            asyncio.create_task(
+                dispatcher.submit(recorder.call(name), "embedding", flow=name[0])
+            )
+            for name in ["a1", "a2", "a3", "b1"]
+        ]
+        await settle()
+
+        recorder.release.set()
+        await asyncio.gather(blocker, *queued)
+
+        assert recorder.started == ["blocker", "a1", "b1", "a2", "a3"]
+
+    async def test_concurrency_cap_and_interactive_slots(self, make_dispatcher):
+        dispatcher = make_dispatcher(max_concurrency=3, interactive_slots=1)
+        recorder = Recorder()
+
+        bulk = [
+            asyncio.create_task(
+                dispatcher.submit(
+                    recorder.call(f"bulk-{i}", hold=True),
+                    "embedding",
+                    priority=RequestPriority.BULK,
+                )
+            )
+            for i in range(4)
+        ]
+        await settle()
+        assert recorder.running == 2  # One slot is kept for interactive calls
+
+        search = asyncio.create_task(
+            dispatcher.submit(
+                recorder.call("search"),
+                "embedding",
+                priority=RequestPriority.INTERACTIVE,
+            )
+        )
+        assert await search == "search"
+
+        recorder.release.set()
+        await asyncio.gather(*bulk)
+        assert recorder.max_running == 3
+        assert dispatcher.get_stats()["completed"] == 5
+
+    async def test_denied_requests_wait_instead_of_proceeding(
+        self, make_dispatcher, rate_limiter
+    ):
+        rate_limiter.check_rate_limit.side_effect = [(False, []), (True, [])]
+        rate_limiter.get_recommended_delay.return_value = 0.01
+        dispatcher = make_dispatcher()
+        call = AsyncMock(return_value="embedded")
+
+        result = await dispatcher.submit(
+            call, "embedding", estimated_tokens=500, estimated_cost=0.01
+        )
+
+        assert result == "embedded"
+        call.assert_awaited_once()
+        assert rate_limiter.check_rate_limit.await_count == 2
+        rate_limiter.check_rate_limit.assert_awaited_with(
+            service="openai",
+            operation_type="embedding",
+            estimated_tokens=500,
+            estimated_cost=0.01,
+        )
+        assert dispatcher.get_stats()["throttled"] == 1
+        rate_limiter.get_recommended_delay.assert_awaited_once_with(
+            "openai", "embedding", estimated_tokens=500, estimated_cost=0.01
+        )
+
+    async def test_cancelled_caller_drops_its_queued_request(self, make_dispatcher):
+        dispatcher = make_dispatcher(max_concurrency=2, interactive_slots=1)
+        recorder = Recorder()
+
+        blockers = [
+            asyncio.create_task(
+                dispatcher.submit(
+                    recorder.call(name, hold=True),
+                    "embedding",
+                    priority=RequestPriority.INTERACTIVE,
+                )
+            )
+            for name in ["blocker-0", "blocker-1"]
+        ]
+        await settle()
+        search = asyncio.create_task(
+            dispatcher.submit(
+                recorder.call("search"),
+                "embedding",
+                priority=RequestPriority.INTERACTIVE,
+                max_wait_seconds=5,
+            )
+        )
+        await settle()
+        search.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await search
+
+        recorder.release.set()
+        await asyncio.gather(*blockers)
+        await settle()
+
+        assert recorder.started == ["blocker-0", "blocker-1"]
+
+    async def test_admission_timeout(self, make_dispatcher, rate_limiter):
+        rate_limiter.check_rate_limit.return_value = (False, [])
+        rate_limiter.get_recommended_delay.return_value = 60.0
+        dispatcher = make_dispatcher()
+        call = AsyncMock()
+
+        with pytest.raises(AdmissionTimeoutError):
+            await dispatcher.submit(
+                call,
+                "embedding",
+                priority=RequestPriority.INTERACTIVE,
+                max_wait_seconds=0.05,
+            )
+
+        call.assert_not_awaited()
+        assert dispatcher.get_stats()["timed_out"] == 1
+
+    async def test_errors_reach_the_caller(self, make_dispatcher):
+        dispatcher = make_dispatcher()
+        call = AsyncMock(side_effect=ValueError("bad request"))
+
+        with pytest.raises(ValueError, match="bad request"):
+            await dispatcher.submit(call, "embedding")
+
+        stats = dispatcher.get_stats()
+        assert stats["failed"] == 1
+        assert stats["active"] == 0
@@ -1,5 +1,7 @@
 """Tests for tasks/processing_tasks.py module."""
 
+import threading
+
 import pytest
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch, mock_open
@@ -8,9 +10,19 @@ from jd_ingestion.tasks.processing_tasks import (
     process_single_file_task,
     batch_process_files_task,
     _process_single_file_async,
+    _batch_process_directory_async,
+    _batch_process_files_async,
+    _bulk_write_parsed_files,
+    _parse_file_for_ingestion,
     _handle_task_failure,
     # _is_retryable_error,  # Moved to retry_utils
 )
+from jd_ingestion.core.file_discovery import (
+    FileDiscovery,
+    FileMetadata,
+    ManifestEntry,
+)
+from jd_ingestion.processors.content_processor import TextChunk
 from jd_ingestion.utils.retry_utils import is_retryable_error as _is_retryable_error
 
 
@@ -218,11 +230,18 @@ class TestBatchProcessFilesTask:
         mock_file_discovery.scan_directory.return_value = mock_file_metadata
         mock_file_discovery_cls.return_value = mock_file_discovery
 
-        # Mock async processing results
-        mock_asyncio_run.side_effect = [
-            {"status": "success", "job_id": 123},
-            {"status": "success", "job_id": 456},
-        ]
+        # Mock pipelined batch processing result
+        mock_asyncio_run.return_value = {
+            "total_files_found": 2,
+            "valid_files_found": 2,
+            "unchanged_files": 0,
+            "duplicate_files": 0,
+            "successful": [
+                {"file_path": "/test/file1.txt", "job_id": 123, "updated": False},
+                {"file_path": "/test/file2.txt", "job_id": 456, "updated": False},
+            ],
+            "failed": [],
+        }
 
         # Mock embedding task
         with patch(
@@ -307,10 +326,16 @@ class TestBatchProcessFilesTask:
         mock_file_discovery_cls.return_value = mock_file_discovery
 
         # Mock mixed success/failure
-        mock_asyncio_run.side_effect = [
-            {"status": "success", "job_id": 123},
-            Exception("Processing failed"),
-        ]
+        mock_asyncio_run.return_value = {
+            "total_files_found": 2,
+            "valid_files_found": 2,
+            "unchanged_files": 0,
+            "duplicate_files": 0,
+            "successful": [
+                {"file_path": "/test/file1.txt", "job_id": 123, "updated": False}
+            ],
+            "failed": [{"file_path": "/test/file2.txt", "error": "Processing failed"}],
+        }
 
         result = batch_process_files_task(mock_task, "/test/directory")
 
@@ -321,6 +346,464 @@ class TestBatchProcessFilesTask:
         assert len(result["results"]["failed"]) == 1
 
 
+class TestBatchIngestionPipeline:
+    """Test the parse/persist stages used by batch_process_files_task."""
+
+    @staticmethod
+    def _parsed(chunks=None, department=None):
+        return {
+            "raw_content": "raw",
+            "sections": {"general_accountability": "Lead the team", "empty": "  "},
+            "department": department,
+            "reports_to": None,
+            "chunks": (
+                chunks
+                if chunks is not None
+                else [
+                    {"chunk_text": "intro", "section_type": None},
+                    {"chunk_text": "", "section_type": None},
+                    {
+                        "chunk_text": "Lead the team",
+                        "section_type": "general_accountability",
+                    },
+                ]
+            ),
+            "processing_errors": [],
+        }
+
+    @staticmethod
+    def _session_factory(db):
+        session_local = MagicMock()
+        session_local.return_value.__aenter__ = AsyncMock(return_value=db)
+        session_local.return_value.__aexit__ = AsyncMock(return_value=False)
+        return session_local
+
+    def test_parse_file_for_ingestion(self, tmp_path):
+        """Parsing returns plain data that can cross a process boundary."""
+        file_path = tmp_path / "EX-01 Director 123456 - JD.txt"
+        file_path.write_text(
+            "GENERAL ACCOUNTABILITY\nLeads the directorate.\n", encoding="utf-8"
+        )
+
+        parsed = _parse_file_for_ingestion(str(file_path), "utf-8", "en")
+
+        assert parsed["raw_content"].startswith("GENERAL ACCOUNTABILITY")
+        assert isinstance(parsed["sections"], dict)
+        assert parsed["chunks"]
+        assert parsed["processing_errors"] == []
+
+    @pytest.fixture
+    def facet_store(self):
+        with patch("jd_ingestion.tasks.processing_tasks.facet_store") as store:
+            store.track = AsyncMock(return_value=MagicMock(apply=AsyncMock()))
+            yield store
+
+    @pytest.mark.asyncio
+    async def test_bulk_write_uses_one_statement_per_table(self, facet_store):
+        """A group of files is written with one multi-row insert per table."""
+        db = AsyncMock()
+        job_result = MagicMock()
+        job_result.scalars.return_value.all.return_value = [11, 12]
+        db.execute.return_value = job_result
+
+        files = [
+            (
+                FileMetadata(file_path=Path("/data/a.txt"), job_number="1"),
+                self._parsed(),
+            ),
+            (
+                FileMetadata(file_path=Path("/data/b.txt"), job_number="2"),
+                self._parsed(department="Finance"),
+            ),
+        ]
+
+        job_ids = await _bulk_write_parsed_files(db, files)
+
+        assert job_ids == [11, 12]
+        # jobs, sections, metadata, chunks
+        assert db.execute.call_count == 4
+        job_rows = db.execute.call_args_list[0][0][1]
+        assert [row["job_number"] for row in job_rows] == ["1", "2"]
+        section_rows = db.execute.call_args_list[1][0][1]
+        assert [row["job_id"] for row in section_rows] == [11, 12]
+        metadata_rows = db.execute.call_args_list[2][0][1]
+        assert metadata_rows == [
+            {"job_id": 12, "department": "Finance", "reports_to": None}
+        ]
+        chunk_rows = db.execute.call_args_list[3][0][1]
+        # Blank chunks are skipped but keep their original positions; chunks
+        # point at the section rows returned by the section insert
+        assert [
+            (r["job_id"], r["chunk_index"], r["section_id"]) for r in chunk_rows
+        ] == [
+            (11, 0, None),
+            (11, 2, 11),
+            (12, 0, None),
+            (12, 2, 12),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bulk_write_updates_modified_files_in_place(self, facet_store):
+        """Modified files keep their job row; its child rows are replaced."""
+        db = AsyncMock()
+        job_result = MagicMock()
+        job_result.scalars.return_value.all.return_value = [31]
+        db.execute.return_value = job_result
+
+        modified = FileMetadata(
+            file_path=Path("/data/a.txt"),
+            job_number="1",
+            change_status="modified",
+            job_id=7,
+        )
+        new = FileMetadata(file_path=Path("/data/b.txt"), job_number="2")
+
+        job_ids = await _bulk_write_parsed_files(
+            db, [(modified, self._parsed()), (new, self._parsed())]
+        )
+
+        assert job_ids == [7, 31]
+        statements = [str(call[0][0]) for call in db.execute.call_args_list]
+        assert statements[0].startswith("UPDATE job_descriptions")
+        deleted = [sql.split()[2] for sql in statements if sql.startswith("DELETE")]
+        assert deleted == [
+            "content_chunks",
+            "job_sections",
+            "job_metadata",
+            "job_embeddings",
+        ]
+        # Only the new file is inserted as a job
+        insert_rows = [
+            call[0][1]
+            for call in db.execute.call_args_list
+            if str(call[0][0]).startswith("INSERT INTO job_descriptions")
+        ]
+        assert [row["job_number"] for row in insert_rows[0]] == ["2"]
+        # Facet counts drop the old version of job 7 and add both jobs
+        facet_store.track.assert_awaited_once_with(db, [7])
+        facet_change = facet_store.track.return_value
+        facet_change.apply.assert_awaited_once_with([31])
+
+    @pytest.mark.asyncio
+    async def test_pipeline_groups_writes_and_reports_progress(self):
+        """Parsed files are persisted in flush-sized groups."""
+        files = [
+            FileMetadata(file_path=Path(f"/data/{i}.txt"), job_number=str(i))
+            for i in range(5)
+        ]
+        db = AsyncMock()
+        task = MagicMock()
+        group_sizes = []
+
+        async def fake_bulk_write(session, group):
+            group_sizes.append(len(group))
+            return [int(meta.job_number) + 100 for meta, _ in group]
+
+        with (
+            patch(
+                "jd_ingestion.tasks.processing_tasks._parse_file_for_ingestion",
+                return_value=self._parsed(),
+            ),
+            patch(
+                "jd_ingestion.tasks.processing_tasks._bulk_write_parsed_files",
+                side_effect=fake_bulk_write,
+            ),
+            patch(
+                "jd_ingestion.tasks.processing_tasks.AsyncSessionLocal",
+                self._session_factory(db),
+            ),
+            patch("jd_ingestion.tasks.processing_tasks.settings") as mock_settings,
+        ):
+            mock_settings.batch_db_flush_size = 2
+            mock_settings.batch_parse_workers = 1
+            result = await _batch_process_files_async(files, task)
+
+        assert sorted(group_sizes) == [1, 2, 2]
+        assert sorted(f["job_id"] for f in result["successful"]) == [
+            100,
+            101,
+            102,
+            103,
+            104,
+        ]
+        assert result["failed"] == []
+        assert db.commit.await_count == 3
+        final_meta = task.update_state.call_args[1]["meta"]
+        assert final_meta["files_processed"] == 5
+        assert final_meta["progress"] == 100
+
+    @pytest.mark.asyncio
+    async def test_pipeline_isolates_failing_files(self):
+        """A failing group is retried per file; parse errors only fail their file."""
+        files = [
+            FileMetadata(file_path=Path(f"/data/{name}.txt"), job_number=name)
+            for name in ("1", "bad", "3", "unreadable")
+        ]
+        db = AsyncMock()
+
+        def fake_parse(file_path, encoding, language):
+            if "unreadable" in file_path:
+                raise UnicodeDecodeError("utf-8", b"", 0, 1, "bad byte")
+            return self._parsed()
+
+        async def fake_bulk_write(session, group):
+            if any(meta.job_number == "bad" for meta, _ in group):
+                raise Exception("duplicate key value violates unique constraint")
+            return [int(meta.job_number) for meta, _ in group]
+
+        with (
+            patch(
+                "jd_ingestion.tasks.processing_tasks._parse_file_for_ingestion",
+                side_effect=fake_parse,
+            ),
+            patch(
+                "jd_ingestion.tasks.processing_tasks._bulk_write_parsed_files",
+                side_effect=fake_bulk_write,
+            ),
+            patch(
+                "jd_ingestion.tasks.processing_tasks.AsyncSessionLocal",
+                self._session_factory(db),
+            ),
+            patch("jd_ingestion.tasks.processing_tasks.settings") as mock_settings,
+        ):
+            mock_settings.batch_db_flush_size = 10
+            mock_settings.batch_parse_workers = 1
+            result = await _batch_process_files_async(files, MagicMock())
+
+        assert sorted(f["job_id"] for f in result["successful"]) == [1, 3]
+        failed_paths = sorted(f["file_path"] for f in result["failed"])
+        assert failed_paths == ["/data/bad.txt", "/data/unreadable.txt"]
+        db.rollback.assert_awaited()
+
+
+class TestIncrementalBatchScan:
+    """Test manifest-driven classification in _batch_process_directory_async."""
+
+    @staticmethod
+    def _file(name, change_status="new", job_id=None, file_hash=None, mtime_ns=5):
+        return FileMetadata(
+            file_path=Path(f"/data/{name}.txt"),
+            file_size=10,
+            mtime_ns=mtime_ns,
+            inode=1,
+            file_hash=file_hash or f"hash-{name}",
+            change_status=change_status,
+            job_id=job_id,
+        )
+
+    @staticmethod
+    def _entry(job_id, mtime_ns=5, file_hash="x"):
+        return ManifestEntry(
+            file_size=10, mtime_ns=mtime_ns, inode=1, file_hash=file_hash, job_id=job_id
+        )
+
+    @staticmethod
+    def _consume_files(processed):
+        """Stand-in for _batch_process_files_async recording what it is fed."""
+
+        async def process(files, task):
+            async for file_metadata in files:
+                processed.append(file_metadata)
+            return {"successful": [], "failed": []}
+
+        return process
+
+    @pytest.mark.asyncio
+    async def test_only_changed_files_are_processed(self):
+        """Unchanged files are skipped and known content is linked, not re-ingested."""
+        files = [
+            self._file("same", "unchanged", job_id=1),
+            self._file("touched", "unchanged", job_id=2, mtime_ns=9),
+            self._file("edited", "modified", job_id=3),
+            self._file("orphan", "unchanged", job_id=None),
+            self._file("renamed", file_hash="hash-known"),
+            self._file("fresh"),
+            self._file("fresh-copy", file_hash="hash-fresh"),
+        ]
+        manifest = {
+            FileDiscovery.manifest_key(files[0].file_path): self._entry(1),
+            FileDiscovery.manifest_key(files[1].file_path): self._entry(2),
+            FileDiscovery.manifest_key(files[2].file_path): self._entry(3),
+        }
+        file_discovery = MagicMock()
+        file_discovery.data_directory = Path("/data")
+        file_discovery.iter_scan.return_value = iter(files)
+        fed = []
+
+        db = AsyncMock()
+        session_local = MagicMock()
+        session_local.return_value.__aenter__ = AsyncMock(return_value=db)
+        session_local.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch(
+                "jd_ingestion.tasks.processing_tasks.AsyncSessionLocal", session_local
+            ),
+            patch(
+                "jd_ingestion.tasks.processing_tasks.file_manifest_service"
+            ) as mock_manifest,
+            patch(
+                "jd_ingestion.tasks.processing_tasks._batch_process_files_async",
+                side_effect=self._consume_files(fed),
+            ),
+        ):
+            mock_manifest.load = AsyncMock(return_value=manifest)
+            mock_manifest.find_jobs_by_hash = AsyncMock(return_value={"hash-known": 99})
+            mock_manifest.record = AsyncMock(return_value=2)
+
+            result = await _batch_process_directory_async(file_discovery, MagicMock())
+
+        file_discovery.iter_scan.assert_called_once_with(True, manifest)
+        processed = [f.file_path.stem for f in fed]
+        assert processed == ["edited", "orphan", "fresh"]
+        assert result["unchanged_files"] == 2
+        assert result["duplicate_files"] == 2
+        refreshed = [f.file_path.stem for f in mock_manifest.record.call_args[0][1]]
+        assert refreshed == ["touched", "renamed"]
+        assert files[4].job_id is None
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_full_rescan_processes_every_valid_file(self):
+        """With incremental=False the manifest is neither loaded nor consulted."""
+        files = [self._file("a"), self._file("b")]
+        file_discovery = MagicMock()
+        file_discovery.iter_scan.return_value = iter(files)
+        fed = []
+
+        with (
+            patch(
+                "jd_ingestion.tasks.processing_tasks.file_manifest_service"
+            ) as mock_manifest,
+            patch(
+                "jd_ingestion.tasks.processing_tasks._batch_process_files_async",
+                side_effect=self._consume_files(fed),
+            ),
+        ):
+            mock_manifest.load = AsyncMock()
+            result = await _batch_process_directory_async(
+                file_discovery, MagicMock(), max_files=1, incremental=False
+            )
+
+        mock_manifest.load.assert_not_awaited()
+        file_discovery.iter_scan.assert_called_once_with(True, None)
+        assert fed == files[:1]
+        assert result["valid_files_found"] == 2
+
+    @pytest.mark.asyncio
+    async def test_edited_duplicate_is_ingested_as_a_new_job(self, tmp_path):
+        """A copy of an ingested file never takes over the original's job."""
+        (tmp_path / "original.txt").write_text("same content " * 20)
+        (tmp_path / "copy.txt").write_text("same content " * 20)
+        file_discovery = FileDiscovery(tmp_path)
+        manifest = {}
+        jobs_by_hash = {}
+        fed = []
+
+        def record(db, files_metadata):
+            for file_metadata in files_metadata:
+                manifest[FileDiscovery.manifest_key(file_metadata.file_path)] = (
+                    ManifestEntry(
+                        file_size=file_metadata.file_size,
+                        mtime_ns=file_metadata.mtime_ns,
+                        inode=file_metadata.inode,
+                        file_hash=file_metadata.file_hash,
+                        job_id=file_metadata.job_id,
+                    )
+                )
+
+        async def ingest(files, task):
+            # Stands in for the persist stage: new files get new jobs
+            async for file_metadata in files:
+                fed.append((file_metadata.file_path.stem, file_metadata.job_id))
+                if file_metadata.job_id is None:
+                    file_metadata.job_id = len(jobs_by_hash) + 1
+                jobs_by_hash[file_metadata.file_hash] = file_metadata.job_id
+                record(None, [file_metadata])
+            return {"successful": [], "failed": []}
+
+        async def scan():
+            with (
+                patch(
+                    "jd_ingestion.tasks.processing_tasks.AsyncSessionLocal",
+                    self._session_factory(),
+                ),
+                patch(
+                    "jd_ingestion.tasks.processing_tasks.file_manifest_service"
+                ) as mock_manifest,
+                patch(
+                    "jd_ingestion.tasks.processing_tasks._batch_process_files_async",
+                    side_effect=ingest,
+                ),
+            ):
+                mock_manifest.load = AsyncMock(side_effect=lambda db, root: manifest)
+                mock_manifest.find_jobs_by_hash = AsyncMock(
+                    side_effect=lambda db, hashes: {
+                        h: jobs_by_hash[h] for h in hashes if h in jobs_by_hash
+                    }
+                )
+                mock_manifest.record = AsyncMock(side_effect=record)
+                return await _batch_process_directory_async(file_discovery, MagicMock())
+
+        # The original is ingested first and the copy is seen as a duplicate
+        (tmp_path / "copy.txt").rename(tmp_path / "copy.tmp")
+        await scan()
+        (tmp_path / "copy.tmp").rename(tmp_path / "copy.txt")
+        result = await scan()
+        assert result["duplicate_files"] == 1
+        copy_key = FileDiscovery.manifest_key(tmp_path / "copy.txt")
+        assert manifest[copy_key].job_id is None
+
+        # Editing the copy ingests it as a new job; the original's is untouched
+        (tmp_path / "copy.txt").write_text("edited content " * 20)
+        await scan()
+        assert fed == [("original", None), ("copy", None)]
+        assert manifest[copy_key].job_id == 2
+        original_key = FileDiscovery.manifest_key(tmp_path / "original.txt")
+        assert manifest[original_key].job_id == 1
+
+    @staticmethod
+    def _session_factory():
+        session_local = MagicMock()
+        session_local.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+        session_local.return_value.__aexit__ = AsyncMock(return_value=False)
+        return session_local
+
+    @pytest.mark.asyncio
+    async def test_ingestion_starts_before_the_scan_finishes(self):
+        """Files reach ingestion while the scan is still producing more."""
+        first_files_ingested = threading.Event()
+        fed = []
+
+        def iter_scan(recursive, manifest):
+            yield self._file("a")
+            yield self._file("b")
+            # The scan only continues once ingestion has received a and b
+            assert first_files_ingested.wait(timeout=5)
+            yield self._file("c")
+
+        file_discovery = MagicMock()
+        file_discovery.iter_scan.side_effect = iter_scan
+
+        async def process(files, task):
+            async for file_metadata in files:
+                fed.append(file_metadata.file_path.stem)
+                if len(fed) == 2:
+                    first_files_ingested.set()
+            return {"successful": [], "failed": []}
+
+        with patch(
+            "jd_ingestion.tasks.processing_tasks._batch_process_files_async",
+            side_effect=process,
+        ):
+            result = await _batch_process_directory_async(
+                file_discovery, MagicMock(), incremental=False
+            )
+
+        assert fed == ["a", "b", "c"]
+        assert result["total_files_found"] == 3
+
+
 class TestProcessSingleFileAsync:
     """Test the _process_single_file_async function."""
 
@@ -389,7 +872,10 @@ class TestProcessSingleFileAsync:
         # Mock content processor
         mock_content_processor = MagicMock()
         mock_content_processor.process_content.return_value = mock_processed_content
-        mock_content_processor.chunk_content.return_value = ["chunk1", "chunk2"]
+        mock_content_processor.iter_chunks.return_value = [
+            TextChunk(text="chunk1"),
+            TextChunk(text="chunk2"),
+        ]
         mock_content_processor_cls.return_value = mock_content_processor
 
         # Mock task
@@ -409,13 +895,28 @@ class TestProcessSingleFileAsync:
             patch(
                 "jd_ingestion.tasks.processing_tasks.ContentChunk"
             ) as _mock_content_chunk_cls,
+            patch("jd_ingestion.tasks.processing_tasks.facet_store") as mock_facets,
+            patch("jd_ingestion.tasks.processing_tasks.cache_service") as mock_cache,
+            patch(
+                "jd_ingestion.tasks.embedding_tasks.generate_embeddings_for_job_task"
+            ) as mock_embedding_task,
+            patch(
+                "jd_ingestion.tasks.quality_tasks.calculate_quality_metrics_task"
+            ) as _mock_quality_task,
         ):
             mock_job_desc = MagicMock()
             mock_job_desc.id = 123
             mock_job_desc_cls.return_value = mock_job_desc
+            mock_facets.add_jobs = AsyncMock()
+            mock_cache.invalidate_job_cache = AsyncMock()
 
             result = await _process_single_file_async("/test/file.txt", mock_task, True)
 
+            # Cached search, similar-job and facet entries are dropped after commit
+            mock_facets.add_jobs.assert_awaited_once_with(mock_db, [123])
+            mock_cache.invalidate_job_cache.assert_awaited_once_with(123)
+            mock_embedding_task.delay.assert_called_once_with(123)
+
         # Verify result
         assert result["status"] == "success"
         assert result["job_id"] == 123
@@ -515,7 +1016,7 @@ class TestProcessSingleFileAsync:
         mock_content_processor.process_content.side_effect = Exception(
             "Processing failed"
         )
-        mock_content_processor.chunk_content.return_value = []
+        mock_content_processor.iter_chunks.return_value = []
         mock_content_processor_cls.return_value = mock_content_processor
 
         mock_task = MagicMock()
@@ -572,7 +1073,7 @@ class TestProcessSingleFileAsync:
             mock_content.sections = {}
             mock_content.processing_errors = []
             mock_content_processor.process_content.return_value = mock_content
-            mock_content_processor.chunk_content.return_value = []
+            mock_content_processor.iter_chunks.return_value = []
             mock_content_processor_cls.return_value = mock_content_processor
 
             mock_task = MagicMock()
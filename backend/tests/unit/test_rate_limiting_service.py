@@ -2,6 +2,7 @@
 
 import pytest
 import asyncio
+from unittest.mock import patch
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -62,6 +63,20 @@ class TestTokenBucket:
         assert "capacity" in status
         assert status["capacity"] == 10
 
+    @pytest.mark.asyncio
+    async def test_consume_all_is_all_or_nothing(self):
+        """A bucket short of tokens leaves the others untouched"""
+        requests_bucket = TokenBucket(capacity=10, refill_rate=0.0)
+        tokens_bucket = TokenBucket(capacity=100, refill_rate=0.0)
+
+        sufficient = await TokenBucket.consume_all(
+            [(requests_bucket, 1), (tokens_bucket, 500)]
+        )
+
+        assert sufficient == [True, False]
+        assert requests_bucket.tokens == 10
+        assert tokens_bucket.tokens == 100
+
 
 class TestSlidingWindowCounter:
     @pytest.mark.asyncio
@@ -102,6 +117,44 @@ class TestSlidingWindowCounter:
         count = await counter.get_count()
         assert count == 0
 
+    @pytest.mark.asyncio
+    async def test_usage_expires_per_sub_window(self):
+        """Test usage leaves the window one sub-window at a time"""
+        counter = SlidingWindowCounter(window_seconds=60, buckets=6)
+        with patch("jd_ingestion.services.rate_limiting_service.time") as mock_time:
+            mock_time.time.return_value = 1000.0
+            await counter.add_request(amount=5)
+            mock_time.time.return_value = 1035.0
+            await counter.add_request(amount=3)
+
+            mock_time.time.return_value = 1059.0
+            assert await counter.get_count() == 8
+            mock_time.time.return_value = 1060.0
+            assert await counter.get_count() == 3
+            mock_time.time.return_value = 1500.0
+            assert await counter.get_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_backdated_requests(self):
+        """Test timestamps inside the window count and older ones are ignored"""
+        counter = SlidingWindowCounter(window_seconds=60)
+        with patch("jd_ingestion.services.rate_limiting_service.time") as mock_time:
+            mock_time.time.return_value = 1000.0
+            await counter.add_request(amount=2, timestamp=970.0)
+            await counter.add_request(amount=4, timestamp=900.0)
+
+            assert await counter.get_count() == 2
+
+    @pytest.mark.asyncio
+    async def test_memory_is_bounded_by_buckets(self):
+        """Test the counter keeps one slot per sub-window whatever the traffic"""
+        counter = SlidingWindowCounter(window_seconds=3600, buckets=60)
+        for _ in range(10000):
+            await counter.add_request(amount=1)
+
+        assert len(counter.counts) == 60
+        assert await counter.get_count() == 10000
+
 
 class TestRateLimitingServiceInit:
     def test_initialization(self, service):
@@ -402,6 +455,34 @@ class TestGetRecommendedDelay:
         assert isinstance(delay, (int, float))
         assert delay >= 0
 
+    @pytest.mark.asyncio
+    async def test_get_recommended_delay_covers_the_request(self, service):
+        """The delay lasts until the buckets hold the whole request"""
+        service.token_buckets["openai"][RateLimitType.TOKENS_PER_MINUTE].tokens = 0
+
+        small = await service.get_recommended_delay("openai", "embedding")
+        large = await service.get_recommended_delay(
+            "openai", "embedding", estimated_tokens=5000
+        )
+
+        # The TPM bucket refills 2500 tokens per second
+        assert small < 0.01
+        assert 1.9 < large <= 2.0
+
+    @pytest.mark.asyncio
+    async def test_denied_request_consumes_no_tokens(self, service):
+        """A request over the token limit does not use up requests per minute"""
+        buckets = service.token_buckets["openai"]
+        buckets[RateLimitType.TOKENS_PER_MINUTE].tokens = 0
+        rpm_before = buckets[RateLimitType.REQUESTS_PER_MINUTE].tokens
+
+        is_allowed, _ = await service.check_rate_limit(
+            "openai", "embedding", estimated_tokens=5000
+        )
+
+        assert is_allowed is False
+        assert buckets[RateLimitType.REQUESTS_PER_MINUTE].tokens >= rpm_before
+
     @pytest.mark.asyncio
     async def test_get_recommended_delay_unknown_service(self, service):
         """Test getting delay for unknown service"""
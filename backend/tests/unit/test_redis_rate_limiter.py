@@ -0,0 +1,299 @@
+"""Tests for the Redis-backed rate limiter shared across processes"""
+
+import asyncio
+import math
+from unittest.mock import patch
+
+import pytest
+
+from jd_ingestion.services.rate_limiting_service import (
+    RateLimit,
+    RateLimitingService,
+    RateLimitType,
+)
+from jd_ingestion.services.redis_rate_limiter import (
+    RedisRateLimiter,
+    SLIDING_WINDOW_SCRIPT,
+    TOKEN_BUCKET_SCRIPT,
+)
+
+
+class FakeRedis:
+    """
+    In-memory Redis running Python models of the limiter's Lua scripts.
+
+    A script yields once, like a network round trip, then runs its model
+    without awaiting, so it is atomic like a script on a real server. ``now`` is the
+    server clock returned by TIME.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.now = 1_700_000_000.0
+        self.calls = {"bucket": 0, "window": 0}
+        self.fail = False
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+    def register_script(self, source):
+        models = {TOKEN_BUCKET_SCRIPT: "bucket", SLIDING_WINDOW_SCRIPT: "window"}
+        name = models[source]
+
+        async def script(keys=None, args=None):
+            await asyncio.sleep(0)  # Let other "processes" interleave
+            if self.fail:
+                raise ConnectionError("Connection refused")
+            self.calls[name] += 1
+            return getattr(self, f"_{name}")(keys, [float(arg) for arg in args])
+
+        return script
+
+    def _bucket(self, keys, args):
+        levels, allowed = [], 1
+        for i, key in enumerate(keys):
+            capacity, rate, need, _ = args[i * 4 : i * 4 + 4]
+            state = self.hashes.get(key)
+            if state is None:
+                level = capacity
+            else:
+                elapsed = max(0.0, self.now - state["ts"])
+                level = min(capacity, state["tokens"] + elapsed * rate)
+            levels.append(level)
+            if level < need:
+                allowed = 0
+
+        result = [allowed]
+        for i, key in enumerate(keys):
+            granted = min(levels[i], args[i * 4 + 3]) if allowed else 0
+            self.hashes[key] = {"tokens": levels[i] - granted, "ts": self.now}
+            result += [str(granted).encode(), str(levels[i] - granted).encode()]
+        return result
+
+    def _window(self, keys, args):
+        result = []
+        for i, key in enumerate(keys):
+            window, width, amount = args[i * 3 : i * 3 + 3]
+            current = math.floor(self.now / width)
+            oldest = current - math.ceil(window / width) + 1
+            counts = self.hashes.setdefault(key, {})
+            if amount > 0:
+                counts[current] = counts.get(current, 0) + int(amount)
+            for index in [index for index in counts if index < oldest]:
+                del counts[index]
+            result.append(sum(counts.values()))
+        return result
+
+
+def make_process(redis_client, lease_fraction=0.05, rpm=100):
+    """A worker process: its own service and limiter over shared Redis."""
+    limiter = RedisRateLimiter(
+        client=redis_client,
+        lease_fraction=lease_fraction,
+        lease_ttl_seconds=60,
+        retry_seconds=60,
+    )
+    service = RateLimitingService(distributed=limiter)
+    service.rate_limits["openai"][RateLimitType.REQUESTS_PER_MINUTE] = RateLimit(
+        rpm, 60, burst_allowance=1.0
+    )
+    return service
+
+
+async def admitted(service, attempts):
+    allowed = 0
+    for _ in range(attempts):
+        is_allowed, _ = await service.check_rate_limit("openai", "embedding")
+        allowed += is_allowed
+    return allowed
+
+
+class TestGlobalLimits:
+    @pytest.mark.asyncio
+    async def test_processes_share_one_budget(self):
+        """Concurrent processes never admit more than the global limit"""
+        redis_client = FakeRedis()
+        processes = [make_process(redis_client) for _ in range(4)]
+
+        results = await asyncio.gather(*(admitted(p, 100) for p in processes))
+
+        # Only tokens still sitting in unexpired leases go unused
+        assert 100 - 4 * 5 <= sum(results) <= 100
+
+    @pytest.mark.asyncio
+    async def test_memory_limits_multiply_with_processes(self):
+        """Without Redis every process enforces the limit on its own"""
+        processes = [RateLimitingService() for _ in range(2)]
+        for service in processes:
+            await service.update_rate_limits(
+                "openai",
+                {RateLimitType.REQUESTS_PER_MINUTE: RateLimit(10, 60, 1.0)},
+            )
+
+        results = [await admitted(service, 20) for service in processes]
+
+        assert sum(results) == 20
+
+    @pytest.mark.asyncio
+    async def test_refill_uses_the_redis_clock(self):
+        """Tokens return at the configured rate, measured by the server"""
+        redis_client = FakeRedis()
+        service = make_process(redis_client, lease_fraction=0)
+
+        assert await admitted(service, 150) == 100
+
+        redis_client.now += 6  # 100 per minute -> 10 tokens
+        assert await admitted(service, 20) == 10
+
+    @pytest.mark.asyncio
+    async def test_leases_avoid_round_trips(self):
+        """Checks are served from the local lease until it runs out"""
+        redis_client = FakeRedis()
+        service = make_process(redis_client, lease_fraction=0.1)
+
+        assert await admitted(service, 11) == 11
+        assert redis_client.calls["bucket"] == 1
+        assert redis_client.calls["window"] == 1
+
+        await admitted(service, 1)
+        assert redis_client.calls["bucket"] == 2
+        assert service.distributed.get_stats()["lease_hits"] == 10
+
+    @pytest.mark.asyncio
+    async def test_denied_request_consumes_nothing(self):
+        """A request short on any bucket takes no tokens from the others"""
+        redis_client = FakeRedis()
+        service = make_process(redis_client, lease_fraction=0)
+
+        is_allowed, statuses = await service.check_rate_limit(
+            "openai", "embedding", estimated_tokens=500_000
+        )
+
+        assert is_allowed is False
+        exceeded = [status.limit_type for status in statuses if status.is_exceeded]
+        assert exceeded == [RateLimitType.TOKENS_PER_MINUTE]
+        assert await admitted(service, 100) == 100
+
+
+class TestSharedUsage:
+    @pytest.mark.asyncio
+    async def test_recorded_usage_is_visible_to_other_processes(self):
+        """Sliding windows are shared through Redis"""
+        redis_client = FakeRedis()
+        writer, reader = make_process(redis_client), make_process(redis_client)
+
+        await writer.record_usage("openai", "embedding", tokens_used=500, cost=0.25)
+        _, statuses = await reader.check_rate_limit("openai", "embedding")
+
+        usage = {status.limit_type: status.current_usage for status in statuses}
+        assert usage[RateLimitType.REQUESTS_PER_MINUTE] == 1
+        assert usage[RateLimitType.TOKENS_PER_MINUTE] == 500
+        assert usage[RateLimitType.COST_PER_HOUR] == 25
+        # Nothing went to the per-process fallback windows
+        window = writer.sliding_windows["openai"][RateLimitType.TOKENS_PER_MINUTE]
+        assert await window.get_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_usage_leaves_the_window(self):
+        """Usage older than the window is no longer counted"""
+        redis_client = FakeRedis()
+        limiter = RedisRateLimiter(client=redis_client, lease_ttl_seconds=0)
+
+        await limiter.add_usage("openai", {"tokens_per_minute": (60, 300)})
+        redis_client.now += 30
+        await limiter.add_usage("openai", {"tokens_per_minute": (60, 200)})
+        assert await limiter.window_counts("openai", {"tokens_per_minute": 60}) == {
+            "tokens_per_minute": 500
+        }
+
+        redis_client.now += 31
+        assert await limiter.window_counts("openai", {"tokens_per_minute": 60}) == {
+            "tokens_per_minute": 200
+        }
+
+    @pytest.mark.asyncio
+    async def test_recommended_delay_from_shared_levels(self):
+        """The delay estimate comes from the last bucket level Redis returned"""
+        redis_client = FakeRedis()
+        service = make_process(redis_client, lease_fraction=0, rpm=60)
+
+        await admitted(service, 61)
+        delay = await service.get_recommended_delay("openai", "embedding")
+
+        assert 0.9 < delay <= 1.0  # One token per second
+
+
+class TestFallback:
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_when_redis_is_down(self):
+        """Redis errors switch to per-process limits without failing requests"""
+        redis_client = FakeRedis()
+        redis_client.fail = True
+        service = make_process(redis_client)
+
+        is_allowed, statuses = await service.check_rate_limit("openai", "embedding")
+        await service.record_usage("openai", "embedding", tokens_used=100)
+
+        assert is_allowed is True
+        assert len(statuses) == 4
+        assert service.distributed.available is False
+        assert service.distributed.get_stats()["failures"] == 1
+        window = service.sliding_windows["openai"][RateLimitType.TOKENS_PER_MINUTE]
+        assert await window.get_count() == 100
+
+    @pytest.mark.asyncio
+    async def test_redis_is_retried_after_the_retry_period(self):
+        """Shared limits resume once the retry period has passed"""
+        redis_client = FakeRedis()
+        redis_client.fail = True
+        service = make_process(redis_client)
+        service.distributed.retry_seconds = 0
+
+        await service.check_rate_limit("openai", "embedding")
+        redis_client.fail = False
+        await service.check_rate_limit("openai", "embedding")
+
+        assert redis_client.calls["bucket"] == 1
+
+
+class TestClientLifecycle:
+    def test_client_from_previous_loop_is_closed(self):
+        """Each new event loop gets a client, and the stale one is closed"""
+        clients = []
+
+        def from_url(*args, **kwargs):
+            clients.append(FakeRedis())
+            return clients[-1]
+
+        limiter = RedisRateLimiter(retry_seconds=60)
+        buckets = {"requests": (10.0, 1.0, 1.0)}
+        with patch("jd_ingestion.services.redis_rate_limiter.redis.from_url", from_url):
+            # Like Celery tasks, each run gets a fresh loop
+            asyncio.run(limiter.acquire("openai", buckets))
+            limiter._leases.clear()
+            asyncio.run(limiter.acquire("openai", buckets))
+
+        assert len(clients) == 2
+        assert clients[0].closed is True
+        assert clients[1].closed is False
+
+
+class TestLuaScripts:
+    @pytest.mark.asyncio
+    async def test_scripts_enforce_global_limit(self):
+        """Run the real Lua scripts against fakeredis when it is installed"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+
+        redis_client = fakeredis.FakeAsyncRedis()
+        processes = [make_process(redis_client) for _ in range(3)]
+        for service in processes:
+            await service.record_usage("openai", "embedding", tokens_used=10)
+
+        results = await asyncio.gather(*(admitted(p, 60) for p in processes))
+        _, statuses = await processes[0].check_rate_limit("openai", "embedding")
+
+        assert 100 - 3 * 5 <= sum(results) <= 100
+        usage = {status.limit_type: status.current_usage for status in statuses}
+        assert usage[RateLimitType.TOKENS_PER_MINUTE] == 30
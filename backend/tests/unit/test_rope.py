@@ -0,0 +1,132 @@
+"""
+Tests for the chunked rope used as collaborative document state.
+"""
+
+import random
+
+import pytest
+
+from jd_ingestion.utils.operational_transform import (
+    apply_operation,
+    apply_operation_to_rope,
+    compose_operation_sequence,
+    create_delete_operation,
+    create_insert_operation,
+)
+from jd_ingestion.utils.rope import Rope
+
+
+class TestRope:
+    """Test rope edits against plain string slicing."""
+
+    def test_insert_and_delete(self):
+        rope = Rope("Hello world", chunk_size=4)
+
+        rope.insert(5, " big")
+        rope.delete(0, 6)
+        rope.insert(len(rope), "!")
+
+        assert rope == "big world!"
+        assert len(rope) == 10
+
+    def test_edits_only_rebuild_nearby_chunks(self):
+        rope = Rope("x" * 50_000, chunk_size=1024)
+
+        rope.insert(25_000, "typed")
+
+        assert rope.chunk_count == 49
+        assert str(rope)[25_000:25_005] == "typed"
+
+    def test_deletes_do_not_fragment_the_document(self):
+        rope = Rope("abcdefgh" * 64, chunk_size=16)
+
+        for _ in range(200):
+            rope.delete(100, 101)
+
+        assert rope.chunk_count <= len(rope) // 8 + 1
+
+    def test_out_of_range_edits_raise(self):
+        rope = Rope("abc")
+
+        with pytest.raises(IndexError):
+            rope.insert(4, "d")
+        with pytest.raises(IndexError):
+            rope.delete(2, 5)
+        assert rope == "abc"
+
+    @pytest.mark.parametrize("chunk_size", [16, 64, 1024])
+    def test_random_edits_match_string(self, chunk_size):
+        rng = random.Random(chunk_size)
+        text = "job description " * 100
+        rope = Rope(text, chunk_size=chunk_size)
+
+        for _ in range(2000):
+            if text and rng.random() < 0.45:
+                start = rng.randrange(len(text))
+                end = min(len(text), start + rng.choice([1, 1, 3, 80]))
+                text = text[:start] + text[end:]
+                rope.delete(start, end)
+            else:
+                position = rng.randrange(len(text) + 1)
+                insert = rng.choice(["a", "bc", "requirements " * rng.randint(1, 20)])
+                text = text[:position] + insert + text[position:]
+                rope.insert(position, insert)
+
+        assert rope == text
+
+
+class TestOperationComposition:
+    """Test coalescing of sequential operations."""
+
+    def test_typing_run_composes_to_one_insert(self):
+        ops = [create_insert_operation(3 + i, char) for i, char in enumerate("abc")]
+
+        composed = compose_operation_sequence(ops)
+
+        assert [op.to_dict() for op in composed] == [
+            {"type": "insert", "position": 3, "text": "abc"}
+        ]
+
+    def test_backspace_run_composes_to_one_delete(self):
+        ops = [create_delete_operation(9 - i, 10 - i) for i in range(4)]
+
+        composed = compose_operation_sequence(ops)
+
+        assert [op.to_dict() for op in composed] == [
+            {"type": "delete", "start": 6, "end": 10}
+        ]
+
+    def test_deleting_typed_text_cancels_out(self):
+        ops = [create_insert_operation(2, "ab"), create_delete_operation(2, 4)]
+
+        assert compose_operation_sequence(ops) == []
+
+    def test_composed_operations_give_the_same_document(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            document = "".join(rng.choice("abcdef") for _ in range(12))
+            expected, ops = document, []
+            for _ in range(rng.randint(1, 8)):
+                if expected and rng.random() < 0.5:
+                    start = rng.randrange(len(expected))
+                    op = create_delete_operation(
+                        start, min(len(expected), start + rng.randint(1, 3))
+                    )
+                else:
+                    position = rng.randint(0, len(expected))
+                    op = create_insert_operation(position, rng.choice(["x", "yz"]))
+                ops.append(op)
+                expected = apply_operation(expected, op)
+
+            rope = Rope(document, chunk_size=4)
+            for op in compose_operation_sequence(ops):
+                apply_operation_to_rope(rope, op)
+
+            assert rope == expected
+
+    def test_empty_delete_at_start_is_a_noop(self):
+        op = create_delete_operation(0, 0)
+
+        assert apply_operation("abc", op) == "abc"
+        assert apply_operation_to_rope(Rope("abc"), op) == "abc"
+        assert compose_operation_sequence([op]) == []
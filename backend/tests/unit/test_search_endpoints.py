@@ -899,6 +899,134 @@ class TestSearchUtilityFunctions:
         snippet = _extract_snippet(content, query, max_length=30)
         assert snippet.startswith("This is content")
 
+    @staticmethod
+    def _sql_snippet_columns(content, query, max_length=200):
+        """Emulate the columns _snippet_columns computes in the database."""
+        terms = list(dict.fromkeys(query.lower().split()))
+        positions = [content.lower().find(t) + 1 for t in terms]
+        positions = [p for p in positions if p > 0]
+        position = min(positions) if positions else None
+        start = max(position - max_length // 3, 1) if position else 1
+        return {
+            "snippet_position": position,
+            "snippet_start": start,
+            "snippet_window": content[start - 1 : start - 1 + max_length],
+            "content_length": len(content),
+        }
+
+    @pytest.mark.parametrize(
+        "content,query",
+        [
+            ("Short text about data.", "data"),
+            ("x" * 500 + " data science " + "y" * 500, "data science"),
+            ("data at the very start " + "z" * 400, "data"),
+            ("nothing relevant here " * 30, "budget"),
+            ("tail match " + "w" * 300 + " Budget", "budget"),
+            ("", "anything"),
+        ],
+    )
+    def test_build_snippet_matches_extract_snippet(self, content, query):
+        """SQL-windowed snippets are identical to full-text Python snippets."""
+        from jd_ingestion.api.endpoints.search import _build_snippet, _extract_snippet
+
+        row = Mock(**self._sql_snippet_columns(content, query))
+        assert _build_snippet(row) == _extract_snippet(content, query)
+
+    @pytest.mark.asyncio
+    async def test_hydrate_search_results_uses_two_queries(self):
+        """Hydration costs two queries regardless of page size."""
+        from jd_ingestion.api.endpoints.search import (
+            SearchQuery,
+            _hydrate_search_results,
+        )
+
+        job_rows = [
+            Mock(id=job_id, **self._sql_snippet_columns("data analyst role", "data"))
+            for job_id in (3, 1, 2)
+        ]
+        section_rows = [
+            Mock(
+                id=10,
+                job_id=1,
+                section_type="general_accountability",
+                **self._sql_snippet_columns("Leads data work", "data"),
+            ),
+            Mock(
+                id=11,
+                job_id=1,
+                section_type="key_activities",
+                **self._sql_snippet_columns("Maintains data sets", "data"),
+            ),
+        ]
+        jobs_result = Mock()
+        jobs_result.all.return_value = job_rows
+        sections_result = Mock()
+        sections_result.all.return_value = section_rows
+        mock_db = AsyncMock()
+        mock_db.execute.side_effect = [jobs_result, sections_result]
+
+        hydrated = await _hydrate_search_results(
+            [1, 2, 3, 4], SearchQuery(query="data"), mock_db
+        )
+
+        assert mock_db.execute.await_count == 2
+        assert set(hydrated) == {1, 2, 3}  # job 4 no longer exists
+        assert hydrated[2]["matching_sections"] == []
+        assert [s["section_id"] for s in hydrated[1]["matching_sections"]] == [10, 11]
+        assert hydrated[3]["snippet"] == "data analyst role"
+
+    @pytest.mark.asyncio
+    async def test_hydrate_search_results_empty(self):
+        """No queries are issued for an empty result page."""
+        from jd_ingestion.api.endpoints.search import (
+            SearchQuery,
+            _hydrate_search_results,
+        )
+
+        mock_db = AsyncMock()
+        assert await _hydrate_search_results([], SearchQuery(query="x"), mock_db) == {}
+        mock_db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fulltext_search_uses_stored_vector(self):
+        """Matching and ranking use the indexed column, not to_tsvector()."""
+        from sqlalchemy.dialects import postgresql
+
+        from jd_ingestion.api.endpoints.search import SearchQuery, _fulltext_search
+
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = Mock(fetchall=Mock(return_value=[]))
+
+        await _fulltext_search(SearchQuery(query="policy analyst"), mock_db)
+
+        statement = mock_db.execute.call_args_list[0][0][0]
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert "to_tsvector" not in sql
+        assert "job_descriptions.search_vector @@" in sql
+        assert "ts_rank(job_descriptions.search_vector" in sql
+        # Without a language filter, English and French documents both match
+        assert {"english", "french"} <= set(compiled.params.values())
+
+    def test_text_search_query_uses_job_language(self):
+        """A language filter parses the query with that language only."""
+        from sqlalchemy.dialects import postgresql
+
+        from jd_ingestion.utils.text_search import any_term, text_search_query
+
+        compiled = text_search_query("analyste principal", "FR").compile(
+            dialect=postgresql.dialect()
+        )
+        assert list(compiled.params.values()) == ["french", "analyste principal"]
+
+        relaxed = str(
+            any_term(text_search_query("analyst", "en")).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        assert relaxed.startswith("CAST(replace(CAST(plainto_tsquery(")
+        assert relaxed.endswith("AS TSQUERY)")
+
     def test_calculate_title_similarity(self):
         """Test title similarity calculation."""
         from jd_ingestion.api.endpoints.search import _calculate_title_similarity
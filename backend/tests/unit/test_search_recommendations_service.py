@@ -2,6 +2,10 @@
 Tests for search recommendations service.
 """
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime
@@ -237,7 +241,7 @@ class TestSearchRecommendationsService:
         mock_row = MagicMock()
         mock_row.query_text = "python developer"
         mock_row.total_results = 10
-        mock_row.created_at = datetime.now()
+        mock_row.timestamp = datetime.now()
 
         mock_result = AsyncMock()
         mock_result.fetchall = Mock(return_value=[mock_row])
@@ -589,3 +593,108 @@ class TestSearchRecommendationsServiceEdgeCases:
         )
 
         assert isinstance(suggestions, list)
+
+
+class TestConcurrentSuggestionStrategies:
+    """Test the deadline-bounded, concurrent suggestion strategies."""
+
+    @pytest.fixture
+    def sessions(self, recommendations_service):
+        """Record the session each strategy runs on."""
+        opened = []
+
+        @asynccontextmanager
+        async def session_factory():
+            session = Mock()
+            opened.append(session)
+            yield session
+
+        recommendations_service.session_factory = session_factory
+        return opened
+
+    @staticmethod
+    def strategy(text, delay=0.0, seen_sessions=None):
+        async def run(db, *args):
+            if seen_sessions is not None:
+                seen_sessions.append(db)
+            await asyncio.sleep(delay)
+            return [{"text": text, "type": "popular", "score": 1.0, "metadata": {}}]
+
+        return run
+
+    @pytest.mark.asyncio
+    @patch("jd_ingestion.services.search_recommendations_service.cache_service")
+    async def test_slow_strategy_is_cut_at_deadline(
+        self, mock_cache, recommendations_service, sessions
+    ):
+        """Strategies that finish in time are ranked without the slow one"""
+        mock_cache.get = AsyncMock(return_value=None)
+        mock_cache.set = AsyncMock()
+        service = recommendations_service
+        service.suggestion_budget_seconds = 0.1
+        service._get_popular_similar_queries = self.strategy("director general")
+        service._get_semantic_suggestions = self.strategy("director of ai", delay=5)
+        service._get_content_based_suggestions = self.strategy("directorate", 0.02)
+
+        started = time.perf_counter()
+        suggestions = await service.get_query_suggestions(
+            db=Mock(), partial_query="direc", limit=5
+        )
+
+        assert time.perf_counter() - started < 1
+        assert {s["text"] for s in suggestions} == {"director general", "directorate"}
+        assert mock_cache.set.call_args.kwargs["expiry_seconds"] == 60
+        stats = service.get_stats()
+        assert stats["partial_responses"] == 1
+        assert stats["strategies"]["semantic"]["timed_out"] == 1
+        assert stats["strategies"]["content"]["completed"] == 1
+        assert stats["strategies"]["content"]["max_ms"] >= 20
+
+    @pytest.mark.asyncio
+    @patch("jd_ingestion.services.search_recommendations_service.cache_service")
+    async def test_strategies_run_concurrently_on_their_own_sessions(
+        self, mock_cache, recommendations_service, sessions
+    ):
+        """Each strategy gets a pooled session, and they overlap in time"""
+        mock_cache.get = AsyncMock(return_value=None)
+        mock_cache.set = AsyncMock()
+        service, used = recommendations_service, []
+        service.suggestion_budget_seconds = 1.0
+        for name in [
+            "_get_popular_similar_queries",
+            "_get_semantic_suggestions",
+            "_get_user_based_suggestions",
+            "_get_content_based_suggestions",
+        ]:
+            setattr(service, name, self.strategy(name, 0.1, used))
+
+        started = time.perf_counter()
+        suggestions = await service.get_query_suggestions(
+            db=Mock(), partial_query="analyst", user_id="u1", limit=10
+        )
+
+        assert time.perf_counter() - started < 0.3
+        assert len(suggestions) == 4
+        assert len(set(map(id, used))) == 4 and set(map(id, used)) == set(
+            map(id, sessions)
+        )
+        assert mock_cache.set.call_args.kwargs["expiry_seconds"] == service.cache_ttl
+
+    @pytest.mark.asyncio
+    @patch("jd_ingestion.services.search_recommendations_service.cache_service")
+    async def test_failed_strategy_does_not_fail_others(
+        self, mock_cache, recommendations_service, sessions
+    ):
+        mock_cache.get = AsyncMock(return_value=None)
+        mock_cache.set = AsyncMock()
+        service = recommendations_service
+        service._get_popular_similar_queries = AsyncMock(side_effect=Exception("db"))
+        service._get_semantic_suggestions = self.strategy("analyst")
+        service._get_content_based_suggestions = self.strategy("analysis")
+
+        suggestions = await service.get_query_suggestions(
+            db=Mock(), partial_query="anal", limit=5
+        )
+
+        assert {s["text"] for s in suggestions} == {"analyst", "analysis"}
+        assert service.get_stats()["strategies"]["popular"]["failed"] == 1
@@ -0,0 +1,262 @@
+"""
+Tests for the in-memory autocomplete index behind /search/suggestions.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+from jd_ingestion.services.search_recommendations_service import (
+    SearchRecommendationsService,
+)
+from jd_ingestion.services.suggestion_index import SuggestionIndex
+from jd_ingestion.utils.prefix_index import PrefixIndex
+
+
+def result(rows=None, scalar=None):
+    result = Mock()
+    result.all = Mock(return_value=rows or [])
+    result.scalar = Mock(return_value=scalar)
+    return result
+
+
+def patch_session(*results):
+    """Patch the index's database session to return ``results`` in order."""
+    db = Mock()
+    db.execute = AsyncMock(side_effect=list(results))
+
+    @asynccontextmanager
+    async def session_context():
+        yield db
+
+    return patch(
+        "jd_ingestion.services.suggestion_index.async_session_context",
+        session_context,
+    )
+
+
+def texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+class TestPrefixIndex:
+    """Test prefix lookups against the sorted key array."""
+
+    def test_matches_the_start_of_any_word(self):
+        index = PrefixIndex.build(
+            [
+                ("Senior Policy Analyst", 3.0, None),
+                ("Policy Advisor", 2.0, None),
+                ("Data Analyst", 1.0, None),
+            ]
+        )
+
+        assert [t.text for t in index.search("pol")] == [
+            "Senior Policy Analyst",
+            "Policy Advisor",
+        ]
+        assert [t.text for t in index.search("ANALYST")] == [
+            "Senior Policy Analyst",
+            "Data Analyst",
+        ]
+        assert [t.text for t in index.search("policy  ana")] == [
+            "Senior Policy Analyst"
+        ]
+        assert index.search("nalyst") == []
+
+    def test_ranks_by_score_then_length(self):
+        index = PrefixIndex.build(
+            [
+                ("manager of programs", 1.0, None),
+                ("manager", 1.0, None),
+                ("program manager", 5.0, None),
+            ],
+            top_k=2,
+        )
+
+        assert [t.text for t in index.search("man")] == ["program manager", "manager"]
+        assert len(index.search("man", limit=1)) == 1
+
+    def test_repeated_words_are_returned_once(self):
+        index = PrefixIndex.build([("analyst analyst", 1.0, None)])
+
+        assert len(index.search("ana")) == 1
+
+    def test_add_updates_memoized_prefixes(self):
+        index = PrefixIndex.build([("project manager", 2.0, None)])
+        assert [t.text for t in index.search("pro")] == ["project manager"]
+
+        index.add("program officer", 3.0)
+        index.add("Project Manager", 1.0, {"source": "query"})
+
+        assert [t.text for t in index.search("pro")] == [
+            "program officer",
+            "Project Manager",
+        ]
+        assert len(index) == 2
+        assert index.key_count == 4
+
+    def test_add_matches_build(self):
+        terms = [(f"term {i} word{i % 7}", float(i % 5), i) for i in range(200)]
+        built = PrefixIndex.build(terms)
+        added = PrefixIndex()
+        for term in terms:
+            added.add(*term)
+
+        for prefix in ["ter", "word3", "1", "term 1"]:
+            assert added.search(prefix) == built.search(prefix)
+
+    def test_rescored_terms_match_build(self):
+        """Blocks of the sorted array are re-ranked when a score changes"""
+        terms = {
+            f"role {i:04d}": (f"role {i:04d}", float(i), None) for i in range(3000)
+        }
+        index = PrefixIndex.build(terms.values())
+        assert index.search("role")[0].text == "role 2999"
+
+        for text, score in [("role 2999", 0.5), ("role 0042", 5000.0)]:
+            index.add(text, score)
+            terms[text] = (text, score, None)
+
+        rebuilt = PrefixIndex.build(terms.values())
+        for prefix in ["rol", "role 0", "role 29", "0042"]:
+            assert index.search(prefix) == rebuilt.search(prefix)
+        assert index.search("role")[0].text == "role 0042"
+
+
+class TestSuggestionIndex:
+    """Test building, refreshing and serving the per-worker index."""
+
+    async def test_suggest_is_none_until_built(self):
+        assert SuggestionIndex().suggest("pol") is None
+
+    async def test_rebuild_loads_every_source(self):
+        index = SuggestionIndex(top_k=5)
+        with patch_session(
+            result(scalar=40),
+            result([("policy analyst", 30), ("Policy Analyst", 5), ("po", 99)]),
+            result([("Senior Policy Advisor", 12), ("Policy Analyst", 3)]),
+            result([("EC", 50), ("PM", 20)]),
+            result([("Policy development", 8)]),
+        ):
+            await index.rebuild()
+
+        suggestions = index.suggest("pol", limit=5)
+        assert texts(suggestions) == [
+            "policy analyst",
+            "Senior Policy Advisor",
+            "Policy development",
+        ]
+        assert suggestions[0]["type"] == "popular"
+        assert suggestions[0]["metadata"] == {"source": "query", "count": 35}
+        assert suggestions[1]["type"] == "content"
+        assert suggestions[1]["metadata"] == {"source": "title", "count": 12}
+        assert index.get_stats()["watermark"] == 40
+
+    async def test_refresh_adds_new_searches(self):
+        index = SuggestionIndex()
+        with patch_session(
+            result(scalar=10),
+            result([("data analyst", 2)]),
+            result([("Data Scientist", 40)]),
+            result(),
+            result(),
+        ):
+            await index.rebuild()
+        assert texts(index.suggest("data")) == ["Data Scientist", "data analyst"]
+
+        with patch_session(
+            result([("Data Analyst", 120, 15), ("database administrator", 1, 12)])
+        ):
+            await index.refresh()
+
+        assert texts(index.suggest("data")) == [
+            "data analyst",
+            "Data Scientist",
+            "database administrator",
+        ]
+        assert index.suggest("data")[0]["metadata"]["count"] == 122
+        assert index.get_stats()["watermark"] == 15
+
+    async def test_failed_refresh_keeps_serving(self):
+        index = SuggestionIndex(refresh_seconds=0.01)
+        with patch_session(
+            result(scalar=0), result([("auditor", 3)]), result(), result(), result()
+        ):
+            await index.rebuild()
+
+        with patch_session(*[Exception("connection refused")] * 10):
+            index.start()
+            await asyncio.sleep(0.05)
+            await index.stop()
+
+        assert index.get_stats()["failures"] >= 1
+        assert texts(index.suggest("aud")) == ["auditor"]
+
+
+class TestQuerySuggestions:
+    """Test that keystrokes are served from the index once it is built."""
+
+    async def test_built_index_skips_database(self):
+        index = SuggestionIndex()
+        with patch_session(
+            result(scalar=1),
+            result([("director general", 9)]),
+            result(),
+            result(),
+            result(),
+        ):
+            await index.rebuild()
+        db = Mock()
+        db.execute = AsyncMock()
+
+        with patch(
+            "jd_ingestion.services.search_recommendations_service.suggestion_index",
+            index,
+        ):
+            service = SearchRecommendationsService()
+            suggestions = await service.get_query_suggestions(db, "direc", limit=3)
+            fallback = await service.get_query_suggestions(db, "manag", limit=3)
+
+        assert texts(suggestions) == ["director general"]
+        assert fallback and all("manag" in s["text"] for s in fallback)
+        db.execute.assert_not_awaited()
+
+    async def test_built_index_keeps_user_history(self):
+        index = SuggestionIndex()
+        with patch_session(
+            result(scalar=1),
+            result([("director general", 9)]),
+            result(),
+            result(),
+            result(),
+        ):
+            await index.rebuild()
+        history = Mock()
+        history.fetchall = Mock(
+            return_value=[
+                Mock(query_text="director of finance", total_results=4),
+            ]
+        )
+        history_db = Mock()
+        history_db.execute = AsyncMock(return_value=history)
+
+        @asynccontextmanager
+        async def session_context():
+            yield history_db
+
+        with patch(
+            "jd_ingestion.services.search_recommendations_service.suggestion_index",
+            index,
+        ):
+            service = SearchRecommendationsService()
+            service.session_factory = session_context
+            anonymous = await service.get_query_suggestions(Mock(), "direc", limit=3)
+            personal = await service.get_query_suggestions(
+                Mock(), "direc", user_id="user-1", limit=3
+            )
+
+        assert texts(anonymous) == ["director general"]
+        assert texts(personal) == ["director of finance", "director general"]
+        assert personal[0]["type"] == "personal"
+        history_db.execute.assert_awaited_once()
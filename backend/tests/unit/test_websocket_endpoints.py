@@ -390,6 +390,115 @@ class TestConnectionManager:
         assert result == "Hello"  # No change
 
 
+class TestOperationBatches:
+    """Test batched operations and the bounded operation history."""
+
+    async def _session(self, connection_manager, mock_websocket, text=""):
+        await connection_manager.connect(mock_websocket, "session_123", 1, 456)
+        connection_manager.editing_sessions["session_123"]["document_state"] = text
+        mock_websocket.send_text.reset_mock()
+        return connection_manager.editing_sessions["session_123"]
+
+    def _last_message(self, websocket):
+        return json.loads(websocket.send_text.call_args[0][0])
+
+    @pytest.mark.asyncio
+    async def test_keystrokes_are_coalesced(self, connection_manager, mock_websocket):
+        """Consecutive typing and backspacing are stored as one operation each."""
+        session = await self._session(connection_manager, mock_websocket, "Hello world")
+        typing = [
+            {"type": "insert", "position": 5 + i, "text": char}
+            for i, char in enumerate(", big")
+        ]
+        backspaces = [
+            {"type": "delete", "start": 9 - i, "end": 10 - i} for i in range(4)
+        ]
+
+        await connection_manager.apply_operations(
+            "session_123", typing + backspaces, mock_websocket
+        )
+
+        assert session["document_state"] == "Hello, world"
+        assert session["operation_count"] == 1
+        assert [op.to_dict() for op in session["operation_history"]] == [
+            {"type": "insert", "position": 5, "text": ","}
+        ]
+        ack = self._last_message(mock_websocket)
+        assert ack["type"] == "operations_ack"
+        assert ack["sequence_number"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_is_transformed_against_missed_operations(
+        self, connection_manager, mock_websocket
+    ):
+        """A batch based on an old sequence lands after concurrent edits."""
+        session = await self._session(connection_manager, mock_websocket, "abc")
+        await connection_manager.apply_operation(
+            "session_123", {"type": "insert", "position": 0, "text": ">> "}, Mock()
+        )
+
+        await connection_manager.apply_operations(
+            "session_123",
+            [
+                {"type": "insert", "position": 3, "text": "d"},
+                {"type": "insert", "position": 4, "text": "e"},
+            ],
+            mock_websocket,
+            base_sequence=0,
+        )
+
+        assert session["document_state"] == ">> abcde"
+        assert session["operation_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_is_rejected_whole(
+        self, connection_manager, mock_websocket
+    ):
+        """No operation of a batch is applied when one of them is invalid."""
+        session = await self._session(connection_manager, mock_websocket, "abc")
+
+        await connection_manager.apply_operations(
+            "session_123",
+            [
+                {"type": "insert", "position": 3, "text": "d"},
+                {"type": "delete", "start": 0, "end": 10},
+            ],
+            mock_websocket,
+        )
+
+        assert session["document_state"] == "abc"
+        assert session["operation_count"] == 0
+        assert self._last_message(mock_websocket)["type"] == "operation_error"
+
+    @pytest.mark.asyncio
+    async def test_history_is_a_ring_buffer(self, connection_manager, mock_websocket):
+        """Old operations fall out of history; clients that far behind must reload."""
+        session = await self._session(connection_manager, mock_websocket)
+        history = session["operation_history"]
+        for i in range(history.maxlen + 5):
+            await connection_manager.apply_operation(
+                "session_123", {"type": "insert", "position": i, "text": "x"}, Mock()
+            )
+        assert len(history) == history.maxlen
+
+        await connection_manager.apply_operation(
+            "session_123",
+            {"type": "insert", "position": 0, "text": "late", "base_sequence": 2},
+            mock_websocket,
+        )
+
+        assert len(session["document_state"]) == history.maxlen + 5
+        assert self._last_message(mock_websocket)["type"] == "operation_error"
+
+        # A client just inside the history is still transformed
+        await connection_manager.apply_operation(
+            "session_123",
+            {"type": "insert", "position": 5, "text": "!", "base_sequence": 5},
+            mock_websocket,
+        )
+        assert str(session["document_state"]).endswith("!")
+
+
 class TestWebSocketEndpoints:
     """Test WebSocket endpoint functionality."""
 